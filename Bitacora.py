@@ -0,0 +1,166 @@
+import os, sys, time, logging, threading, weakref
+from logging.handlers import RotatingFileHandler
+from logging import DEBUG, INFO, WARNING, ERROR
+from Configuracion import APP_DATA_DIR, obtener_config_store
+from Traducciones import obtener_traduccion
+
+# Registro de la aplicación sobre el módulo logging. Cada mensaje va a tres salidas:
+# - La consola (stdout), como los print() de siempre.
+# - Un archivo rotatorio en LOGS_DIR.
+# - La ventana de progreso o los eventos 'log' de los trabajos, a través de signals.update_log y con un límite de mensajes por segundo.
+# Los mensajes por debajo del nivel configurado no se formatean ni se envían a ninguna salida.
+# Como los mensajes pueden omitirse o filtrarse, nadie debe sacar datos de su texto: el progreso y los costes
+# llegan por las señales update_progress y uso_modelos.
+
+# Carpeta y archivo del registro
+LOGS_DIR = os.path.join(APP_DATA_DIR, 'logs')
+ARCHIVO_LOG = os.path.join(LOGS_DIR, 'powerpoineador.log')
+
+# Tamaño máximo del archivo antes de rotarlo y número de archivos antiguos que se conservan
+MAX_BYTES_LOG = 2 * 1024 * 1024
+ARCHIVOS_LOG_ANTIGUOS = 3
+
+# Variable de entorno para elegir el nivel (tiene prioridad sobre 'nivel_log' en config.json)
+VARIABLE_ENTORNO = 'POWERPOINEADOR_NIVEL_LOG'
+NIVEL_POR_DEFECTO = 'INFO'
+
+# Mensajes por segundo que se envían a cada ventana o trabajo y ráfaga que se permite por encima
+# (los avisos y errores se envían siempre)
+MENSAJES_GUI_POR_SEGUNDO = 20
+RAFAGA_GUI = 50
+
+# Nombre del registro raíz de la aplicación
+NOMBRE_RAIZ = 'powerpoineador'
+
+_configurada = False
+_bloqueo = threading.Lock()
+
+# Clase para un mensaje traducido que solo se traduce y formatea si alguna salida lo va a escribir
+class MensajeTraducido:
+    __slots__ = ('clave', 'idioma', 'valores')
+
+    def __init__(self, clave, idioma='es', **valores):
+        self.clave = clave
+        self.idioma = idioma
+        self.valores = valores
+
+    def __str__(self):
+        texto = obtener_traduccion(self.clave, self.idioma)
+        return texto.format(**self.valores) if self.valores else texto
+
+# Clase de salida a la consola que escribe en el sys.stdout de cada momento
+# (la generación por lotes lo redirige a stderr para dejar stdout a los eventos JSON)
+class SalidaConsola(logging.StreamHandler):
+    def emit(self, record):
+        self.stream = sys.stdout
+        super().emit(record)
+
+# Clase de salida que envía los mensajes a signals.update_log, sin pasar de
+# MENSAJES_GUI_POR_SEGUNDO por cada objeto de señales para no saturar la ventana
+class SalidaSenales(logging.Handler):
+    def __init__(self, por_segundo=MENSAJES_GUI_POR_SEGUNDO, rafaga=RAFAGA_GUI):
+        super().__init__()
+        self.por_segundo = por_segundo
+        self.rafaga = rafaga
+        # Por cada objeto de señales: [fichas disponibles, último instante, mensajes omitidos]
+        self._cubos = weakref.WeakKeyDictionary()
+
+    # Función para saber si se puede enviar un mensaje a unas señales (el bloqueo del Handler ya está tomado)
+    def _admitir(self, signals, nivel):
+        try:
+            cubo = self._cubos.get(signals)
+        except TypeError:
+            return True, 0
+        ahora = time.monotonic()
+        if cubo is None:
+            cubo = [float(self.rafaga), ahora, 0]
+            try:
+                self._cubos[signals] = cubo
+            except TypeError:
+                return True, 0
+        cubo[0] = min(self.rafaga, cubo[0] + (ahora - cubo[1]) * self.por_segundo)
+        cubo[1] = ahora
+        if cubo[0] < 1 and nivel < WARNING:
+            cubo[2] += 1
+            return False, 0
+        cubo[0] = max(0.0, cubo[0] - 1)
+        omitidos, cubo[2] = cubo[2], 0
+        return True, omitidos
+
+    def emit(self, record):
+        signals = getattr(record, 'signals', None)
+        if signals is None:
+            return
+        admitido, omitidos = self._admitir(signals, record.levelno)
+        if not admitido:
+            return
+        try:
+            if omitidos:
+                signals.update_log.emit(obtener_traduccion('log_mensajes_omitidos', getattr(signals, 'current_language', 'es')).format(omitidos=omitidos))
+            signals.update_log.emit(self.format(record))
+        except RuntimeError:
+            # La ventana ya se cerró y Qt destruyó sus señales
+            pass
+
+# Función para leer el nivel configurado (variable de entorno o 'nivel_log' en config.json)
+def nivel_configurado():
+    nombre = os.environ.get(VARIABLE_ENTORNO)
+    if not nombre:
+        try:
+            nombre = obtener_config_store().obtener('nivel_log', NIVEL_POR_DEFECTO)
+        except Exception as e:
+            print(f"Error al leer el nivel del registro: {str(e)}", file=sys.stderr)
+            nombre = NIVEL_POR_DEFECTO
+    nivel = logging.getLevelName(str(nombre).upper())
+    return nivel if isinstance(nivel, int) else logging.INFO
+
+# Función para saber si se guarda el registro en disco (se puede desactivar con 'guardar_log' en config.json)
+def archivo_activado():
+    try:
+        return bool(obtener_config_store().obtener('guardar_log', True))
+    except Exception as e:
+        print(f"Error al leer la configuración del registro: {str(e)}", file=sys.stderr)
+        return True
+
+# Función para preparar las salidas del registro (solo la primera vez que se llama)
+def configurar_bitacora(nivel=None):
+    global _configurada
+    with _bloqueo:
+        raiz = logging.getLogger(NOMBRE_RAIZ)
+        if _configurada:
+            if nivel is not None:
+                raiz.setLevel(nivel)
+            return raiz
+        _configurada = True
+        raiz.setLevel(nivel if nivel is not None else nivel_configurado())
+        # Los mensajes no pasan al registro raíz de Python, que pueden configurar las librerías
+        raiz.propagate = False
+
+        consola = SalidaConsola()
+        consola.setFormatter(logging.Formatter('%(message)s'))
+        raiz.addHandler(consola)
+
+        senales = SalidaSenales()
+        senales.setFormatter(logging.Formatter('%(message)s'))
+        raiz.addHandler(senales)
+
+        if archivo_activado():
+            try:
+                os.makedirs(LOGS_DIR, exist_ok=True)
+                archivo = RotatingFileHandler(ARCHIVO_LOG, maxBytes=MAX_BYTES_LOG, backupCount=ARCHIVOS_LOG_ANTIGUOS, encoding='utf-8', delay=True)
+                archivo.setFormatter(logging.Formatter('%(asctime)s %(levelname)-7s [%(threadName)s] %(name)s: %(message)s'))
+                raiz.addHandler(archivo)
+            except OSError as e:
+                print(f"Error al abrir el archivo de registro: {str(e)}", file=sys.stderr)
+        return raiz
+
+# Función para obtener el registro de un módulo (por ejemplo, obtener_registro(__name__))
+def obtener_registro(nombre):
+    configurar_bitacora()
+    return logging.getLogger(f"{NOMBRE_RAIZ}.{nombre}")
+
+# Función para escribir un mensaje en el registro y enviarlo a unas señales (si las hay)
+# - mensaje: texto o MensajeTraducido (que solo se formatea si el nivel está activo)
+def registrar(registro, signals, mensaje, nivel=INFO):
+    if registro.isEnabledFor(nivel):
+        registro.log(nivel, mensaje, extra={'signals': signals})
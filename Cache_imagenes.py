@@ -0,0 +1,105 @@
+import os, json, hashlib, threading
+from PIL import Image
+from Configuracion import APP_DATA_DIR, obtener_config_store
+from Bitacora import obtener_registro
+
+# Registro del módulo
+registro = obtener_registro(__name__)
+
+# Las imágenes cacheadas se guardan junto a las de las diapositivas, en su propia carpeta
+CACHE_DIR = os.path.join(APP_DATA_DIR, 'images', 'cache')
+
+# Tamaño máximo de la caché en MB (se puede cambiar con 'tamano_max_cache_imagenes_mb' en config.json)
+TAMANO_MAX_CACHE_MB = 500
+
+# Contadores de aciertos y fallos de la caché desde que se abrió la aplicación
+estadisticas = {'aciertos': 0, 'fallos': 0}
+_bloqueo = threading.Lock()
+# Resultado de la última búsqueda en la caché hecha desde cada hilo
+_ultima_busqueda = threading.local()
+
+# Función para calcular la clave de una imagen a partir del modelo y de todos sus parámetros de entrada (incluida la semilla)
+def clave_imagen(modelo, entrada):
+    contenido = json.dumps({'modelo': modelo, 'entrada': entrada}, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(contenido.encode('utf-8')).hexdigest()
+
+# Función para obtener la ruta del archivo de una clave
+def ruta_imagen(clave):
+    return os.path.join(CACHE_DIR, f"{clave}.png")
+
+# Función para obtener el tamaño máximo de la caché en bytes
+def obtener_tamano_max():
+    tamano_mb = TAMANO_MAX_CACHE_MB
+    try:
+        config = obtener_config_store().leer()
+        tamano_mb = float(config.get('tamano_max_cache_imagenes_mb', tamano_mb))
+    except Exception as e:
+        registro.warning("Error al leer el tamaño máximo de la caché de imágenes: %s", e)
+    return int(tamano_mb * 1024 * 1024)
+
+# Función para buscar una imagen en la caché; devuelve None si no está o si no se debe usar
+def obtener_imagen_cacheada(modelo, entrada, usar_cache=True):
+    _ultima_busqueda.acierto = False
+    if not usar_cache:
+        return None
+    ruta = ruta_imagen(clave_imagen(modelo, entrada))
+    try:
+        img = Image.open(ruta)
+        img.load()
+        # Marcar la imagen como usada recientemente para el desalojo LRU
+        os.utime(ruta, None)
+    except (FileNotFoundError, OSError):
+        with _bloqueo:
+            estadisticas['fallos'] += 1
+        return None
+    with _bloqueo:
+        estadisticas['aciertos'] += 1
+    _ultima_busqueda.acierto = True
+    return img
+
+# Función para saber si la última búsqueda hecha desde este hilo encontró la imagen en la caché
+def ultima_busqueda_fue_acierto():
+    return getattr(_ultima_busqueda, 'acierto', False)
+
+# Función para guardar una imagen generada en la caché
+def guardar_imagen_cacheada(modelo, entrada, img):
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        ruta = ruta_imagen(clave_imagen(modelo, entrada))
+        # Escribir en un archivo temporal y renombrarlo para no dejar imágenes a medias
+        ruta_temporal = f"{ruta}.{threading.get_ident()}.tmp"
+        img.save(ruta_temporal, format='PNG')
+        os.replace(ruta_temporal, ruta)
+        limpiar_cache()
+    except Exception as e:
+        registro.warning("Error al guardar la imagen en la caché: %s", e)
+
+# Función para eliminar las imágenes usadas hace más tiempo hasta quedar por debajo del tamaño máximo
+def limpiar_cache(tamano_max=None):
+    if tamano_max is None:
+        tamano_max = obtener_tamano_max()
+    with _bloqueo:
+        try:
+            archivos = []
+            for nombre in os.listdir(CACHE_DIR):
+                if not nombre.endswith('.png'):
+                    continue
+                ruta = os.path.join(CACHE_DIR, nombre)
+                info = os.stat(ruta)
+                archivos.append((info.st_mtime, info.st_size, ruta))
+        except FileNotFoundError:
+            return
+        total = sum(tamano for _, tamano, _ in archivos)
+        for _, tamano, ruta in sorted(archivos):
+            if total <= tamano_max:
+                break
+            try:
+                os.remove(ruta)
+                total -= tamano
+            except OSError:
+                pass
+
+# Función para obtener una copia de los contadores de la caché
+def obtener_estadisticas():
+    with _bloqueo:
+        return dict(estadisticas)
@@ -0,0 +1,99 @@
+import os, json, time, hashlib, sqlite3, threading, unicodedata
+from Configuracion import APP_DATA_DIR, obtener_config_store
+from Bitacora import obtener_registro
+
+# Registro del módulo
+registro = obtener_registro(__name__)
+
+# Base de datos donde se guardan las respuestas de los modelos de texto
+CACHE_DB = os.path.join(APP_DATA_DIR, 'cache_respuestas.sqlite3')
+
+# Valores por defecto (se pueden cambiar con 'ttl_cache_respuestas_horas' y 'max_respuestas_cacheadas' en config.json)
+TTL_CACHE_HORAS = 24 * 7
+MAX_RESPUESTAS_CACHEADAS = 500
+
+_bloqueo = threading.Lock()
+
+# Función para normalizar el prompt: mismos caracteres Unicode y espacios colapsados
+def normalizar_prompt(prompt):
+    prompt = unicodedata.normalize('NFC', prompt or '')
+    return ' '.join(prompt.split())
+
+# Función para calcular la clave de una respuesta a partir del modelo y del prompt normalizado
+def clave_respuesta(modelo, prompt):
+    contenido = f"{modelo}\n{normalizar_prompt(prompt)}"
+    return hashlib.sha256(contenido.encode('utf-8')).hexdigest()
+
+# Función para leer los límites de la caché desde config.json
+def obtener_limites():
+    ttl_horas = TTL_CACHE_HORAS
+    max_respuestas = MAX_RESPUESTAS_CACHEADAS
+    try:
+        config = obtener_config_store().leer()
+        ttl_horas = float(config.get('ttl_cache_respuestas_horas', ttl_horas))
+        max_respuestas = int(config.get('max_respuestas_cacheadas', max_respuestas))
+    except Exception as e:
+        registro.warning("Error al leer los límites de la caché de respuestas: %s", e)
+    return ttl_horas * 3600, max_respuestas
+
+# Función para abrir la base de datos, creando la tabla si no existe
+def _conectar():
+    os.makedirs(APP_DATA_DIR, exist_ok=True)
+    conexion = sqlite3.connect(CACHE_DB, timeout=10)
+    conexion.execute(
+        "CREATE TABLE IF NOT EXISTS respuestas ("
+        "clave TEXT PRIMARY KEY, modelo TEXT, respuesta TEXT, creada REAL, usada REAL)"
+    )
+    return conexion
+
+# Función para buscar una respuesta en la caché; devuelve None si no está, ha caducado o no se debe usar
+def obtener_respuesta_cacheada(modelo, prompt, usar_cache=True):
+    if not usar_cache:
+        return None
+    ttl, _ = obtener_limites()
+    clave = clave_respuesta(modelo, prompt)
+    ahora = time.time()
+    try:
+        with _bloqueo:
+            conexion = _conectar()
+            try:
+                fila = conexion.execute("SELECT respuesta, creada FROM respuestas WHERE clave = ?", (clave,)).fetchone()
+                if fila is None:
+                    return None
+                if ahora - fila[1] > ttl:
+                    conexion.execute("DELETE FROM respuestas WHERE clave = ?", (clave,))
+                    conexion.commit()
+                    return None
+                # Marcar la respuesta como usada recientemente para el desalojo LRU
+                conexion.execute("UPDATE respuestas SET usada = ? WHERE clave = ?", (ahora, clave))
+                conexion.commit()
+                return json.loads(fila[0])
+            finally:
+                conexion.close()
+    except Exception as e:
+        registro.warning("Error al leer la caché de respuestas: %s", e)
+        return None
+
+# Función para guardar una respuesta en la caché y eliminar las caducadas o sobrantes
+def guardar_respuesta_cacheada(modelo, prompt, respuesta):
+    ttl, max_respuestas = obtener_limites()
+    clave = clave_respuesta(modelo, prompt)
+    ahora = time.time()
+    try:
+        with _bloqueo:
+            conexion = _conectar()
+            try:
+                conexion.execute(
+                    "INSERT OR REPLACE INTO respuestas (clave, modelo, respuesta, creada, usada) VALUES (?, ?, ?, ?, ?)",
+                    (clave, modelo, json.dumps(respuesta, ensure_ascii=False), ahora, ahora)
+                )
+                conexion.execute("DELETE FROM respuestas WHERE creada < ?", (ahora - ttl,))
+                conexion.execute(
+                    "DELETE FROM respuestas WHERE clave NOT IN (SELECT clave FROM respuestas ORDER BY usada DESC LIMIT ?)",
+                    (max(0, max_respuestas),)
+                )
+                conexion.commit()
+            finally:
+                conexion.close()
+    except Exception as e:
+        registro.warning("Error al guardar la respuesta en la caché: %s", e)
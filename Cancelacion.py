@@ -0,0 +1,116 @@
+import threading
+from contextlib import contextmanager
+from Bitacora import obtener_registro
+
+# Registro del módulo
+registro = obtener_registro(__name__)
+
+# Excepción lanzada cuando se cancela la generación (el worker ya trata InterruptedError como una cancelación)
+class CancelacionError(InterruptedError):
+    reintentable = False
+
+    def __init__(self, mensaje="Generación cancelada"):
+        super().__init__(mensaje)
+
+# Clase que avisa a todas las partes de una generación de que se ha cancelado
+class TokenCancelacion:
+    def __init__(self):
+        self._evento = threading.Event()
+        self._bloqueo = threading.Lock()
+        self._funciones = {}
+        self._siguiente = 0
+        # Función para dejar de depender del token padre (si es un token hijo)
+        self._soltar = lambda: None
+
+    # Función para cancelar: marca el token y ejecuta las funciones registradas (cerrar conexiones, abortar llamadas...)
+    def cancelar(self):
+        with self._bloqueo:
+            if self._evento.is_set():
+                return
+            self._evento.set()
+            funciones = list(self._funciones.values())
+            self._funciones.clear()
+        self.soltar()
+        for funcion in funciones:
+            try:
+                funcion()
+            except Exception as e:
+                registro.warning("Error al cancelar: %s", e)
+
+    # Función para saber si se ha cancelado
+    @property
+    def cancelado(self):
+        return self._evento.is_set()
+
+    # Función para lanzar CancelacionError si se ha cancelado
+    def comprobar(self):
+        if self._evento.is_set():
+            raise CancelacionError()
+
+    # Función para esperar unos segundos; devuelve True si se cancela antes
+    def esperar(self, segundos):
+        return self._evento.wait(segundos)
+
+    # Función para registrar una función que se ejecuta al cancelar; devuelve otra función para quitarla
+    # (si ya está cancelado, se ejecuta enseguida)
+    def al_cancelar(self, funcion):
+        with self._bloqueo:
+            if not self._evento.is_set():
+                clave = self._siguiente
+                self._siguiente += 1
+                self._funciones[clave] = funcion
+                return lambda: self._quitar(clave)
+        funcion()
+        return lambda: None
+
+    # Función para quitar una función registrada
+    def _quitar(self, clave):
+        with self._bloqueo:
+            self._funciones.pop(clave, None)
+
+    # Función para crear un token hijo: se cancela cuando se cancela este, pero también se puede cancelar solo
+    # (por ejemplo, la petición perdedora de una imagen duplicada, sin cancelar el resto de la generación)
+    def crear_hijo(self):
+        hijo = TokenCancelacion()
+        hijo._soltar = self.al_cancelar(hijo.cancelar)
+        return hijo
+
+    # Función para que un token hijo que ya no hace falta deje de estar registrado en su padre
+    def soltar(self):
+        soltar, self._soltar = self._soltar, lambda: None
+        soltar()
+
+# Función para crear un token hijo del indicado (o uno independiente si no hay token)
+def crear_token_hijo(padre=None):
+    return padre.crear_hijo() if padre is not None else TokenCancelacion()
+
+# Token de la generación que se está haciendo en cada hilo
+_actual = threading.local()
+
+# Función para obtener el token de cancelación del hilo actual (None si no hay)
+def token_actual():
+    return getattr(_actual, 'token', None)
+
+# Función para usar un token de cancelación en el hilo actual mientras dura el bloque
+@contextmanager
+def usar_token(token):
+    anterior = token_actual()
+    _actual.token = token
+    try:
+        yield token
+    finally:
+        _actual.token = anterior
+
+# Función para lanzar CancelacionError si la generación del hilo actual se ha cancelado
+def comprobar_cancelacion():
+    token = token_actual()
+    if token is not None:
+        token.comprobar()
+
+# Función para esperar unos segundos, despertando y lanzando CancelacionError si se cancela antes
+def esperar(segundos):
+    token = token_actual()
+    if token is None:
+        threading.Event().wait(segundos)
+    elif token.esperar(segundos):
+        raise CancelacionError()
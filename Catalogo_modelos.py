@@ -0,0 +1,165 @@
+import os, importlib
+
+# Imágenes que se pueden pedir a la vez a cada proveedor si el modelo no indica otro límite
+MAX_SIMULTANEAS_POR_PROVEEDOR = {
+    'replicate': 4,
+    'xai': 2,
+    'google': 2,
+}
+
+# Catálogo de modelos: etiqueta mostrada en la interfaz -> datos del modelo
+# - tipo: 'texto' o 'imagen'
+# - proveedor: API cuya clave hace falta para usarlo ('replicate', 'xai' o 'google')
+# - modulo: módulo de modelos/ que lo implementa (se importa la primera vez que se usa)
+# - icono: icono que se muestra en la interfaz
+# - precio: precio por uso en dólares (None si no se conoce)
+# - imagen_personalizada: el modelo necesita una foto de referencia del usuario
+# - recibe_signals: la función del módulo acepta las señales para escribir en el log
+# - max_simultaneas: límite de peticiones a la vez (si no, el del proveedor)
+# El orden de las entradas es el orden en el que aparecen en los desplegables
+MODELOS = {
+    # Modelos de texto de Google
+    'gemini-2.5-flash-preview-05-20': {'tipo': 'texto', 'proveedor': 'google', 'modulo': 'modelos.IA_gemini2_5_flash', 'icono': 'iconos/gemini.png', 'precio': None},
+    'gemini-2.0-flash': {'tipo': 'texto', 'proveedor': 'google', 'modulo': 'modelos.IA_gemini2_flash', 'icono': 'iconos/gemini.png', 'precio': None},
+    'gemini-2.0-flash-thinking-exp-01-21': {'tipo': 'texto', 'proveedor': 'google', 'modulo': 'modelos.IA_gemini2_flash_thinking', 'icono': 'iconos/gemini.png', 'precio': None},
+    # Modelos de imagen de Google
+    'gemini-2.0-flash-preview-image-generation': {'tipo': 'imagen', 'proveedor': 'google', 'modulo': 'modelos.IA_gemini2_flash_image', 'icono': 'iconos/gemini.png', 'precio': None, 'recibe_signals': True},
+    # Modelos de texto de Replicate
+    'gpt-4.1 [$0.0056]': {'tipo': 'texto', 'proveedor': 'replicate', 'modulo': 'modelos.IA_gpt4_1', 'icono': 'iconos/openai.png', 'precio': 0.0056},
+    'gpt-4.1-nano [$0.00028]': {'tipo': 'texto', 'proveedor': 'replicate', 'modulo': 'modelos.IA_gpt4_1_nano', 'icono': 'iconos/openai.png', 'precio': 0.00028},
+    'o4-mini [$0.0028]': {'tipo': 'texto', 'proveedor': 'replicate', 'modulo': 'modelos.IA_o4_mini', 'icono': 'iconos/openai.png', 'precio': 0.0028},
+    'gpt-4o [$0.00112]': {'tipo': 'texto', 'proveedor': 'replicate', 'modulo': 'modelos.IA_gpt4o', 'icono': 'iconos/openai.png', 'precio': 0.00112},
+    'gpt-4o-mini [$0.00042]': {'tipo': 'texto', 'proveedor': 'replicate', 'modulo': 'modelos.IA_gpt4o_mini', 'icono': 'iconos/openai.png', 'precio': 0.00042},
+    'deepseek-r1 [$0.007]': {'tipo': 'texto', 'proveedor': 'replicate', 'modulo': 'modelos.IA_deepseek', 'icono': 'iconos/deepseek.png', 'precio': 0.007},
+    'claude-4-sonnet [$0.0105]': {'tipo': 'texto', 'proveedor': 'replicate', 'modulo': 'modelos.IA_sonnet4', 'icono': 'iconos/claude.png', 'precio': 0.0105},
+    'claude-3.7-sonnet [$0.0105]': {'tipo': 'texto', 'proveedor': 'replicate', 'modulo': 'modelos.IA_sonnet3_7', 'icono': 'iconos/claude.png', 'precio': 0.0105},
+    'claude-3.5-sonnet [$0.01312]': {'tipo': 'texto', 'proveedor': 'replicate', 'modulo': 'modelos.IA_sonnet3_5', 'icono': 'iconos/claude.png', 'precio': 0.01312},
+    'claude-3.5-haiku [$0.0035]': {'tipo': 'texto', 'proveedor': 'replicate', 'modulo': 'modelos.IA_haiku', 'icono': 'iconos/claude.png', 'precio': 0.0035},
+    'meta-llama-4-scout-instruct [$0.00046]': {'tipo': 'texto', 'proveedor': 'replicate', 'modulo': 'modelos.IA_llama4s', 'icono': 'iconos/meta.png', 'precio': 0.00046},
+    'meta-llama-4-maverick-instruct [$0.00067]': {'tipo': 'texto', 'proveedor': 'replicate', 'modulo': 'modelos.IA_llama4m', 'icono': 'iconos/meta.png', 'precio': 0.00067},
+    'meta-llama-3.1-405b-instruct [$0.0067]': {'tipo': 'texto', 'proveedor': 'replicate', 'modulo': 'modelos.IA_llama3', 'icono': 'iconos/meta.png', 'precio': 0.0067},
+    'dolphin-2.9-llama3-70b-gguf [$0.050]': {'tipo': 'texto', 'proveedor': 'replicate', 'modulo': 'modelos.IA_dolphin', 'icono': 'iconos/dolphin.png', 'precio': 0.050},
+    # Modelos de imagen de Replicate
+    'dall-e-3 [$0.12]': {'tipo': 'imagen', 'proveedor': 'replicate', 'modulo': 'modelos.IA_dall_e_3', 'icono': 'iconos/openai.png', 'precio': 0.12},
+    'dall-e-2 [$0.02]': {'tipo': 'imagen', 'proveedor': 'replicate', 'modulo': 'modelos.IA_dall_e_2', 'icono': 'iconos/openai.png', 'precio': 0.02},
+    'flux-schnell [$0.003]': {'tipo': 'imagen', 'proveedor': 'replicate', 'modulo': 'modelos.IA_fluxschnell', 'icono': 'iconos/fluxschnell.png', 'precio': 0.003},
+    'imagen-4 [$0.05]': {'tipo': 'imagen', 'proveedor': 'replicate', 'modulo': 'modelos.IA_imagen4', 'icono': 'iconos/google.png', 'precio': 0.05},
+    'imagen-3 [$0.05]': {'tipo': 'imagen', 'proveedor': 'replicate', 'modulo': 'modelos.IA_imagen3', 'icono': 'iconos/google.png', 'precio': 0.05},
+    'imagen-3-fast [$0.025]': {'tipo': 'imagen', 'proveedor': 'replicate', 'modulo': 'modelos.IA_imagen3fast', 'icono': 'iconos/google.png', 'precio': 0.025},
+    'sana [$0.0067]': {'tipo': 'imagen', 'proveedor': 'replicate', 'modulo': 'modelos.IA_sana', 'icono': 'iconos/nvidia.png', 'precio': 0.0067},
+    'sana-sprint-1.6b [$0.0015]': {'tipo': 'imagen', 'proveedor': 'replicate', 'modulo': 'modelos.IA_sana_sprint', 'icono': 'iconos/nvidia.png', 'precio': 0.0015},
+    'photomaker [$0.0070]': {'tipo': 'imagen', 'proveedor': 'replicate', 'modulo': 'modelos.IA_photomaker', 'icono': 'iconos/photomaker.png', 'precio': 0.0070, 'imagen_personalizada': True},
+    'flux-pulid [$0.032]': {'tipo': 'imagen', 'proveedor': 'replicate', 'modulo': 'modelos.IA_fluxpulid', 'icono': 'iconos/bytedance.png', 'precio': 0.032, 'imagen_personalizada': True},
+    'hyper-flux-8step [$0.045]': {'tipo': 'imagen', 'proveedor': 'replicate', 'modulo': 'modelos.IA_flux8', 'icono': 'iconos/bytedance.png', 'precio': 0.045},
+    'hyper-flux-16step [$0.047]': {'tipo': 'imagen', 'proveedor': 'replicate', 'modulo': 'modelos.IA_flux16', 'icono': 'iconos/bytedance.png', 'precio': 0.047},
+    'sdxl-lightning-4step [$0.0037]': {'tipo': 'imagen', 'proveedor': 'replicate', 'modulo': 'modelos.IA_sdxl', 'icono': 'iconos/bytedance.png', 'precio': 0.0037},
+    'model3_4 [$0.00098]': {'tipo': 'imagen', 'proveedor': 'replicate', 'modulo': 'modelos.IA_model3_4', 'icono': 'iconos/lightweight.png', 'precio': 0.00098},
+    'dgmtnzflux [$0.03]': {'tipo': 'imagen', 'proveedor': 'replicate', 'modulo': 'modelos.IA_dgmtnzflux', 'icono': 'iconos/dgmtnzflux.png', 'precio': 0.03},
+    # Modelos de texto de xAI
+    'grok-3': {'tipo': 'texto', 'proveedor': 'xai', 'modulo': 'modelos.IA_grok3', 'icono': 'iconos/grok.jpg', 'precio': None},
+    'grok-3-mini': {'tipo': 'texto', 'proveedor': 'xai', 'modulo': 'modelos.IA_grok3_mini', 'icono': 'iconos/grok.jpg', 'precio': None},
+    'grok-3-mini-fast': {'tipo': 'texto', 'proveedor': 'xai', 'modulo': 'modelos.IA_grok3_mini_fast', 'icono': 'iconos/grok.jpg', 'precio': None},
+    'grok-2-1212': {'tipo': 'texto', 'proveedor': 'xai', 'modulo': 'modelos.IA_grok2', 'icono': 'iconos/grok.jpg', 'precio': None},
+    # Modelos de imagen de xAI
+    'grok-2-image-1212': {'tipo': 'imagen', 'proveedor': 'xai', 'modulo': 'modelos.IA_grok2_image', 'icono': 'iconos/grok.jpg', 'precio': None},
+}
+
+# Etiquetas antiguas (con otros precios) que todavía pueden venir de configuraciones o código anterior
+ALIAS_MODELOS = {
+    'flux-pulid [$0.027]': 'flux-pulid [$0.032]',
+    'flux-pulid [$0.029]': 'flux-pulid [$0.032]',
+    'photomaker [$0.0067]': 'photomaker [$0.0070]',
+    'photomaker [$0.0069]': 'photomaker [$0.0070]',
+}
+
+# Modelo de texto que se usa si la etiqueta no está en el catálogo
+MODELO_TEXTO_POR_DEFECTO = 'dolphin-2.9-llama3-70b-gguf [$0.050]'
+
+# Modelos que se prueban, en orden, cuando falla un modelo (se pueden cambiar con 'cadenas_respaldo' en config.json)
+CADENAS_RESPALDO = {
+    'gemini-2.0-flash-preview-image-generation': ['imagen-3-fast [$0.025]', 'flux-schnell [$0.003]'],
+    'grok-2-image-1212': ['imagen-3-fast [$0.025]', 'flux-schnell [$0.003]'],
+    'imagen-4 [$0.05]': ['imagen-3-fast [$0.025]', 'flux-schnell [$0.003]'],
+    'imagen-3 [$0.05]': ['imagen-3-fast [$0.025]', 'flux-schnell [$0.003]'],
+    'imagen-3-fast [$0.025]': ['flux-schnell [$0.003]'],
+    'grok-3': ['gpt-4.1-nano [$0.00028]'],
+    'grok-3-mini': ['gpt-4.1-nano [$0.00028]'],
+    'grok-3-mini-fast': ['gpt-4.1-nano [$0.00028]'],
+    'grok-2-1212': ['gpt-4.1-nano [$0.00028]'],
+    'gemini-2.5-flash-preview-05-20': ['gemini-2.0-flash', 'gpt-4.1-nano [$0.00028]'],
+    'gemini-2.0-flash': ['gpt-4.1-nano [$0.00028]'],
+    'gemini-2.0-flash-thinking-exp-01-21': ['gemini-2.0-flash', 'gpt-4.1-nano [$0.00028]'],
+}
+
+# Variables de entorno en las que la aplicación deja la clave API de cada proveedor
+VARIABLES_CLAVE_PROVEEDOR = {
+    'replicate': ('REPLICATE_API_TOKEN',),
+    'xai': ('GROK_API_KEY',),
+    'google': ('GOOGLE_API_KEY', 'GEMINI_API_KEY'),
+}
+
+# Función para obtener la etiqueta actual de un modelo (resolviendo etiquetas antiguas)
+def normalizar_etiqueta(etiqueta):
+    return ALIAS_MODELOS.get(etiqueta, etiqueta)
+
+# Función para obtener los datos de un modelo; devuelve None si no está en el catálogo
+def obtener_modelo(etiqueta):
+    return MODELOS.get(normalizar_etiqueta(etiqueta))
+
+# Función para importar el módulo que implementa un modelo (solo se importa la primera vez)
+def cargar_modulo(etiqueta):
+    modelo = obtener_modelo(etiqueta)
+    if modelo is None:
+        raise KeyError(etiqueta)
+    return importlib.import_module(modelo['modulo'])
+
+# Función para obtener las etiquetas de un tipo de modelo que ofrece un proveedor, en orden
+def modelos_por_proveedor(tipo, proveedor):
+    return [etiqueta for etiqueta, modelo in MODELOS.items() if modelo['tipo'] == tipo and modelo['proveedor'] == proveedor]
+
+# Función para obtener el proveedor de un modelo
+def obtener_proveedor(etiqueta):
+    modelo = obtener_modelo(etiqueta)
+    return modelo['proveedor'] if modelo else 'replicate'
+
+# Función para obtener el precio de un modelo (0.0 si no se conoce)
+def obtener_precio(etiqueta):
+    modelo = obtener_modelo(etiqueta)
+    if modelo and modelo.get('precio') is not None:
+        return modelo['precio']
+    return 0.0
+
+# Función para saber si un modelo necesita la foto de referencia del usuario
+def requiere_imagen_personalizada(etiqueta):
+    modelo = obtener_modelo(etiqueta)
+    return bool(modelo and modelo.get('imagen_personalizada'))
+
+# Función para obtener cuántas peticiones se pueden hacer a la vez a un modelo
+def obtener_max_simultaneas(etiqueta):
+    modelo = obtener_modelo(etiqueta) or {}
+    return modelo.get('max_simultaneas', MAX_SIMULTANEAS_POR_PROVEEDOR.get(obtener_proveedor(etiqueta), 1))
+
+# Función para saber si hay una clave API configurada para un proveedor
+def proveedor_configurado(proveedor):
+    return any(os.environ.get(variable) for variable in VARIABLES_CLAVE_PROVEEDOR.get(proveedor, ()))
+
+# Función para obtener los modelos que se prueban para una etiqueta: el propio modelo y después sus respaldos
+# Solo se usan respaldos del mismo tipo, con clave API configurada y que necesiten (o no) la foto de referencia igual que el original
+def obtener_cadena_modelos(etiqueta, cadenas=None):
+    etiqueta = normalizar_etiqueta(etiqueta)
+    cadena = [etiqueta]
+    modelo = obtener_modelo(etiqueta)
+    if modelo is None:
+        return cadena
+    cadenas = CADENAS_RESPALDO if cadenas is None else cadenas
+    for respaldo in cadenas.get(etiqueta, []):
+        respaldo = normalizar_etiqueta(respaldo)
+        datos = obtener_modelo(respaldo)
+        if datos is None or respaldo in cadena or datos['tipo'] != modelo['tipo']:
+            continue
+        if bool(datos.get('imagen_personalizada')) != bool(modelo.get('imagen_personalizada')):
+            continue
+        if not proveedor_configurado(datos['proveedor']):
+            continue
+        cadena.append(respaldo)
+    return cadena
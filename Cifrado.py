@@ -1,31 +1,55 @@
-import os, base64, platform
+import os, base64, platform, threading
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 
 class GestorCifrado:
-    
-    # Generar clave de cifrado
+
+    # Clave derivada y objeto Fernet guardados para todo el proceso (PBKDF2 es lento a propósito)
+    _identidad_cacheada = None
+    _clave_cacheada = None
+    _fernet_cacheado = None
+    _bloqueo = threading.Lock()
+
+    # Obtener la información del sistema que se usa como semilla de la clave
     @staticmethod
-    def get_encryption_key():
+    def get_system_identity():
+        return f"{platform.node()}-{platform.machine()}-{os.getuid() if hasattr(os, 'getuid') else os.getlogin()}"
+
+    # Generar clave de cifrado
+    @classmethod
+    def get_encryption_key(cls):
         # Usar información del sistema para generar una semilla consistente
-        system_info = f"{platform.node()}-{platform.machine()}-{os.getuid() if hasattr(os, 'getuid') else os.getlogin()}"
-        salt = b'powerpoineador_salt'
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=salt,
-            iterations=100000,
-        )
-        key = base64.urlsafe_b64encode(kdf.derive(system_info.encode()))
-        return key
+        system_info = cls.get_system_identity()
+        with cls._bloqueo:
+            # Reutilizar la clave si la identidad de la máquina no ha cambiado
+            if cls._clave_cacheada is not None and cls._identidad_cacheada == system_info:
+                return cls._clave_cacheada
+            salt = b'powerpoineador_salt'
+            kdf = PBKDF2HMAC(
+                algorithm=hashes.SHA256(),
+                length=32,
+                salt=salt,
+                iterations=100000,
+            )
+            key = base64.urlsafe_b64encode(kdf.derive(system_info.encode()))
+            cls._identidad_cacheada = system_info
+            cls._clave_cacheada = key
+            cls._fernet_cacheado = Fernet(key)
+            return key
+
+    # Obtener el objeto Fernet de la clave actual (se crea una sola vez por clave)
+    @classmethod
+    def get_fernet(cls):
+        cls.get_encryption_key()
+        return cls._fernet_cacheado
 
     # Función para cifrar API
     @classmethod
     def encrypt_text(cls, text):
         if not text:
             return ""
-        fernet = Fernet(cls.get_encryption_key())
+        fernet = cls.get_fernet()
         return fernet.encrypt(text.encode()).decode()
 
     # Función para descifrar API
@@ -34,20 +58,27 @@ class GestorCifrado:
         if not encrypted_text:
             return None
         try:
-            fernet = Fernet(cls.get_encryption_key())
+            fernet = cls.get_fernet()
             return fernet.decrypt(encrypted_text.encode()).decode()
         except Exception:
             # Si hay error al descifrar, puede ser que esté sin cifrar o que sea inválido
             return encrypted_text
 
+    # Función para descifrar varias APIs de una vez ({nombre: texto cifrado} -> {nombre: texto descifrado})
+    @classmethod
+    def decrypt_many(cls, encrypted_texts):
+        # Derivar la clave una sola vez para todas las claves
+        cls.get_fernet()
+        return {nombre: cls.decrypt_text(texto) for nombre, texto in encrypted_texts.items()}
+
     # Función para migrar claves antiguas
     @classmethod
     def migrar_claves_antiguas(cls, config_file):
         try:
-            if os.path.exists(config_file):
-                with open(config_file, 'r', encoding='utf-8') as f:
-                    import json
-                    config = json.load(f)
+            from Configuracion import obtener_config_store
+            config_store = obtener_config_store(config_file)
+            if config_store.existe():
+                config = config_store.leer()
                 
                 # Verificar si hay claves sin cifrar
                 api_key = config.get('api_key')
@@ -73,8 +104,8 @@ class GestorCifrado:
                     ha_cambiado = True
                 
                 if ha_cambiado:
-                    with open(config_file, 'w', encoding='utf-8') as f:
-                        json.dump(config, f, ensure_ascii=False, indent=4)
+                    config_store.guardar(config)
+                    config_store.flush()
                 
                 return ha_cambiado
                 
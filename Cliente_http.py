@@ -0,0 +1,213 @@
+import os, threading, requests
+from requests.adapters import HTTPAdapter
+from Plazos import obtener_plazos, ejecutar_con_plazo, vigilar_stream
+from Cancelacion import token_actual
+from Grabacion import obtener_grabadora
+from Trazas import medir
+from Bitacora import obtener_registro
+
+# Registro del módulo
+registro = obtener_registro(__name__)
+
+# Conexiones abiertas como máximo contra un mismo host, por proveedor
+# ('descargas' es la sesión para bajar las imágenes generadas de los CDN de los proveedores)
+MAX_CONEXIONES_POR_HOST = {
+    'replicate': 8,
+    'xai': 4,
+    'google': 4,
+    'descargas': 8,
+}
+
+# Tiempos máximos de espera por proveedor: (conexión, lectura) en segundos
+TIMEOUTS = {
+    'replicate': (10, 60),
+    'xai': (10, 300),
+    'google': (10, 300),
+    'descargas': (10, 60),
+}
+
+# Tiempo máximo de espera de las peticiones a Gemini, en segundos
+TIMEOUT_GEMINI = 300
+
+# Dirección base de la API de cada proveedor. Se puede cambiar con la variable de entorno
+# POWERPOINEADOR_URL_<PROVEEDOR> (por ejemplo para usar el servidor simulado de benchmarks/servidor_simulado.py)
+URLS_BASE = {
+    'replicate': 'https://api.replicate.com',
+    'xai': 'https://api.x.ai',
+    'google': 'https://generativelanguage.googleapis.com',
+}
+
+_sesiones = {}
+_clientes_gemini = {}
+_clientes_replicate = {}
+_bloqueo = threading.Lock()
+
+# Función para obtener el tiempo de espera de un proveedor
+def obtener_timeout(proveedor):
+    return TIMEOUTS.get(proveedor, TIMEOUTS['descargas'])
+
+# Función para obtener la dirección base de la API de un proveedor
+def obtener_url_base(proveedor):
+    return (os.environ.get(f"POWERPOINEADOR_URL_{proveedor.upper()}") or URLS_BASE[proveedor]).rstrip('/')
+
+# Función para obtener la dirección completa de un endpoint de la API de un proveedor
+def url_proveedor(proveedor, ruta):
+    return obtener_url_base(proveedor) + ruta
+
+# Función para obtener la sesión compartida de un proveedor (mantiene las conexiones abiertas entre peticiones)
+def obtener_sesion(proveedor='descargas'):
+    with _bloqueo:
+        sesion = _sesiones.get(proveedor)
+        if sesion is None:
+            max_conexiones = MAX_CONEXIONES_POR_HOST.get(proveedor, MAX_CONEXIONES_POR_HOST['descargas'])
+            # pool_block hace que las peticiones que superan el límite esperen a que se libere una conexión
+            adaptador = HTTPAdapter(pool_connections=4, pool_maxsize=max_conexiones, pool_block=True)
+            sesion = requests.Session()
+            sesion.mount('https://', adaptador)
+            sesion.mount('http://', adaptador)
+            _sesiones[proveedor] = sesion
+        return sesion
+
+# Función para hacer una petición HTTP con la sesión del proveedor y su tiempo de espera por defecto
+def peticion(metodo, url, proveedor='descargas', **kwargs):
+    kwargs.setdefault('timeout', obtener_timeout(proveedor))
+    return obtener_sesion(proveedor).request(metodo, str(url), **kwargs)
+
+# Función para hacer una petición a un modelo con los plazos de su clase
+# (la respuesta no llega por partes, así que la lectura puede durar tanto como el plazo total)
+def peticion_con_plazo(metodo, url, proveedor, clase, etapa='espera_modelo', **kwargs):
+    plazos = obtener_plazos(clase)
+    kwargs.setdefault('timeout', (plazos['conexion'], plazos['total']))
+    timeout = kwargs['timeout']
+    lectura = timeout[1] if isinstance(timeout, tuple) else timeout
+    modelo = (kwargs.get('json') or {}).get('model') or str(url)
+    llamar = lambda: peticion(metodo, url, proveedor, **kwargs)
+    grabadora = obtener_grabadora()
+    if grabadora:
+        llamar = grabadora.envolver_peticion(modelo, llamar)
+    with medir('peticion', 'red', proveedor=proveedor, modelo=modelo):
+        return ejecutar_con_plazo(llamar, etapa, clase, lectura=lectura)
+
+# Función para descargar un archivo (normalmente una imagen generada) reutilizando las conexiones abiertas
+def descargar(url, proveedor='descargas', **kwargs):
+    plazos = obtener_plazos('descarga')
+    kwargs.setdefault('timeout', (plazos['conexion'], plazos['lectura']))
+    timeout = kwargs['timeout']
+    lectura = timeout[1] if isinstance(timeout, tuple) else timeout
+
+    # Función que hace la descarga dentro del plazo total vigilado
+    def bajar():
+        response = peticion('GET', url, proveedor, stream=True, **kwargs)
+        # Cerrar la conexión en cuanto se cancele la generación (la imagen ya no se va a usar)
+        token = token_actual()
+        quitar_cancelacion = token.al_cancelar(response.close) if token else (lambda: None)
+        try:
+            response.raise_for_status()
+            # Leer el cuerpo entero aquí, dentro del plazo
+            response.content
+            return response
+        finally:
+            quitar_cancelacion()
+
+    grabadora = obtener_grabadora()
+    if grabadora:
+        bajar = grabadora.envolver_descarga(url, bajar)
+    with medir('descarga', 'red', proveedor=proveedor) as datos:
+        response = ejecutar_con_plazo(bajar, 'descarga', 'descarga', lectura=lectura)
+        datos['bytes'] = len(response.content)
+        return response
+
+# Función que, al crear una predicción de Replicate, prepara su cancelación por si se cancela la generación
+# (así el proveedor deja de trabajar, y de cobrar, en cuanto el usuario cancela)
+def _registrar_prediccion(response):
+    token = token_actual()
+    if token is None or response.request.method != 'POST' or not response.request.url.path.rstrip('/').endswith('/predictions'):
+        return
+    response.read()
+    try:
+        url_cancelar = (response.json().get('urls') or {}).get('cancel')
+    except ValueError:
+        return
+    if not url_cancelar:
+        return
+    autorizacion = response.request.headers.get('Authorization')
+
+    # Función que pide la cancelación a Replicate (si la predicción ya terminó, la respuesta se ignora)
+    def pedir_cancelacion():
+        try:
+            peticion('POST', url_cancelar, 'replicate', headers={'Authorization': autorizacion})
+        except requests.RequestException as e:
+            registro.warning("Error al cancelar la predicción: %s", e)
+
+    # Función que pide la cancelación en segundo plano para no bloquear a quien cancela
+    def cancelar_prediccion():
+        threading.Thread(target=pedir_cancelacion, name='cancelar_prediccion', daemon=True).start()
+
+    token.al_cancelar(cancelar_prediccion)
+
+# Función para obtener el cliente de Replicate compartido de una clase de modelo (con sus plazos de conexión y lectura)
+def obtener_cliente_replicate(clase='imagen'):
+    import replicate, httpx
+    api_token = os.environ.get("REPLICATE_API_TOKEN")
+    url_base = obtener_url_base('replicate')
+    with _bloqueo:
+        cliente = _clientes_replicate.get((clase, api_token, url_base))
+        if cliente is None:
+            plazos = obtener_plazos(clase)
+            cliente = replicate.Client(
+                api_token=api_token,
+                base_url=url_base,
+                timeout=httpx.Timeout(plazos['lectura'], connect=plazos['conexion']),
+                event_hooks={'response': [_registrar_prediccion]},
+            )
+            _clientes_replicate[(clase, api_token, url_base)] = cliente
+        return cliente
+
+# Función para ejecutar un modelo de Replicate y esperar su salida dentro del plazo total de su clase
+def ejecutar_replicate(modelo, clase='imagen', **kwargs):
+    llamar = lambda: obtener_cliente_replicate(clase).run(modelo, **kwargs)
+    grabadora = obtener_grabadora()
+    if grabadora:
+        llamar = grabadora.envolver_salida(modelo, llamar)
+    with medir('peticion', 'red', proveedor='replicate', modelo=modelo):
+        return ejecutar_con_plazo(llamar, 'espera_modelo', clase)
+
+# Función para recibir en streaming la salida de un modelo de Replicate, con plazo entre fragmentos y plazo total
+def stream_replicate(modelo, clase='texto', **kwargs):
+    crear_stream = lambda: obtener_cliente_replicate(clase).stream(modelo, **kwargs)
+    grabadora = obtener_grabadora()
+    if grabadora:
+        crear_stream = grabadora.envolver_stream(modelo, crear_stream)
+    return vigilar_stream(crear_stream, 'stream', clase)
+
+# Función para obtener el cliente de Google AI compartido para una clave API
+def obtener_cliente_gemini(api_key=None):
+    grabadora = obtener_grabadora()
+    if grabadora:
+        # Al reproducir no se llega a crear el cliente real (ni hace falta la clave)
+        return grabadora.envolver_cliente_gemini(_crear_cliente_gemini(api_key) if grabadora.grabando else None)
+    return _crear_cliente_gemini(api_key)
+
+# Función para crear (o reutilizar) el cliente de Google AI de una clave API
+def _crear_cliente_gemini(api_key):
+    from google import genai
+    from google.genai import types
+    url_base = obtener_url_base('google')
+    with _bloqueo:
+        cliente = _clientes_gemini.get((api_key, url_base))
+        if cliente is None:
+            cliente = genai.Client(
+                api_key=api_key,
+                http_options=types.HttpOptions(timeout=TIMEOUT_GEMINI * 1000, base_url=url_base),
+            )
+            _clientes_gemini[(api_key, url_base)] = cliente
+        return cliente
+
+# Función para cerrar todas las sesiones abiertas
+def cerrar_sesiones():
+    with _bloqueo:
+        for sesion in _sesiones.values():
+            sesion.close()
+        _sesiones.clear()
+        _clientes_gemini.clear()
+        _clientes_replicate.clear()
@@ -0,0 +1,203 @@
+import os, json, math, time, atexit, threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED, TimeoutError as FuturesTimeoutError
+from Traducciones import obtener_traduccion
+from Configuracion import APP_DATA_DIR, obtener_config_store
+from Bitacora import obtener_registro
+from Cancelacion import crear_token_hijo
+
+# Registro del módulo
+registro = obtener_registro(__name__)
+
+# Opciones por defecto de la cobertura de imágenes lentas (se pueden cambiar con 'cobertura_imagenes' en config.json):
+# - activa: lanzar una petición de respaldo cuando una imagen tarda más que el percentil de su modelo
+# - percentil: percentil de la latencia observada a partir del cual se considera lenta
+# - fraccion_maxima: fracción de las imágenes de una presentación que se pueden duplicar (tope de coste)
+# - modelo_respaldo: modelo para la petición de respaldo (None para repetir el mismo modelo)
+OPCIONES_POR_DEFECTO = {
+    'activa': False,
+    'percentil': 0.9,
+    'fraccion_maxima': 0.2,
+    'modelo_respaldo': None,
+}
+
+# Latencias que se guardan por modelo y mínimo necesario para calcular el percentil
+MAX_LATENCIAS_GUARDADAS = 50
+MIN_LATENCIAS_PERCENTIL = 5
+
+# Archivo con las latencias observadas de cada modelo (aparte de config.json, que no se reescribe tras cada imagen)
+# y segundos mínimos entre dos escrituras (lo que quede pendiente se guarda al cerrar la aplicación)
+LATENCIAS_FILE = os.path.join(APP_DATA_DIR, 'latencias_imagenes.json')
+INTERVALO_GUARDADO_LATENCIAS = 30.0
+
+_bloqueo_latencias = threading.Lock()
+# Latencias en memoria (se leen del archivo la primera vez que hacen falta)
+_latencias = None
+_latencias_pendientes = False
+_ultimo_guardado_latencias = 0.0
+
+# Función para leer las opciones de cobertura desde config.json
+def obtener_opciones():
+    opciones = dict(OPCIONES_POR_DEFECTO)
+    configuradas = obtener_config_store().obtener('cobertura_imagenes', {})
+    if isinstance(configuradas, dict):
+        opciones.update(configuradas)
+    return opciones
+
+# Función para obtener las latencias en memoria, leyéndolas del archivo la primera vez (con el bloqueo tomado)
+def _cargar_latencias():
+    global _latencias
+    if _latencias is None:
+        try:
+            with open(LATENCIAS_FILE, 'r', encoding='utf-8') as f:
+                datos = json.load(f)
+        except (OSError, ValueError):
+            datos = {}
+        _latencias = datos if isinstance(datos, dict) else {}
+    return _latencias
+
+# Función para escribir las latencias en su archivo sin dejarlo a medias (con el bloqueo tomado)
+def _escribir_latencias():
+    global _latencias_pendientes, _ultimo_guardado_latencias
+    _ultimo_guardado_latencias = time.monotonic()
+    try:
+        os.makedirs(APP_DATA_DIR, exist_ok=True)
+        temporal = LATENCIAS_FILE + '.tmp'
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump(_latencias, f)
+        os.replace(temporal, LATENCIAS_FILE)
+        _latencias_pendientes = False
+    except OSError as e:
+        registro.warning("Error al guardar las latencias de las imágenes: %s", e)
+
+# Función para anotar cuánto ha tardado un modelo en generar una imagen
+def registrar_latencia(modelo, segundos):
+    global _latencias_pendientes
+    with _bloqueo_latencias:
+        latencias = _cargar_latencias()
+        latencias[modelo] = (latencias.get(modelo, []) + [round(segundos, 2)])[-MAX_LATENCIAS_GUARDADAS:]
+        _latencias_pendientes = True
+        if time.monotonic() - _ultimo_guardado_latencias >= INTERVALO_GUARDADO_LATENCIAS:
+            _escribir_latencias()
+
+# Función para guardar las latencias que aún no se han escrito en el archivo
+def guardar_latencias():
+    with _bloqueo_latencias:
+        if _latencias_pendientes:
+            _escribir_latencias()
+
+atexit.register(guardar_latencias)
+
+# Función para calcular el percentil de la latencia de un modelo; None si aún no hay datos suficientes
+def percentil_latencia(modelo, percentil=0.9):
+    with _bloqueo_latencias:
+        latencias = sorted(_cargar_latencias().get(modelo, []))
+    if len(latencias) < MIN_LATENCIAS_PERCENTIL:
+        return None
+    return latencias[min(len(latencias) - 1, int(math.ceil(percentil * len(latencias))) - 1)]
+
+# Clase que lanza una petición de respaldo para las imágenes que tardan demasiado y se queda con la primera que termina
+class CoberturaImagenes:
+    def __init__(self, total_esperado=None, opciones=None, log_message=print, idioma='es'):
+        self.opciones = opciones or obtener_opciones()
+        self.total_esperado = total_esperado
+        self.log_message = log_message
+        self.idioma = idioma
+        self.pedidas = 0
+        self.duplicadas = 0
+        self.ganadas = 0
+        self._bloqueo = threading.Lock()
+        self._ejecutor = ThreadPoolExecutor(thread_name_prefix='cobertura_imagenes')
+
+    # Función para reservar una petición de respaldo si no se supera el tope de coste
+    def _reservar_duplicado(self):
+        with self._bloqueo:
+            base = max(self.total_esperado or 0, self.pedidas)
+            if self.duplicadas >= math.floor(self.opciones['fraccion_maxima'] * base):
+                return False
+            self.duplicadas += 1
+            return True
+
+    # Función para generar la imagen número 'numero' con 'generar(modelo, cancelacion)', duplicando la petición si se retrasa;
+    # devuelve (resultado, modelo que lo ha generado), que es el de respaldo si su petición llega antes
+    # (cada petición recibe su propio token hijo de 'cancelacion' para poder cancelar la que pierde)
+    # - detalles: diccionario en cuya lista 'duplicadas' se anota el modelo de la petición duplicada que no se usa
+    #   (solo si llegó a enviarse al proveedor)
+    def generar(self, numero, modelo, generar, cancelacion=None, detalles=None):
+        with self._bloqueo:
+            self.pedidas += 1
+        umbral = percentil_latencia(modelo, self.opciones['percentil'])
+        if umbral is None:
+            # Sin latencias suficientes todavía: generar normalmente
+            return generar(modelo, cancelacion), modelo
+
+        tokens = {}
+        modelos = {}
+        # Tokens de las peticiones que han empezado en un hilo (y pueden haber llegado al proveedor)
+        empezadas = set()
+
+        # Función para lanzar una petición en un hilo de la cobertura con su propio token de cancelación
+        def lanzar(modelo_peticion):
+            token = crear_token_hijo(cancelacion)
+
+            # Función que hace la petición; se anota como empezada antes de comprobar si se ha descartado,
+            # para que la que se cancela justo al empezar no llegue al proveedor sin anotarse
+            def ejecutar():
+                empezadas.add(token)
+                token.comprobar()
+                return generar(modelo_peticion, token)
+
+            futuro = self._ejecutor.submit(ejecutar)
+            tokens[futuro] = token
+            modelos[futuro] = modelo_peticion
+            return futuro
+
+        original = lanzar(modelo)
+        try:
+            try:
+                return original.result(timeout=umbral), modelo
+            except FuturesTimeoutError:
+                pass
+            if not self._reservar_duplicado():
+                return original.result(), modelo
+
+            modelo_respaldo = self.opciones.get('modelo_respaldo') or modelo
+            self.log_message(obtener_traduccion('imagen_duplicada', self.idioma).format(
+                numero=numero, segundos=f"{umbral:.1f}", modelo=modelo_respaldo))
+            respaldo = lanzar(modelo_respaldo)
+
+            # Quedarse con la primera petición que termine bien; si una falla, esperar a la otra
+            pendientes = {original, respaldo}
+            ultimo_error = None
+            while pendientes:
+                terminados, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+                for futuro in terminados:
+                    if futuro.exception() is None:
+                        # Cancelar la perdedora: si aún no ha empezado no llega a lanzarse y, si está en marcha,
+                        # su token aborta la llamada y cancela la predicción en el proveedor para que no se cobre entera
+                        perdedora = respaldo if futuro is original else original
+                        perdedora.cancel()
+                        tokens[perdedora].cancelar()
+                        # Si la perdedora ya había empezado (o terminado), anotar su modelo porque también se ha pedido
+                        # al proveedor; si seguía en la cola, no se llega a enviar y no se cobra
+                        if tokens[perdedora] in empezadas and detalles is not None:
+                            detalles.setdefault('duplicadas', []).append(modelos[perdedora])
+                        if futuro is respaldo:
+                            with self._bloqueo:
+                                self.ganadas += 1
+                        return futuro.result(), modelos[futuro]
+                    ultimo_error = futuro.exception()
+            raise ultimo_error
+        finally:
+            for token in tokens.values():
+                token.soltar()
+
+    # Función para liberar los hilos sin esperar a las peticiones descartadas
+    def cerrar(self):
+        self._ejecutor.shutdown(wait=False, cancel_futures=True)
+
+# Función para crear la cobertura de una presentación; None si está desactivada en config.json
+def crear_cobertura(total_esperado=None, log_message=print, idioma='es'):
+    opciones = obtener_opciones()
+    if not opciones.get('activa'):
+        return None
+    return CoberturaImagenes(total_esperado, opciones, log_message, idioma)
@@ -0,0 +1,136 @@
+import sys, os, json, copy, atexit, logging, threading
+
+# Registro del módulo (Bitacora importa este módulo, así que se pide a logging directamente;
+# usa las salidas de Bitacora en cuanto están configuradas)
+registro = logging.getLogger('powerpoineador.' + __name__)
+
+# Definir el directorio de datos de la aplicación
+if sys.platform == 'win32':
+    APP_DATA_DIR = os.path.join(os.getenv('APPDATA'), 'Powerpoineador')
+elif sys.platform == 'darwin':
+    APP_DATA_DIR = os.path.join(os.path.expanduser('~'), 'Library', 'Application Support', 'Powerpoineador')
+else:
+    APP_DATA_DIR = os.path.join(os.path.expanduser('~'), '.Powerpoineador')
+
+# Ruta por defecto del archivo de configuración
+CONFIG_FILE = os.path.join(APP_DATA_DIR, 'config.json')
+
+# Segundos que se esperan tras el último cambio antes de escribir en disco
+RETARDO_GUARDADO = 1.0
+
+# Clase que mantiene config.json en memoria y agrupa las escrituras
+class ConfigStore:
+    def __init__(self, ruta, retardo=RETARDO_GUARDADO):
+        self.ruta = ruta
+        self.retardo = retardo
+        self._bloqueo = threading.RLock()
+        self._config = None
+        self._existe = False
+        self._pendiente = False
+        self._temporizador = None
+
+    # Función para cargar el archivo la primera vez que se necesita
+    def _cargar(self):
+        if self._config is not None:
+            return
+        self._config = {}
+        try:
+            with open(self.ruta, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+            self._existe = True
+            if isinstance(config, dict):
+                self._config = config
+        except FileNotFoundError:
+            pass
+        except (OSError, json.JSONDecodeError) as e:
+            self._existe = os.path.exists(self.ruta)
+            registro.warning("Error al cargar la configuración: %s", e)
+
+    # Función para saber si hay configuración guardada (en disco o pendiente de escribir)
+    def existe(self):
+        with self._bloqueo:
+            self._cargar()
+            return self._existe or self._pendiente
+
+    # Función para obtener una copia de toda la configuración
+    def leer(self):
+        with self._bloqueo:
+            self._cargar()
+            return copy.deepcopy(self._config)
+
+    # Función para obtener un único valor de la configuración
+    def obtener(self, clave, defecto=None):
+        with self._bloqueo:
+            self._cargar()
+            return copy.deepcopy(self._config.get(clave, defecto))
+
+    # Función para sustituir la configuración y programar su escritura en disco
+    def guardar(self, config):
+        with self._bloqueo:
+            self._config = copy.deepcopy(config)
+            self._pendiente = True
+            # Reiniciar el temporizador para agrupar los cambios seguidos en una sola escritura
+            if self._temporizador:
+                self._temporizador.cancel()
+            self._temporizador = threading.Timer(self.retardo, self.flush)
+            self._temporizador.daemon = True
+            self._temporizador.start()
+
+    # Función para cambiar solo algunas claves de la configuración
+    def actualizar(self, **valores):
+        with self._bloqueo:
+            self._cargar()
+            config = copy.deepcopy(self._config)
+            config.update(valores)
+            self.guardar(config)
+
+    # Función para escribir en disco los cambios pendientes de inmediato
+    def flush(self):
+        with self._bloqueo:
+            if self._temporizador:
+                self._temporizador.cancel()
+                self._temporizador = None
+            if not self._pendiente:
+                return
+            try:
+                os.makedirs(os.path.dirname(self.ruta), exist_ok=True)
+                # Escribir en un archivo temporal y renombrarlo para no dejar nunca un config.json a medias
+                ruta_temporal = f"{self.ruta}.{os.getpid()}.tmp"
+                with open(ruta_temporal, 'w', encoding='utf-8') as f:
+                    json.dump(self._config, f, ensure_ascii=False, indent=4)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(ruta_temporal, self.ruta)
+                self._pendiente = False
+                self._existe = True
+            except Exception as e:
+                registro.warning("Error al guardar la configuración: %s", e)
+
+    # Función para descartar la copia en memoria y volver a leer el archivo
+    def recargar(self):
+        with self._bloqueo:
+            self.flush()
+            self._config = None
+            self._existe = False
+            self._cargar()
+
+_almacenes = {}
+_bloqueo_almacenes = threading.Lock()
+
+# Función para obtener el almacén compartido de un archivo de configuración
+def obtener_config_store(ruta=None):
+    ruta = os.path.abspath(ruta or CONFIG_FILE)
+    with _bloqueo_almacenes:
+        if ruta not in _almacenes:
+            _almacenes[ruta] = ConfigStore(ruta)
+        return _almacenes[ruta]
+
+# Función para escribir los cambios pendientes de todos los almacenes
+def guardar_todo():
+    with _bloqueo_almacenes:
+        almacenes = list(_almacenes.values())
+    for almacen in almacenes:
+        almacen.flush()
+
+# Asegurar que no se pierden cambios al cerrar la aplicación
+atexit.register(guardar_todo)
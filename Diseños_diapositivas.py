@@ -1,14 +1,17 @@
-import os, sys
+import os, uuid
 from pptx.util import Inches, Pt
 from pptx.enum.text import MSO_ANCHOR, MSO_AUTO_SIZE, PP_ALIGN
 from pptx.enum.shapes import MSO_SHAPE
 from pptx.dml.color import RGBColor
 from PIL import Image, ImageEnhance, ImageFilter
+from Espacios_trabajo import ruta_temporal_edicion, guardar_atomico
 
 # Clase para manejar los diseños de diapositivas
 class Diapositivas:
-    def __init__(self, presentation, title_font_name='Calibri', content_font_name='Calibri', title_font_size=16, content_font_size=10, title_bold=False, title_italic=False, title_underline=False, content_bold=False, content_italic=False, content_underline=False):
+    def __init__(self, presentation, title_font_name='Calibri', content_font_name='Calibri', title_font_size=16, content_font_size=10, title_bold=False, title_italic=False, title_underline=False, content_bold=False, content_italic=False, content_underline=False, carpeta_trabajo=None):
         self.presentation = presentation
+        # Carpeta de trabajo de la presentación, donde se guardan las imágenes procesadas (fondos desenfocados u oscurecidos)
+        self.carpeta_trabajo = carpeta_trabajo
         self.title_font_name = title_font_name
         self.content_font_name = content_font_name
         self.title_font_size = title_font_size
@@ -20,6 +23,13 @@ class Diapositivas:
         self.content_italic = content_italic
         self.content_underline = content_underline
 
+    # Función para obtener una ruta única para una imagen procesada, para que las presentaciones no se pisen los archivos
+    # (fuera de una generación, como al editar, se usa una imagen temporal de edición que se borra cuando se queda antigua)
+    def ruta_imagen_procesada(self, prefijo):
+        if not self.carpeta_trabajo:
+            return ruta_temporal_edicion()
+        return os.path.join(self.carpeta_trabajo, f"{prefijo}_{uuid.uuid4().hex[:8]}.jpg")
+
     # Función auxiliar para aplicar fuente al texto
     def apply_font(self, text_frame):
         for paragraph in text_frame.paragraphs:
@@ -51,24 +61,10 @@ class Diapositivas:
 
         # Procesar imagen para fondo con efecto de desenfoque
         try:
-            if sys.platform == 'win32':
-                APP_DATA_DIR = os.path.join(os.getenv('APPDATA'), 'Powerpoineador')
-            elif sys.platform == 'darwin':
-                APP_DATA_DIR = os.path.join(os.path.expanduser('~'), 'Library', 'Application Support', 'Powerpoineador')
-            else:
-                APP_DATA_DIR = os.path.join(os.path.expanduser('~'), '.Powerpoineador')
-            
-            IMAGES_DIR = os.path.join(APP_DATA_DIR, 'images')
-            
-            if not os.path.exists(IMAGES_DIR):
-                os.makedirs(IMAGES_DIR, exist_ok=True)
-                
             image = Image.open(image_path)
             blurred_image = image.filter(ImageFilter.GaussianBlur(radius=3))
             enhanced = ImageEnhance.Brightness(blurred_image).enhance(0.7)
-            processed_path = os.path.join(IMAGES_DIR, 'intro_background.jpg')
-            enhanced.save(processed_path)
-            bg_image_path = processed_path
+            bg_image_path = guardar_atomico(enhanced.convert('RGB'), self.ruta_imagen_procesada('intro_background'), 'JPEG')
         except Exception as e:
             print(f"Error al procesar imagen: {str(e)}")
             bg_image_path = image_path
@@ -935,13 +931,10 @@ class Diapositivas:
         slide = self.presentation.slides.add_slide(slide_layout)
 
         # Procesar imagen para oscurecerla
-        APP_DATA_DIR = os.path.join(os.getenv('APPDATA'), 'Powerpoineador')
-        IMAGES_DIR = os.path.join(APP_DATA_DIR, 'images')
         image = Image.open(image_path)
         enhancer = ImageEnhance.Brightness(image)
         image_darker = enhancer.enhance(0.5)
-        darker_path = os.path.join(IMAGES_DIR, 'Slide_darker.jpg')
-        image_darker.save(darker_path)
+        darker_path = guardar_atomico(image_darker.convert('RGB'), self.ruta_imagen_procesada('Slide_darker'), 'JPEG')
 
         # Añadir imagen oscurecida como fondo
         left = Inches(0)
@@ -0,0 +1,161 @@
+import os, time, uuid, shutil, threading
+from Configuracion import APP_DATA_DIR, obtener_config_store
+from Bitacora import obtener_registro
+
+# Registro del módulo
+registro = obtener_registro(__name__)
+
+# Cada presentación escribe sus imágenes en su propia carpeta dentro de 'trabajos',
+# para que dos generaciones a la vez (o una generación y una edición) no se pisen los archivos
+ESPACIOS_DIR = os.path.join(APP_DATA_DIR, 'trabajos')
+# Las imágenes temporales de la edición de diapositivas siguen en la carpeta de imágenes
+IMAGES_DIR = os.path.join(APP_DATA_DIR, 'images')
+PREFIJO_EDICION = 'temp_edit_slide_'
+
+# Espacio máximo en MB de las carpetas de trabajo (se puede cambiar con 'cuota_espacios_trabajo_mb' en config.json)
+CUOTA_ESPACIOS_MB = 500
+# Carpetas más recientes que se conservan siempre (la vista previa puede seguir usando sus imágenes)
+MIN_ESPACIOS_CONSERVADOS = 3
+# Segundos sin cambios tras los que una carpeta de otro proceso se puede borrar
+ANTIGUEDAD_MINIMA_ESPACIO = 600
+# Segundos tras los que se borran las imágenes temporales de edición
+ANTIGUEDAD_TEMPORALES = 24 * 3600
+
+# Carpetas de trabajo que están usando generaciones en curso de este proceso
+_en_uso = set()
+_bloqueo = threading.Lock()
+
+# Función para guardar una imagen sin dejarla a medias: se escribe en un temporal y se renombra
+def guardar_atomico(imagen, ruta, formato=None):
+    ruta_temporal = f"{ruta}.{threading.get_ident()}.tmp"
+    try:
+        imagen.save(ruta_temporal, format=formato or imagen.format or 'JPEG')
+        os.replace(ruta_temporal, ruta)
+    except BaseException:
+        if os.path.exists(ruta_temporal):
+            os.remove(ruta_temporal)
+        raise
+    return ruta
+
+# Función para copiar un archivo sin dejarlo a medias
+def copiar_atomico(origen, destino):
+    ruta_temporal = f"{destino}.{threading.get_ident()}.tmp"
+    try:
+        shutil.copyfile(origen, ruta_temporal)
+        os.replace(ruta_temporal, destino)
+    except BaseException:
+        if os.path.exists(ruta_temporal):
+            os.remove(ruta_temporal)
+        raise
+    return destino
+
+# Función para obtener una ruta única para una imagen temporal de edición
+def ruta_temporal_edicion(extension='.jpg'):
+    os.makedirs(IMAGES_DIR, exist_ok=True)
+    return os.path.join(IMAGES_DIR, f"{PREFIJO_EDICION}{int(time.time())}_{uuid.uuid4().hex[:8]}{extension}")
+
+# Clase con la carpeta de trabajo de una presentación
+class EspacioTrabajo:
+    def __init__(self, prefijo='presentacion'):
+        self.carpeta = os.path.join(ESPACIOS_DIR, f"{prefijo}_{time.strftime('%Y%m%d-%H%M%S')}_{uuid.uuid4().hex[:8]}")
+        os.makedirs(self.carpeta, exist_ok=True)
+        with _bloqueo:
+            _en_uso.add(self.carpeta)
+
+    # Función para obtener la ruta de un archivo dentro de la carpeta
+    def ruta(self, nombre):
+        return os.path.join(self.carpeta, nombre)
+
+    # Función para obtener una ruta que no choque con ningún otro archivo de la carpeta
+    def ruta_unica(self, prefijo, extension='.jpg'):
+        return self.ruta(f"{prefijo}_{uuid.uuid4().hex[:8]}{extension}")
+
+    # Función para guardar una imagen en la carpeta; devuelve su ruta
+    def guardar_imagen(self, imagen, nombre, formato='JPEG'):
+        return guardar_atomico(imagen, self.ruta(nombre), formato)
+
+    # Función para indicar que la generación ha terminado (la carpeta se conserva hasta que la libere la cuota)
+    def liberar(self):
+        with _bloqueo:
+            _en_uso.discard(self.carpeta)
+
+# Función para calcular lo que ocupa una carpeta en bytes
+def tamano_carpeta(carpeta):
+    total = 0
+    for raiz, _, archivos in os.walk(carpeta):
+        for nombre in archivos:
+            try:
+                total += os.path.getsize(os.path.join(raiz, nombre))
+            except OSError:
+                pass
+    return total
+
+# Función para obtener la cuota de las carpetas de trabajo en bytes
+def obtener_cuota():
+    cuota_mb = CUOTA_ESPACIOS_MB
+    try:
+        cuota_mb = float(obtener_config_store().obtener('cuota_espacios_trabajo_mb', cuota_mb))
+    except Exception as e:
+        registro.warning("Error al leer la cuota de las carpetas de trabajo: %s", e)
+    return int(cuota_mb * 1024 * 1024)
+
+# Función para borrar las carpetas de trabajo más antiguas hasta quedar por debajo de la cuota
+def aplicar_cuota(cuota=None):
+    if cuota is None:
+        cuota = obtener_cuota()
+    try:
+        carpetas = []
+        for nombre in os.listdir(ESPACIOS_DIR):
+            ruta = os.path.join(ESPACIOS_DIR, nombre)
+            if os.path.isdir(ruta):
+                carpetas.append((os.path.getmtime(ruta), tamano_carpeta(ruta), ruta))
+    except FileNotFoundError:
+        return
+    carpetas.sort()
+    total = sum(tamano for _, tamano, _ in carpetas)
+    ahora = time.time()
+    for modificada, tamano, ruta in carpetas[:-MIN_ESPACIOS_CONSERVADOS or None]:
+        if total <= cuota:
+            break
+        with _bloqueo:
+            en_uso = ruta in _en_uso
+        # No borrar las carpetas de generaciones en curso, ni las que otro proceso acaba de usar
+        if en_uso or ahora - modificada < ANTIGUEDAD_MINIMA_ESPACIO:
+            continue
+        shutil.rmtree(ruta, ignore_errors=True)
+        total -= tamano
+
+# Función para borrar las imágenes temporales de edición antiguas y los temporales que quedaron a medias
+def limpiar_temporales(antiguedad=ANTIGUEDAD_TEMPORALES):
+    ahora = time.time()
+    carpetas = [IMAGES_DIR]
+    if os.path.isdir(ESPACIOS_DIR):
+        carpetas += [os.path.join(ESPACIOS_DIR, nombre) for nombre in os.listdir(ESPACIOS_DIR)]
+    for carpeta in carpetas:
+        try:
+            nombres = os.listdir(carpeta)
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+        for nombre in nombres:
+            if not (nombre.startswith(PREFIJO_EDICION) or nombre.endswith('.tmp')):
+                continue
+            ruta = os.path.join(carpeta, nombre)
+            try:
+                if ahora - os.path.getmtime(ruta) > antiguedad:
+                    os.remove(ruta)
+            except OSError:
+                pass
+
+# Función para limpiar los temporales y aplicar la cuota en un hilo aparte, sin bloquear la interfaz
+def limpiar_en_segundo_plano():
+    # Función que hace la limpieza en el hilo auxiliar
+    def limpiar():
+        try:
+            limpiar_temporales()
+            aplicar_cuota()
+        except Exception as e:
+            registro.warning("Error al limpiar las carpetas de trabajo: %s", e)
+
+    hilo = threading.Thread(target=limpiar, name='limpieza_espacios_trabajo', daemon=True)
+    hilo.start()
+    return hilo
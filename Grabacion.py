@@ -0,0 +1,293 @@
+import os, json, time, types, hashlib, threading
+from Cancelacion import esperar
+
+# Grabación y reproducción del tráfico con los proveedores, para repetir una generación con respuestas reales sin gastar créditos.
+# Se activa con variables de entorno antes de arrancar la aplicación (o el benchmark, o la generación por lotes):
+#   POWERPOINEADOR_GRABACION=grabar:/ruta/carpeta       guarda cada respuesta de los proveedores en la carpeta
+#   POWERPOINEADOR_GRABACION=reproducir:/ruta/carpeta   responde con lo guardado sin llamar a los proveedores
+#   POWERPOINEADOR_GRABACION_ESCALA=1                   al reproducir, espera lo que tardó cada respuesta (0: sin esperas)
+# Se graban las salidas de Replicate, los eventos de sus streams, las respuestas JSON de xAI, las de Gemini
+# y los bytes de las imágenes descargadas, con sus tiempos. Solo se guardan las llamadas que terminan bien.
+VARIABLE_GRABACION = 'POWERPOINEADOR_GRABACION'
+VARIABLE_ESCALA = 'POWERPOINEADOR_GRABACION_ESCALA'
+GRABAR, REPRODUCIR = 'grabar', 'reproducir'
+
+# Archivo con una llamada grabada por línea y carpeta con los archivos binarios (imágenes), nombrados por su hash
+LLAMADAS = 'llamadas.jsonl'
+ARCHIVOS = 'archivos'
+VERSION_GRABACION = 1
+
+# Excepción lanzada al reproducir una llamada que no está en la grabación
+class LlamadaNoGrabadaError(Exception):
+    pass
+
+# Clase que graba o reproduce las llamadas a los proveedores de una carpeta
+# Las llamadas se agrupan por (tipo, modelo); al reproducir, la enésima llamada a un modelo recibe su enésima
+# respuesta grabada (y se vuelve a empezar si se piden más de las que hay)
+class Grabadora:
+    def __init__(self, carpeta, modo, escala_tiempo=0.0):
+        if modo not in (GRABAR, REPRODUCIR):
+            raise ValueError(f"Modo de grabación desconocido: {modo}")
+        self.carpeta = carpeta
+        self.modo = modo
+        self.escala_tiempo = escala_tiempo
+        self._bloqueo = threading.Lock()
+        self._local = threading.local()
+        self._llamadas = {}
+        self._posiciones = {}
+        self._descargas = {}
+        if modo == GRABAR:
+            os.makedirs(os.path.join(carpeta, ARCHIVOS), exist_ok=True)
+        else:
+            self._cargar()
+
+    @property
+    def grabando(self):
+        return self.modo == GRABAR
+
+    # Función para leer las llamadas grabadas de la carpeta
+    def _cargar(self):
+        ruta = os.path.join(self.carpeta, LLAMADAS)
+        if not os.path.exists(ruta):
+            raise FileNotFoundError(f"No hay ninguna grabación en {self.carpeta}")
+        with open(ruta, 'r', encoding='utf-8') as f:
+            for linea in f:
+                if not linea.strip():
+                    continue
+                llamada = json.loads(linea)
+                if llamada.get('version') != VERSION_GRABACION:
+                    continue
+                self._llamadas.setdefault((llamada['tipo'], llamada['modelo']), []).append(llamada)
+                if llamada['tipo'] == 'descarga':
+                    self._descargas[llamada['url']] = llamada
+
+    # Función para añadir una llamada a la grabación
+    def _guardar(self, tipo, modelo, datos):
+        llamada = {'version': VERSION_GRABACION, 'tipo': tipo, 'modelo': modelo, 'grabada': round(time.time(), 3), **datos}
+        with self._bloqueo:
+            with open(os.path.join(self.carpeta, LLAMADAS), 'a', encoding='utf-8') as f:
+                f.write(json.dumps(llamada, ensure_ascii=False) + '\n')
+
+    # Función para guardar un archivo binario; devuelve su nombre dentro de la carpeta de archivos
+    def _guardar_archivo(self, datos):
+        nombre = hashlib.sha256(datos).hexdigest() + '.bin'
+        ruta = os.path.join(self.carpeta, ARCHIVOS, nombre)
+        if not os.path.exists(ruta):
+            temporal = f"{ruta}.{threading.get_ident()}.tmp"
+            with open(temporal, 'wb') as f:
+                f.write(datos)
+            os.replace(temporal, ruta)
+        return nombre
+
+    # Función para leer un archivo binario de la grabación
+    def _leer_archivo(self, nombre):
+        with open(os.path.join(self.carpeta, ARCHIVOS, nombre), 'rb') as f:
+            return f.read()
+
+    # Función para obtener la siguiente respuesta grabada de un modelo
+    def _siguiente(self, tipo, modelo):
+        # Las descargas de este hilo son las de la última llamada a un modelo que ha hecho
+        self._local.modelo = modelo
+        with self._bloqueo:
+            llamadas = self._llamadas.get((tipo, modelo))
+            if not llamadas:
+                raise LlamadaNoGrabadaError(f"No hay ninguna llamada '{tipo}' grabada para el modelo {modelo} en {self.carpeta}")
+            posicion = self._posiciones.get((tipo, modelo), 0)
+            self._posiciones[(tipo, modelo)] = posicion + 1
+            return llamadas[posicion % len(llamadas)]
+
+    # Función para esperar, al reproducir, lo que tardó la llamada original (según la escala de tiempo)
+    def _esperar(self, segundos):
+        if self.escala_tiempo > 0 and segundos > 0:
+            esperar(segundos * self.escala_tiempo)
+
+    # Función para envolver una llamada que devuelve la salida de un modelo de Replicate (replicate.run)
+    def envolver_salida(self, modelo, llamar):
+        if not self.grabando:
+            # Función que devuelve la salida grabada
+            def reproducir():
+                llamada = self._siguiente('salida', modelo)
+                self._esperar(llamada['duracion'])
+                return llamada['salida']
+            return reproducir
+
+        # Función que hace la llamada real y guarda su salida (las URL de los archivos en lugar de los archivos)
+        def grabar():
+            self._local.modelo = modelo
+            inicio = time.monotonic()
+            salida = llamar()
+            if isinstance(salida, types.GeneratorType):
+                salida = list(salida)
+            self._guardar('salida', modelo, {'duracion': round(time.monotonic() - inicio, 3), 'salida': _serializar_salida(salida)})
+            return salida
+        return grabar
+
+    # Función para envolver la creación de un stream de Replicate (replicate.stream)
+    def envolver_stream(self, modelo, crear_stream):
+        if not self.grabando:
+            # Función que crea un stream con los eventos grabados, con sus tiempos si se reproduce a velocidad real
+            def reproducir():
+                from replicate.stream import ServerSentEvent
+                llamada = self._siguiente('stream', modelo)
+                anterior = 0
+                for instante, evento, datos, identificador in llamada['eventos']:
+                    self._esperar(instante - anterior)
+                    anterior = instante
+                    yield ServerSentEvent(event=evento, data=datos, id=identificador)
+            return reproducir
+
+        # Función que crea el stream real y guarda sus eventos cuando termina entero
+        def grabar():
+            self._local.modelo = modelo
+            inicio = time.monotonic()
+            eventos = []
+            for evento in crear_stream():
+                eventos.append([round(time.monotonic() - inicio, 4), _valor(evento.event), str(evento.data), evento.id])
+                yield evento
+            self._guardar('stream', modelo, {'duracion': round(time.monotonic() - inicio, 3), 'eventos': eventos})
+        return grabar
+
+    # Función para envolver una petición HTTP a un modelo (las de xAI); se graba su respuesta JSON
+    def envolver_peticion(self, modelo, llamar):
+        if not self.grabando:
+            # Función que devuelve la respuesta grabada como una respuesta de requests
+            def reproducir():
+                llamada = self._siguiente('peticion', modelo)
+                self._esperar(llamada['duracion'])
+                return _crear_respuesta(llamada['url'], llamada['estado'], llamada['cuerpo'].encode('utf-8'), llamada['tipo_contenido'])
+            return reproducir
+
+        # Función que hace la petición real y guarda su respuesta si ha ido bien
+        def grabar():
+            self._local.modelo = modelo
+            inicio = time.monotonic()
+            respuesta = llamar()
+            if respuesta.ok:
+                self._guardar('peticion', modelo, {
+                    'duracion': round(time.monotonic() - inicio, 3), 'url': str(respuesta.url), 'estado': respuesta.status_code,
+                    'tipo_contenido': respuesta.headers.get('Content-Type'), 'cuerpo': respuesta.text})
+            return respuesta
+        return grabar
+
+    # Función para envolver la descarga de un archivo (normalmente una imagen generada); se graban sus bytes
+    def envolver_descarga(self, url, llamar):
+        if not self.grabando:
+            # Función que devuelve el archivo grabado con esa URL (o, si no está, el siguiente del último modelo usado)
+            def reproducir():
+                llamada = self._descargas.get(str(url))
+                if llamada is None:
+                    llamada = self._siguiente('descarga', getattr(self._local, 'modelo', None))
+                self._esperar(llamada['duracion'])
+                return _crear_respuesta(llamada['url'], 200, self._leer_archivo(llamada['archivo']), llamada['tipo_contenido'])
+            return reproducir
+
+        # Función que hace la descarga real y guarda sus bytes
+        def grabar():
+            inicio = time.monotonic()
+            respuesta = llamar()
+            self._guardar('descarga', getattr(self._local, 'modelo', None), {
+                'duracion': round(time.monotonic() - inicio, 3), 'url': str(url),
+                'tipo_contenido': respuesta.headers.get('Content-Type'), 'archivo': self._guardar_archivo(respuesta.content)})
+            return respuesta
+        return grabar
+
+    # Función para envolver el cliente de Google AI (al reproducir no hace falta un cliente real)
+    def envolver_cliente_gemini(self, cliente):
+        return ClienteGeminiGrabado(self, cliente)
+
+# Clase con la parte de la interfaz del cliente de Google AI que usan los modelos (client.models.*)
+class ClienteGeminiGrabado:
+    def __init__(self, grabadora, cliente):
+        self.models = ModelosGeminiGrabados(grabadora, cliente)
+
+# Clase que graba o reproduce generate_content y generate_content_stream
+class ModelosGeminiGrabados:
+    def __init__(self, grabadora, cliente):
+        self.grabadora = grabadora
+        self.cliente = cliente
+
+    def generate_content(self, model, **kwargs):
+        from google.genai import types as tipos_genai
+        grabadora = self.grabadora
+        if not grabadora.grabando:
+            llamada = grabadora._siguiente('gemini', model)
+            grabadora._esperar(llamada['duracion'])
+            return tipos_genai.GenerateContentResponse.model_validate(llamada['respuesta'])
+        grabadora._local.modelo = model
+        inicio = time.monotonic()
+        respuesta = self.cliente.models.generate_content(model=model, **kwargs)
+        grabadora._guardar('gemini', model, {'duracion': round(time.monotonic() - inicio, 3),
+                                             'respuesta': respuesta.model_dump(mode='json', exclude_none=True)})
+        return respuesta
+
+    def generate_content_stream(self, model, **kwargs):
+        from google.genai import types as tipos_genai
+        grabadora = self.grabadora
+        if not grabadora.grabando:
+            llamada = grabadora._siguiente('gemini_stream', model)
+            anterior = 0
+            for instante, fragmento in llamada['fragmentos']:
+                grabadora._esperar(instante - anterior)
+                anterior = instante
+                yield tipos_genai.GenerateContentResponse.model_validate(fragmento)
+            return
+        grabadora._local.modelo = model
+        inicio = time.monotonic()
+        fragmentos = []
+        for fragmento in self.cliente.models.generate_content_stream(model=model, **kwargs):
+            fragmentos.append([round(time.monotonic() - inicio, 4), fragmento.model_dump(mode='json', exclude_none=True)])
+            yield fragmento
+        grabadora._guardar('gemini_stream', model, {'duracion': round(time.monotonic() - inicio, 3), 'fragmentos': fragmentos})
+
+# Función para obtener el valor de texto de un enumerado (o el propio valor)
+def _valor(valor):
+    return getattr(valor, 'value', valor)
+
+# Función para convertir la salida de un modelo de Replicate en algo que se pueda guardar como JSON
+# (los FileOutput se guardan como su URL, que es lo que los modelos descargan después)
+def _serializar_salida(salida):
+    if isinstance(salida, (list, tuple)):
+        return [_serializar_salida(elemento) for elemento in salida]
+    if isinstance(salida, dict):
+        return {clave: _serializar_salida(valor) for clave, valor in salida.items()}
+    if hasattr(salida, 'url'):
+        return str(salida.url)
+    return salida
+
+# Función para crear una respuesta de requests con los datos grabados
+def _crear_respuesta(url, estado, contenido, tipo_contenido=None):
+    import requests
+    respuesta = requests.Response()
+    respuesta.status_code = estado
+    respuesta.url = url
+    respuesta._content = contenido
+    respuesta.encoding = 'utf-8'
+    if tipo_contenido:
+        respuesta.headers['Content-Type'] = tipo_contenido
+    return respuesta
+
+_grabadora = None
+_configurada = False
+_bloqueo = threading.Lock()
+
+# Función para obtener la grabadora activa (None si no se graba ni se reproduce, que es lo normal)
+def obtener_grabadora():
+    global _grabadora, _configurada
+    if _configurada:
+        return _grabadora
+    with _bloqueo:
+        if not _configurada:
+            valor = os.environ.get(VARIABLE_GRABACION)
+            if valor:
+                modo, _, carpeta = valor.partition(':')
+                _grabadora = Grabadora(carpeta, modo.strip().lower(), float(os.environ.get(VARIABLE_ESCALA) or 0))
+            _configurada = True
+    return _grabadora
+
+# Función para empezar a grabar o a reproducir desde el código (modo None para desactivarlo)
+def configurar_grabacion(modo=None, carpeta=None, escala_tiempo=0.0):
+    global _grabadora, _configurada
+    with _bloqueo:
+        _grabadora = Grabadora(carpeta, modo, escala_tiempo) if modo else None
+        _configurada = True
+    return _grabadora
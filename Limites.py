@@ -0,0 +1,138 @@
+import time, threading
+from contextlib import contextmanager
+from Configuracion import obtener_config_store
+from Cancelacion import comprobar_cancelacion, esperar
+
+# Límites por defecto de cada proveedor (se pueden cambiar con 'limites_proveedores' en config.json):
+# - peticiones_por_minuto: ritmo máximo sostenido
+# - rafaga: peticiones que se pueden hacer seguidas antes de tener que esperar
+# - max_en_vuelo: peticiones abiertas a la vez (texto, imágenes y regeneraciones juntas)
+LIMITES_PROVEEDORES = {
+    'replicate': {'peticiones_por_minuto': 600, 'rafaga': 10, 'max_en_vuelo': 8},
+    'xai': {'peticiones_por_minuto': 120, 'rafaga': 4, 'max_en_vuelo': 4},
+    'google': {'peticiones_por_minuto': 60, 'rafaga': 4, 'max_en_vuelo': 4},
+}
+LIMITE_POR_DEFECTO = {'peticiones_por_minuto': 60, 'rafaga': 2, 'max_en_vuelo': 2}
+
+# Al recibir un 429 el ritmo se multiplica por este factor; cada acierto recupera esta fracción del ritmo máximo
+FACTOR_FRENADO = 0.5
+FRACCION_RECUPERACION = 0.05
+# Ritmo mínimo (peticiones por minuto) al que se puede llegar frenando
+RITMO_MINIMO = 1.0
+# Segundos que se pausa como mínimo un modelo tras un 429 sin Retry-After
+# (para que la petición que vuelve a la cola no insista enseguida mientras el ritmo aún es alto)
+PAUSA_MINIMA_LIMITE = 2.0
+
+# Clase con un cubo de fichas: cada petición gasta una ficha y las fichas se reponen al ritmo actual
+class CuboFichas:
+    def __init__(self, por_minuto, rafaga):
+        self.ritmo_maximo = por_minuto / 60.0
+        self.ritmo = self.ritmo_maximo
+        self.capacidad = max(1.0, float(rafaga))
+        self.fichas = self.capacidad
+        self.pausado_hasta = 0.0
+        self.ultimo = time.monotonic()
+        self._bloqueo = threading.Lock()
+
+    # Función para reponer las fichas según el tiempo transcurrido
+    def _reponer(self, ahora):
+        if ahora > self.ultimo:
+            self.fichas = min(self.capacidad, self.fichas + (ahora - self.ultimo) * self.ritmo)
+        self.ultimo = ahora
+
+    # Función para gastar una ficha; devuelve 0 si se ha gastado o los segundos que hay que esperar
+    def intentar_tomar(self):
+        with self._bloqueo:
+            ahora = time.monotonic()
+            if ahora < self.pausado_hasta:
+                return self.pausado_hasta - ahora
+            self._reponer(ahora)
+            if self.fichas >= 1:
+                self.fichas -= 1
+                return 0.0
+            return (1 - self.fichas) / self.ritmo
+
+    # Función para esperar (en cola) hasta que haya una ficha disponible (o se cancele la generación)
+    def tomar(self):
+        while True:
+            espera = self.intentar_tomar()
+            if espera <= 0:
+                return
+            esperar(min(espera, 1.0))
+
+    # Función para pausar el cubo tras un 429 el tiempo indicado por el proveedor (y, si se pide, reducir el ritmo)
+    def frenar(self, retry_after=None, reducir_ritmo=True):
+        with self._bloqueo:
+            ahora = time.monotonic()
+            self._reponer(ahora)
+            if reducir_ritmo:
+                self.ritmo = max(RITMO_MINIMO / 60.0, self.ritmo * FACTOR_FRENADO)
+                self.fichas = 0.0
+            pausa = retry_after if retry_after is not None else (max(PAUSA_MINIMA_LIMITE, 1 / self.ritmo) if reducir_ritmo else 0.0)
+            self.pausado_hasta = max(self.pausado_hasta, ahora + pausa)
+
+    # Función para recuperar poco a poco el ritmo tras una petición correcta
+    def acelerar(self):
+        with self._bloqueo:
+            self.ritmo = min(self.ritmo_maximo, self.ritmo + self.ritmo_maximo * FRACCION_RECUPERACION)
+
+# Clase que junta el cubo de fichas y el máximo de peticiones en vuelo de un proveedor o de un modelo
+class Limitador:
+    def __init__(self, por_minuto, rafaga, max_en_vuelo):
+        self.cubo = CuboFichas(por_minuto, rafaga)
+        self.en_vuelo = threading.BoundedSemaphore(max(1, int(max_en_vuelo)))
+
+_limitadores = {}
+_bloqueo_limitadores = threading.Lock()
+
+# Función para leer los límites de un proveedor, aplicando los cambios de config.json
+def obtener_limites(proveedor):
+    limites = dict(LIMITES_PROVEEDORES.get(proveedor, LIMITE_POR_DEFECTO))
+    configurados = obtener_config_store().obtener('limites_proveedores', {})
+    if isinstance(configurados, dict) and isinstance(configurados.get(proveedor), dict):
+        limites.update(configurados[proveedor])
+    return limites
+
+# Función para obtener el limitador de un proveedor o, si se indica, de uno de sus modelos
+# (los modelos empiezan con los límites del proveedor y aprenden su propio ritmo a partir de los 429)
+def obtener_limitador(proveedor, modelo=None):
+    clave = (proveedor, modelo)
+    with _bloqueo_limitadores:
+        if clave not in _limitadores:
+            limites = obtener_limites(proveedor)
+            _limitadores[clave] = Limitador(limites['peticiones_por_minuto'], limites['rafaga'], limites['max_en_vuelo'])
+        return _limitadores[clave]
+
+# Función para esperar turno antes de llamar a un proveedor y liberar el hueco al terminar
+@contextmanager
+def turno(proveedor, modelo=None):
+    limitadores = [obtener_limitador(proveedor)]
+    if modelo:
+        limitadores.append(obtener_limitador(proveedor, modelo))
+    # Ocupar los huecos siempre en el mismo orden (proveedor y después modelo) para no bloquearse entre hilos
+    ocupados = []
+    try:
+        for limitador in limitadores:
+            # Esperar hueco comprobando de vez en cuando si la generación se ha cancelado
+            while not limitador.en_vuelo.acquire(timeout=0.5):
+                comprobar_cancelacion()
+            ocupados.append(limitador)
+        for limitador in limitadores:
+            limitador.cubo.tomar()
+        yield
+    finally:
+        for limitador in reversed(ocupados):
+            limitador.en_vuelo.release()
+
+# Función para anotar un 429 y frenar las siguientes peticiones
+# (si se sabe el modelo, se reduce su ritmo y el resto de modelos del proveedor solo respeta el Retry-After)
+def registrar_limite_superado(proveedor, modelo=None, retry_after=None):
+    obtener_limitador(proveedor).cubo.frenar(retry_after, reducir_ritmo=not modelo)
+    if modelo:
+        obtener_limitador(proveedor, modelo).cubo.frenar(retry_after)
+
+# Función para anotar una petición correcta y recuperar el ritmo poco a poco
+def registrar_exito(proveedor, modelo=None):
+    obtener_limitador(proveedor).cubo.acelerar()
+    if modelo:
+        obtener_limitador(proveedor, modelo).cubo.acelerar()
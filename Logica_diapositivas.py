@@ -1,45 +1,60 @@
-import sys, os, random
+import sys, os, random, json, threading, time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_EXCEPTION
+from PIL import Image
 from pptx import Presentation
 from Diseños_diapositivas import Diapositivas
-from modelos.IA_sdxl import generar_imagen as generar_imagen_sdxl
-from modelos.IA_fluxschnell import generar_imagen as generar_imagen_fluxschnell
-from modelos.IA_flux8 import generar_imagen as generar_imagen_flux8
-from modelos.IA_flux16 import generar_imagen as generar_imagen_flux16
-from modelos.IA_dgmtnzflux import generar_imagen as generar_imagen_diego
-from modelos.IA_fluxpulid import generar_imagen as generar_imagen_flux
-from modelos.IA_photomaker import generar_imagen as generar_imagen_photomaker
-from modelos.IA_imagen3 import generar_imagen as generar_imagen_imagen3
-from modelos.IA_imagen3fast import generar_imagen as generar_imagen_imagen3fast
-from modelos.IA_sana import generar_imagen as generar_imagen_sana
-from modelos.IA_sana_sprint import generar_imagen as generar_imagen_sana_sprint
-from modelos.IA_model3_4 import generar_imagen as generar_imagen_model3_4
-from modelos.IA_grok2_image import generar_imagen as generar_imagen_grok
-from modelos.IA_gemini2_flash_image import generar_imagen as generar_imagen_gemini_flash
-from modelos.IA_dall_e_2 import generar_imagen as generar_imagen_dalle2
-from modelos.IA_dall_e_3 import generar_imagen as generar_imagen_dalle3
-from modelos.IA_imagen4 import generar_imagen as generar_imagen_imagen4
 from Traducciones import obtener_traduccion
+from Parser_secciones import ParserSeccionesIncremental
+from Cache_imagenes import obtener_estadisticas as obtener_estadisticas_cache_imagenes, ultima_busqueda_fue_acierto
+from Cobertura_imagenes import crear_cobertura, registrar_latencia
+from Cache_respuestas import obtener_respuesta_cacheada, guardar_respuesta_cacheada
+from Configuracion import obtener_config_store
+from Reintentos import reintentar
+from Cancelacion import CancelacionError, token_actual, usar_token
+from Espacios_trabajo import EspacioTrabajo, copiar_atomico, limpiar_en_segundo_plano
+from Puntos_control import PuntoControl, EN_CURSO, COMPLETADO, FALLIDO, CANCELADO
+from Trazas import crear_traza, traza_actual, usar_traza
+from Catalogo_modelos import obtener_modelo, cargar_modulo, obtener_proveedor, obtener_max_simultaneas, requiere_imagen_personalizada, obtener_cadena_modelos, normalizar_etiqueta, CADENAS_RESPALDO, MODELO_TEXTO_POR_DEFECTO
+from Bitacora import obtener_registro, registrar, MensajeTraducido, DEBUG, INFO, ERROR
+
+# Registro del módulo
+registro = obtener_registro(__name__)
+
+# Tamaño y color de la imagen que se pone cuando ningún modelo ha podido generar la de una diapositiva
+TAMANO_IMAGEN_RELLENO = (1024, 1024)
+COLOR_IMAGEN_RELLENO = (200, 200, 200)
+
+# Función para añadir a la descripción del usuario las instrucciones de formato para el modelo de texto
+def construir_descripcion(descripcion, num_diapositivas, idioma='es'):
+    instruccion_idioma = obtener_traduccion('language_instruction', idioma)
+    return descripcion + f" hazlo OBLIGATORIAMENTE en {num_diapositivas} claves-valores (diapositivas) y en {instruccion_idioma}, tal que los títulos de la tupla NO superen 4 palabras y del contenido NO superen 69 palabras"
+
+# Función para obtener cuántas imágenes se pueden generar a la vez con un modelo
+def obtener_max_imagenes_simultaneas(modelo):
+    proveedor = obtener_proveedor(modelo)
+    limite = obtener_max_simultaneas(modelo)
+    # Permitir ajustar el límite por proveedor desde config.json
+    try:
+        config = obtener_config_store().leer()
+        limite = int(config.get('max_imagenes_simultaneas', {}).get(proveedor, limite))
+    except Exception as e:
+        registro.warning("Error al leer el límite de imágenes simultáneas: %s", e)
+    return max(1, limite)
 
-# Definir la ruta de la carpeta de datos de la aplicación según el sistema operativo
-if sys.platform == 'win32':
-    APP_DATA_DIR = os.path.join(os.getenv('APPDATA'), 'Powerpoineador')
-elif sys.platform == 'darwin':
-    APP_DATA_DIR = os.path.join(os.path.expanduser('~'), 'Library', 'Application Support', 'Powerpoineador')
-else:
-    APP_DATA_DIR = os.path.join(os.path.expanduser('~'), '.Powerpoineador')
-
-# Crear carpeta de imágenes si no existe
-IMAGES_DIR = os.path.join(APP_DATA_DIR, 'images')
-if not os.path.exists(IMAGES_DIR):
-    os.makedirs(IMAGES_DIR)
+# Función para obtener los modelos que se prueban para una etiqueta, aplicando las cadenas de respaldo de config.json
+def obtener_cadena_respaldo(modelo):
+    cadenas = dict(CADENAS_RESPALDO)
+    configuradas = obtener_config_store().obtener('cadenas_respaldo', {})
+    if isinstance(configuradas, dict):
+        cadenas.update(configuradas)
+    return obtener_cadena_modelos(modelo, cadenas)
 
 # Función para obtener respuesta del modelo con reintentos
-def obtener_respuesta_ia(descripcion, modelo, signals=None):
+# - detalles: diccionario en el que se anota el modelo que ha dado la respuesta ('modelo') y si salió de la caché ('cache')
+def obtener_respuesta_ia(descripcion, modelo, signals=None, receptor_stream=None, usar_cache=True, cancelacion=None, detalles=None):
     # Función interna para manejar logs
-    def log_message(msg):
-        print(msg)
-        if signals:
-            signals.update_log.emit(str(msg))
+    def log_message(msg, nivel=INFO):
+        registrar(registro, signals, msg, nivel)
     
     # Obtener el idioma actual
     current_language = 'es'
@@ -51,85 +66,59 @@ def obtener_respuesta_ia(descripcion, modelo, signals=None):
         current_language = signals.parent.parent.current_language
 
     try:
-        # Imprimir un mensaje indicando que se está intentando generar una respuesta
-        log_message(obtener_traduccion('intentando_generar_respuesta', current_language).format(modelo=modelo))
-        
-        # Verificar cuál es el modelo que se está utilizando
-        if modelo == 'meta-llama-3.1-405b-instruct [$0.0067]':
-            from modelos.IA_llama3 import intentar_obtener_respuesta
-            respuesta = intentar_obtener_respuesta(descripcion, signals)
-        elif modelo == 'meta-llama-4-scout-instruct [$0.00046]':
-            from modelos.IA_llama4s import intentar_obtener_respuesta
-            respuesta = intentar_obtener_respuesta(descripcion, signals)
-        elif modelo == 'meta-llama-4-maverick-instruct [$0.00067]':
-            from modelos.IA_llama4m import intentar_obtener_respuesta
-            respuesta = intentar_obtener_respuesta(descripcion, signals)
-        elif modelo == 'claude-4-sonnet [$0.0105]':
-            from modelos.IA_sonnet4 import intentar_obtener_respuesta
-            respuesta = intentar_obtener_respuesta(descripcion, signals)
-        elif modelo == 'claude-3.7-sonnet [$0.0105]':
-            from modelos.IA_sonnet3_7 import intentar_obtener_respuesta
-            respuesta = intentar_obtener_respuesta(descripcion, signals)
-        elif modelo == 'claude-3.5-sonnet [$0.01312]':
-            from modelos.IA_sonnet3_5 import intentar_obtener_respuesta
-            respuesta = intentar_obtener_respuesta(descripcion, signals)
-        elif modelo == 'claude-3.5-haiku [$0.0035]':
-            from modelos.IA_haiku import intentar_obtener_respuesta
-            respuesta = intentar_obtener_respuesta(descripcion, signals)
-        elif modelo == 'grok-2-1212':
-            from modelos.IA_grok2 import intentar_obtener_respuesta
-            respuesta = intentar_obtener_respuesta(descripcion, signals)
-        elif modelo == 'grok-3':
-            from modelos.IA_grok3 import intentar_obtener_respuesta
-            respuesta = intentar_obtener_respuesta(descripcion, signals)
-        elif modelo == 'grok-3-mini':
-            from modelos.IA_grok3_mini import intentar_obtener_respuesta
-            respuesta = intentar_obtener_respuesta(descripcion, signals)
-        elif modelo == 'grok-3-mini-fast':
-            from modelos.IA_grok3_mini_fast import intentar_obtener_respuesta
-            respuesta = intentar_obtener_respuesta(descripcion, signals)
-        elif modelo == 'gemini-2.5-flash-preview-05-20':
-            from modelos.IA_gemini2_5_flash import intentar_obtener_respuesta
-            respuesta = intentar_obtener_respuesta(descripcion, signals)
-        elif modelo == 'gemini-2.0-flash':
-            from modelos.IA_gemini2_flash import intentar_obtener_respuesta
-            respuesta = intentar_obtener_respuesta(descripcion, signals)
-        elif modelo == 'gemini-2.0-flash-thinking-exp-01-21':
-            from modelos.IA_gemini2_flash_thinking import intentar_obtener_respuesta
-            respuesta = intentar_obtener_respuesta(descripcion, signals)
-        elif modelo == 'deepseek-r1 [$0.007]':
-            from modelos.IA_deepseek import intentar_obtener_respuesta
-            respuesta = intentar_obtener_respuesta(descripcion, signals)
-        elif modelo == 'gpt-4.1 [$0.0056]':
-            from modelos.IA_gpt4_1 import intentar_obtener_respuesta
-            respuesta = intentar_obtener_respuesta(descripcion, signals)
-        elif modelo == 'gpt-4.1-nano [$0.00028]':
-            from modelos.IA_gpt4_1_nano import intentar_obtener_respuesta
-            respuesta = intentar_obtener_respuesta(descripcion, signals)
-        elif modelo == 'o4-mini [$0.0028]':
-            from modelos.IA_o4_mini import intentar_obtener_respuesta
-            respuesta = intentar_obtener_respuesta(descripcion, signals)
-        elif modelo == 'gpt-4o-mini [$0.00042]':
-            from modelos.IA_gpt4o_mini import intentar_obtener_respuesta
-            respuesta = intentar_obtener_respuesta(descripcion, signals)
-        elif modelo == 'gpt-4o [$0.00112]':
-            from modelos.IA_gpt4o import intentar_obtener_respuesta
-            respuesta = intentar_obtener_respuesta(descripcion, signals)
-        else:
-            from modelos.IA_dolphin import intentar_obtener_respuesta
-            respuesta = intentar_obtener_respuesta(descripcion, signals)
-
-        # Verificar si se pudo obtener respuesta del modelo
-        if respuesta:
-            log_message(obtener_traduccion('respuesta_modelo', current_language).format(modelo=modelo, respuesta=respuesta))
-            log_message(obtener_traduccion('tupla_generada', current_language).format(respuesta=respuesta))
+        # Reutilizar la respuesta si ya se pidió lo mismo al mismo modelo
+        respuesta = obtener_respuesta_cacheada(modelo, descripcion, usar_cache)
+        if isinstance(respuesta, dict) and respuesta:
+            log_message(obtener_traduccion('respuesta_desde_cache', current_language).format(modelo=modelo))
+            if detalles is not None:
+                detalles.update(modelo=modelo, cache=True)
+            log_message(MensajeTraducido('tupla_generada', current_language, respuesta=respuesta), DEBUG)
             return respuesta
-        
+
+        # Probar el modelo elegido y, si falla, sus modelos de respaldo en orden
+        cadena = obtener_cadena_respaldo(modelo)
+        for indice, etiqueta in enumerate(cadena):
+            # Imprimir un mensaje indicando que se está intentando generar una respuesta
+            log_message(obtener_traduccion('intentando_generar_respuesta', current_language).format(modelo=etiqueta))
+            try:
+                # Obtener el módulo del modelo desde el catálogo (se importa la primera vez que se usa)
+                modulo = cargar_modulo(etiqueta if obtener_modelo(etiqueta) else MODELO_TEXTO_POR_DEFECTO)
+                with usar_token(cancelacion or token_actual()):
+                    respuesta = modulo.intentar_obtener_respuesta(descripcion, signals, receptor_stream)
+                error = None
+            except CancelacionError:
+                # Al cancelar no se prueban los modelos de respaldo
+                raise
+            except Exception as e:
+                respuesta = None
+                error = e
+                # Imprimir un mensaje indicando que ocurrió un error al obtener la respuesta
+                log_message(obtener_traduccion('error_obtener_respuesta', current_language).format(error=str(e)), ERROR)
+
+            # Verificar si se pudo obtener respuesta del modelo
+            if respuesta:
+                if indice > 0:
+                    log_message(obtener_traduccion('texto_con_respaldo', current_language).format(modelo=etiqueta, original=modelo))
+                log_message(MensajeTraducido('respuesta_modelo', current_language, modelo=etiqueta, respuesta=respuesta), DEBUG)
+                log_message(MensajeTraducido('tupla_generada', current_language, respuesta=respuesta), DEBUG)
+                # Guardar la respuesta en la caché (con el modelo que la ha generado) para las próximas generaciones
+                if isinstance(respuesta, dict):
+                    guardar_respuesta_cacheada(etiqueta, descripcion, respuesta)
+                if detalles is not None:
+                    detalles.update(modelo=etiqueta, cache=False)
+                return respuesta
+
+            if indice + 1 < len(cadena):
+                log_message(obtener_traduccion('modelo_fallido_respaldo', current_language).format(
+                    modelo=etiqueta, error=str(error) if error else obtener_traduccion('respuesta_no_valida', current_language), respaldo=cadena[indice + 1]))
+
         return None
         
+    except CancelacionError:
+        raise
     except Exception as e:
         # Imprimir un mensaje indicando que ocurrió un error al obtener la respuesta
-        log_message(obtener_traduccion('error_obtener_respuesta', current_language).format(error=str(e)))
+        log_message(obtener_traduccion('error_obtener_respuesta', current_language).format(error=str(e)), ERROR)
         return None
     finally:
         import gc
@@ -138,10 +127,8 @@ def obtener_respuesta_ia(descripcion, modelo, signals=None):
 # Función para generar texto (título y contenido) con un modelo de IA
 def generar_texto_ia(tipo, contenido_actual, descripcion, modelo, signals=None):
     # Función interna para manejar logs
-    def log_message(msg):
-        print(msg)
-        if signals:
-            signals.update_log.emit(str(msg))
+    def log_message(msg, nivel=INFO):
+        registrar(registro, signals, msg, nivel)
     
     # Obtener el idioma actual
     current_language = 'es'
@@ -167,70 +154,9 @@ def generar_texto_ia(tipo, contenido_actual, descripcion, modelo, signals=None):
             )
             log_message(obtener_traduccion('generando_contenido', current_language).format(modelo=modelo))
         
-        # Verificar cuál es el modelo que se está utilizando
-        if modelo == 'meta-llama-3.1-405b-instruct [$0.0067]':
-            from modelos.IA_llama3 import generar_texto_simple
-            texto_generado = generar_texto_simple(prompt, signals)
-        elif modelo == 'meta-llama-4-scout-instruct [$0.00046]':
-            from modelos.IA_llama4s import generar_texto_simple
-            texto_generado = generar_texto_simple(prompt, signals)
-        elif modelo == 'meta-llama-4-maverick-instruct [$0.00067]':
-            from modelos.IA_llama4m import generar_texto_simple
-            texto_generado = generar_texto_simple(prompt, signals)
-        elif modelo == 'claude-4-sonnet [$0.0105]':
-            from modelos.IA_sonnet4 import generar_texto_simple
-            texto_generado = generar_texto_simple(prompt, signals)
-        elif modelo == 'claude-3.7-sonnet [$0.0105]':
-            from modelos.IA_sonnet3_7 import generar_texto_simple
-            texto_generado = generar_texto_simple(prompt, signals)
-        elif modelo == 'claude-3.5-sonnet [$0.01312]':
-            from modelos.IA_sonnet3_5 import generar_texto_simple
-            texto_generado = generar_texto_simple(prompt, signals)
-        elif modelo == 'claude-3.5-haiku [$0.0035]':
-            from modelos.IA_haiku import generar_texto_simple
-            texto_generado = generar_texto_simple(prompt, signals)
-        elif modelo == 'grok-2-1212':
-            from modelos.IA_grok2 import generar_texto_simple
-            texto_generado = generar_texto_simple(prompt, signals)
-        elif modelo == 'grok-3':
-            from modelos.IA_grok3 import generar_texto_simple
-            texto_generado = generar_texto_simple(prompt, signals)
-        elif modelo == 'grok-3-mini':
-            from modelos.IA_grok3_mini import generar_texto_simple
-            texto_generado = generar_texto_simple(prompt, signals)
-        elif modelo == 'grok-3-mini-fast':
-            from modelos.IA_grok3_mini_fast import generar_texto_simple
-            texto_generado = generar_texto_simple(prompt, signals)
-        elif modelo == 'gemini-2.5-flash-preview-05-20':
-            from modelos.IA_gemini2_5_flash import generar_texto_simple
-            texto_generado = generar_texto_simple(prompt, signals)
-        elif modelo == 'gemini-2.0-flash':
-            from modelos.IA_gemini2_flash import generar_texto_simple
-            texto_generado = generar_texto_simple(prompt, signals)
-        elif modelo == 'gemini-2.0-flash-thinking-exp-01-21':
-            from modelos.IA_gemini2_flash_thinking import generar_texto_simple
-            texto_generado = generar_texto_simple(prompt, signals)
-        elif modelo == 'deepseek-r1 [$0.007]':
-            from modelos.IA_deepseek import generar_texto_simple
-            texto_generado = generar_texto_simple(prompt, signals)
-        elif modelo == 'gpt-4.1 [$0.0056]':
-            from modelos.IA_gpt4_1 import generar_texto_simple
-            texto_generado = generar_texto_simple(prompt, signals)
-        elif modelo == 'gpt-4.1-nano [$0.00028]':
-            from modelos.IA_gpt4_1_nano import generar_texto_simple
-            texto_generado = generar_texto_simple(prompt, signals)
-        elif modelo == 'o4-mini [$0.0028]':
-            from modelos.IA_o4_mini import generar_texto_simple
-            texto_generado = generar_texto_simple(prompt, signals)
-        elif modelo == 'gpt-4o-mini [$0.00042]':
-            from modelos.IA_gpt4o_mini import generar_texto_simple
-            texto_generado = generar_texto_simple(prompt, signals)
-        elif modelo == 'gpt-4o [$0.00112]':
-            from modelos.IA_gpt4o import generar_texto_simple
-            texto_generado = generar_texto_simple(prompt, signals)
-        else:
-            from modelos.IA_dolphin import generar_texto_simple
-            texto_generado = generar_texto_simple(prompt, signals)
+        # Obtener el módulo del modelo desde el catálogo (se importa la primera vez que se usa)
+        modulo = cargar_modulo(modelo if obtener_modelo(modelo) else MODELO_TEXTO_POR_DEFECTO)
+        texto_generado = modulo.generar_texto_simple(prompt, signals)
 
         # Verificar si se pudo obtener respuesta del modelo
         if texto_generado:
@@ -246,21 +172,21 @@ def generar_texto_ia(tipo, contenido_actual, descripcion, modelo, signals=None):
     except Exception as e:
         # Imprimir un mensaje indicando que ocurrió un error
         if tipo == "titulo":
-            log_message(obtener_traduccion('error_generar_titulo', current_language).format(error=str(e)))
+            log_message(obtener_traduccion('error_generar_titulo', current_language).format(error=str(e)), ERROR)
         else:
-            log_message(obtener_traduccion('error_generar_contenido', current_language).format(error=str(e)))
+            log_message(obtener_traduccion('error_generar_contenido', current_language).format(error=str(e)), ERROR)
         return None
     finally:
         import gc
         gc.collect()
 
 # Función para generar una imagen con un modelo de IA
-def generar_imagen_ia(section, content, descripcion, modelo, signals=None):
+# - detalles: diccionario en el que se anota el modelo que ha generado la imagen ('modelo'), si salió de la caché ('cache')
+#   y los modelos de las peticiones duplicadas por la cobertura que no se han usado ('duplicadas')
+def generar_imagen_ia(section, content, descripcion, modelo, signals=None, usar_cache=True, imagen_personalizada=None, cobertura=None, numero=None, detalles=None, cancelacion=None):
     # Función interna para manejar logs
-    def log_message(msg):
-        print(msg)
-        if signals:
-            signals.update_log.emit(str(msg))
+    def log_message(msg, nivel=INFO):
+        registrar(registro, signals, msg, nivel)
     
     # Obtener el idioma actual
     current_language = 'es'
@@ -271,53 +197,74 @@ def generar_imagen_ia(section, content, descripcion, modelo, signals=None):
     elif signals and hasattr(signals, 'parent') and hasattr(signals.parent, 'parent') and hasattr(signals.parent.parent, 'current_language'):
         current_language = signals.parent.parent.current_language
 
-    try:
-        # Ya no imprimir mensaje aquí, ya se hace en generar_presentacion
-        
-        if modelo == 'sdxl-lightning-4step [$0.0037]':
-            return generar_imagen_sdxl(section, content, descripcion, signals, False)
-        elif modelo == 'flux-schnell [$0.003]':
-            return generar_imagen_fluxschnell(section, content, descripcion, signals, False)
-        elif modelo == 'hyper-flux-8step [$0.045]':
-            return generar_imagen_flux8(section, content, descripcion, signals, False)
-        elif modelo == 'photomaker [$0.0070]':
-            return generar_imagen_photomaker(section, content, descripcion, None, signals, False)
-        elif modelo == 'hyper-flux-16step [$0.047]':
-            return generar_imagen_flux16(section, content, descripcion, signals, False)
-        elif modelo == 'dgmtnzflux [$0.03]':
-            return generar_imagen_diego(section, content, descripcion, signals, False)
-        elif modelo == 'sana [$0.0067]':
-            return generar_imagen_sana(section, content, descripcion, signals, False)
-        elif modelo == 'sana-sprint-1.6b [$0.0015]':
-            return generar_imagen_sana_sprint(section, content, descripcion, signals, False)
-        elif modelo == 'imagen-3 [$0.05]':
-            return generar_imagen_imagen3(section, content, descripcion, signals, False)
-        elif modelo == 'imagen-3-fast [$0.025]':
-            return generar_imagen_imagen3fast(section, content, descripcion, signals, False)
-        elif modelo == 'model3_4 [$0.00098]':
-            return generar_imagen_model3_4(section, content, descripcion, signals, False)
-        elif modelo == 'grok-2-image-1212':
-            return generar_imagen_grok(section, content, descripcion, signals, False)
-        elif modelo == 'gemini-2.0-flash-preview-image-generation':
-            return generar_imagen_gemini_flash(section, content, descripcion, signals, False)
-        elif modelo == 'dall-e-3 [$0.12]':
-            return generar_imagen_dalle3(section, content, descripcion, signals, False)
-        elif modelo == 'dall-e-2 [$0.02]':
-            return generar_imagen_dalle2(section, content, descripcion, signals, False)
-        elif modelo == 'imagen-4 [$0.05]':
-            return generar_imagen_imagen4(section, content, descripcion, signals, False)
-        else:
-            return generar_imagen_flux(section, content, descripcion, None, signals, False)
-    except Exception as e:
-        raise RuntimeError(obtener_traduccion('error_generar_imagen', current_language).format(error=str(e)))
+    # Función para generar la imagen con un modelo del catálogo, anotando cuánto tarda; devuelve (imagen, si salió de la caché)
+    # (token: token de cancelación de esta petición, si no es el de la generación)
+    def generar_con_modelo(etiqueta, token=None):
+        # Buscar el modelo en el catálogo
+        datos_modelo = obtener_modelo(etiqueta)
+        if datos_modelo is None or datos_modelo['tipo'] != 'imagen':
+            raise ValueError(obtener_traduccion('modelo_imagen_desconocido', current_language).format(modelo=etiqueta))
+
+        # Construir los argumentos según lo que necesita el módulo del modelo
+        argumentos = [section, content, descripcion]
+        if datos_modelo.get('imagen_personalizada'):
+            argumentos.append(imagen_personalizada)
+        if datos_modelo.get('recibe_signals'):
+            argumentos.append(signals)
+
+        # Importar el módulo del modelo (solo la primera vez) y generar la imagen con la política común de reintentos
+        modulo = cargar_modulo(etiqueta)
+        inicio = time.monotonic()
+        with usar_token(token or cancelacion), usar_traza(traza), traza.etapa('modelo_imagen', 'imagen', numero=numero, modelo=etiqueta):
+            img = reintentar(
+                lambda: modulo.generar_imagen(*argumentos, usar_cache=usar_cache),
+                datos_modelo['proveedor'], log_message, current_language, modelo=datos_modelo['modulo']
+            )
+        # Las imágenes sacadas de la caché no cuentan para la latencia del modelo
+        # (el acierto se comprueba aquí porque la cobertura genera en otro hilo)
+        acierto = ultima_busqueda_fue_acierto()
+        if not acierto:
+            registrar_latencia(etiqueta, time.monotonic() - inicio)
+        return img, acierto
+
+    # La cobertura genera en otros hilos, así que el token de cancelación y la traza se pasan a cada intento
+    cancelacion = cancelacion or token_actual()
+    traza = traza_actual()
+
+    # Probar el modelo elegido y, si falla, sus modelos de respaldo en orden
+    cadena = obtener_cadena_respaldo(modelo)
+    for indice, etiqueta in enumerate(cadena):
+        try:
+            # Con cobertura activa, las imágenes lentas se piden una segunda vez y se usa la primera que llegue
+            # (si gana la petición de respaldo, la imagen es del modelo de respaldo de la cobertura)
+            if cobertura:
+                (img, acierto), etiqueta_usada = cobertura.generar(numero, etiqueta, generar_con_modelo, cancelacion, detalles)
+            else:
+                (img, acierto), etiqueta_usada = generar_con_modelo(etiqueta), etiqueta
+        except CancelacionError:
+            # Al cancelar no se prueban los modelos de respaldo
+            raise
+        except Exception as e:
+            ultimo_error = e
+            if indice + 1 < len(cadena):
+                log_message(obtener_traduccion('modelo_fallido_respaldo', current_language).format(
+                    modelo=etiqueta, error=str(e), respaldo=cadena[indice + 1]))
+            continue
+        # Anotar qué modelo ha generado la imagen
+        if detalles is not None:
+            detalles.update(modelo=normalizar_etiqueta(etiqueta_usada), cache=acierto)
+        return img
+
+    # Los errores de compatibilidad regional ya vienen traducidos y se propagan sin prefijo
+    if type(ultimo_error).__name__ == 'RegionCompatibilityError':
+        raise RuntimeError(str(ultimo_error))
+    raise RuntimeError(obtener_traduccion('error_generar_imagen', current_language).format(error=str(ultimo_error)))
 
 # Función para generar una presentación con un modelo de IA
-def generar_presentacion(modelo_texto, modelo_imagen, descripcion, auto_open, imagen_personalizada, filename, signals=None, title_font_name='Calibri', content_font_name='Calibri', title_font_size=16, content_font_size=10, title_bold=False, title_italic=False, title_underline=False, content_bold=False, content_italic=False, content_underline=False, disenos_aleatorios=True, selected_layout_index=1):
+def generar_presentacion(modelo_texto, modelo_imagen, descripcion, auto_open, imagen_personalizada, filename, signals=None, title_font_name='Calibri', content_font_name='Calibri', title_font_size=16, content_font_size=10, title_bold=False, title_italic=False, title_underline=False, content_bold=False, content_italic=False, content_underline=False, disenos_aleatorios=True, selected_layout_index=1, num_diapositivas=None, usar_cache_imagenes=True, usar_cache_texto=True, cancelacion=None, punto_control=None, traza=None):
     # Función interna para manejar logs
-    def log_message(msg):
-        print(msg)
-        if signals:
-            signals.update_log.emit(str(msg))
+    def log_message(msg, nivel=INFO):
+        registrar(registro, signals, msg, nivel)
     
     # Obtener el idioma actual
     current_language = 'es'
@@ -328,72 +275,262 @@ def generar_presentacion(modelo_texto, modelo_imagen, descripcion, auto_open, im
     elif signals and hasattr(signals, 'parent') and hasattr(signals.parent, 'parent') and hasattr(signals.parent.parent, 'current_language'):
         current_language = signals.parent.parent.current_language
 
+    # Anotar cuánto dura cada etapa (se guarda como traza de Chrome y se emite por la señal 'etapa' si existe)
+    if traza is None:
+        senal_etapa = getattr(signals, 'etapa', None)
+        traza = crear_traza(al_evento=senal_etapa.emit if senal_etapa else None)
+    inicio_presentacion = time.perf_counter()
+    estado_final = FALLIDO
+
+    espacio = None
     try:
+        # Carpeta propia de esta presentación para sus imágenes (no se pisa con otras generaciones ni con la edición)
+        espacio = EspacioTrabajo()
         # Crear una nueva presentación
         presentation = Presentation()
         # Crear un objeto para aplicar diseños a las diapositivas, pasando la fuente y tamaños
-        slide_designs = Diapositivas(presentation, title_font_name, content_font_name, title_font_size, content_font_size, title_bold, title_italic, title_underline, content_bold, content_italic, content_underline)
-
-        # Imprimir un mensaje indicando que se está generando texto con el modelo
-        log_message(obtener_traduccion('generando_texto', current_language).format(modelo=modelo_texto))
-        
-        # Obtener la respuesta del modelo
-        respuesta = obtener_respuesta_ia(descripcion, modelo_texto, signals)
-        
-        # Verificar si se pudo obtener respuesta del modelo
-        if not respuesta:
-            raise Exception(obtener_traduccion('no_respuesta_modelo_texto', current_language))
-        
-        # Obtener las secciones del contenido
-        sections = respuesta
-        # Inicializar el número de diapositiva
-        slide_number = 1
-        # Obtener el número total de diapositivas
-        total_slides = len(sections)
-        # Crear una lista para almacenar las imágenes generadas
-        imagenes_generadas = []
-        
-        # Iterar sobre las secciones del contenido
-        for section, content in sections.items():
+        slide_designs = Diapositivas(presentation, title_font_name, content_font_name, title_font_size, content_font_size, title_bold, title_italic, title_underline, content_bold, content_italic, content_underline, carpeta_trabajo=espacio.carpeta)
+        # Medir cada llamada a los diseños
+        slide_designs = traza.envolver_disenos(slide_designs)
+
+        # Verificar que los modelos de caras tienen una imagen de referencia antes de pedir el texto
+        if requiere_imagen_personalizada(modelo_imagen):
+            if not (imagen_personalizada and os.path.exists(imagen_personalizada)):
+                raise RuntimeError(obtener_traduccion('error_imagen_requerida', current_language))
+
+        # Guardar el avance en disco para poder reanudar la presentación si algo falla
+        # (al reanudar se recuperan el texto y las imágenes ya generadas y solo se pide lo que falta)
+        if punto_control is None:
+            punto_control = PuntoControl.crear({
+                'modelo_texto': modelo_texto, 'modelo_imagen': modelo_imagen, 'descripcion': descripcion,
+                'auto_open': auto_open, 'imagen_personalizada': imagen_personalizada, 'filename': filename,
+                'title_font_name': title_font_name, 'content_font_name': content_font_name,
+                'title_font_size': title_font_size, 'content_font_size': content_font_size,
+                'title_bold': title_bold, 'title_italic': title_italic, 'title_underline': title_underline,
+                'content_bold': content_bold, 'content_italic': content_italic, 'content_underline': content_underline,
+                'disenos_aleatorios': disenos_aleatorios, 'selected_layout_index': selected_layout_index,
+                'num_diapositivas': num_diapositivas, 'usar_cache_imagenes': usar_cache_imagenes,
+                'usar_cache_texto': usar_cache_texto,
+            })
+        else:
+            hechas, total = punto_control.resumen()
+            log_message(obtener_traduccion('reanudando_presentacion', current_language).format(hechas=hechas, total=total or '?'))
+            punto_control.marcar(EN_CURSO)
+        traza.nombre = punto_control.id
+        traza.registrar('preparacion', inicio_presentacion, time.perf_counter())
+
+        # Número de diapositivas esperado mientras el modelo de texto aún no ha terminado
+        total_esperado = num_diapositivas if num_diapositivas else '?'
+        # Detalles de la imagen de cada sección: modelo que la ha generado (None si se usó la imagen de relleno),
+        # si salió de la caché, si se recuperó del punto de control, si se sustituyó por la de relleno
+        # y modelos de las peticiones duplicadas que no se usaron
+        detalles_por_seccion = {}
+        # Modelo que ha dado el texto y si salió de la caché o del punto de control
+        uso_texto = {'modelo': modelo_texto, 'cache': False, 'recuperado': False}
+
+        # Función para generar y guardar la imagen de una diapositiva
+        def generar_imagen_diapositiva(numero, section, content):
             # Imprimir un mensaje indicando que se está generando una imagen
-            log_message(obtener_traduccion('generando_imagen', current_language).format(numero=slide_number, total=total_slides))
+            imagen_path = espacio.ruta(f"Slide{numero}.jpg")
+
+            # Recuperar la imagen si ya se generó en un intento anterior de esta presentación
+            guardada = punto_control.obtener_imagen(section, content)
+            detalles = {'modelo': None, 'cache': False, 'recuperada': False, 'sustituida': False, 'duplicadas': []}
+            detalles_por_seccion[(section, content)] = detalles
+            if guardada:
+                ruta_guardada, modelo_guardado = guardada
+                detalles.update(modelo=modelo_guardado, recuperada=True)
+                log_message(obtener_traduccion('imagen_recuperada', current_language).format(numero=numero))
+                copiar_atomico(ruta_guardada, imagen_path)
+                return imagen_path
+
+            log_message(obtener_traduccion('generando_imagen', current_language).format(numero=numero, total=total_esperado))
             try:
-                # Verificar cuál es el modelo que se está utilizando
-                if modelo_imagen in ['flux-pulid [$0.027]', 'photomaker [$0.0067]']:
-                    if imagen_personalizada and os.path.exists(imagen_personalizada):
-                        if modelo_imagen == 'flux-pulid [$0.027]':
-                            img = generar_imagen_flux(section, content, descripcion, imagen_personalizada, signals, False)
-                        else:  # photomaker
-                            img = generar_imagen_photomaker(section, content, descripcion, imagen_personalizada, signals, False)
-                    else:
-                        raise RuntimeError(obtener_traduccion('error_imagen_requerida', current_language))
-                else:
-                    img = generar_imagen_ia(section, content, descripcion, modelo_imagen, signals)
-                
-                # Guardar la imagen generada en la carpeta de imágenes
-                imagen_path = os.path.join(IMAGES_DIR, f"Slide{slide_number}.jpg")
-                img.save(imagen_path)
-                # Agregar la ruta de la imagen generada a la lista de imágenes generadas
-                imagenes_generadas.append(imagen_path)
-                # Imprimir un mensaje indicando que la imagen se generó correctamente
-                log_message(obtener_traduccion('imagen_generada_correctamente', current_language).format(numero=slide_number))
-                
-                # Emitir señal para actualizar la vista previa con imagen y texto
-                if signals:
-                    signals.nueva_diapositiva.emit(imagen_path, section, content)
-                
-                if signals:
-                    # Emitir una señal para actualizar el progreso
-                    signals.update_progress.emit(slide_number, total_slides)
-                
-                slide_number += 1
-            except Exception as e:
-                # Imprimir un mensaje indicando que ocurrió un error al generar la imagen
-                log_message(obtener_traduccion('error_generando_imagen', current_language).format(numero=slide_number, error=str(e)))
+                img = generar_imagen_ia(section, content, descripcion, modelo_imagen, signals, usar_cache=usar_cache_imagenes, imagen_personalizada=imagen_personalizada, cobertura=cobertura, numero=numero, detalles=detalles, cancelacion=cancelacion)
+            except CancelacionError:
                 raise
+            except Exception as e:
+                # Si ningún modelo de la cadena ha podido generarla, usar una imagen de relleno para no perder el resto de la presentación
+                log_message(obtener_traduccion('error_generando_imagen', current_language).format(numero=numero, error=str(e)), ERROR)
+                log_message(obtener_traduccion('imagen_sustituida', current_language).format(numero=numero))
+                detalles.update(modelo=None, cache=False, sustituida=True)
+                img = Image.new('RGB', TAMANO_IMAGEN_RELLENO, COLOR_IMAGEN_RELLENO)
+            else:
+                if detalles['modelo'] != normalizar_etiqueta(modelo_imagen):
+                    log_message(obtener_traduccion('imagen_con_respaldo', current_language).format(
+                        numero=numero, modelo=detalles['modelo'], original=modelo_imagen))
+
+            # Guardar la imagen generada en la carpeta de imágenes y anotarla en el punto de control
+            # (las de relleno no se guardan, para volver a pedirlas al reanudar)
+            with traza.etapa('decodificar_imagen', 'imagen', numero=numero):
+                img = img.convert('RGB')
+            with traza.etapa('guardar_imagen', 'imagen', numero=numero):
+                espacio.guardar_imagen(img, f"Slide{numero}.jpg")
+            if detalles['modelo'] is None:
+                punto_control.registrar_relleno(section, content)
+            else:
+                punto_control.registrar_imagen(section, content, imagen_path, detalles['modelo'])
+            return imagen_path
+
+        # Preparar la cobertura de las imágenes lentas (None si está desactivada en config.json)
+        cobertura = crear_cobertura(num_diapositivas, log_message, current_language)
+
+        # Guardar los contadores de la caché de imágenes para informar de los aciertos de esta presentación
+        estadisticas_cache_inicio = obtener_estadisticas_cache_imagenes()
+
+        # Las imágenes se generan en paralelo, limitando las peticiones simultáneas al proveedor,
+        # y se empiezan a pedir en cuanto el modelo de texto cierra cada sección
+        max_imagenes_simultaneas = obtener_max_imagenes_simultaneas(modelo_imagen)
+        executor = ThreadPoolExecutor(max_workers=max_imagenes_simultaneas)
+        # Imágenes pedidas, indexadas por el par (título, contenido)
+        futuros = {}
+        # Orden en que se mostrarán las diapositivas en la vista previa
+        orden_diapositivas = []
+        estado = {'emitidas': 0, 'completadas': 0, 'total': None}
+        bloqueo = threading.Lock()
+
+        # Función para enviar a la vista previa, en orden, las diapositivas que ya tienen imagen
+        def publicar_diapositivas_listas():
+            with bloqueo:
+                while estado['emitidas'] < len(orden_diapositivas):
+                    par = orden_diapositivas[estado['emitidas']]
+                    futuro = futuros.get(par)
+                    if futuro is None or not futuro.done() or futuro.cancelled() or futuro.exception():
+                        break
+                    if signals:
+                        signals.nueva_diapositiva.emit(futuro.result(), par[0], par[1])
+                    estado['emitidas'] += 1
+
+        # Función que se ejecuta cada vez que termina una imagen
+        def imagen_terminada(futuro, numero):
+            if futuro.cancelled() or futuro.exception():
+                return
+            with bloqueo:
+                estado['completadas'] += 1
+                completadas = estado['completadas']
+                total = estado['total'] or num_diapositivas or len(orden_diapositivas)
+            # Imprimir un mensaje indicando que la imagen se generó correctamente
+            log_message(obtener_traduccion('imagen_generada_correctamente', current_language).format(numero=numero))
+            if signals:
+                # Emitir una señal para actualizar el progreso
+                signals.update_progress.emit(min(completadas, total), total)
+            publicar_diapositivas_listas()
+
+        # Función que genera la imagen de una diapositiva en un hilo del ejecutor, anotando cuánto esperó en la cola
+        def generar_imagen_con_traza(numero, section, content, encolada):
+            traza.registrar('cola_imagen', encolada, time.perf_counter(), 'imagen', numero=numero)
+            with usar_traza(traza), traza.etapa('imagen', 'imagen', numero=numero):
+                return generar_imagen_diapositiva(numero, section, content)
+
+        # Función para pedir la imagen de una sección (una sola vez por sección)
+        def enviar_imagen(section, content):
+            par = (section, content)
+            with bloqueo:
+                if par in futuros:
+                    return
+                numero = len(futuros) + 1
+                futuros[par] = executor.submit(generar_imagen_con_traza, numero, section, content, time.perf_counter())
+                orden_diapositivas.append(par)
+                total = estado['total'] or num_diapositivas
+            # Con la primera imagen, la barra de progreso pasa de la animación de carga a contar imágenes
+            if numero == 1 and signals and total:
+                signals.update_progress.emit(0, total)
+            futuros[par].add_done_callback(lambda futuro: imagen_terminada(futuro, numero))
+
+        try:
+            secciones_guardadas = punto_control.obtener_secciones()
+            if secciones_guardadas:
+                # Reanudando: el texto ya se generó en un intento anterior
+                log_message(obtener_traduccion('texto_recuperado', current_language).format(total=len(secciones_guardadas)))
+                respuesta = dict(secciones_guardadas)
+                uso_texto['recuperado'] = True
+            else:
+                # Imprimir un mensaje indicando que se está generando texto con el modelo
+                log_message(obtener_traduccion('generando_texto', current_language).format(modelo=modelo_texto))
+
+                # Obtener la respuesta del modelo, pidiendo las imágenes a medida que llegan las secciones
+                parser_secciones = traza.envolver_receptor(ParserSeccionesIncremental(enviar_imagen))
+                with usar_traza(traza), traza.etapa('respuesta_texto', 'texto', modelo=modelo_texto) as datos_texto:
+                    respuesta = obtener_respuesta_ia(descripcion, modelo_texto, signals, parser_secciones, usar_cache_texto, cancelacion, uso_texto)
+                    if hasattr(parser_secciones, 'resumen'):
+                        datos_texto.update(parser_secciones.resumen())
+
+            # Verificar si se pudo obtener respuesta del modelo
+            if not respuesta:
+                raise Exception(obtener_traduccion('no_respuesta_modelo_texto', current_language))
+
+            # Obtener las secciones del contenido
+            with traza.etapa('analizar_respuesta', 'texto'):
+                sections = respuesta
+                lista_secciones = list(sections.items())
+            with traza.etapa('guardar_punto_control', 'texto', secciones=len(lista_secciones)):
+                punto_control.guardar_secciones(lista_secciones)
+            # Obtener el número total de diapositivas
+            total_slides = len(lista_secciones)
+            total_esperado = total_slides
+            log_message(obtener_traduccion('imagenes_en_paralelo', current_language).format(total=total_slides, maximo=max_imagenes_simultaneas))
+
+            # Pedir las imágenes de las secciones que no se pudieron leer durante el streaming
+            for section, content in lista_secciones:
+                enviar_imagen(section, content)
+
+            with bloqueo:
+                # Descartar las imágenes de secciones que no forman parte de la respuesta final (por ejemplo, de un intento fallido)
+                for par, futuro in futuros.items():
+                    if par not in lista_secciones:
+                        futuro.cancel()
+                # A partir de aquí la vista previa sigue el orden definitivo de las secciones
+                orden_diapositivas[estado['emitidas']:] = [par for par in lista_secciones if par not in orden_diapositivas[:estado['emitidas']]]
+                estado['total'] = total_slides
+                estado['completadas'] = sum(1 for par in lista_secciones if futuros[par].done() and not futuros[par].cancelled() and not futuros[par].exception())
+            publicar_diapositivas_listas()
+
+            # Esperar a todas las imágenes, deteniéndose en cuanto una falle
+            futuros_finales = [futuros[par] for par in lista_secciones]
+            with traza.etapa('esperar_imagenes', 'imagen', pendientes=sum(1 for futuro in futuros_finales if not futuro.done())):
+                wait(futuros_finales, return_when=FIRST_EXCEPTION)
+            imagenes_generadas = []
+            for indice, futuro in enumerate(futuros_finales):
+                try:
+                    imagenes_generadas.append(futuro.result())
+                except CancelacionError:
+                    raise
+                except Exception as e:
+                    # Imprimir un mensaje indicando que ocurrió un error al generar la imagen
+                    log_message(obtener_traduccion('error_generando_imagen', current_language).format(numero=indice + 1, error=str(e)), ERROR)
+                    raise
+            publicar_diapositivas_listas()
+
+            # Dejar constancia de qué modelo ha servido cada diapositiva si alguna no usó el modelo elegido
+            modelos_diapositivas = [detalles_por_seccion[par]['modelo'] for par in lista_secciones]
+            if any(usado != normalizar_etiqueta(modelo_imagen) for usado in modelos_diapositivas):
+                sin_imagen = obtener_traduccion('imagen_relleno', current_language)
+                log_message(obtener_traduccion('modelos_por_diapositiva', current_language).format(
+                    detalle=', '.join(f"{numero}: {usado or sin_imagen}" for numero, usado in enumerate(modelos_diapositivas, 1))))
+
+            # Imprimir los aciertos y fallos de la caché de imágenes en esta presentación
+            estadisticas_cache = obtener_estadisticas_cache_imagenes()
+            log_message(obtener_traduccion('cache_imagenes_estadisticas', current_language).format(
+                aciertos=estadisticas_cache['aciertos'] - estadisticas_cache_inicio['aciertos'],
+                fallos=estadisticas_cache['fallos'] - estadisticas_cache_inicio['fallos']
+            ))
+            # Imprimir cuántas imágenes se pidieron dos veces y cuántas llegaron antes por la petición de respaldo
+            if cobertura and cobertura.duplicadas:
+                log_message(obtener_traduccion('cobertura_estadisticas', current_language).format(
+                    duplicadas=cobertura.duplicadas, ganadas=cobertura.ganadas))
+        finally:
+            # Cancelar las imágenes pendientes si algo falló y esperar a las que están en curso
+            executor.shutdown(wait=True, cancel_futures=True)
+            if cobertura:
+                cobertura.cerrar()
+
+        # No aplicar los diseños ni guardar si se ha cancelado mientras terminaban las imágenes
+        if cancelacion:
+            cancelacion.comprobar()
 
         # Imprimir un mensaje indicando que se está aplicando diseños a las diapositivas
         log_message(obtener_traduccion('aplicando_disenos', current_language))
+        inicio_disenos = time.perf_counter()
         # Crear una lista con los diseños disponibles
         designs = list(range(1, 10))
         # Modificar la lógica de diseños
@@ -473,514 +610,69 @@ def generar_presentacion(modelo_texto, modelo_imagen, descripcion, auto_open, im
                         slide_designs.design9(presentation.slides, section, content, imagenes_generadas[i])
                 # Imprimir un mensaje indicando que la diapositiva se completó correctamente
                 log_message(obtener_traduccion('diapositiva_completada', current_language).format(numero=i+1, total=total_slides))
+                punto_control.registrar_diapositiva(i + 1)
             except Exception as e:
                 # Imprimir un mensaje indicando que ocurrió un error al aplicar el diseño a la diapositiva
-                log_message(obtener_traduccion('error_aplicando_diseno', current_language).format(numero=i+1, error=str(e)))
+                log_message(obtener_traduccion('error_aplicando_diseno', current_language).format(numero=i+1, error=str(e)), ERROR)
                 raise
 
+        traza.registrar('aplicar_disenos', inicio_disenos, time.perf_counter(), diapositivas=total_slides)
+
         # Guardar la presentación en un archivo
-        presentation.save(filename)
+        if cancelacion:
+            cancelacion.comprobar()
+        with traza.etapa('guardar_pptx'):
+            presentation.save(filename)
+        punto_control.marcar(COMPLETADO)
+        estado_final = COMPLETADO
 
         # Liberar memoria
         presentation = None
         slide_designs = None
 
+        # Informar de qué modelo ha servido el texto y cada imagen, para calcular los costes sin depender de los mensajes del log
+        # (las imágenes descartadas son las de secciones que no quedaron en la respuesta final, que también se pidieron)
+        informe = {
+            'modelo_texto': uso_texto['modelo'],
+            'texto_desde_cache': uso_texto['cache'],
+            'texto_recuperado': uso_texto['recuperado'],
+            'diapositivas': [{'numero': numero, 'titulo': par[0], **detalles_por_seccion[par]} for numero, par in enumerate(lista_secciones, 1)],
+            'descartadas': [{'numero': None, 'titulo': par[0], **detalles} for par, detalles in detalles_por_seccion.items() if par not in lista_secciones],
+        }
+        senal_uso = getattr(signals, 'uso_modelos', None)
+        if senal_uso:
+            senal_uso.emit(informe)
+
         # Emitir una señal para indicar que el proceso terminó
         if signals:
             signals.finished.emit()
-
+        return informe
+
+    except CancelacionError:
+        # Imprimir un mensaje indicando que se canceló la generación y avisar al worker (no es un error)
+        log_message(obtener_traduccion('generation_cancelled', current_language))
+        estado_final = CANCELADO
+        if punto_control:
+            punto_control.marcar(CANCELADO)
+        raise
     except Exception as e:
         # Imprimir un mensaje indicando que ocurrió un error durante la generación de la presentación
-        log_message(obtener_traduccion('error_generacion_presentacion', current_language).format(error=str(e)))
+        log_message(obtener_traduccion('error_generacion_presentacion', current_language).format(error=str(e)), ERROR)
+        if punto_control:
+            punto_control.marcar(FALLIDO, str(e))
         # Emitir señal de error
         if signals:
             signals.error.emit(str(e))
     finally:
+        # Dejar que la cuota pueda liberar la carpeta de trabajo más adelante y limpiar las antiguas sin esperar
+        if espacio:
+            espacio.liberar()
+        limpiar_en_segundo_plano()
+        # Cerrar la traza con la duración total y guardarla
+        traza.registrar('presentacion', inicio_presentacion, time.perf_counter(), estado=estado_final)
+        ruta_traza = traza.cerrar(estado=estado_final, modelo_texto=modelo_texto, modelo_imagen=modelo_imagen, num_diapositivas=num_diapositivas)
+        if ruta_traza:
+            registro.debug("Traza de tiempos guardada en %s", ruta_traza)
         # Liberar memoria
         import gc
         gc.collect()
-
-# Función para generar una imagen con el modelo Flux
-def generar_imagen_flux(section, content, descripcion, image1, signals=None, print_log=True):
-    # Función interna para manejar logs
-    def log_message(msg):
-        print(msg)
-        if signals:
-            signals.update_log.emit(str(msg))
-    
-    # Obtener el idioma actual
-    current_language = 'es'
-    if signals and hasattr(signals, 'current_language'):
-        current_language = signals.current_language
-    elif signals and hasattr(signals, 'parent') and hasattr(signals.parent, 'current_language'):
-        current_language = signals.parent.current_language
-    elif signals and hasattr(signals, 'parent') and hasattr(signals.parent, 'parent') and hasattr(signals.parent.parent, 'current_language'):
-        current_language = signals.parent.parent.current_language
-
-    try:
-        # Imprimir mensaje solo si se solicita
-        if print_log:
-            log_message(f"{obtener_traduccion('intentando_generar_imagen', current_language)} (Flux)")
-        
-        # Importar la función original
-        from modelos.IA_fluxpulid import generar_imagen
-        return generar_imagen(section, content, descripcion, image1)
-    except Exception as e:
-        raise RuntimeError(obtener_traduccion('error_generar_imagen', current_language).format(error=str(e)))
-
-# Función para generar una imagen con el modelo Photomaker
-def generar_imagen_photomaker(section, content, descripcion, image1, signals=None, print_log=True):
-    # Función interna para manejar logs
-    def log_message(msg):
-        print(msg)
-        if signals:
-            signals.update_log.emit(str(msg))
-    
-    # Obtener el idioma actual
-    current_language = 'es'
-    if signals and hasattr(signals, 'current_language'):
-        current_language = signals.current_language
-    elif signals and hasattr(signals, 'parent') and hasattr(signals.parent, 'current_language'):
-        current_language = signals.parent.current_language
-    elif signals and hasattr(signals, 'parent') and hasattr(signals.parent, 'parent') and hasattr(signals.parent.parent, 'current_language'):
-        current_language = signals.parent.parent.current_language
-
-    try:
-        # Imprimir mensaje solo si se solicita
-        if print_log:
-            log_message(f"{obtener_traduccion('intentando_generar_imagen', current_language)} (Photomaker)")
-        
-        # Importar la función original
-        from modelos.IA_photomaker import generar_imagen
-        return generar_imagen(section, content, descripcion, image1)
-    except Exception as e:
-        raise RuntimeError(obtener_traduccion('error_generar_imagen', current_language).format(error=str(e)))
-
-# Función para generar una imagen con el modelo SDXL
-def generar_imagen_sdxl(section, content, descripcion, signals=None, print_log=True):
-    # Función interna para manejar logs
-    def log_message(msg):
-        print(msg)
-        if signals:
-            signals.update_log.emit(str(msg))
-    
-    # Obtener el idioma actual
-    current_language = 'es'
-    if signals and hasattr(signals, 'current_language'):
-        current_language = signals.current_language
-    elif signals and hasattr(signals, 'parent') and hasattr(signals.parent, 'current_language'):
-        current_language = signals.parent.current_language
-    elif signals and hasattr(signals, 'parent') and hasattr(signals.parent, 'parent') and hasattr(signals.parent.parent, 'current_language'):
-        current_language = signals.parent.parent.current_language
-
-    try:
-        # Imprimir mensaje solo si se solicita
-        if print_log:
-            log_message(f"{obtener_traduccion('intentando_generar_imagen', current_language)} (SDXL)")
-        
-        # Importar la función original
-        from modelos.IA_sdxl import generar_imagen
-        return generar_imagen(section, content, descripcion)
-    except Exception as e:
-        raise RuntimeError(obtener_traduccion('error_generar_imagen', current_language).format(error=str(e)))
-
-# Función para generar una imagen con el modelo FluxSchnell
-def generar_imagen_fluxschnell(section, content, descripcion, signals=None, print_log=True):
-    # Función interna para manejar logs
-    def log_message(msg):
-        print(msg)
-        if signals:
-            signals.update_log.emit(str(msg))
-    
-    # Obtener el idioma actual
-    current_language = 'es'
-    if signals and hasattr(signals, 'current_language'):
-        current_language = signals.current_language
-    elif signals and hasattr(signals, 'parent') and hasattr(signals.parent, 'current_language'):
-        current_language = signals.parent.current_language
-    elif signals and hasattr(signals, 'parent') and hasattr(signals.parent, 'parent') and hasattr(signals.parent.parent, 'current_language'):
-        current_language = signals.parent.parent.current_language
-
-    try:
-        # Imprimir mensaje solo si se solicita
-        if print_log:
-            log_message(f"{obtener_traduccion('intentando_generar_imagen', current_language)} (FluxSchnell)")
-        
-        # Importar la función original
-        from modelos.IA_fluxschnell import generar_imagen
-        return generar_imagen(section, content, descripcion)
-    except Exception as e:
-        raise RuntimeError(obtener_traduccion('error_generar_imagen', current_language).format(error=str(e)))
-
-# Función para generar una imagen con el modelo Flux8
-def generar_imagen_flux8(section, content, descripcion, signals=None, print_log=True):
-    # Función interna para manejar logs
-    def log_message(msg):
-        print(msg)
-        if signals:
-            signals.update_log.emit(str(msg))
-    
-    # Obtener el idioma actual
-    current_language = 'es'
-    if signals and hasattr(signals, 'current_language'):
-        current_language = signals.current_language
-    elif signals and hasattr(signals, 'parent') and hasattr(signals.parent, 'current_language'):
-        current_language = signals.parent.current_language
-    elif signals and hasattr(signals, 'parent') and hasattr(signals.parent, 'parent') and hasattr(signals.parent.parent, 'current_language'):
-        current_language = signals.parent.parent.current_language
-
-    try:
-        # Imprimir mensaje solo si se solicita
-        if print_log:
-            log_message(f"{obtener_traduccion('intentando_generar_imagen', current_language)} (Flux8)")
-        
-        # Importar la función original
-        from modelos.IA_flux8 import generar_imagen
-        return generar_imagen(section, content, descripcion)
-    except Exception as e:
-        raise RuntimeError(obtener_traduccion('error_generar_imagen', current_language).format(error=str(e)))
-
-# Función para generar una imagen con el modelo Flux16
-def generar_imagen_flux16(section, content, descripcion, signals=None, print_log=True):
-    # Función interna para manejar logs
-    def log_message(msg):
-        print(msg)
-        if signals:
-            signals.update_log.emit(str(msg))
-    
-    # Obtener el idioma actual
-    current_language = 'es'
-    if signals and hasattr(signals, 'current_language'):
-        current_language = signals.current_language
-    elif signals and hasattr(signals, 'parent') and hasattr(signals.parent, 'current_language'):
-        current_language = signals.parent.current_language
-    elif signals and hasattr(signals, 'parent') and hasattr(signals.parent, 'parent') and hasattr(signals.parent.parent, 'current_language'):
-        current_language = signals.parent.parent.current_language
-
-    try:
-        # Imprimir mensaje solo si se solicita
-        if print_log:
-            log_message(f"{obtener_traduccion('intentando_generar_imagen', current_language)} (Flux16)")
-        
-        # Importar la función original
-        from modelos.IA_flux16 import generar_imagen
-        return generar_imagen(section, content, descripcion)
-    except Exception as e:
-        raise RuntimeError(obtener_traduccion('error_generar_imagen', current_language).format(error=str(e)))
-
-# Función para generar una imagen con el modelo Diego
-def generar_imagen_diego(section, content, descripcion, signals=None, print_log=True):
-    # Función interna para manejar logs
-    def log_message(msg):
-        print(msg)
-        if signals:
-            signals.update_log.emit(str(msg))
-    
-    # Obtener el idioma actual
-    current_language = 'es'
-    if signals and hasattr(signals, 'current_language'):
-        current_language = signals.current_language
-    elif signals and hasattr(signals, 'parent') and hasattr(signals.parent, 'current_language'):
-        current_language = signals.parent.current_language
-    elif signals and hasattr(signals, 'parent') and hasattr(signals.parent, 'parent') and hasattr(signals.parent.parent, 'current_language'):
-        current_language = signals.parent.parent.current_language
-
-    try:
-        # Imprimir mensaje solo si se solicita
-        if print_log:
-            log_message(f"{obtener_traduccion('intentando_generar_imagen', current_language)} (Diego)")
-        
-        # Importar la función original
-        from modelos.IA_dgmtnzflux import generar_imagen
-        return generar_imagen(section, content, descripcion)
-    except Exception as e:
-        raise RuntimeError(obtener_traduccion('error_generar_imagen', current_language).format(error=str(e)))
-
-# Función para generar una imagen con el modelo Sana
-def generar_imagen_sana(section, content, descripcion, signals=None, print_log=True):
-    # Función interna para manejar logs
-    def log_message(msg):
-        print(msg)
-        if signals:
-            signals.update_log.emit(str(msg))
-    
-    # Obtener el idioma actual
-    current_language = 'es'
-    if signals and hasattr(signals, 'current_language'):
-        current_language = signals.current_language
-    elif signals and hasattr(signals, 'parent') and hasattr(signals.parent, 'current_language'):
-        current_language = signals.parent.current_language
-    elif signals and hasattr(signals, 'parent') and hasattr(signals.parent, 'parent') and hasattr(signals.parent.parent, 'current_language'):
-        current_language = signals.parent.parent.current_language
-
-    try:
-        # Imprimir mensaje solo si se solicita
-        if print_log:
-            log_message(f"{obtener_traduccion('intentando_generar_imagen', current_language)} (Sana)")
-        
-        # Importar la función original
-        from modelos.IA_sana import generar_imagen
-        return generar_imagen(section, content, descripcion)
-    except Exception as e:
-        raise RuntimeError(obtener_traduccion('error_generar_imagen', current_language).format(error=str(e)))
-
-# Función para generar una imagen con el modelo SanaSprint
-def generar_imagen_sana_sprint(section, content, descripcion, signals=None, print_log=True):
-    # Función interna para manejar logs
-    def log_message(msg):
-        print(msg)
-        if signals:
-            signals.update_log.emit(str(msg))
-    
-    # Obtener el idioma actual
-    current_language = 'es'
-    if signals and hasattr(signals, 'current_language'):
-        current_language = signals.current_language
-    elif signals and hasattr(signals, 'parent') and hasattr(signals.parent, 'current_language'):
-        current_language = signals.parent.current_language
-    elif signals and hasattr(signals, 'parent') and hasattr(signals.parent, 'parent') and hasattr(signals.parent.parent, 'current_language'):
-        current_language = signals.parent.parent.current_language
-
-    try:
-        # Imprimir mensaje solo si se solicita
-        if print_log:
-            log_message(f"{obtener_traduccion('intentando_generar_imagen', current_language)} (SanaSprint)")
-        
-        # Importar la función original
-        from modelos.IA_sana_sprint import generar_imagen
-        return generar_imagen(section, content, descripcion)
-    except Exception as e:
-        raise RuntimeError(obtener_traduccion('error_generar_imagen', current_language).format(error=str(e)))
-
-# Función para generar una imagen con el modelo Imagen3
-def generar_imagen_imagen3(section, content, descripcion, signals=None, print_log=True):
-    # Función interna para manejar logs
-    def log_message(msg):
-        print(msg)
-        if signals:
-            signals.update_log.emit(str(msg))
-    
-    # Obtener el idioma actual
-    current_language = 'es'
-    if signals and hasattr(signals, 'current_language'):
-        current_language = signals.current_language
-    elif signals and hasattr(signals, 'parent') and hasattr(signals.parent, 'current_language'):
-        current_language = signals.parent.current_language
-    elif signals and hasattr(signals, 'parent') and hasattr(signals.parent, 'parent') and hasattr(signals.parent.parent, 'current_language'):
-        current_language = signals.parent.parent.current_language
-
-    try:
-        # Imprimir mensaje solo si se solicita
-        if print_log:
-            log_message(f"{obtener_traduccion('intentando_generar_imagen', current_language)} (Imagen3)")
-        
-        # Importar la función original
-        from modelos.IA_imagen3 import generar_imagen
-        return generar_imagen(section, content, descripcion)
-    except Exception as e:
-        raise RuntimeError(obtener_traduccion('error_generar_imagen', current_language).format(error=str(e)))
-
-# Función para generar una imagen con el modelo Imagen3Fast
-def generar_imagen_imagen3fast(section, content, descripcion, signals=None, print_log=True):
-    # Función interna para manejar logs
-    def log_message(msg):
-        print(msg)
-        if signals:
-            signals.update_log.emit(str(msg))
-    
-    # Obtener el idioma actual
-    current_language = 'es'
-    if signals and hasattr(signals, 'current_language'):
-        current_language = signals.current_language
-    elif signals and hasattr(signals, 'parent') and hasattr(signals.parent, 'current_language'):
-        current_language = signals.parent.current_language
-    elif signals and hasattr(signals, 'parent') and hasattr(signals.parent, 'parent') and hasattr(signals.parent.parent, 'current_language'):
-        current_language = signals.parent.parent.current_language
-
-    try:
-        # Imprimir mensaje solo si se solicita
-        if print_log:
-            log_message(f"{obtener_traduccion('intentando_generar_imagen', current_language)} (Imagen3Fast)")
-        
-        # Importar la función original
-        from modelos.IA_imagen3fast import generar_imagen
-        return generar_imagen(section, content, descripcion)
-    except Exception as e:
-        raise RuntimeError(obtener_traduccion('error_generar_imagen', current_language).format(error=str(e)))
-    
-# Función para generar una imagen con el modelo Imagen4
-def generar_imagen_imagen4(section, content, descripcion, signals=None, print_log=True):
-    # Función interna para manejar logs
-    def log_message(msg):
-        print(msg)
-        if signals:
-            signals.update_log.emit(str(msg))
-    
-    # Obtener el idioma actual
-    current_language = 'es'
-    if signals and hasattr(signals, 'current_language'):
-        current_language = signals.current_language
-    elif signals and hasattr(signals, 'parent') and hasattr(signals.parent, 'current_language'):
-        current_language = signals.parent.current_language
-    elif signals and hasattr(signals, 'parent') and hasattr(signals.parent, 'parent') and hasattr(signals.parent.parent, 'current_language'):
-        current_language = signals.parent.parent.current_language
-
-    try:
-        # Imprimir mensaje solo si se solicita
-        if print_log:
-            log_message(f"{obtener_traduccion('intentando_generar_imagen', current_language)} (Imagen4)")
-        
-        # Importar la función original
-        from modelos.IA_imagen4 import generar_imagen
-        return generar_imagen(section, content, descripcion)
-    except Exception as e:
-        raise RuntimeError(obtener_traduccion('error_generar_imagen', current_language).format(error=str(e)))
-
-# Función para generar una imagen con el modelo Model3_4
-def generar_imagen_model3_4(section, content, descripcion, signals=None, print_log=True):
-    # Función interna para manejar logs
-    def log_message(msg):
-        print(msg)
-        if signals:
-            signals.update_log.emit(str(msg))
-    
-    # Obtener el idioma actual
-    current_language = 'es'
-    if signals and hasattr(signals, 'current_language'):
-        current_language = signals.current_language
-    elif signals and hasattr(signals, 'parent') and hasattr(signals.parent, 'current_language'):
-        current_language = signals.parent.current_language
-    elif signals and hasattr(signals, 'parent') and hasattr(signals.parent, 'parent') and hasattr(signals.parent.parent, 'current_language'):
-        current_language = signals.parent.parent.current_language
-
-    try:
-        # Imprimir mensaje solo si se solicita
-        if print_log:
-            log_message(f"{obtener_traduccion('intentando_generar_imagen', current_language)} (Model3_4)")
-        
-        # Importar la función original
-        from modelos.IA_model3_4 import generar_imagen
-        return generar_imagen(section, content, descripcion)
-    except Exception as e:
-        raise RuntimeError(obtener_traduccion('error_generar_imagen', current_language).format(error=str(e)))
-
-# Función para generar una imagen con el modelo Grok
-def generar_imagen_grok(section, content, descripcion, signals=None, print_log=True):
-    # Función interna para manejar logs
-    def log_message(msg):
-        print(msg)
-        if signals:
-            signals.update_log.emit(str(msg))
-    
-    # Obtener el idioma actual
-    current_language = 'es'
-    if signals and hasattr(signals, 'current_language'):
-        current_language = signals.current_language
-    elif signals and hasattr(signals, 'parent') and hasattr(signals.parent, 'current_language'):
-        current_language = signals.parent.current_language
-    elif signals and hasattr(signals, 'parent') and hasattr(signals.parent, 'parent') and hasattr(signals.parent.parent, 'current_language'):
-        current_language = signals.parent.parent.current_language
-
-    try:
-        # Imprimir mensaje solo si se solicita
-        if print_log:
-            log_message(f"{obtener_traduccion('intentando_generar_imagen', current_language)} (Grok)")
-        
-        # Importar la función original
-        from modelos.IA_grok2_image import generar_imagen
-        return generar_imagen(section, content, descripcion)
-    except Exception as e:
-        raise RuntimeError(obtener_traduccion('error_generar_imagen', current_language).format(error=str(e)))
-    
-# Función para generar una imagen con el modelo Gemini Flash
-def generar_imagen_gemini_flash(section, content, descripcion, signals=None, print_log=True):
-    # Función interna para manejar logs
-    def log_message(msg):
-        print(msg)
-        if signals:
-            signals.update_log.emit(str(msg))
-    
-    # Obtener el idioma actual
-    current_language = 'es'
-    if signals and hasattr(signals, 'current_language'):
-        current_language = signals.current_language
-    elif signals and hasattr(signals, 'parent') and hasattr(signals.parent, 'current_language'):
-        current_language = signals.parent.current_language
-    elif signals and hasattr(signals, 'parent') and hasattr(signals.parent, 'parent') and hasattr(signals.parent.parent, 'current_language'):
-        current_language = signals.parent.parent.current_language
-
-    try:
-        # Imprimir mensaje solo si se solicita
-        if print_log:
-            log_message(f"{obtener_traduccion('intentando_generar_imagen', current_language)} (GeminiFlash)")
-        
-        # Importar la función original y la excepción personalizada
-        from modelos.IA_gemini2_flash_image import generar_imagen, RegionCompatibilityError
-        
-        try:
-            return generar_imagen(section, content, descripcion, signals)
-        except RegionCompatibilityError as e:
-            # Propagar directamente el mensaje de error personalizado sin prefijo
-            raise RuntimeError(str(e))
-    except RuntimeError as e:
-        # Ya capturamos RegionCompatibilityError y formateamos el mensaje, solo propagamos RuntimeError
-        raise
-    except Exception as e:
-        # Para otros errores, usar el formato estándar
-        raise RuntimeError(obtener_traduccion('error_generar_imagen', current_language).format(error=str(e)))
-
-# Función para generar una imagen con el modelo Dall-e-2
-def generar_imagen_dalle2(section, content, descripcion, signals=None, print_log=True):
-    # Función interna para manejar logs
-    def log_message(msg):
-        print(msg)
-        if signals:
-            signals.update_log.emit(str(msg))
-    
-    # Obtener el idioma actual
-    current_language = 'es'
-    if signals and hasattr(signals, 'current_language'):
-        current_language = signals.current_language
-    elif signals and hasattr(signals, 'parent') and hasattr(signals.parent, 'current_language'):
-        current_language = signals.parent.current_language
-    elif signals and hasattr(signals, 'parent') and hasattr(signals.parent, 'parent') and hasattr(signals.parent.parent, 'current_language'):
-        current_language = signals.parent.parent.current_language
-
-    try:
-        # Imprimir mensaje solo si se solicita
-        if print_log:
-            log_message(f"{obtener_traduccion('intentando_generar_imagen', current_language)} (Dalle2)")
-        
-        # Importar la función original
-        from modelos.IA_dall_e_2 import generar_imagen
-        return generar_imagen(section, content, descripcion)
-    except Exception as e:
-        raise RuntimeError(obtener_traduccion('error_generar_imagen', current_language).format(error=str(e)))
-
-# Función para generar una imagen con el modelo Dall-e-3
-def generar_imagen_dalle3(section, content, descripcion, signals=None, print_log=True):
-    # Función interna para manejar logs
-    def log_message(msg):
-        print(msg)
-        if signals:
-            signals.update_log.emit(str(msg))
-    
-    # Obtener el idioma actual
-    current_language = 'es'
-    if signals and hasattr(signals, 'current_language'):
-        current_language = signals.current_language
-    elif signals and hasattr(signals, 'parent') and hasattr(signals.parent, 'current_language'):
-        current_language = signals.parent.current_language
-    elif signals and hasattr(signals, 'parent') and hasattr(signals.parent, 'parent') and hasattr(signals.parent.parent, 'current_language'):
-        current_language = signals.parent.parent.current_language
-
-    try:
-        # Imprimir mensaje solo si se solicita
-        if print_log:
-            log_message(f"{obtener_traduccion('intentando_generar_imagen', current_language)} (Dalle3)")
-        
-        # Importar la función original
-        from modelos.IA_dall_e_3 import generar_imagen
-        return generar_imagen(section, content, descripcion)
-    except Exception as e:
-        raise RuntimeError(obtener_traduccion('error_generar_imagen', current_language).format(error=str(e)))
\ No newline at end of file
@@ -0,0 +1,111 @@
+import ast
+
+# Clase para extraer las secciones {"Título": "Contenido"} de una respuesta que llega por fragmentos
+class ParserSeccionesIncremental:
+    def __init__(self, al_completar_seccion=None):
+        # Función que se llama con (titulo, contenido) en cuanto se cierra cada par
+        self.al_completar_seccion = al_completar_seccion
+        self.reiniciar()
+
+    # Función para empezar de cero (por ejemplo, al reintentar la petición al modelo)
+    def reiniciar(self):
+        self.texto = ""
+        self.posicion = 0
+        self.estado = 'inicio'
+        self.clave = None
+        self.secciones = []
+
+    # Función para añadir un nuevo fragmento de texto recibido del modelo
+    def alimentar(self, fragmento):
+        if not fragmento or self.estado in ('fin', 'invalido'):
+            return
+        self.texto += fragmento
+        self._procesar()
+
+    # Función para leer una cadena entre comillas; devuelve None si aún no se ha cerrado
+    def _leer_cadena(self, inicio):
+        comilla = self.texto[inicio]
+        i = inicio + 1
+        while i < len(self.texto):
+            caracter = self.texto[i]
+            if caracter == '\\':
+                i += 2
+                continue
+            if caracter == comilla:
+                try:
+                    valor = ast.literal_eval(self.texto[inicio:i + 1])
+                except Exception:
+                    self.estado = 'invalido'
+                    return None
+                return valor, i + 1
+            i += 1
+        return None
+
+    # Función para avanzar sobre el texto acumulado tanto como sea posible
+    def _procesar(self):
+        texto = self.texto
+        while True:
+            if self.estado == 'inicio':
+                # Saltar los bloques de razonamiento <think>...</think> de algunos modelos
+                llave = texto.find('{', self.posicion)
+                think = texto.find('<think>', self.posicion)
+                if think != -1 and (llave == -1 or think < llave):
+                    fin_think = texto.find('</think>', think)
+                    if fin_think == -1:
+                        return
+                    self.posicion = fin_think + len('</think>')
+                    continue
+                if llave == -1:
+                    return
+                self.posicion = llave + 1
+                self.estado = 'clave'
+                continue
+
+            # Saltar los espacios entre elementos
+            while self.posicion < len(texto) and texto[self.posicion].isspace():
+                self.posicion += 1
+            if self.posicion >= len(texto):
+                return
+            caracter = texto[self.posicion]
+
+            if self.estado == 'clave':
+                if caracter == '}':
+                    self.estado = 'fin'
+                    return
+                if caracter == ',':
+                    self.posicion += 1
+                    continue
+                if caracter in '"\'':
+                    resultado = self._leer_cadena(self.posicion)
+                    if resultado is None:
+                        return
+                    self.clave, self.posicion = resultado
+                    self.estado = 'dos_puntos'
+                    continue
+                self.estado = 'invalido'
+                return
+
+            if self.estado == 'dos_puntos':
+                if caracter == ':':
+                    self.posicion += 1
+                    self.estado = 'valor'
+                    continue
+                self.estado = 'invalido'
+                return
+
+            if self.estado == 'valor':
+                if caracter in '"\'':
+                    resultado = self._leer_cadena(self.posicion)
+                    if resultado is None:
+                        return
+                    valor, self.posicion = resultado
+                    self.secciones.append((self.clave, valor))
+                    self.estado = 'clave'
+                    if self.al_completar_seccion:
+                        self.al_completar_seccion(self.clave, valor)
+                    continue
+                # Si el valor no es una cadena se deja que la respuesta completa se procese al final
+                self.estado = 'invalido'
+                return
+
+            return
@@ -0,0 +1,129 @@
+import os, sys, time, uuid, cProfile, functools, threading
+from collections import Counter
+from contextlib import contextmanager
+from Configuracion import APP_DATA_DIR
+from Bitacora import obtener_registro
+
+# Registro del módulo
+registro = obtener_registro(__name__)
+
+# Carpeta con los perfiles de cada generación: un .prof de cProfile (se abre con snakeviz o pstats)
+# y un .folded con las pilas muestreadas de todos los hilos (se abre con flamegraph.pl o https://www.speedscope.app)
+PERFILES_DIR = os.path.join(APP_DATA_DIR, 'profiles')
+
+# Variable de entorno y argumento para activar el perfilado (no hay opción en la interfaz)
+VARIABLE_ENTORNO = 'POWERPOINEADOR_PERFILAR'
+ARGUMENTO = '--perfilar'
+
+# Número máximo de trabajos perfilados que se conservan (se borran los más antiguos)
+MAX_PERFILES = 20
+
+# Segundos entre dos muestras de las pilas de los hilos
+INTERVALO_MUESTREO = 0.01
+
+# Función para saber si se ha pedido perfilar las generaciones
+def perfilado_solicitado():
+    return os.environ.get(VARIABLE_ENTORNO, '') not in ('', '0') or ARGUMENTO in sys.argv
+
+# Se decide una sola vez al importar el módulo: sin perfilado, perfilar() devuelve la función tal cual
+_activo = perfilado_solicitado()
+
+# Clase que toma muestras periódicas de las pilas de todos los hilos (las imágenes y las
+# peticiones con plazo se hacen en otros hilos, que cProfile no ve desde el hilo del worker)
+class Muestreador(threading.Thread):
+    def __init__(self, intervalo=INTERVALO_MUESTREO):
+        super().__init__(name='perfilado-muestreo', daemon=True)
+        self.intervalo = intervalo
+        self.pilas = Counter()
+        self.muestras = 0
+        self._parar = threading.Event()
+
+    def run(self):
+        propio = threading.get_ident()
+        while not self._parar.wait(self.intervalo):
+            nombres = {hilo.ident: hilo.name for hilo in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == propio:
+                    continue
+                pila = []
+                while frame is not None:
+                    codigo = frame.f_code
+                    pila.append(f"{codigo.co_name} ({os.path.basename(codigo.co_filename)}:{codigo.co_firstlineno})")
+                    frame = frame.f_back
+                # La raíz de cada pila es el nombre del hilo, para separarlos en el flamegraph
+                pila.append(nombres.get(ident, str(ident)).replace(';', ','))
+                self.pilas[';'.join(reversed(pila))] += 1
+            self.muestras += 1
+
+    def detener(self):
+        self._parar.set()
+        self.join()
+
+    # Función para escribir las pilas en el formato "collapsed" de flamegraph.pl (una pila y su número de muestras por línea)
+    def escribir(self, ruta):
+        with open(ruta, 'w', encoding='utf-8') as f:
+            for pila, muestras in self.pilas.most_common():
+                f.write(f"{pila} {muestras}\n")
+
+# Función para perfilar un bloque y guardar sus perfiles en PERFILES_DIR
+@contextmanager
+def perfil(nombre):
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Desde Python 3.12 solo puede haber un cProfile activo a la vez; si ya hay otro, solo se muestrea
+        profiler = None
+    muestreador = Muestreador()
+    muestreador.start()
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        muestreador.detener()
+        guardar_perfil(nombre, profiler, muestreador, time.perf_counter() - inicio)
+
+# Función para guardar el .prof y el .folded de un trabajo perfilado; devuelve la ruta base (None si falla)
+def guardar_perfil(nombre, profiler, muestreador, segundos):
+    base = os.path.join(PERFILES_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}_{nombre}_{uuid.uuid4().hex[:8]}")
+    try:
+        os.makedirs(PERFILES_DIR, exist_ok=True)
+        if profiler is not None:
+            profiler.dump_stats(base + '.prof')
+        muestreador.escribir(base + '.folded')
+        registro.info("Perfil de '%s' guardado en %s.* (%.1f s, %d muestras)", nombre, base, segundos, muestreador.muestras)
+    except OSError as e:
+        registro.error("Error al guardar el perfil de '%s': %s", nombre, e)
+        return None
+    limpiar_perfiles()
+    return base
+
+# Decorador para perfilar cada llamada a una función (por ejemplo, el run() de un QThread)
+def perfilar(nombre):
+    def decorador(funcion):
+        if not _activo:
+            return funcion
+
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            with perfil(nombre):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorador
+
+# Función para borrar los perfiles más antiguos (cada trabajo deja un .prof y un .folded con el mismo nombre)
+def limpiar_perfiles(maximo=MAX_PERFILES):
+    try:
+        nombres = os.listdir(PERFILES_DIR)
+    except FileNotFoundError:
+        return
+    bases = sorted({os.path.splitext(nombre)[0] for nombre in nombres if nombre.endswith(('.prof', '.folded'))})
+    antiguas = set(bases[:-maximo or None])
+    for nombre in nombres:
+        if os.path.splitext(nombre)[0] in antiguas:
+            try:
+                os.remove(os.path.join(PERFILES_DIR, nombre))
+            except OSError:
+                pass
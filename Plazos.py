@@ -0,0 +1,245 @@
+import time, queue, threading
+from Configuracion import obtener_config_store
+from Reintentos import ErrorReintentable
+from Cancelacion import CancelacionError, token_actual, usar_token, crear_token_hijo
+
+# Plazos por defecto de cada clase de modelo, en segundos (se pueden cambiar con 'plazos_modelos' en config.json):
+# - conexion: tiempo máximo para abrir la conexión con el proveedor
+# - lectura: tiempo máximo sin recibir datos (hasta el primer fragmento de un stream y entre fragmentos)
+# - total: tiempo máximo de la llamada completa
+PLAZOS_POR_CLASE = {
+    'texto': {'conexion': 10, 'lectura': 60, 'total': 300},
+    'razonamiento': {'conexion': 10, 'lectura': 180, 'total': 600},
+    'imagen': {'conexion': 10, 'lectura': 120, 'total': 300},
+    'descarga': {'conexion': 10, 'lectura': 30, 'total': 120},
+}
+
+# Cada cuántos segundos revisa el vigilante las llamadas en curso
+INTERVALO_VIGILANCIA = 0.5
+
+# Marcas de fin de un stream vigilado y de aviso para revisar si se ha abortado
+_FIN = object()
+_DESPERTAR = object()
+
+# Excepción lanzada cuando una llamada supera uno de sus plazos (se reintenta como cualquier fallo temporal)
+class PlazoSuperadoError(ErrorReintentable):
+    def __init__(self, etapa, segundos):
+        super().__init__(f"Plazo de {segundos:g} s superado en la etapa '{etapa}'")
+        self.etapa = etapa
+        self.segundos = segundos
+
+# Función para convertir el timeout de conexión o de lectura de requests/httpx en PlazoSuperadoError (None si no lo es)
+def convertir_timeout(error, etapa, plazos):
+    nombre = type(error).__name__
+    if nombre in ('ConnectTimeout', 'ConnectTimeoutError', 'PoolTimeout'):
+        return PlazoSuperadoError('conexion', plazos['conexion'])
+    if nombre in ('ReadTimeout', 'ReadTimeoutError', 'Timeout', 'TimeoutException'):
+        return PlazoSuperadoError(etapa, plazos['lectura'])
+    return None
+
+# Función para devolver el error convertido (enlazado al original) o, si no se ha convertido, el original
+def _con_causa(convertido, original):
+    if convertido is None:
+        return original
+    convertido.__cause__ = original
+    return convertido
+
+# Función para obtener los plazos de una clase de modelo, aplicando los cambios de config.json
+def obtener_plazos(clase):
+    plazos = dict(PLAZOS_POR_CLASE.get(clase, PLAZOS_POR_CLASE['texto']))
+    configurados = obtener_config_store().obtener('plazos_modelos', {})
+    if isinstance(configurados, dict) and isinstance(configurados.get(clase), dict):
+        plazos.update(configurados[clase])
+    return plazos
+
+# Clase que representa una llamada a un proveedor vigilada por el vigilante
+# (lectura=None para las llamadas que no dan señales de vida hasta terminar)
+# - token: token de cancelación de quien hace la llamada; la llamada usa un token hijo suyo
+class Llamada:
+    def __init__(self, etapa, total, lectura=None, token=None):
+        self.etapa = etapa
+        self.total = total
+        self.lectura = lectura
+        self.token = crear_token_hijo(token)
+        self.inicio = time.monotonic()
+        self.ultima_actividad = self.inicio
+        self.resultado = None
+        self.error = None
+        self.terminada = threading.Event()
+        self._bloqueo = threading.Lock()
+
+    # Función para anotar que la llamada sigue recibiendo datos
+    def latido(self):
+        self.ultima_actividad = time.monotonic()
+
+    # Función para terminar la llamada con un resultado o un error (solo cuenta la primera vez)
+    def terminar(self, resultado=None, error=None):
+        with self._bloqueo:
+            if self.terminada.is_set():
+                return False
+            self.resultado = resultado
+            self.error = error
+            self.terminada.set()
+            return True
+
+    # Función para abandonar la llamada por superar un plazo: la termina con el error y cancela su token, con lo que
+    # se cierran sus conexiones y se cancela en el proveedor la predicción que hubiera creado (si no, se cobraría
+    # además de la del reintento)
+    def abandonar(self, error):
+        if self.terminar(error=error):
+            self.token.cancelar()
+
+    # Función para dejar de depender del token de quien hizo la llamada cuando ya ha terminado
+    def soltar(self):
+        self.token.soltar()
+
+    # Función para saber si la llamada ha superado un plazo; devuelve el error a lanzar o None
+    def comprobar(self, ahora):
+        if self.total is not None and ahora - self.inicio > self.total:
+            return PlazoSuperadoError(self.etapa, self.total)
+        if self.lectura is not None and ahora - self.ultima_actividad > self.lectura:
+            return PlazoSuperadoError(self.etapa, self.lectura)
+        return None
+
+# Clase con el hilo que revisa las llamadas en curso y aborta las que se han quedado colgadas
+class Vigilante:
+    def __init__(self, intervalo=INTERVALO_VIGILANCIA):
+        self.intervalo = intervalo
+        self.llamadas = set()
+        self._bloqueo = threading.Lock()
+        self._hilo = None
+
+    # Función para empezar a vigilar una llamada (arranca el hilo la primera vez)
+    def registrar(self, llamada):
+        with self._bloqueo:
+            self.llamadas.add(llamada)
+            if self._hilo is None or not self._hilo.is_alive():
+                self._hilo = threading.Thread(target=self._vigilar, name='vigilante_plazos', daemon=True)
+                self._hilo.start()
+
+    # Función para dejar de vigilar una llamada
+    def quitar(self, llamada):
+        with self._bloqueo:
+            self.llamadas.discard(llamada)
+
+    # Función que revisa periódicamente los plazos de las llamadas en curso
+    def _vigilar(self):
+        while True:
+            time.sleep(self.intervalo)
+            ahora = time.monotonic()
+            with self._bloqueo:
+                llamadas = list(self.llamadas)
+            for llamada in llamadas:
+                error = llamada.comprobar(ahora)
+                if error is not None:
+                    # El hilo que hace la llamada no se puede matar: se abandona y quien espera recibe el error
+                    llamada.abandonar(error)
+                    self.quitar(llamada)
+
+_vigilante = Vigilante()
+
+# Función para terminar una llamada con el error que ha lanzado; devuelve el error (convertido si era un timeout)
+# (si la conexión ha superado su plazo, la llamada se abandona igual que cuando la aborta el vigilante)
+def _terminar_con_error(llamada, error, etapa, plazos):
+    convertido = _con_causa(convertir_timeout(error, etapa, plazos), error)
+    if isinstance(convertido, PlazoSuperadoError):
+        llamada.abandonar(convertido)
+    else:
+        llamada.terminar(error=convertido)
+    return convertido
+
+# Función para abortar una llamada en cuanto se cancele la generación; devuelve la función para dejar de hacerlo
+# - despertar: función para avisar enseguida a quien espera la llamada
+def _abortar_al_cancelar(token, llamada, despertar=None):
+    if token is None:
+        return lambda: None
+
+    # Función que aborta la llamada al cancelar
+    def abortar():
+        llamada.terminar(error=CancelacionError())
+        if despertar:
+            despertar()
+
+    return token.al_cancelar(abortar)
+
+# Función para ejecutar una llamada bloqueante con un plazo total vigilado
+# (la llamada sigue en un hilo aparte; si se cuelga, se abandona y se lanza PlazoSuperadoError)
+# - lectura: plazo de lectura que se ha dado a la conexión, si no es el de la clase (para informar bien del fallo)
+def ejecutar_con_plazo(funcion, etapa, clase='texto', total=None, lectura=None):
+    plazos = obtener_plazos(clase)
+    if lectura is not None:
+        plazos['lectura'] = lectura
+    token = token_actual()
+    llamada = Llamada(etapa, total if total is not None else plazos['total'], token=token)
+
+    # Función que hace la llamada en el hilo auxiliar (con el token de la llamada, hijo del de quien la pide)
+    def ejecutar():
+        try:
+            with usar_token(llamada.token):
+                llamada.terminar(resultado=funcion())
+        except BaseException as e:
+            _terminar_con_error(llamada, e, etapa, plazos)
+
+    quitar_cancelacion = _abortar_al_cancelar(token, llamada)
+    _vigilante.registrar(llamada)
+    try:
+        threading.Thread(target=ejecutar, name=f'llamada_{etapa}', daemon=True).start()
+        llamada.terminada.wait()
+    finally:
+        _vigilante.quitar(llamada)
+        quitar_cancelacion()
+        llamada.soltar()
+    if llamada.error is not None:
+        raise llamada.error
+    return llamada.resultado
+
+# Función para recorrer un stream con plazo entre fragmentos y plazo total vigilados
+# - crear_stream: función que abre el stream (se llama en el hilo auxiliar, para vigilar también la espera inicial)
+def vigilar_stream(crear_stream, etapa='stream', clase='texto'):
+    plazos = obtener_plazos(clase)
+    token = token_actual()
+    llamada = Llamada(etapa, plazos['total'], plazos['lectura'], token)
+    cola = queue.Queue()
+
+    # Función que lee el stream en el hilo auxiliar y pasa los fragmentos a la cola
+    def producir():
+        try:
+            with usar_token(llamada.token):
+                stream = crear_stream()
+                for fragmento in stream:
+                    # Dejar de leer (y cerrar el stream) si la llamada se ha abortado o cancelado
+                    if llamada.terminada.is_set():
+                        if hasattr(stream, 'close'):
+                            stream.close()
+                        return
+                    llamada.latido()
+                    cola.put((fragmento, None))
+            cola.put((_FIN, None))
+        except BaseException as e:
+            cola.put((None, _terminar_con_error(llamada, e, etapa, plazos)))
+
+    quitar_cancelacion = _abortar_al_cancelar(token, llamada, lambda: cola.put((_DESPERTAR, None)))
+    _vigilante.registrar(llamada)
+    try:
+        threading.Thread(target=producir, name=f'llamada_{etapa}', daemon=True).start()
+        while True:
+            # Parar en cuanto el vigilante aborte la llamada o se cancele la generación, aunque sigan llegando fragmentos
+            if llamada.terminada.is_set() and llamada.error is not None:
+                raise llamada.error
+            try:
+                fragmento, error = cola.get(timeout=INTERVALO_VIGILANCIA)
+            except queue.Empty:
+                continue
+            if error is not None:
+                raise error
+            if fragmento is _DESPERTAR:
+                continue
+            if fragmento is _FIN:
+                return
+            yield fragmento
+    finally:
+        # Marcar la llamada como terminada para que el hilo auxiliar deje de leer
+        llamada.terminar()
+        _vigilante.quitar(llamada)
+        quitar_cancelacion()
+        llamada.soltar()
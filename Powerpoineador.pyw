@@ -1,4 +1,7 @@
-import sys, os, requests, json, webbrowser, platform
+# Medir el arranque si se pide (antes de importar nada más para poder medir todas las importaciones)
+from Tiempos_arranque import iniciar_medicion, marcar_etapa, imprimir_informe
+iniciar_medicion()
+import sys, os, requests, json, webbrowser, platform, importlib.util
 from PySide6.QtCore import Qt, QTimer, QPropertyAnimation, QEasingCurve, QPoint
 from PySide6.QtGui import QIcon, QPixmap, QAction, QFont, QFontDatabase, QActionGroup, QTextCursor, QGuiApplication
 from PySide6.QtWidgets import (
@@ -7,17 +10,17 @@ from PySide6.QtWidgets import (
     QMenu, QSizePolicy, QGridLayout, QStyleFactory
     )
 from Version_checker import obtener_url_descarga, obtener_ultima_version, obtener_version_actual
-from apis.Replicate import ReplicateAPIKeyWindow
-from apis.xAI import GrokAPIKeyWindow
-from apis.Google import GoogleAPIKeyWindow
 from Cifrado import GestorCifrado
+from Configuracion import obtener_config_store
+from Validacion_apis import validar_apis
 from Traducciones import obtener_traduccion
-from PyPDF2 import PdfReader
-from Vista_previa import PPTX_AVAILABLE
-from Plantillas import StyleSelectionDialog
+from Catalogo_modelos import obtener_modelo, modelos_por_proveedor, requiere_imagen_personalizada, obtener_precio
 from Temas import ThemeManager
 import subprocess
 
+# Comprobar si python-pptx está instalado sin importarlo (se importa al abrir la vista previa)
+PPTX_AVAILABLE = importlib.util.find_spec('pptx') is not None
+
 # Definir la ruta de la carpeta de datos de la aplicación según el sistema operativo
 if sys.platform == 'win32':
     APP_DATA_DIR = os.path.join(os.getenv('APPDATA'), 'Powerpoineador')
@@ -33,6 +36,9 @@ if not os.path.exists(APP_DATA_DIR):
 # Definir la ruta del archivo de configuración
 CONFIG_FILE = os.path.join(APP_DATA_DIR, 'config.json')
 
+# Configuración en memoria: se lee una sola vez y los cambios se escriben agrupados
+config_store = obtener_config_store(CONFIG_FILE)
+
 # Función para obtener la ruta de un recurso
 def resource_path(relative_path):
     try:
@@ -44,23 +50,14 @@ def resource_path(relative_path):
     
     return os.path.join(base_path, relative_path)
 
-# Función para verificar la conexión a Internet
-def verificar_conexion_internet():
-    try:
-        requests.get("https://www.google.com", timeout=3)
-        return True
-    except requests.RequestException:
-        return False
-
 # Función para mostrar el mensaje de error de conexión
 def mostrar_error_conexion():
     # Obtener el idioma guardado
     current_language = 'es'
     try:
-        if os.path.exists(CONFIG_FILE):
-            with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-                current_language = config.get('language', 'es')
+        if config_store.existe():
+            config = config_store.leer()
+            current_language = config.get('language', 'es')
     except Exception as e:
         print(f"Error al cargar el idioma: {str(e)}")
     
@@ -87,9 +84,7 @@ class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         GestorCifrado.migrar_claves_antiguas(CONFIG_FILE)
-        self.api_key = self.load_api_key()
-        self.grok_api_key = self.load_grok_api_key()
-        self.google_api_key = self.load_google_api_key()
+        self.api_key, self.grok_api_key, self.google_api_key = self.load_all_api_keys()
         
         self.current_language = 'es'
         self.load_language()
@@ -119,8 +114,8 @@ class MainWindow(QMainWindow):
         
         if not (self.api_key or self.grok_api_key or self.google_api_key):
             self.disable_functionality()
-        else:
-            self.validate_replicate_api()
+        # Comprobar la conexión y las claves en paralelo sin bloquear la interfaz
+        self.start_api_validation()
         
         # Siempre iniciar maximizado
         self.showMaximized()
@@ -131,14 +126,28 @@ class MainWindow(QMainWindow):
     def migrar_claves_antiguas(self):
         GestorCifrado.migrar_claves_antiguas(CONFIG_FILE)
 
+    # Función para cargar las tres claves API leyendo la configuración y derivando la clave de cifrado una sola vez
+    def load_all_api_keys(self):
+        try:
+            if config_store.existe():
+                config = config_store.leer()
+                claves = GestorCifrado.decrypt_many({
+                    'api_key': config.get('api_key'),
+                    'grok_api_key': config.get('grok_api_key'),
+                    'google_api_key': config.get('google_api_key'),
+                })
+                return claves['api_key'], claves['grok_api_key'], claves['google_api_key']
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+        return None, None, None
+
     # Función para cargar la clave API de Replicate
     def load_api_key(self):
         try:
-            if os.path.exists(CONFIG_FILE):
-                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                    encrypted_key = config.get('api_key')
-                    return GestorCifrado.decrypt_text(encrypted_key) if encrypted_key else None
+            if config_store.existe():
+                config = config_store.leer()
+                encrypted_key = config.get('api_key')
+                return GestorCifrado.decrypt_text(encrypted_key) if encrypted_key else None
         except (FileNotFoundError, json.JSONDecodeError):
             return None
 
@@ -146,45 +155,50 @@ class MainWindow(QMainWindow):
     def save_api_key(self):
         try:
             config = {}
-            if os.path.exists(CONFIG_FILE):
-                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
+            if config_store.existe():
+                config = config_store.leer()
             
             config['api_key'] = GestorCifrado.encrypt_text(self.api_key) if self.api_key else None
             config['grok_api_key'] = GestorCifrado.encrypt_text(self.grok_api_key) if self.grok_api_key else None
             config['google_api_key'] = GestorCifrado.encrypt_text(self.google_api_key) if self.google_api_key else None
             
-            with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-                json.dump(config, f, ensure_ascii=False, indent=4)
+            config_store.guardar(config)
         except Exception as e:
             print(f"Error al guardar las claves API: {str(e)}")
 
+    # Función para lanzar en segundo plano la comprobación de conexión y la validación de las claves API
+    def start_api_validation(self):
+        self.api_validation = validar_apis({
+            'replicate': self.api_key,
+            'grok': self.grok_api_key,
+            'google': self.google_api_key,
+        })
+        QTimer.singleShot(100, self.check_api_validation)
+
+    # Función para aplicar el resultado de la validación cuando terminan todas las comprobaciones
+    def check_api_validation(self):
+        if not self.api_validation.done():
+            QTimer.singleShot(100, self.check_api_validation)
+            return
+        resultados = self.api_validation.result()
+        # Sin conexión no se toca ninguna clave: el arranque muestra el error y vuelve a validar
+        if resultados.get('conexion') and (self.api_key or self.grok_api_key or self.google_api_key):
+            self.validate_replicate_api(resultados)
+
     # Función para validar la clave API de Replicate
-    def validate_replicate_api(self):
+    def validate_replicate_api(self, resultados):
         replicate_invalid = False
         grok_invalid = False
         google_invalid = False
-        has_saved_replicate = bool(self.load_api_key())
-        has_saved_grok = bool(self.load_grok_api_key())
-        has_saved_google = bool(self.load_google_api_key())
+        saved_replicate, saved_grok, saved_google = self.load_all_api_keys()
+        has_saved_replicate = bool(saved_replicate)
+        has_saved_grok = bool(saved_grok)
+        has_saved_google = bool(saved_google)
         
         if self.api_key:
-            try:
-                headers = {"Authorization": f"Token {self.api_key}"}
-                response = requests.get("https://api.replicate.com/v1/models", headers=headers)
-                if response.status_code == 200:
-                    self.enable_functionality()
-                else:
-                    self.api_key = None
-                    self.save_api_key()
-                    if os.environ.get("REPLICATE_API_TOKEN"):
-                        del os.environ["REPLICATE_API_TOKEN"]
-                    replicate_invalid = True
-                    self.get_api_action.setEnabled(True)
-                    if not (self.grok_api_key or self.google_api_key):
-                        self.disable_functionality()
-                
-            except Exception:
+            if resultados.get('replicate'):
+                self.enable_functionality()
+            else:
                 self.api_key = None
                 self.save_api_key()
                 if os.environ.get("REPLICATE_API_TOKEN"):
@@ -198,30 +212,9 @@ class MainWindow(QMainWindow):
             self.get_api_action.setEnabled(True)
 
         if self.grok_api_key:
-            try:
-                headers = {
-                    "Authorization": f"Bearer {self.grok_api_key}",
-                    "Content-Type": "application/json"
-                }
-                response = requests.get(
-                    "https://api.x.ai/v1/models",
-                    headers=headers,
-                    timeout=10
-                )
-                
-                if response.status_code in [200, 403]:
-                    self.enable_functionality()
-                else:
-                    self.grok_api_key = None
-                    self.save_grok_api_key()
-                    if os.environ.get("GROK_API_KEY"):
-                        del os.environ["GROK_API_KEY"]
-                    grok_invalid = True
-                    self.get_grok_api_action.setEnabled(True)
-                    if not (self.api_key or self.google_api_key):
-                        self.disable_functionality()
-                
-            except Exception:
+            if resultados.get('grok'):
+                self.enable_functionality()
+            else:
                 self.grok_api_key = None
                 self.save_grok_api_key()
                 if os.environ.get("GROK_API_KEY"):
@@ -235,26 +228,9 @@ class MainWindow(QMainWindow):
             self.get_grok_api_action.setEnabled(True)
 
         if self.google_api_key:
-            try:
-                headers = {
-                    "Content-Type": "application/json"
-                }
-                url = f"https://generativelanguage.googleapis.com/v1beta/models?key={self.google_api_key}"
-                response = requests.get(url, headers=headers, timeout=10)
-                
-                if response.status_code == 200:
-                    self.enable_functionality()
-                else:
-                    self.google_api_key = None
-                    self.save_google_api_key()
-                    if os.environ.get("GOOGLE_API_KEY"):
-                        del os.environ["GOOGLE_API_KEY"]
-                    google_invalid = True
-                    self.get_google_api_action.setEnabled(True)
-                    if not (self.api_key or self.grok_api_key):
-                        self.disable_functionality()
-            
-            except Exception:
+            if resultados.get('google'):
+                self.enable_functionality()
+            else:
                 self.google_api_key = None
                 self.save_google_api_key()
                 if os.environ.get("GOOGLE_API_KEY"):
@@ -290,25 +266,22 @@ class MainWindow(QMainWindow):
     # Función para cargar la clave API de xAI
     def load_grok_api_key(self):
         try:
-            with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-                encrypted_key = config.get('grok_api_key')
-                return GestorCifrado.decrypt_text(encrypted_key) if encrypted_key else None
+            config = config_store.leer()
+            encrypted_key = config.get('grok_api_key')
+            return GestorCifrado.decrypt_text(encrypted_key) if encrypted_key else None
         except (FileNotFoundError, json.JSONDecodeError):
             return None
 
     # Función para guardar la clave API de xAI
     def save_grok_api_key(self):
         try:
-            with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                config = json.load(f)
+            config = config_store.leer()
         except (FileNotFoundError, json.JSONDecodeError):
             config = {}
         
         config['grok_api_key'] = GestorCifrado.encrypt_text(self.grok_api_key) if self.grok_api_key else None
         
-        with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-            json.dump(config, f, ensure_ascii=False, indent=4)
+        config_store.guardar(config)
 
     # Función para establecer la clave API de xAI
     def set_grok_api_key(self, api_key):
@@ -765,6 +738,7 @@ class MainWindow(QMainWindow):
 
     # Función para mostrar la ventana de configuración de la clave API de Replicate
     def show_api_dialog(self):
+        from apis.Replicate import ReplicateAPIKeyWindow
         self.api_window = ReplicateAPIKeyWindow(self)
         self.api_window.show()
 
@@ -843,13 +817,11 @@ class MainWindow(QMainWindow):
                 # Forzar procesamiento de eventos para asegurar la actualización visual inmediata
                 QApplication.processEvents()
                 try:
-                    if os.path.exists(CONFIG_FILE):
-                        with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                            config = json.load(f)
+                    if config_store.existe():
+                        config = config_store.leer()
                         if 'costos_totales' in config:
                             del config['costos_totales']
-                        with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-                            json.dump(config, f, ensure_ascii=False, indent=4)
+                        config_store.guardar(config)
                 except Exception as e:
                     print(f"Error al borrar costos totales: {str(e)}")
             else:
@@ -876,6 +848,7 @@ class MainWindow(QMainWindow):
 
     # Función para mostrar la ventana de configuración de la clave API de xAI
     def show_grok_api_dialog(self):
+        from apis.xAI import GrokAPIKeyWindow
         self.grok_api_window = GrokAPIKeyWindow(self)
         self.grok_api_window.show()
 
@@ -954,13 +927,11 @@ class MainWindow(QMainWindow):
                 # Forzar procesamiento de eventos para asegurar la actualización visual inmediata
                 QApplication.processEvents()
                 try:
-                    if os.path.exists(CONFIG_FILE):
-                        with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                            config = json.load(f)
+                    if config_store.existe():
+                        config = config_store.leer()
                         if 'costos_totales' in config:
                             del config['costos_totales']
-                        with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-                            json.dump(config, f, ensure_ascii=False, indent=4)
+                        config_store.guardar(config)
                 except Exception as e:
                     print(f"Error al borrar costos totales: {str(e)}")
             else:
@@ -1060,17 +1031,15 @@ class MainWindow(QMainWindow):
                 # Forzar procesamiento de eventos para asegurar la actualización visual inmediata
                 QApplication.processEvents()
                 try:
-                    if os.path.exists(CONFIG_FILE):
-                        with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                            config = json.load(f)
+                    if config_store.existe():
+                        config = config_store.leer()
                         if 'costos_totales' in config:
                             del config['costos_totales']
                         if 'num_diapositivas' in config:
                             del config['num_diapositivas']
                         if 'pdf_path' in config: # <--- Añadir esta línea
                             del config['pdf_path'] # <--- Añadir esta línea
-                        with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-                            json.dump(config, f, ensure_ascii=False, indent=4)
+                        config_store.guardar(config)
                 except Exception as e:
                     print(f"Error al borrar costos totales: {str(e)}")
             else:
@@ -1162,17 +1131,15 @@ class MainWindow(QMainWindow):
         if hasattr(self, 'balance_action'):
             self.balance_action.setEnabled(False)
             try:
-                if os.path.exists(CONFIG_FILE):
-                    with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                        config = json.load(f)
+                if config_store.existe():
+                    config = config_store.leer()
                     if 'costos_totales' in config:
                         del config['costos_totales']
                     if 'num_diapositivas' in config:
                         del config['num_diapositivas']
                     if 'pdf_path' in config: # <--- Añadir esta línea
                         del config['pdf_path'] # <--- Añadir esta línea
-                    with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-                        json.dump(config, f, ensure_ascii=False, indent=4)
+                    config_store.guardar(config)
             except Exception as e:
                 print(f"Error al borrar costos totales: {str(e)}")
         
@@ -1504,12 +1471,13 @@ class MainWindow(QMainWindow):
                 
                 if msg.exec() == QMessageBox.Yes:
                     if self.widget.worker:
-                        self.widget.worker.requestInterruption()
-                        self.widget.worker.terminate()
+                        self.widget.worker.cancelar()
                     event.accept()
                 else:
                     event.ignore()
                     return
+        # Escribir en disco los cambios de configuración pendientes antes de cerrar
+        config_store.flush()
         event.accept()
 
     # Función para mostrar el mensaje de clave API inválida de Replicate
@@ -1579,9 +1547,8 @@ class MainWindow(QMainWindow):
     def save_window_position(self):
         try:
             config = {}
-            if os.path.exists(CONFIG_FILE):
-                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
+            if config_store.existe():
+                config = config_store.leer()
             
             is_maximized = self.isMaximized()
             config['window_maximized'] = is_maximized
@@ -1595,21 +1562,19 @@ class MainWindow(QMainWindow):
                     'height': geometry.height()
                 }
             
-            with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-                json.dump(config, f, ensure_ascii=False, indent=4)
+            config_store.guardar(config)
         except Exception as e:
             print(f"Error al guardar la posición de la ventana: {str(e)}")
 
     # Función para cargar la posición de la ventana
     def load_window_position(self):
         try:
-            if os.path.exists(CONFIG_FILE):
-                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
+            if config_store.existe():
+                config = config_store.leer()
                     
-                    # Siempre maximizar la ventana, independientemente de la configuración guardada
-                    QTimer.singleShot(0, self.showMaximized)
-                    return True
+                # Siempre maximizar la ventana, independientemente de la configuración guardada
+                QTimer.singleShot(0, self.showMaximized)
+                return True
                     
         except Exception as e:
             print(f"Error al cargar la posición de la ventana: {str(e)}")
@@ -1626,25 +1591,22 @@ class MainWindow(QMainWindow):
     # Función para cargar la clave API de Google
     def load_google_api_key(self):
         try:
-            with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-                encrypted_key = config.get('google_api_key')
-                return GestorCifrado.decrypt_text(encrypted_key) if encrypted_key else None
+            config = config_store.leer()
+            encrypted_key = config.get('google_api_key')
+            return GestorCifrado.decrypt_text(encrypted_key) if encrypted_key else None
         except (FileNotFoundError, json.JSONDecodeError):
             return None
 
     # Función para guardar la clave API de Google
     def save_google_api_key(self):
         try:
-            with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                config = json.load(f)
+            config = config_store.leer()
         except (FileNotFoundError, json.JSONDecodeError):
             config = {}
         
         config['google_api_key'] = GestorCifrado.encrypt_text(self.google_api_key) if self.google_api_key else None
         
-        with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-            json.dump(config, f, ensure_ascii=False, indent=4)
+        config_store.guardar(config)
 
     # Función para establecer la clave API de Google
     def set_google_api_key(self, api_key):
@@ -1656,6 +1618,7 @@ class MainWindow(QMainWindow):
 
     # Función para mostrar la ventana de configuración de la clave API de Google
     def show_google_api_dialog(self):
+        from apis.Google import GoogleAPIKeyWindow
         self.google_api_window = GoogleAPIKeyWindow(self)
         self.google_api_window.show()
 
@@ -1696,14 +1659,12 @@ class MainWindow(QMainWindow):
         self.current_language = language_code
         try:
             config = {}
-            if os.path.exists(CONFIG_FILE):
-                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
+            if config_store.existe():
+                config = config_store.leer()
 
             config['language'] = language_code
 
-            with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-                json.dump(config, f, ensure_ascii=False, indent=4)
+            config_store.guardar(config)
 
             # >>> Actualizar texto de las opciones del menú <<<
             self.es_action.setText(obtener_traduccion('language_option_es', language_code))
@@ -1789,10 +1750,9 @@ class MainWindow(QMainWindow):
 
     def load_language(self):
         try:
-            if os.path.exists(CONFIG_FILE):
-                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                    self.current_language = config.get('language', 'es')
+            if config_store.existe():
+                config = config_store.leer()
+                self.current_language = config.get('language', 'es')
             # >>> Actualizar estado del menú después de cargar <<<
             if hasattr(self, 'language_menu_action'): # Asegurarse de que el menú existe
                  self.update_language_menu_state()
@@ -1856,13 +1816,10 @@ class MainWindow(QMainWindow):
             # Habilitar la interfaz inmediatamente
             self.enable_ui_after_generation()
             
-            # Detener el worker después de habilitar la interfaz
+            # Detener el worker después de habilitar la interfaz: la cancelación cierra las conexiones en curso
+            # y el hilo termina solo en poco tiempo (si no, se fuerza)
             if hasattr(self, 'worker') and self.worker and self.worker.isRunning():
-                self.worker.requestInterruption()
-                # Reducir el tiempo de espera a 500ms
-                if not self.worker.wait(500):
-                    self.worker.terminate()
-                    # No esperar más después de terminate
+                self.worker.cancelar()
                 self.worker = None
 
     # >>> AÑADIR NUEVA FUNCIÓN <<<
@@ -1912,10 +1869,9 @@ class MainWindow(QMainWindow):
     # --- INICIO NUEVAS FUNCIONES PARA TEMA ---
     def load_app_theme_preference(self):
         try:
-            if os.path.exists(CONFIG_FILE):
-                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                    self.current_app_theme = config.get('theme_preference', 'system') # Leer 'theme_preference'
+            if config_store.existe():
+                config = config_store.leer()
+                self.current_app_theme = config.get('theme_preference', 'system') # Leer 'theme_preference'
             else:
                 self.current_app_theme = 'system' # Default si no hay config
         except Exception as e:
@@ -1925,12 +1881,10 @@ class MainWindow(QMainWindow):
     def save_app_theme_preference(self):
         try:
             config = {}
-            if os.path.exists(CONFIG_FILE):
-                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
+            if config_store.existe():
+                config = config_store.leer()
             config['theme_preference'] = self.current_app_theme # Guardar como 'theme_preference'
-            with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-                json.dump(config, f, ensure_ascii=False, indent=4)
+            config_store.guardar(config)
         except Exception as e:
             print(f"Error al guardar la preferencia de tema: {str(e)}")
 
@@ -2106,8 +2060,7 @@ class BalanceWindow(QWidget):
             try:
                 config = self.load_costs()
                 config['costos_totales'] = {'texto': 0.0, 'imagen': 0.0}
-                with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-                    json.dump(config, f, ensure_ascii=False, indent=4)
+                config_store.guardar(config)
                 self.close()
             except Exception as e:
                 print(f"Error al reiniciar costos: {str(e)}")
@@ -2123,9 +2076,8 @@ class BalanceWindow(QWidget):
     # Función para cargar los costos
     def load_costs(self):
         try:
-            if os.path.exists(CONFIG_FILE):
-                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
+            if config_store.existe():
+                config = config_store.leer()
             
             if 'costos_totales' not in config:
                 config['costos_totales'] = {
@@ -2148,6 +2100,8 @@ class PowerpoineatorWidget(QWidget):
         self.worker = None
         self.vista_previa = None
         self.total_images = 0
+        # Informe de los modelos usados en la última generación (llega por la señal uso_modelos)
+        self.informe_uso = None
         self.current_image = 0
         self.generation_completed = False
         # --- MODIFICADO: Usar idioma inicial ---
@@ -2196,6 +2150,8 @@ class PowerpoineatorWidget(QWidget):
             
             # Actualizar textos principales
             self.auto_open_checkbox.setText(obtener_traduccion('auto_open', idioma))
+            self.regenerar_texto_checkbox.setText(obtener_traduccion('regenerar_texto', idioma))
+            self.regenerar_texto_checkbox.setToolTip(obtener_traduccion('regenerar_texto_tooltip', idioma))
             self.diapositivas_label.setText(obtener_traduccion('num_diapositivas', idioma))
             self.descripcion_label.setText(obtener_traduccion('descripcion_presentacion', idioma))
             self.texto_label.setText(obtener_traduccion('texto_modelo', idioma))
@@ -2254,6 +2210,12 @@ class PowerpoineatorWidget(QWidget):
             if not self.descripcion_text.isEnabled():
                 self.descripcion_text.setPlaceholderText(obtener_traduccion('description_text', idioma))
             self.actualizar_contador()
+
+            # Actualizar el botón de reanudar la última presentación
+            if hasattr(self, 'reanudar_btn'):
+                self.reanudar_btn.setText(obtener_traduccion('reanudar_presentacion', idioma))
+                if not (hasattr(self, 'worker') and self.worker and self.worker.isRunning()):
+                    self.actualizar_boton_reanudar()
             
             # Actualizar la vista previa si existe
             if hasattr(self, 'vista_previa') and self.vista_previa:
@@ -2281,10 +2243,9 @@ class PowerpoineatorWidget(QWidget):
     def setup_ui(self):
         current_language = 'es'
         try:
-            if os.path.exists(CONFIG_FILE):
-                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                    current_language = config.get('language', 'es')
+            if config_store.existe():
+                config = config_store.leer()
+                current_language = config.get('language', 'es')
         except Exception as e:
             print(f"Error al cargar el idioma: {str(e)}")
 
@@ -2545,6 +2506,11 @@ class PowerpoineatorWidget(QWidget):
         self.auto_open_checkbox.setChecked(False)
         self.auto_open_checkbox.stateChanged.connect(self.save_auto_open_state)
         left_section.addWidget(self.auto_open_checkbox)
+        # Checkbox para volver a pedir el texto al modelo aunque esté en la caché
+        self.regenerar_texto_checkbox = QCheckBox(obtener_traduccion('regenerar_texto', current_language))
+        self.regenerar_texto_checkbox.setToolTip(obtener_traduccion('regenerar_texto_tooltip', current_language))
+        self.regenerar_texto_checkbox.setChecked(False)
+        left_section.addWidget(self.regenerar_texto_checkbox)
         left_section.addStretch(1)
         
         # Sección central - Botón y etiqueta de estilos
@@ -2593,6 +2559,12 @@ class PowerpoineatorWidget(QWidget):
 
         self.generar_btn.clicked.connect(self.generar_presentacion_event)
         left_layout.addWidget(self.generar_btn)
+
+        # Botón para reanudar la última presentación que no terminó (solo visible si hay alguna)
+        self.reanudar_btn = QPushButton(obtener_traduccion('reanudar_presentacion', current_language))
+        self.reanudar_btn.clicked.connect(self.reanudar_presentacion_event)
+        left_layout.addWidget(self.reanudar_btn)
+        self.actualizar_boton_reanudar()
         
         # Panel derecho (elementos de progreso)
         right_panel = QWidget()
@@ -2696,6 +2668,11 @@ class PowerpoineatorWidget(QWidget):
                                                         "Advertencia", 
                                                         "La biblioteca 'python-pptx' no está instalada.\\nLa función de editar diapositivas directamente en el archivo PPTX estará deshabilitada.\\nInstálala con: pip install python-pptx"))
 
+    # Función para añadir a un desplegable los modelos del catálogo de un proveedor
+    def agregar_modelos_catalogo(self, combo, tipo, proveedor):
+        for etiqueta in modelos_por_proveedor(tipo, proveedor):
+            combo.addItem(QIcon(resource_path(obtener_modelo(etiqueta)['icono'])), etiqueta)
+
     # Función para poblar los campos de selección de modelos
     def populate_fields(self):
 
@@ -2706,56 +2683,27 @@ class PowerpoineatorWidget(QWidget):
         self.imagen_combo.clear()
 
         if hasattr(self.parent(), 'google_api_key') and self.parent().google_api_key and self.parent().validate_google_api():
-            self.texto_combo.addItem(QIcon(resource_path("iconos/gemini.png")), 'gemini-2.5-flash-preview-05-20')
-            self.texto_combo.addItem(QIcon(resource_path("iconos/gemini.png")), 'gemini-2.0-flash')
-            self.texto_combo.addItem(QIcon(resource_path("iconos/gemini.png")), 'gemini-2.0-flash-thinking-exp-01-21')
-            
-            self.imagen_combo.addItem(QIcon(resource_path("iconos/gemini.png")), 'gemini-2.0-flash-preview-image-generation')
+            # Añadir los modelos de Google desde el catálogo
+            self.agregar_modelos_catalogo(self.texto_combo, 'texto', 'google')
+            self.agregar_modelos_catalogo(self.imagen_combo, 'imagen', 'google')
             
             if not (hasattr(self.parent(), 'api_key') and self.parent().api_key) and not (hasattr(self.parent(), 'grok_api_key') and self.parent().grok_api_key):
                 self.imagen_combo.setEnabled(True)
                 self.imagen_combo.setAttribute(Qt.WA_TransparentForMouseEvents, False)
         
         if hasattr(self.parent(), 'api_key') and self.parent().api_key:
-            self.texto_combo.addItem(QIcon(resource_path("iconos/openai.png")), 'gpt-4.1 [$0.0056]')
-            self.texto_combo.addItem(QIcon(resource_path("iconos/openai.png")), 'gpt-4.1-nano [$0.00028]')
-            self.texto_combo.addItem(QIcon(resource_path("iconos/openai.png")), 'o4-mini [$0.0028]')
-            self.texto_combo.addItem(QIcon(resource_path("iconos/openai.png")), 'gpt-4o [$0.00112]')
-            self.texto_combo.addItem(QIcon(resource_path("iconos/openai.png")), 'gpt-4o-mini [$0.00042]')
-            self.texto_combo.addItem(QIcon(resource_path("iconos/deepseek.png")), 'deepseek-r1 [$0.007]')
-            self.texto_combo.addItem(QIcon(resource_path("iconos/claude.png")), 'claude-4-sonnet [$0.0105]')
-            self.texto_combo.addItem(QIcon(resource_path("iconos/claude.png")), 'claude-3.7-sonnet [$0.0105]')
-            self.texto_combo.addItem(QIcon(resource_path("iconos/claude.png")), 'claude-3.5-sonnet [$0.01312]')
-            self.texto_combo.addItem(QIcon(resource_path("iconos/claude.png")), 'claude-3.5-haiku [$0.0035]')
-            self.texto_combo.addItem(QIcon(resource_path("iconos/meta.png")), 'meta-llama-4-scout-instruct [$0.00046]')
-            self.texto_combo.addItem(QIcon(resource_path("iconos/meta.png")), 'meta-llama-4-maverick-instruct [$0.00067]')
-            self.texto_combo.addItem(QIcon(resource_path("iconos/meta.png")), 'meta-llama-3.1-405b-instruct [$0.0067]')
-            self.texto_combo.addItem(QIcon(resource_path("iconos/dolphin.png")), 'dolphin-2.9-llama3-70b-gguf [$0.050]')
+            # Añadir los modelos de texto de Replicate desde el catálogo
+            self.agregar_modelos_catalogo(self.texto_combo, 'texto', 'replicate')
             
             self.imagen_combo.setEnabled(True)
             self.imagen_combo.setAttribute(Qt.WA_TransparentForMouseEvents, False)
-            self.imagen_combo.addItem(QIcon(resource_path("iconos/openai.png")), 'dall-e-3 [$0.12]')
-            self.imagen_combo.addItem(QIcon(resource_path("iconos/openai.png")), 'dall-e-2 [$0.02]')
-            self.imagen_combo.addItem(QIcon(resource_path("iconos/fluxschnell.png")), 'flux-schnell [$0.003]')
-            self.imagen_combo.addItem(QIcon(resource_path("iconos/google.png")), 'imagen-4 [$0.05]')
-            self.imagen_combo.addItem(QIcon(resource_path("iconos/google.png")), 'imagen-3 [$0.05]')
-            self.imagen_combo.addItem(QIcon(resource_path("iconos/google.png")), 'imagen-3-fast [$0.025]')
-            self.imagen_combo.addItem(QIcon(resource_path("iconos/nvidia.png")), 'sana [$0.0067]')
-            self.imagen_combo.addItem(QIcon(resource_path("iconos/nvidia.png")), 'sana-sprint-1.6b [$0.0015]')
-            self.imagen_combo.addItem(QIcon(resource_path("iconos/photomaker.png")), 'photomaker [$0.0070]')
-            self.imagen_combo.addItem(QIcon(resource_path("iconos/bytedance.png")), 'flux-pulid [$0.032]')
-            self.imagen_combo.addItem(QIcon(resource_path("iconos/bytedance.png")), 'hyper-flux-8step [$0.045]')
-            self.imagen_combo.addItem(QIcon(resource_path("iconos/bytedance.png")), 'hyper-flux-16step [$0.047]')
-            self.imagen_combo.addItem(QIcon(resource_path("iconos/bytedance.png")), 'sdxl-lightning-4step [$0.0037]')
-            self.imagen_combo.addItem(QIcon(resource_path("iconos/lightweight.png")), 'model3_4 [$0.00098]')
-            self.imagen_combo.addItem(QIcon(resource_path("iconos/dgmtnzflux.png")), 'dgmtnzflux [$0.03]')
+            # Añadir los modelos de imagen de Replicate desde el catálogo
+            self.agregar_modelos_catalogo(self.imagen_combo, 'imagen', 'replicate')
         
         if hasattr(self.parent(), 'grok_api_key') and self.parent().grok_api_key and self.parent().validate_grok_api():
-            self.texto_combo.addItem(QIcon(resource_path("iconos/grok.jpg")), 'grok-3')
-            self.texto_combo.addItem(QIcon(resource_path("iconos/grok.jpg")), 'grok-3-mini')
-            self.texto_combo.addItem(QIcon(resource_path("iconos/grok.jpg")), 'grok-3-mini-fast')
-            self.texto_combo.addItem(QIcon(resource_path("iconos/grok.jpg")), 'grok-2-1212')
-            self.imagen_combo.addItem(QIcon(resource_path("iconos/grok.jpg")), 'grok-2-image-1212')
+            # Añadir los modelos de xAI desde el catálogo
+            self.agregar_modelos_catalogo(self.texto_combo, 'texto', 'xai')
+            self.agregar_modelos_catalogo(self.imagen_combo, 'imagen', 'xai')
             if not (hasattr(self.parent(), 'api_key') and self.parent().api_key):
                 self.imagen_combo.setEnabled(True)
                 self.imagen_combo.setAttribute(Qt.WA_TransparentForMouseEvents, False)
@@ -2793,14 +2741,12 @@ class PowerpoineatorWidget(QWidget):
     def save_log_visibility_state(self):
         try:
             config = {}
-            if os.path.exists(CONFIG_FILE):
-                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
+            if config_store.existe():
+                config = config_store.leer()
             
             config['log_visible'] = self.log_text.isVisible()
             
-            with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-                json.dump(config, f, ensure_ascii=False, indent=4)
+            config_store.guardar(config)
         except Exception as e:
             print(f"Error al guardar el estado de visibilidad del log: {str(e)}")
     
@@ -2810,11 +2756,10 @@ class PowerpoineatorWidget(QWidget):
             config_language = 'es'
             
             # 1. Leer archivo de configuración
-            if os.path.exists(CONFIG_FILE):
-                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                    log_visible = config.get('log_visible', False)
-                    config_language = config.get('language', 'es')  # Idioma del archivo
+            if config_store.existe():
+                config = config_store.leer()
+                log_visible = config.get('log_visible', False)
+                config_language = config.get('language', 'es')  # Idioma del archivo
             
             # 2. Aplicar visibilidad ANTES de cualquier otra configuración
             self.log_text.setVisible(log_visible)
@@ -2850,50 +2795,14 @@ class PowerpoineatorWidget(QWidget):
         self.log_text.verticalScrollBar().setValue(
             self.log_text.verticalScrollBar().maximum()
         )
-
-        # Detectar cuando comienza la generación de imágenes y obtener el total
-        current_language = self.current_language # Usar el idioma actual del widget
-
-        # Obtener la traducción del mensaje clave en el idioma actual
-        generando_key = 'generando_imagen'
-        generando_base_text = obtener_traduccion(generando_key, current_language)
-        # Formatear para eliminar placeholders y espacios
-        generando_check_text = generando_base_text.format(numero=1, total='').strip()
-
-        # Comprobar si el texto formateado está en el log recibido
-        # Asegurarse que generango_check_text no está vacío antes de la comprobación
-        if generando_check_text and generando_check_text in text:
-            self.loading_timer.stop()
-            self.progress_bar.setRange(0, 100)
-            self.progress_bar.setValue(0)
-            # Extraer el número total de imágenes
-            try:
-                # Intenta extraer el total asumiendo el formato "... X/Y ..."
-                parts = text.split('/')
-                if len(parts) > 1:
-                    # Intentar obtener el número después de la barra, limpiando espacios/caracteres no numéricos
-                    total_str_part = parts[-1].strip().split()[0]
-                    # Filtrar solo dígitos
-                    total_str = ''.join(filter(str.isdigit, total_str_part))
-                    if total_str: # Asegurarse que hay dígitos
-                        self.total_images = int(total_str)
-                    else: # Si no se encontraron dígitos después de la limpieza
-                        print(f"Advertencia: No se pudieron extraer dígitos del total de imágenes de: {parts[-1]}")
-                        self.total_images = 1 # Fallback
-                else: # Si no hay '/', asumir 1 imagen (fallback)
-                     self.total_images = 1
-            except ValueError:
-                print(f"Advertencia: No se pudo convertir a entero el número total de imágenes del texto: {text}")
-                self.total_images = 1 # Fallback si la conversión falla
-            except Exception as e:
-                 print(f"Error inesperado extrayendo total de imágenes: {e}")
-                 self.total_images = 1 # Fallback general
         
     def update_progress(self, current, total):
         # Detener la animación de carga inicial
         if hasattr(self, 'loading_timer') and self.loading_timer.isActive():
             self.loading_timer.stop()
         self.progress_bar.setRange(0, 100)
+        # El total definitivo de imágenes se conoce cuando termina el texto
+        self.total_images = total
         
         # Continuar con la animación normal de progreso
         target_percentage = int((current / total) * 100)
@@ -3088,6 +2997,7 @@ class PowerpoineatorWidget(QWidget):
 
         # Deshabilitar controles auxiliares
         self.auto_open_checkbox.setEnabled(False)
+        self.regenerar_texto_checkbox.setEnabled(False)
         self.num_diapositivas_spin.setEnabled(False)
         self.diapositivas_label.setEnabled(False)
 
@@ -3128,6 +3038,7 @@ class PowerpoineatorWidget(QWidget):
             pass
         self.generar_btn.clicked.connect(self.confirm_cancel_generation)
         self.generar_btn.setEnabled(True)
+        self.reanudar_btn.setVisible(False)
 
         # Asegurarse de que los botones de navegación de la vista previa estén habilitados según corresponda
         if self.vista_previa:
@@ -3166,6 +3077,7 @@ class PowerpoineatorWidget(QWidget):
             pass
         self.generar_btn.clicked.connect(self.generar_presentacion_event)
         self.generar_btn.setEnabled(True)
+        self.actualizar_boton_reanudar()
         
         # Habilitar selección de modelos
         self.texto_combo.setEnabled(True)
@@ -3216,6 +3128,7 @@ class PowerpoineatorWidget(QWidget):
         
         # Habilitar controles auxiliares
         self.auto_open_checkbox.setEnabled(True)
+        self.regenerar_texto_checkbox.setEnabled(True)
         self.num_diapositivas_spin.setEnabled(True)
         self.diapositivas_label.setEnabled(True)
         
@@ -3253,6 +3166,9 @@ class PowerpoineatorWidget(QWidget):
         modelo_imagen = self.imagen_combo.currentText()
         descripcion = self.descripcion_text.toPlainText()
         auto_open = self.auto_open_checkbox.isChecked()
+        usar_cache_texto = not self.regenerar_texto_checkbox.isChecked()
+        # Los costes se calculan con el informe de los modelos usados que envía la generación al terminar
+        self.informe_uso = None
         num_diapositivas = self.num_diapositivas_spin.value()
         # selected_font = self.font_combo.currentText() # Obtener fuente seleccionada
         title_font = self.font_combo.currentText() # <-- Fuente Título
@@ -3293,7 +3209,7 @@ class PowerpoineatorWidget(QWidget):
                                obtener_traduccion('empty_description', current_language))
             return
         
-        if modelo_imagen in ['photomaker [$0.0070]', 'flux-pulid [$0.032]']:
+        if requiere_imagen_personalizada(modelo_imagen):
             if not self.imagen_personalizada or not os.path.exists(self.imagen_personalizada):
                 QMessageBox.warning(self, obtener_traduccion('error', current_language), 
                                    obtener_traduccion('image_required', current_language))
@@ -3331,6 +3247,7 @@ class PowerpoineatorWidget(QWidget):
             self.signals.error.connect(self.show_error)
             self.signals.update_progress.connect(self.update_progress)
             self.signals.nueva_diapositiva.connect(self.agregar_diapositiva)
+            self.signals.uso_modelos.connect(self.guardar_informe_uso)
             
             # Iniciar el timer de animación de carga
             self.loading_timer.start(50)
@@ -3354,14 +3271,14 @@ class PowerpoineatorWidget(QWidget):
             
             # Crear worker e iniciar generación
             from Ventana_progreso import GenerationWorker
+            from Logica_diapositivas import construir_descripcion
             idioma = current_language  # Usar la variable current_language en lugar de self.parent().current_language
-            instruccion_idioma = obtener_traduccion('language_instruction', idioma)
             selected_layout_index = self.selected_layout_index # <-- Obtener el índice seleccionado
 
             self.worker = GenerationWorker(
                 modelo_texto,
                 modelo_imagen,
-                nuevo_string + f" hazlo OBLIGATORIAMENTE en {num_diapositivas} claves-valores (diapositivas) y en {instruccion_idioma}, tal que los títulos de la tupla NO superen 4 palabras y del contenido NO superen 69 palabras",
+                construir_descripcion(nuevo_string, num_diapositivas, idioma),
                 auto_open,
                 self.imagen_personalizada,
                 file_path,
@@ -3376,36 +3293,101 @@ class PowerpoineatorWidget(QWidget):
                 content_bold, # Pasar opción de negrita para contenido
                 content_italic, # Pasar opción de cursiva para contenido
                 content_underline, # Pasar opción de subrayado para contenido
-                selected_layout_index=selected_layout_index # Pasar el índice seleccionado (se usará si aleatorio es False)
+                selected_layout_index=selected_layout_index, # Pasar el índice seleccionado (se usará si aleatorio es False)
+                num_diapositivas=num_diapositivas, # Pasar el número de diapositivas pedido
+                usar_cache_texto=usar_cache_texto # Pedir de nuevo el texto si se marcó regenerar
             )
             self.worker.start()
 
+    # Función para mostrar el botón de reanudar solo si la última presentación no terminó
+    def actualizar_boton_reanudar(self):
+        try:
+            from Puntos_control import obtener_ultimo_reanudable
+            punto_control = obtener_ultimo_reanudable()
+        except Exception as e:
+            print(f"Error al buscar la última presentación: {str(e)}")
+            punto_control = None
+        self.reanudar_btn.setVisible(bool(punto_control))
+        if punto_control:
+            hechas, total = punto_control.resumen()
+            self.reanudar_btn.setToolTip(obtener_traduccion('reanudar_presentacion_tooltip', self.current_language).format(
+                hechas=hechas, total=total or '?'))
+
+    # Función para reanudar la última presentación que no terminó, generando solo lo que falta
+    def reanudar_presentacion_event(self):
+        from Puntos_control import obtener_ultimo_reanudable
+        punto_control = obtener_ultimo_reanudable()
+        if not punto_control:
+            self.actualizar_boton_reanudar()
+            return
+        ajustes = punto_control.ajustes
+
+        current_language = 'es'
+        if self.parent() and hasattr(self.parent(), 'current_language'):
+            current_language = self.parent().current_language
+        self.current_language = current_language
+
+        # La imagen de referencia de los modelos de caras tiene que seguir existiendo
+        if requiere_imagen_personalizada(ajustes['modelo_imagen']):
+            if not ajustes.get('imagen_personalizada') or not os.path.exists(ajustes['imagen_personalizada']):
+                QMessageBox.warning(self, obtener_traduccion('error', current_language),
+                                   obtener_traduccion('image_required', current_language))
+                return
+
+        # Mostrar los modelos de la presentación que se reanuda (los costes se cobran a los modelos seleccionados)
+        self.texto_combo.setCurrentText(ajustes['modelo_texto'])
+        self.imagen_combo.setCurrentText(ajustes['modelo_imagen'])
+
+        self.generated_pptx_path = None
+        if hasattr(self, 'preview_window') and self.preview_window:
+            self.preview_window.reset_completo()
+        self.informe_uso = None
+
+        # Limpiar el log y la vista previa
+        self.log_text.clear()
+        self.resetear_vista_previa()
+        self.progress_bar.setRange(0, 0)
+        self.progress_bar.setValue(0)
+        self.disable_ui_during_generation()
+
+        # Crear signals para la comunicación
+        from Ventana_progreso import LogSignals, GenerationWorker
+        self.signals = LogSignals(self)
+        self.signals.current_language = current_language
+        self.signals.update_log.connect(self.update_log)
+        self.signals.finished.connect(self.on_generation_finished)
+        self.signals.error.connect(self.show_error)
+        self.signals.update_progress.connect(self.update_progress)
+        self.signals.nueva_diapositiva.connect(self.agregar_diapositiva)
+        self.signals.uso_modelos.connect(self.guardar_informe_uso)
+        self.loading_timer.start(50)
+
+        self.worker = GenerationWorker(signals=self.signals, punto_control=punto_control, **ajustes)
+        self.worker.start()
+
     # Función para guardar la descripción
     def save_description(self):
         try:
             config = {}
-            if os.path.exists(CONFIG_FILE):
-                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
+            if config_store.existe():
+                config = config_store.leer()
             
             config['descripcion'] = self.descripcion_text.toPlainText()
             
-            with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-                json.dump(config, f, ensure_ascii=False, indent=4)
+            config_store.guardar(config)
         except Exception as e:
             print(f"Error al guardar la descripción: {str(e)}")
 
     # Función para cargar la descripción
     def load_description(self):
         try:
-            if os.path.exists(CONFIG_FILE):
-                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                    descripcion = config.get('descripcion', '')
-                    self.descripcion_text.blockSignals(True)
-                    self.descripcion_text.setText(descripcion)
-                    self.descripcion_text.blockSignals(False)
-                    self.actualizar_contador()
+            if config_store.existe():
+                config = config_store.leer()
+                descripcion = config.get('descripcion', '')
+                self.descripcion_text.blockSignals(True)
+                self.descripcion_text.setText(descripcion)
+                self.descripcion_text.blockSignals(False)
+                self.actualizar_contador()
         except Exception as e:
             print(f"Error al cargar la descripción: {str(e)}")
 
@@ -3413,10 +3395,9 @@ class PowerpoineatorWidget(QWidget):
     def actualizar_contador(self):
         current_language = 'es'
         try:
-            if os.path.exists(CONFIG_FILE):
-                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                    current_language = config.get('language', 'es')
+            if config_store.existe():
+                config = config_store.leer()
+                current_language = config.get('language', 'es')
         except Exception as e:
             print(f"Error al cargar el idioma: {str(e)}")
             
@@ -3479,7 +3460,7 @@ class PowerpoineatorWidget(QWidget):
 
     # Función para manejar el cambio en la selección de modelos de imagen
     def on_imagen_combo_changed(self, texto):
-        if texto in ['flux-pulid [$0.032]', 'photomaker [$0.0070]']:
+        if requiere_imagen_personalizada(texto):
             self.cargar_imagen_btn.show()
             self.ver_imagen_btn.show()
             self.cargar_imagen_btn.setEnabled(True)
@@ -3523,9 +3504,8 @@ class PowerpoineatorWidget(QWidget):
     def save_combo_selection(self):
         try:
             config = {}
-            if os.path.exists(CONFIG_FILE):
-                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
+            if config_store.existe():
+                config = config_store.leer()
             
             if self.texto_combo.currentText():
                 config['texto_modelo'] = self.texto_combo.currentText()
@@ -3533,8 +3513,7 @@ class PowerpoineatorWidget(QWidget):
             if self.imagen_combo.isEnabled() and self.imagen_combo.currentText():
                 config['imagen_modelo'] = self.imagen_combo.currentText()
             
-            with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-                json.dump(config, f, ensure_ascii=False, indent=4)
+            config_store.guardar(config)
         except Exception as e:
             print(f"Error al guardar la selección de modelos: {str(e)}")
 
@@ -3543,9 +3522,8 @@ class PowerpoineatorWidget(QWidget):
         try:
             config = {}
             # Intentar cargar la configuración existente
-            if os.path.exists(CONFIG_FILE):
-                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
+            if config_store.existe():
+                config = config_store.leer()
             
             texto_modelo_guardado = config.get('texto_modelo', '')
             imagen_modelo_guardado = config.get('imagen_modelo', '')
@@ -3563,15 +3541,13 @@ class PowerpoineatorWidget(QWidget):
                         # Seleccionar el primer modelo disponible y actualizar la configuración.
                         self.texto_combo.setCurrentIndex(0)
                         config['texto_modelo'] = self.texto_combo.currentText()
-                        with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-                            json.dump(config, f, ensure_ascii=False, indent=4)
+                        config_store.guardar(config)
                 else:
                     # No hay modelo guardado, o el combo estaba vacío pero ahora tiene items.
                     # Seleccionar el primero por defecto y guardarlo.
                     self.texto_combo.setCurrentIndex(0)
                     config['texto_modelo'] = self.texto_combo.currentText()
-                    with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-                        json.dump(config, f, ensure_ascii=False, indent=4)
+                    config_store.guardar(config)
             
             # --- Manejo de imagen_combo ---
             if self.imagen_combo.isEnabled() and self.imagen_combo.count() > 0: # Solo proceder si el combo está habilitado y tiene items
@@ -3580,7 +3556,7 @@ class PowerpoineatorWidget(QWidget):
                     if index >= 0:
                         self.imagen_combo.setCurrentIndex(index)
                         # Re-aplicar lógica de mostrar/ocultar botones para modelos específicos
-                        if imagen_modelo_guardado in ['flux-pulid [$0.032]', 'photomaker [$0.0070]']:
+                        if requiere_imagen_personalizada(imagen_modelo_guardado):
                             self.cargar_imagen_btn.show()
                             self.ver_imagen_btn.show()
                             self.cargar_imagen_btn.setEnabled(True)
@@ -3595,27 +3571,25 @@ class PowerpoineatorWidget(QWidget):
                         config['imagen_modelo'] = self.imagen_combo.currentText()
                         # Re-aplicar lógica de botones para el nuevo modelo seleccionado (índice 0)
                         current_img_model_at_0 = self.imagen_combo.currentText()
-                        if current_img_model_at_0 in ['flux-pulid [$0.032]', 'photomaker [$0.0070]']:
+                        if requiere_imagen_personalizada(current_img_model_at_0):
                              self.cargar_imagen_btn.show(); self.ver_imagen_btn.show()
                              self.cargar_imagen_btn.setEnabled(True); self.ver_imagen_btn.setEnabled(True)
                         else:
                              self.cargar_imagen_btn.hide(); self.ver_imagen_btn.hide()
                              # self.imagen_personalizada = None
-                        with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-                            json.dump(config, f, ensure_ascii=False, indent=4)
+                        config_store.guardar(config)
                 else:
                     # No hay modelo de imagen guardado. Seleccionar el primero y guardarlo.
                     self.imagen_combo.setCurrentIndex(0)
                     config['imagen_modelo'] = self.imagen_combo.currentText()
                     current_img_model_at_0 = self.imagen_combo.currentText()
-                    if current_img_model_at_0 in ['flux-pulid [$0.032]', 'photomaker [$0.0070]']:
+                    if requiere_imagen_personalizada(current_img_model_at_0):
                             self.cargar_imagen_btn.show(); self.ver_imagen_btn.show()
                             self.cargar_imagen_btn.setEnabled(True); self.ver_imagen_btn.setEnabled(True)
                     else:
                             self.cargar_imagen_btn.hide(); self.ver_imagen_btn.hide()
                             # self.imagen_personalizada = None
-                    with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-                        json.dump(config, f, ensure_ascii=False, indent=4)
+                    config_store.guardar(config)
                         
         except (FileNotFoundError, json.JSONDecodeError):
             # Archivo de configuración no existe o está corrupto.
@@ -3626,7 +3600,7 @@ class PowerpoineatorWidget(QWidget):
                 self.imagen_combo.setCurrentIndex(0)
                 # Actualizar botones para el modelo en el índice 0 de imagen_combo
                 current_img_model_at_0 = self.imagen_combo.currentText()
-                if current_img_model_at_0 in ['flux-pulid [$0.032]', 'photomaker [$0.0070]']:
+                if requiere_imagen_personalizada(current_img_model_at_0):
                         self.cargar_imagen_btn.show(); self.ver_imagen_btn.show()
                         self.cargar_imagen_btn.setEnabled(True); self.ver_imagen_btn.setEnabled(True)
                 else:
@@ -3640,7 +3614,7 @@ class PowerpoineatorWidget(QWidget):
                 self.imagen_combo.setCurrentIndex(0)
                 # Actualizar botones para el modelo en el índice 0 de imagen_combo
                 current_img_model_at_0 = self.imagen_combo.currentText()
-                if current_img_model_at_0 in ['flux-pulid [$0.032]', 'photomaker [$0.0070]']:
+                if requiere_imagen_personalizada(current_img_model_at_0):
                         self.cargar_imagen_btn.show(); self.ver_imagen_btn.show()
                         self.cargar_imagen_btn.setEnabled(True); self.ver_imagen_btn.setEnabled(True)
                 else:
@@ -3654,29 +3628,29 @@ class PowerpoineatorWidget(QWidget):
     def save_auto_open_state(self):
         try:
             config = {}
-            if os.path.exists(CONFIG_FILE):
-                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
+            if config_store.existe():
+                config = config_store.leer()
             
             config['auto_open'] = self.auto_open_checkbox.isChecked()
             
-            with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-                json.dump(config, f, ensure_ascii=False, indent=4)
+            config_store.guardar(config)
         except Exception as e:
             print(f"Error al guardar el estado de auto-abrir: {str(e)}")
 
     # Función para cargar el estado de auto-abrir
     def load_auto_open_state(self):
         try:
-            if os.path.exists(CONFIG_FILE):
-                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                    auto_open = config.get('auto_open', False)
-                    self.auto_open_checkbox.setChecked(auto_open)
+            if config_store.existe():
+                config = config_store.leer()
+                auto_open = config.get('auto_open', False)
+                self.auto_open_checkbox.setChecked(auto_open)
         except Exception as e:
             print(f"Error al cargar el estado de auto-abrir: {str(e)}")
 
     def extraer_precio_modelo(self, texto_modelo):
+        # Usar el precio del catálogo si el modelo está en él
+        if obtener_modelo(texto_modelo):
+            return obtener_precio(texto_modelo)
         try:
             inicio = texto_modelo.find('[$')
             fin = texto_modelo.find(']')
@@ -3690,9 +3664,8 @@ class PowerpoineatorWidget(QWidget):
     def registrar_costos(self, modelo_texto=None, modelo_imagen=None, num_imagenes=1):
         try:
             config = {}
-            if os.path.exists(CONFIG_FILE):
-                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
+            if config_store.existe():
+                config = config_store.leer()
             
             if 'costos_totales' not in config:
                 config['costos_totales'] = {
@@ -3711,55 +3684,63 @@ class PowerpoineatorWidget(QWidget):
                 #     num_imagenes = self.log_window.total_images
                 config['costos_totales']['imagen'] += precio_imagen * num_imagenes
             
-            with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-                json.dump(config, f, ensure_ascii=False, indent=4)
+            config_store.guardar(config)
         except Exception as e:
             print(f"Error al registrar costos: {str(e)}")
 
+    # Función que recibe el informe de los modelos usados en la generación (señal uso_modelos)
+    def guardar_informe_uso(self, informe):
+        self.informe_uso = informe
+
     def registrar_costos_finales(self):
-        self.registrar_costos(modelo_texto=self.texto_combo.currentText())
-        # Usar self.total_images que se obtiene de update_log.
-        # Si self.total_images no se actualizó (por ejemplo, si no hubo mensajes de 'generando_imagen'),
-        # su valor por defecto es 0, pero update_log tiene fallbacks a 1.
-        # Para mayor seguridad, si self.total_images es 0, usar 1.
-        num_imagenes_a_registrar = self.total_images if self.total_images > 0 else 1
-        self.registrar_costos(modelo_imagen=self.imagen_combo.currentText(), num_imagenes=num_imagenes_a_registrar)
+        informe = self.informe_uso
+        if not informe:
+            return
+        # El texto obtenido de la caché o recuperado al reanudar no se ha vuelto a pagar
+        if not (informe.get('texto_desde_cache') or informe.get('texto_recuperado')):
+            self.registrar_costos(modelo_texto=informe.get('modelo_texto') or self.texto_combo.currentText())
+        # Cada imagen se cobra al modelo que la ha generado, salvo las de la caché, las recuperadas y las de relleno;
+        # las peticiones duplicadas por la cobertura de imágenes lentas que no se usaron también se cobran
+        imagenes_por_modelo = {}
+        for diapositiva in informe.get('diapositivas', []) + informe.get('descartadas', []):
+            modelos = list(diapositiva.get('duplicadas', []))
+            if diapositiva.get('modelo') and not (diapositiva.get('cache') or diapositiva.get('recuperada')):
+                modelos.append(diapositiva['modelo'])
+            for modelo in modelos:
+                imagenes_por_modelo[modelo] = imagenes_por_modelo.get(modelo, 0) + 1
+        for modelo, num_imagenes in imagenes_por_modelo.items():
+            self.registrar_costos(modelo_imagen=modelo, num_imagenes=num_imagenes)
 
     def save_num_diapositivas(self):
         try:
             config = {}
-            if os.path.exists(CONFIG_FILE):
-                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
+            if config_store.existe():
+                config = config_store.leer()
             
             config['num_diapositivas'] = self.num_diapositivas_spin.value()
             
-            with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-                json.dump(config, f, ensure_ascii=False, indent=4)
+            config_store.guardar(config)
         except Exception as e:
             print(f"Error al guardar el número de diapositivas: {str(e)}")
 
     def load_num_diapositivas(self):
         try:
-            if os.path.exists(CONFIG_FILE):
-                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                    num_diapositivas = config.get('num_diapositivas', 5)
-                    self.num_diapositivas_spin.setValue(num_diapositivas)
+            if config_store.existe():
+                config = config_store.leer()
+                num_diapositivas = config.get('num_diapositivas', 5)
+                self.num_diapositivas_spin.setValue(num_diapositivas)
         except Exception as e:
             print(f"Error al cargar el número de diapositivas: {str(e)}")
 
     # Función para limpiar los campos de selección de modelos
     def clear_fields(self):
         try:
-            if os.path.exists(CONFIG_FILE):
-                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
+            if config_store.existe():
+                config = config_store.leer()
                 config['descripcion'] = ""
                 config['texto_modelo'] = ""
                 config['imagen_modelo'] = ""
-                with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-                    json.dump(config, f, ensure_ascii=False, indent=4)
+                config_store.guardar(config)
         except Exception as e:
             print(f"Error al limpiar la configuración: {str(e)}")
         
@@ -3830,13 +3811,10 @@ class PowerpoineatorWidget(QWidget):
             # Habilitar la interfaz inmediatamente
             self.enable_ui_after_generation()
             
-            # Detener el worker después de habilitar la interfaz
+            # Detener el worker después de habilitar la interfaz: la cancelación cierra las conexiones en curso
+            # y el hilo termina solo en poco tiempo (si no, se fuerza)
             if hasattr(self, 'worker') and self.worker and self.worker.isRunning():
-                self.worker.requestInterruption()
-                # Reducir el tiempo de espera a 500ms
-                if not self.worker.wait(500):
-                    self.worker.terminate()
-                    # No esperar más después de terminate
+                self.worker.cancelar()
                 self.worker = None
 
     # Función para cargar un archivo PDF o TXT
@@ -3887,6 +3865,8 @@ class PowerpoineatorWidget(QWidget):
     # Función para extraer texto de un PDF
     def extraer_texto_pdf(self, pdf_path):
         try:
+            # Importar PyPDF2 solo cuando se carga un PDF
+            from PyPDF2 import PdfReader
             reader = PdfReader(pdf_path)
             texto = ""
             for pagina in reader.pages:
@@ -3919,41 +3899,38 @@ class PowerpoineatorWidget(QWidget):
     def save_pdf_path(self):
         try:
             config = {}
-            if os.path.exists(CONFIG_FILE):
-                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
+            if config_store.existe():
+                config = config_store.leer()
             
             config['pdf_path'] = self.pdf_cargado if self.pdf_cargado else ""
             
-            with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-                json.dump(config, f, ensure_ascii=False, indent=4)
+            config_store.guardar(config)
         except Exception as e:
             print(f"Error al guardar la ruta del PDF: {str(e)}")
     
     # Cargar la ruta del PDF desde la configuración
     def load_pdf_path(self):
         try:
-            if os.path.exists(CONFIG_FILE):
-                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                    pdf_path = config.get('pdf_path', "")
-                    if pdf_path and os.path.exists(pdf_path):
-                        self.pdf_cargado = pdf_path
-                        if hasattr(self, 'pdf_label'):
-                            # Obtener el idioma del archivo de configuración para asegurar coherencia
-                            current_language = config.get('language', 'es')
-                            self.pdf_label.setText(obtener_traduccion('pdf_cargado', current_language).format(os.path.basename(pdf_path)))
-                            self.pdf_label.show() # <--- Mostrar la etiqueta
-                            # Mostrar y habilitar los botones
-                            self.eliminar_pdf_btn.show()
-                            self.eliminar_pdf_btn.setEnabled(True)
-                            self.revisar_pdf_btn.show()
-                            self.revisar_pdf_btn.setEnabled(True)
-                    else:
-                        self.pdf_cargado = None
-                        if hasattr(self, 'pdf_label'): # <--- Asegurarse de que existe antes de ocultar
-                            self.pdf_label.setText("")
-                            self.pdf_label.hide()
+            if config_store.existe():
+                config = config_store.leer()
+                pdf_path = config.get('pdf_path', "")
+                if pdf_path and os.path.exists(pdf_path):
+                    self.pdf_cargado = pdf_path
+                    if hasattr(self, 'pdf_label'):
+                        # Obtener el idioma del archivo de configuración para asegurar coherencia
+                        current_language = config.get('language', 'es')
+                        self.pdf_label.setText(obtener_traduccion('pdf_cargado', current_language).format(os.path.basename(pdf_path)))
+                        self.pdf_label.show() # <--- Mostrar la etiqueta
+                        # Mostrar y habilitar los botones
+                        self.eliminar_pdf_btn.show()
+                        self.eliminar_pdf_btn.setEnabled(True)
+                        self.revisar_pdf_btn.show()
+                        self.revisar_pdf_btn.setEnabled(True)
+                else:
+                    self.pdf_cargado = None
+                    if hasattr(self, 'pdf_label'): # <--- Asegurarse de que existe antes de ocultar
+                        self.pdf_label.setText("")
+                        self.pdf_label.hide()
         except Exception as e:
             print(f"Error al cargar la ruta del PDF: {str(e)}")
             self.pdf_cargado = None
@@ -3982,14 +3959,12 @@ class PowerpoineatorWidget(QWidget):
     def save_font_selection(self, font_name):
         try:
             config = {}
-            if os.path.exists(CONFIG_FILE):
-                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
+            if config_store.existe():
+                config = config_store.leer()
 
             config['title_font'] = font_name # <-- Guardar como title_font
 
-            with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-                json.dump(config, f, ensure_ascii=False, indent=4)
+            config_store.guardar(config)
         except Exception as e:
             print(f"Error al guardar la fuente del título: {str(e)}")
             
@@ -4015,14 +3990,12 @@ class PowerpoineatorWidget(QWidget):
     def save_content_font_selection(self, font_name):
         try:
             config = {}
-            if os.path.exists(CONFIG_FILE):
-                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
+            if config_store.existe():
+                config = config_store.leer()
             
             config['content_font'] = font_name
             
-            with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-                json.dump(config, f, ensure_ascii=False, indent=4)
+            config_store.guardar(config)
         except Exception as e:
             print(f"Error al guardar la fuente del contenido: {str(e)}")
         # --- NUEVO: Actualizar vista previa ---
@@ -4045,23 +4018,22 @@ class PowerpoineatorWidget(QWidget):
 
     def load_font_selection(self):
         try:
-            if os.path.exists(CONFIG_FILE):
-                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                    # Cargar fuente de título (anteriormente 'font')
-                    title_font = config.get('title_font', config.get('font', 'Calibri')) 
-                    if title_font in self.system_fonts:
-                        self.font_combo.blockSignals(True)
-                        self.font_combo.setCurrentText(title_font)
-                        self.update_font_combo_style(self.font_combo, title_font) # Aplicar estilo al cargar
-                        self.font_combo.blockSignals(False)
-                    else:
-                        print(f"Fuente de título guardada '{title_font}' no encontrada. Usando Calibri.")
-                        self.font_combo.blockSignals(True)
-                        self.font_combo.setCurrentText('Calibri')
-                        self.update_font_combo_style(self.font_combo, 'Calibri')
-                        self.font_combo.blockSignals(False)
-                        self.save_font_selection('Calibri') # Guardar valor por defecto
+            if config_store.existe():
+                config = config_store.leer()
+                # Cargar fuente de título (anteriormente 'font')
+                title_font = config.get('title_font', config.get('font', 'Calibri')) 
+                if title_font in self.system_fonts:
+                    self.font_combo.blockSignals(True)
+                    self.font_combo.setCurrentText(title_font)
+                    self.update_font_combo_style(self.font_combo, title_font) # Aplicar estilo al cargar
+                    self.font_combo.blockSignals(False)
+                else:
+                    print(f"Fuente de título guardada '{title_font}' no encontrada. Usando Calibri.")
+                    self.font_combo.blockSignals(True)
+                    self.font_combo.setCurrentText('Calibri')
+                    self.update_font_combo_style(self.font_combo, 'Calibri')
+                    self.font_combo.blockSignals(False)
+                    self.save_font_selection('Calibri') # Guardar valor por defecto
         except Exception as e:
             print(f"Error al cargar la fuente del título: {str(e)}")
             self.font_combo.setCurrentText('Calibri') # Fallback
@@ -4070,22 +4042,21 @@ class PowerpoineatorWidget(QWidget):
     # Nueva función para cargar la fuente del contenido
     def load_content_font_selection(self):
         try:
-            if os.path.exists(CONFIG_FILE):
-                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                    content_font = config.get('content_font', 'Calibri')
-                    if content_font in self.system_fonts:
-                        self.content_font_combo.blockSignals(True)
-                        self.content_font_combo.setCurrentText(content_font)
-                        self.update_font_combo_style(self.content_font_combo, content_font)
-                        self.content_font_combo.blockSignals(False)
-                    else:
-                        print(f"Fuente de contenido guardada '{content_font}' no encontrada. Usando Calibri.")
-                        self.content_font_combo.blockSignals(True)
-                        self.content_font_combo.setCurrentText('Calibri')
-                        self.update_font_combo_style(self.content_font_combo, 'Calibri')
-                        self.content_font_combo.blockSignals(False)
-                        self.save_content_font_selection('Calibri')
+            if config_store.existe():
+                config = config_store.leer()
+                content_font = config.get('content_font', 'Calibri')
+                if content_font in self.system_fonts:
+                    self.content_font_combo.blockSignals(True)
+                    self.content_font_combo.setCurrentText(content_font)
+                    self.update_font_combo_style(self.content_font_combo, content_font)
+                    self.content_font_combo.blockSignals(False)
+                else:
+                    print(f"Fuente de contenido guardada '{content_font}' no encontrada. Usando Calibri.")
+                    self.content_font_combo.blockSignals(True)
+                    self.content_font_combo.setCurrentText('Calibri')
+                    self.update_font_combo_style(self.content_font_combo, 'Calibri')
+                    self.content_font_combo.blockSignals(False)
+                    self.save_content_font_selection('Calibri')
         except Exception as e:
             print(f"Error al cargar la fuente del contenido: {str(e)}")
             self.content_font_combo.setCurrentText('Calibri') # Fallback
@@ -4102,15 +4073,13 @@ class PowerpoineatorWidget(QWidget):
     def save_font_sizes(self):
         try:
             config = {}
-            if os.path.exists(CONFIG_FILE):
-                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
+            if config_store.existe():
+                config = config_store.leer()
             
             config['title_font_size'] = self.title_font_size_spin.value()
             config['content_font_size'] = self.content_font_size_spin.value()
             
-            with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-                json.dump(config, f, ensure_ascii=False, indent=4)
+            config_store.guardar(config)
             
             # --- NUEVO: Actualizar vista previa ---
             if hasattr(self, 'vista_previa') and self.vista_previa:
@@ -4132,13 +4101,12 @@ class PowerpoineatorWidget(QWidget):
 
     def load_font_sizes(self):
         try:
-            if os.path.exists(CONFIG_FILE):
-                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                    title_font_size = config.get('title_font_size', 24)
-                    content_font_size = config.get('content_font_size', 18)
-                    self.title_font_size_spin.setValue(title_font_size)
-                    self.content_font_size_spin.setValue(content_font_size)
+            if config_store.existe():
+                config = config_store.leer()
+                title_font_size = config.get('title_font_size', 24)
+                content_font_size = config.get('content_font_size', 18)
+                self.title_font_size_spin.setValue(title_font_size)
+                self.content_font_size_spin.setValue(content_font_size)
         except Exception as e:
             print(f"Error al cargar los tamaños de fuente: {str(e)}")
 
@@ -4146,15 +4114,13 @@ class PowerpoineatorWidget(QWidget):
     def save_font_sizes(self):
         try:
             config = {}
-            if os.path.exists(CONFIG_FILE):
-                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
+            if config_store.existe():
+                config = config_store.leer()
 
             config['title_font_size'] = self.title_font_size_spin.value()
             config['content_font_size'] = self.content_font_size_spin.value()
 
-            with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-                json.dump(config, f, ensure_ascii=False, indent=4)
+            config_store.guardar(config)
             
             # --- NUEVO: Actualizar vista previa ---
             if hasattr(self, 'vista_previa') and self.vista_previa:
@@ -4179,11 +4145,10 @@ class PowerpoineatorWidget(QWidget):
         try:
             title_size = 16 # Default
             content_size = 10 # Default
-            if os.path.exists(CONFIG_FILE):
-                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                    title_size = config.get('title_font_size', 16)
-                    content_size = config.get('content_font_size', 10)
+            if config_store.existe():
+                config = config_store.leer()
+                title_size = config.get('title_font_size', 16)
+                content_size = config.get('content_font_size', 10)
 
             # Validar rangos
             if not (1 <= title_size <= 72): # Ajustado el límite superior a 72
@@ -4213,9 +4178,8 @@ class PowerpoineatorWidget(QWidget):
     def save_format_settings(self):
         try:
             config = {}
-            if os.path.exists(CONFIG_FILE):
-                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
+            if config_store.existe():
+                config = config_store.leer()
             
             config['title_bold'] = self.title_bold_checkbox.isChecked()
             config['title_italic'] = self.title_italic_checkbox.isChecked()
@@ -4224,8 +4188,7 @@ class PowerpoineatorWidget(QWidget):
             config['content_italic'] = self.content_italic_checkbox.isChecked()
             config['content_underline'] = self.content_underline_checkbox.isChecked()
             
-            with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-                json.dump(config, f, ensure_ascii=False, indent=4)
+            config_store.guardar(config)
             
             # --- NUEVO: Actualizar vista previa ---
             if hasattr(self, 'vista_previa') and self.vista_previa:
@@ -4247,16 +4210,15 @@ class PowerpoineatorWidget(QWidget):
 
     def load_format_settings(self):
         try:
-            if os.path.exists(CONFIG_FILE):
-                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                    self.title_bold_checkbox.setChecked(config.get('title_bold', False))
-                    self.title_italic_checkbox.setChecked(config.get('title_italic', False))
-                    self.title_underline_checkbox.setChecked(config.get('title_underline', False))
-                    # Cargar formato de contenido
-                    self.content_bold_checkbox.setChecked(config.get('content_bold', False))
-                    self.content_italic_checkbox.setChecked(config.get('content_italic', False))
-                    self.content_underline_checkbox.setChecked(config.get('content_underline', False))
+            if config_store.existe():
+                config = config_store.leer()
+                self.title_bold_checkbox.setChecked(config.get('title_bold', False))
+                self.title_italic_checkbox.setChecked(config.get('title_italic', False))
+                self.title_underline_checkbox.setChecked(config.get('title_underline', False))
+                # Cargar formato de contenido
+                self.content_bold_checkbox.setChecked(config.get('content_bold', False))
+                self.content_italic_checkbox.setChecked(config.get('content_italic', False))
+                self.content_underline_checkbox.setChecked(config.get('content_underline', False))
         except Exception as e:
             print(f"Error al cargar las configuraciones de formato: {str(e)}")
 
@@ -4271,6 +4233,7 @@ class PowerpoineatorWidget(QWidget):
             current_language = self.current_language # Usar el del widget si no hay padre
 
         # Crear y mostrar el diálogo
+        from Plantillas import StyleSelectionDialog
         dialog = StyleSelectionDialog(
             current_language=current_language,
             current_selection_index=self.selected_layout_index,
@@ -4290,25 +4253,22 @@ class PowerpoineatorWidget(QWidget):
         """Guarda el índice del estilo de diseño seleccionado en config.json."""
         try:
             config = {}
-            if os.path.exists(CONFIG_FILE):
-                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
+            if config_store.existe():
+                config = config_store.leer()
 
             config['selected_layout_index'] = self.selected_layout_index
 
-            with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-                json.dump(config, f, ensure_ascii=False, indent=4)
+            config_store.guardar(config)
         except Exception as e:
             print(f"Error al guardar el índice de estilo seleccionado: {str(e)}")
 
     def load_selected_style(self):
         """Carga el índice del estilo de diseño seleccionado desde config.json."""
         try:
-            if os.path.exists(CONFIG_FILE):
-                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                    # Obtener el índice guardado, usar 1 (Formal) si no existe
-                    self.selected_layout_index = config.get('selected_layout_index', 0)
+            if config_store.existe():
+                config = config_store.leer()
+                # Obtener el índice guardado, usar 1 (Formal) si no existe
+                self.selected_layout_index = config.get('selected_layout_index', 0)
             else:
                 self.selected_layout_index = 1 # Default si no existe config.json
         except Exception as e:
@@ -4341,6 +4301,7 @@ class PowerpoineatorWidget(QWidget):
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     app.setWindowIcon(QIcon(resource_path("iconos/icon.png")))
+    marcar_etapa('qapplication_creada')
 
     # Importar platform para la detección del SO
     import platform
@@ -4364,18 +4325,20 @@ if __name__ == "__main__":
         # Para otros sistemas operativos (Linux, macOS, etc.)
         QApplication.setStyle(QStyleFactory.create('Plastique'))
 
-    while not verificar_conexion_internet():
-        if mostrar_error_conexion() == QMessageBox.Cancel:
-            sys.exit()
-    
     from Splash_carga import SplashScreen
     from Version_checker import obtener_url_descarga
     
     splash = SplashScreen()
     splash.show()
     app.processEvents()
+    marcar_etapa('splash_visible')
     
+    # Borrar en segundo plano las imágenes temporales de edición antiguas y las carpetas de trabajo que superan la cuota
+    from Espacios_trabajo import limpiar_en_segundo_plano
+    limpiar_en_segundo_plano()
+
     window = MainWindow() # MainWindow.__init__ carga la preferencia de tema
+    marcar_etapa('ventana_creada')
     
     # Aplicar el tema cargado ANTES de mostrar la ventana y DESPUÉS de QApplication.setStyle
     theme_to_apply_on_startup = window.current_app_theme
@@ -4391,11 +4354,16 @@ if __name__ == "__main__":
     
     # Función para verificar y mostrar la ventana principal
     def check_and_show_main_window():
-        if not verificar_conexion_internet():
-            window.close()
+        # La conexión se comprueba a la vez que las claves API; esperar sin bloquear a que termine
+        if not window.api_validation.done():
+            QTimer.singleShot(100, check_and_show_main_window)
+            return
+
+        if not window.api_validation.result().get('conexion'):
             if mostrar_error_conexion() == QMessageBox.Cancel:
                 app.quit()
             else:
+                window.start_api_validation()
                 QTimer.singleShot(100, check_and_show_main_window)
             return
         
@@ -4405,6 +4373,8 @@ if __name__ == "__main__":
             
             # Mostrar la ventana principal después de que todo esté listo
             window.show()
+            marcar_etapa('ventana_visible')
+            imprimir_informe()
             
             # Cerrar la pantalla de splash después de mostrar la ventana principal
             splash.close()
@@ -0,0 +1,256 @@
+import os, sys, json, uuid, shutil, hashlib, threading, time
+from Configuracion import APP_DATA_DIR
+
+# Carpeta con un punto de control por presentación: manifiesto.json más una copia de cada imagen ya generada
+PUNTOS_CONTROL_DIR = os.path.join(APP_DATA_DIR, 'puntos_control')
+MANIFIESTO = 'manifiesto.json'
+VERSION_MANIFIESTO = 1
+
+# Número máximo de puntos de control que se conservan (se borran los más antiguos)
+MAX_PUNTOS_CONTROL = 10
+
+# Código de salida que devuelve Windows para los procesos que siguen en marcha
+STILL_ACTIVE = 259
+
+# Estados de una presentación y de cada diapositiva
+EN_CURSO, COMPLETADO, FALLIDO, CANCELADO = 'en_curso', 'completado', 'fallido', 'cancelado'
+PENDIENTE, IMAGEN_LISTA, RELLENO, COMPLETADA = 'pendiente', 'imagen_lista', 'relleno', 'completada'
+
+# Función para calcular el hash de un archivo
+def calcular_sha256(ruta):
+    resumen = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(1024 * 1024), b''):
+            resumen.update(bloque)
+    return resumen.hexdigest()
+
+# Función para saber si un proceso sigue en marcha
+# (en Windows no se usa os.kill(pid, 0), que enviaría un Ctrl+C al proceso)
+def proceso_vivo(pid):
+    if not isinstance(pid, int) or pid <= 0:
+        return False
+    if pid == os.getpid():
+        return True
+    if sys.platform == 'win32':
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        # PROCESS_QUERY_LIMITED_INFORMATION
+        proceso = kernel32.OpenProcess(0x1000, False, pid)
+        if not proceso:
+            return False
+        try:
+            codigo = ctypes.c_ulong()
+            return bool(kernel32.GetExitCodeProcess(proceso, ctypes.byref(codigo))) and codigo.value == STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(proceso)
+    try:
+        os.kill(pid, 0)
+    except PermissionError:
+        # El proceso existe pero es de otro usuario
+        return True
+    except OSError:
+        return False
+    return True
+
+# Clase que guarda en disco el avance de una presentación para poder reanudarla si falla
+class PuntoControl:
+    def __init__(self, carpeta, datos):
+        self.carpeta = carpeta
+        self.datos = datos
+        self._bloqueo = threading.Lock()
+        # Secciones que se han quedado con la imagen de relleno antes de conocer la lista definitiva
+        self._rellenos = set()
+
+    @property
+    def id(self):
+        return self.datos['id']
+
+    @property
+    def ajustes(self):
+        return dict(self.datos['ajustes'])
+
+    @property
+    def estado(self):
+        return self.datos['estado']
+
+    # Función para crear el punto de control de una presentación nueva con sus ajustes
+    @classmethod
+    def crear(cls, ajustes):
+        identificador = time.strftime('%Y%m%d-%H%M%S') + '-' + uuid.uuid4().hex[:8]
+        carpeta = os.path.join(PUNTOS_CONTROL_DIR, identificador)
+        os.makedirs(carpeta, exist_ok=True)
+        ahora = time.time()
+        punto = cls(carpeta, {
+            'version': VERSION_MANIFIESTO,
+            'id': identificador,
+            'creado': ahora,
+            'actualizado': ahora,
+            'estado': EN_CURSO,
+            'error': None,
+            # Proceso que está generando la presentación
+            'pid': os.getpid(),
+            'ajustes': dict(ajustes),
+            'secciones': None,
+            'imagenes': [],
+            'diapositivas': [],
+        })
+        punto._guardar()
+        limpiar_puntos_control()
+        return punto
+
+    # Función para cargar un punto de control desde su carpeta (None si no existe o está dañado)
+    @classmethod
+    def cargar(cls, carpeta):
+        try:
+            with open(os.path.join(carpeta, MANIFIESTO), 'r', encoding='utf-8') as f:
+                datos = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if not isinstance(datos, dict) or datos.get('version') != VERSION_MANIFIESTO:
+            return None
+        return cls(carpeta, datos)
+
+    # Función para escribir el manifiesto de forma atómica (nunca queda a medias si se cierra la aplicación)
+    def _guardar(self):
+        self.datos['actualizado'] = time.time()
+        ruta = os.path.join(self.carpeta, MANIFIESTO)
+        temporal = ruta + '.tmp'
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump(self.datos, f, ensure_ascii=False, indent=2)
+        os.replace(temporal, ruta)
+
+    # Función para obtener las secciones guardadas como lista de pares (None si aún no había texto)
+    def obtener_secciones(self):
+        secciones = self.datos.get('secciones')
+        if secciones is None:
+            return None
+        return [(titulo, contenido) for titulo, contenido in secciones]
+
+    # Función para guardar las secciones devueltas por el modelo de texto
+    # (las imágenes pueden haber terminado antes, mientras el modelo aún escribía)
+    def guardar_secciones(self, secciones):
+        with self._bloqueo:
+            self.datos['secciones'] = [[titulo, contenido] for titulo, contenido in secciones]
+            con_imagen = {(imagen['titulo'], imagen['contenido']) for imagen in self.datos['imagenes']}
+            self.datos['diapositivas'] = [
+                {'numero': numero, 'titulo': titulo, 'contenido': contenido,
+                 'estado': IMAGEN_LISTA if (titulo, contenido) in con_imagen else RELLENO if (titulo, contenido) in self._rellenos else PENDIENTE}
+                for numero, (titulo, contenido) in enumerate(secciones, 1)]
+            self._guardar()
+
+    # Función para cambiar el estado de la diapositiva de una sección (si las secciones ya se conocen)
+    def _marcar_diapositiva(self, titulo, contenido, estado):
+        for diapositiva in self.datos['diapositivas']:
+            if diapositiva['titulo'] == titulo and diapositiva['contenido'] == contenido:
+                diapositiva['estado'] = estado
+
+    # Función para buscar la imagen guardada de una sección; devuelve (ruta, modelo) o None si falta o no coincide su hash
+    def obtener_imagen(self, titulo, contenido):
+        with self._bloqueo:
+            for imagen in self.datos['imagenes']:
+                if imagen['titulo'] == titulo and imagen['contenido'] == contenido:
+                    ruta = os.path.join(self.carpeta, imagen['archivo'])
+                    try:
+                        if calcular_sha256(ruta) == imagen['sha256']:
+                            return ruta, imagen.get('modelo')
+                    except OSError:
+                        pass
+                    return None
+        return None
+
+    # Función para guardar una copia de la imagen generada para una sección
+    def registrar_imagen(self, titulo, contenido, ruta, modelo):
+        with self._bloqueo:
+            archivo = f"imagen_{uuid.uuid4().hex[:12]}.jpg"
+            shutil.copyfile(ruta, os.path.join(self.carpeta, archivo))
+            self.datos['imagenes'] = [imagen for imagen in self.datos['imagenes']
+                                      if (imagen['titulo'], imagen['contenido']) != (titulo, contenido)]
+            self.datos['imagenes'].append({
+                'titulo': titulo, 'contenido': contenido, 'archivo': archivo,
+                'sha256': calcular_sha256(ruta), 'modelo': modelo})
+            self._marcar_diapositiva(titulo, contenido, IMAGEN_LISTA)
+            self._guardar()
+
+    # Función para anotar que una sección se ha quedado con la imagen de relleno (se volverá a pedir al reanudar)
+    def registrar_relleno(self, titulo, contenido):
+        with self._bloqueo:
+            self._rellenos.add((titulo, contenido))
+            self.datos['imagenes'] = [imagen for imagen in self.datos['imagenes']
+                                      if (imagen['titulo'], imagen['contenido']) != (titulo, contenido)]
+            self._marcar_diapositiva(titulo, contenido, RELLENO)
+            self._guardar()
+
+    # Función para anotar que ya se ha aplicado el diseño a una diapositiva
+    def registrar_diapositiva(self, numero):
+        with self._bloqueo:
+            for diapositiva in self.datos['diapositivas']:
+                if diapositiva['numero'] == numero and diapositiva['estado'] != RELLENO:
+                    diapositiva['estado'] = COMPLETADA
+            self._guardar()
+
+    # Función para cambiar el estado de la presentación
+    def marcar(self, estado, error=None):
+        with self._bloqueo:
+            self.datos['estado'] = estado
+            self.datos['error'] = error
+            # Al reanudar, la presentación pasa a ser de este proceso
+            if estado == EN_CURSO:
+                self.datos['pid'] = os.getpid()
+            self._guardar()
+        # Las copias de las imágenes ya no hacen falta si la presentación ha terminado sin imágenes de relleno
+        if not self.es_reanudable():
+            self.liberar_imagenes()
+
+    # Función para borrar las copias de las imágenes (el manifiesto se conserva)
+    def liberar_imagenes(self):
+        with self._bloqueo:
+            for imagen in self.datos['imagenes']:
+                try:
+                    os.remove(os.path.join(self.carpeta, imagen['archivo']))
+                except OSError:
+                    pass
+            self.datos['imagenes'] = []
+            self._guardar()
+
+    # Función para saber si hay algo que reanudar (no ha terminado o alguna diapositiva se quedó con la imagen de relleno)
+    def es_reanudable(self):
+        return self.estado != COMPLETADO or any(d['estado'] == RELLENO for d in self.datos['diapositivas'])
+
+    # Función para saber si la presentación se está generando ahora mismo (en este u otro proceso)
+    # (si el proceso se cerró sin terminarla, el punto de control sigue en curso pero ya no está en uso)
+    def en_uso(self):
+        return self.estado == EN_CURSO and proceso_vivo(self.datos.get('pid'))
+
+    # Función para contar cuántas imágenes ya están generadas y cuántas diapositivas hay en total
+    def resumen(self):
+        total = len(self.datos['secciones'] or [])
+        hechas = sum(1 for d in self.datos['diapositivas'] if d['estado'] in (IMAGEN_LISTA, COMPLETADA))
+        return hechas, total
+
+    # Función para borrar el punto de control
+    def borrar(self):
+        shutil.rmtree(self.carpeta, ignore_errors=True)
+
+# Función para listar los puntos de control guardados, del más reciente al más antiguo
+def listar_puntos_control():
+    if not os.path.isdir(PUNTOS_CONTROL_DIR):
+        return []
+    puntos = []
+    for nombre in os.listdir(PUNTOS_CONTROL_DIR):
+        punto = PuntoControl.cargar(os.path.join(PUNTOS_CONTROL_DIR, nombre))
+        if punto is not None:
+            puntos.append(punto)
+    return sorted(puntos, key=lambda punto: punto.datos.get('actualizado', 0), reverse=True)
+
+# Función para obtener la última presentación que se puede reanudar (None si la última terminó bien)
+def obtener_ultimo_reanudable():
+    puntos = listar_puntos_control()
+    if puntos and puntos[0].es_reanudable():
+        return puntos[0]
+    return None
+
+# Función para borrar los puntos de control más antiguos
+# (los de presentaciones que se están generando no se borran ni cuentan para el máximo)
+def limpiar_puntos_control(maximo=MAX_PUNTOS_CONTROL):
+    for punto in [punto for punto in listar_puntos_control() if not punto.en_uso()][maximo:]:
+        punto.borrar()
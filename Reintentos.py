@@ -0,0 +1,197 @@
+import time, random, threading
+from email.utils import parsedate_to_datetime
+from Traducciones import obtener_traduccion
+from Limites import turno, registrar_limite_superado, registrar_exito
+from Cancelacion import comprobar_cancelacion, esperar
+
+# Política de reintentos compartida por todos los modelos
+MAX_INTENTOS = 4
+ESPERA_BASE = 1.0
+ESPERA_MAXIMA = 30.0
+
+# Segundos que una llamada puede seguir esperando en la cola de Limites por respuestas 429 antes de rendirse
+# (los 429 no gastan intentos: la petición espera su turno, pero no indefinidamente)
+PLAZO_MAXIMO_LIMITES = 600.0
+
+# Fallos seguidos de un proveedor que abren el circuito y segundos que permanece abierto
+UMBRAL_FALLOS_CIRCUITO = 5
+ENFRIAMIENTO_CIRCUITO = 60.0
+
+# Códigos HTTP que indican un fallo temporal del proveedor
+CODIGOS_REINTENTABLES = {408, 409, 425, 429, 500, 502, 503, 504}
+
+# Excepción para errores temporales que deben reintentarse (con una espera sugerida opcional)
+class ErrorReintentable(Exception):
+    reintentable = True
+
+    def __init__(self, mensaje, retry_after=None):
+        super().__init__(mensaje)
+        self.retry_after = retry_after
+
+# Excepción lanzada sin llamar al proveedor mientras su circuito está abierto
+class CircuitoAbiertoError(Exception):
+    reintentable = False
+
+# Excepción lanzada cuando se agotan los intentos
+class ReintentosAgotadosError(Exception):
+    reintentable = False
+
+# Clase que deja de llamar a un proveedor durante un tiempo tras varios fallos seguidos
+class Circuito:
+    def __init__(self, proveedor, umbral=UMBRAL_FALLOS_CIRCUITO, enfriamiento=ENFRIAMIENTO_CIRCUITO):
+        self.proveedor = proveedor
+        self.umbral = umbral
+        self.enfriamiento = enfriamiento
+        self.fallos = 0
+        self.abierto_hasta = 0.0
+        self._bloqueo = threading.Lock()
+
+    # Función para saber cuántos segundos le quedan al circuito abierto (0 si se puede llamar)
+    def segundos_restantes(self):
+        with self._bloqueo:
+            return max(0.0, self.abierto_hasta - time.monotonic())
+
+    # Función para anotar una llamada correcta (cierra el circuito)
+    def registrar_exito(self):
+        with self._bloqueo:
+            self.fallos = 0
+            self.abierto_hasta = 0.0
+
+    # Función para anotar un fallo del proveedor; devuelve True si el circuito se acaba de abrir
+    def registrar_fallo(self):
+        with self._bloqueo:
+            self.fallos += 1
+            # Tras el enfriamiento basta un fallo más (la llamada de prueba) para volver a abrirlo
+            if self.fallos >= self.umbral:
+                self.abierto_hasta = time.monotonic() + self.enfriamiento
+                return True
+            return False
+
+_circuitos = {}
+_bloqueo_circuitos = threading.Lock()
+
+# Función para obtener el circuito de un proveedor
+def obtener_circuito(proveedor):
+    with _bloqueo_circuitos:
+        if proveedor not in _circuitos:
+            _circuitos[proveedor] = Circuito(proveedor)
+        return _circuitos[proveedor]
+
+# Función para obtener el código HTTP de un error de requests, httpx, replicate o google-genai
+def obtener_codigo_http(error):
+    respuesta = getattr(error, 'response', None)
+    for codigo in (getattr(respuesta, 'status_code', None), getattr(error, 'status_code', None),
+                   getattr(error, 'status', None), getattr(error, 'code', None)):
+        if isinstance(codigo, int):
+            return codigo
+    return None
+
+# Función para leer la cabecera Retry-After (en segundos o como fecha HTTP)
+def obtener_retry_after(error):
+    sugerida = getattr(error, 'retry_after', None)
+    if sugerida is not None:
+        return float(sugerida)
+    cabeceras = getattr(getattr(error, 'response', None), 'headers', None)
+    if not cabeceras:
+        return None
+    valor = cabeceras.get('Retry-After') or cabeceras.get('retry-after')
+    if not valor:
+        return None
+    try:
+        return max(0.0, float(valor))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(valor).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+# Función para decidir si un error merece otro intento
+def es_reintentable(error):
+    marcado = getattr(error, 'reintentable', None)
+    if marcado is not None:
+        return marcado
+    codigo = obtener_codigo_http(error)
+    if codigo is not None and codigo >= 400:
+        # Los demás 4xx (clave inválida, petición incorrecta...) no se arreglan reintentando
+        return codigo in CODIGOS_REINTENTABLES
+    return True
+
+# Función para calcular la espera antes del siguiente intento (exponencial con jitter completo)
+def calcular_espera(intento, retry_after=None, base=ESPERA_BASE, maxima=ESPERA_MAXIMA):
+    espera = random.uniform(0, min(maxima, base * (2 ** (intento - 1))))
+    if retry_after is not None:
+        espera = max(espera, min(retry_after, maxima))
+    return espera
+
+# Función para ejecutar una llamada a un proveedor con reintentos acotados y circuito por proveedor
+# - modelo: identificador del modelo para sus límites de ritmo propios (ver Limites.py)
+# - es_valida: función que decide si el resultado sirve (si no, se reintenta sin contar como fallo del proveedor)
+# - plazo_limites: segundos que se puede esperar en la cola por respuestas 429 (no cuentan como intentos)
+def reintentar(funcion, proveedor, log_message=print, idioma='es', es_valida=None, max_intentos=MAX_INTENTOS, modelo=None, plazo_limites=PLAZO_MAXIMO_LIMITES):
+    circuito = obtener_circuito(proveedor)
+    ultimo_error = None
+    inicio = time.monotonic()
+    intento = 1
+
+    while True:
+        # No volver a llamar al proveedor si la generación se ha cancelado
+        comprobar_cancelacion()
+
+        # Fallar enseguida si el proveedor ha fallado demasiadas veces seguidas
+        restantes = circuito.segundos_restantes()
+        if restantes > 0:
+            raise CircuitoAbiertoError(obtener_traduccion('circuito_abierto', idioma).format(
+                proveedor=proveedor, segundos=int(restantes) + 1))
+
+        retry_after = None
+        try:
+            # Esperar turno según los límites de ritmo del proveedor y del modelo
+            with turno(proveedor, modelo):
+                resultado = funcion()
+        except Exception as e:
+            ultimo_error = e
+            # Los errores definitivos (clave inválida, región no soportada...) no cuentan como caída del proveedor
+            if not es_reintentable(e):
+                raise
+            retry_after = obtener_retry_after(e)
+            # Un 429 no es una caída ni gasta un intento: se frena el ritmo y la petición vuelve a esperar turno
+            # en la cola de Limites, hasta que se agote el plazo de espera por límites
+            if obtener_codigo_http(e) == 429:
+                registrar_limite_superado(proveedor, modelo, retry_after)
+                esperado = time.monotonic() - inicio
+                if esperado >= plazo_limites:
+                    raise ReintentosAgotadosError(obtener_traduccion('limite_ritmo_agotado', idioma).format(
+                        proveedor=proveedor, segundos=int(esperado), error=str(e))) from e
+                log_message(obtener_traduccion('limite_ritmo_en_cola', idioma).format(proveedor=proveedor))
+                continue
+            if getattr(e, 'etapa', None):
+                # Indicar en qué etapa se quedó colgada la llamada que se ha abortado por superar su plazo
+                log_message(obtener_traduccion('plazo_superado', idioma).format(
+                    intento=intento, modelo=modelo or proveedor, segundos=f"{e.segundos:g}",
+                    etapa=obtener_traduccion(f'etapa_{e.etapa}', idioma)))
+            else:
+                log_message(obtener_traduccion('error_intento', idioma).format(intento=intento, error=str(e)))
+            if circuito.registrar_fallo():
+                raise CircuitoAbiertoError(obtener_traduccion('circuito_abierto', idioma).format(
+                    proveedor=proveedor, segundos=int(circuito.enfriamiento))) from e
+        else:
+            circuito.registrar_exito()
+            registrar_exito(proveedor, modelo)
+            if es_valida is None or es_valida(resultado):
+                return resultado
+            ultimo_error = None
+            log_message(obtener_traduccion('respuesta_no_valida', idioma))
+
+        if intento >= max_intentos:
+            break
+        espera = calcular_espera(intento, retry_after)
+        log_message(obtener_traduccion('reintentando_en', idioma).format(
+            intento=intento + 1, max_intentos=max_intentos, segundos=f"{espera:.1f}"))
+        # Esperar despertando enseguida si se cancela la generación
+        esperar(espera)
+        intento += 1
+
+    error = str(ultimo_error) if ultimo_error else obtener_traduccion('respuesta_no_valida', idioma)
+    raise ReintentosAgotadosError(obtener_traduccion('reintentos_agotados', idioma).format(
+        intentos=max_intentos, error=error)) from ultimo_error
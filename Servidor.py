@@ -0,0 +1,271 @@
+import os, json, time, uuid, threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from concurrent.futures import ThreadPoolExecutor
+from Cancelacion import TokenCancelacion
+from Trabajos import normalizar_trabajo, ejecutar_trabajo, TrabajoInvalidoError, TRABAJOS_SIMULTANEOS, COMPLETADO, FALLIDO, CANCELADO
+
+# Opciones por defecto del servicio local de generación
+HOST_POR_DEFECTO = '127.0.0.1'
+PUERTO_POR_DEFECTO = 8765
+# Trabajos que pueden esperar en la cola; los demás se rechazan con 503 hasta que haya sitio
+MAX_COLA = 50
+# Trabajos terminados que se recuerdan (se olvidan los más antiguos)
+MAX_TRABAJOS_GUARDADOS = 200
+# Segundos entre comentarios de latido en los streams de eventos (para detectar clientes desconectados)
+INTERVALO_LATIDO = 15
+
+# Estados de un trabajo mientras no ha terminado
+EN_COLA, EN_CURSO = 'en_cola', 'en_curso'
+
+# Clase con el estado y los eventos de un trabajo del servicio
+class TrabajoServidor:
+    def __init__(self, trabajo):
+        self.trabajo = trabajo
+        self.id = trabajo['id']
+        self.estado = EN_COLA
+        self.creado = time.time()
+        self.terminado = None
+        self.progreso = {'actual': 0, 'total': trabajo['num_diapositivas']}
+        self.diapositivas = 0
+        self.error = None
+        self.eventos = []
+        self.cancelacion = TokenCancelacion()
+        self._condicion = threading.Condition()
+
+    # Función para guardar un evento del trabajo y avisar a los clientes que siguen su stream
+    def agregar_evento(self, evento):
+        with self._condicion:
+            if evento['evento'] == 'inicio':
+                self.estado = EN_CURSO
+            elif evento['evento'] == 'progreso':
+                self.progreso = {'actual': evento['actual'], 'total': evento['total']}
+            elif evento['evento'] == 'diapositiva':
+                self.diapositivas += 1
+            elif evento['evento'] == 'fin':
+                self.estado = evento['estado']
+                self.error = evento['error']
+                self.terminado = time.time()
+            self.eventos.append(evento)
+            self._condicion.notify_all()
+
+    # Función para esperar eventos a partir de una posición; devuelve (eventos nuevos, si el trabajo ha terminado)
+    def esperar_eventos(self, desde, tiempo_maximo):
+        with self._condicion:
+            self._condicion.wait_for(lambda: len(self.eventos) > desde or self.terminado is not None, tiempo_maximo)
+            return self.eventos[desde:], self.terminado is not None
+
+    # Función para obtener el resumen del trabajo que se devuelve en GET /jobs/{id}
+    def resumen(self):
+        with self._condicion:
+            return {
+                'id': self.id,
+                'estado': self.estado,
+                'creado': self.creado,
+                'terminado': self.terminado,
+                'progreso': dict(self.progreso),
+                'diapositivas': self.diapositivas,
+                'error': self.error,
+                'modelo_texto': self.trabajo['modelo_texto'],
+                'modelo_imagen': self.trabajo['modelo_imagen'],
+                'eventos': f"/jobs/{self.id}/events",
+                'descarga': f"/jobs/{self.id}/pptx" if self.estado == COMPLETADO else None,
+            }
+
+# Clase que recibe los trabajos, los pone en cola y los genera con un número limitado de hilos
+class GestorTrabajos:
+    def __init__(self, carpeta_salida, simultaneos=TRABAJOS_SIMULTANEOS, max_cola=MAX_COLA):
+        self.carpeta_salida = carpeta_salida
+        self.max_cola = max_cola
+        self.trabajos = {}
+        self._bloqueo = threading.Lock()
+        self._ejecutor = ThreadPoolExecutor(max_workers=max(1, simultaneos), thread_name_prefix='servidor_trabajo')
+
+    # Función para crear un trabajo y ponerlo en cola; devuelve None si la cola está llena
+    def crear(self, datos):
+        if 'filename' in datos or 'id' in datos:
+            raise TrabajoInvalidoError("El servicio asigna el id y la ruta de salida: no se admiten 'id' ni 'filename'")
+        identificador = uuid.uuid4().hex[:12]
+        trabajo = normalizar_trabajo(dict(datos, id=identificador), carpeta_salida=self.carpeta_salida)
+        with self._bloqueo:
+            if sum(1 for t in self.trabajos.values() if t.estado == EN_COLA) >= self.max_cola:
+                return None
+            trabajo_servidor = TrabajoServidor(trabajo)
+            self.trabajos[identificador] = trabajo_servidor
+            self._olvidar_antiguos()
+        self._ejecutor.submit(self._ejecutar, trabajo_servidor)
+        return trabajo_servidor
+
+    # Función que genera un trabajo en uno de los hilos del servicio
+    def _ejecutar(self, trabajo_servidor):
+        if trabajo_servidor.cancelacion.cancelado:
+            trabajo_servidor.agregar_evento({'evento': 'fin', 'trabajo': trabajo_servidor.id, 'tiempo': round(time.time(), 3),
+                                             'estado': CANCELADO, 'salida': None, 'error': None, 'segundos': 0})
+            return
+        try:
+            ejecutar_trabajo(trabajo_servidor.trabajo, trabajo_servidor.agregar_evento, trabajo_servidor.cancelacion)
+        except Exception as e:
+            trabajo_servidor.agregar_evento({'evento': 'fin', 'trabajo': trabajo_servidor.id, 'tiempo': round(time.time(), 3),
+                                             'estado': FALLIDO, 'salida': None, 'error': str(e), 'segundos': 0})
+
+    # Función para olvidar los trabajos terminados más antiguos (sus .pptx se quedan en la carpeta de salida)
+    def _olvidar_antiguos(self):
+        terminados = sorted((t for t in self.trabajos.values() if t.terminado is not None), key=lambda t: t.terminado)
+        for trabajo_servidor in terminados[:max(0, len(self.trabajos) - MAX_TRABAJOS_GUARDADOS)]:
+            del self.trabajos[trabajo_servidor.id]
+
+    # Función para obtener un trabajo por su id (None si no existe)
+    def obtener(self, identificador):
+        with self._bloqueo:
+            return self.trabajos.get(identificador)
+
+    # Función para cancelar un trabajo en cola o en curso
+    def cancelar(self, identificador):
+        trabajo_servidor = self.obtener(identificador)
+        if trabajo_servidor is not None:
+            trabajo_servidor.cancelacion.cancelar()
+        return trabajo_servidor
+
+    # Función para cancelar todos los trabajos y esperar a que terminen
+    def cerrar(self):
+        with self._bloqueo:
+            trabajos = list(self.trabajos.values())
+        for trabajo_servidor in trabajos:
+            trabajo_servidor.cancelacion.cancelar()
+        self._ejecutor.shutdown(wait=True)
+
+# Clase que atiende las peticiones HTTP del servicio
+class ManejadorPeticiones(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Tamaño máximo del cuerpo de POST /jobs
+    MAX_CUERPO = 1024 * 1024
+
+    @property
+    def gestor(self):
+        return self.server.gestor
+
+    # Función para no llenar la consola con una línea por petición
+    def log_message(self, formato, *args):
+        pass
+
+    # Función para responder con un JSON
+    def responder_json(self, codigo, datos):
+        cuerpo = json.dumps(datos, ensure_ascii=False).encode('utf-8')
+        self.send_response(codigo)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    # Función para separar la ruta en partes, ignorando la query
+    def partes_ruta(self):
+        return [parte for parte in self.path.split('?', 1)[0].split('/') if parte]
+
+    # Función para obtener el trabajo de la ruta o responder 404
+    def trabajo_de_ruta(self, partes):
+        trabajo_servidor = self.gestor.obtener(partes[1])
+        if trabajo_servidor is None:
+            self.responder_json(404, {'error': 'Trabajo no encontrado'})
+        return trabajo_servidor
+
+    def do_POST(self):
+        if self.partes_ruta() != ['jobs']:
+            return self.responder_json(404, {'error': 'Ruta no encontrada'})
+        longitud = int(self.headers.get('Content-Length') or 0)
+        if longitud > self.MAX_CUERPO:
+            return self.responder_json(413, {'error': 'Petición demasiado grande'})
+        try:
+            datos = json.loads(self.rfile.read(longitud) or b'{}')
+            if not isinstance(datos, dict):
+                raise TrabajoInvalidoError('El cuerpo debe ser un objeto JSON')
+            trabajo_servidor = self.gestor.crear(datos)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            return self.responder_json(400, {'error': f"JSON no válido: {str(e)}"})
+        except TrabajoInvalidoError as e:
+            return self.responder_json(400, {'error': str(e)})
+        if trabajo_servidor is None:
+            return self.responder_json(503, {'error': 'La cola de trabajos está llena'})
+        self.responder_json(202, trabajo_servidor.resumen())
+
+    def do_GET(self):
+        partes = self.partes_ruta()
+        if partes == ['health']:
+            return self.responder_json(200, {'estado': 'ok'})
+        if len(partes) < 2 or partes[0] != 'jobs' or len(partes) > 3:
+            return self.responder_json(404, {'error': 'Ruta no encontrada'})
+        trabajo_servidor = self.trabajo_de_ruta(partes)
+        if trabajo_servidor is None:
+            return
+        if len(partes) == 2:
+            return self.responder_json(200, trabajo_servidor.resumen())
+        if partes[2] == 'events':
+            return self.enviar_eventos(trabajo_servidor)
+        if partes[2] == 'pptx':
+            return self.enviar_presentacion(trabajo_servidor)
+        self.responder_json(404, {'error': 'Ruta no encontrada'})
+
+    def do_DELETE(self):
+        partes = self.partes_ruta()
+        if len(partes) != 2 or partes[0] != 'jobs':
+            return self.responder_json(404, {'error': 'Ruta no encontrada'})
+        trabajo_servidor = self.gestor.cancelar(partes[1])
+        if trabajo_servidor is None:
+            return self.responder_json(404, {'error': 'Trabajo no encontrado'})
+        self.responder_json(202, trabajo_servidor.resumen())
+
+    # Función para enviar los eventos del trabajo como Server-Sent Events hasta que termine
+    # (con la cabecera Last-Event-ID un cliente reconectado recibe solo los eventos que le faltan)
+    def enviar_eventos(self, trabajo_servidor):
+        try:
+            posicion = int(self.headers.get('Last-Event-ID', -1)) + 1
+        except ValueError:
+            posicion = 0
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+        try:
+            while True:
+                eventos, terminado = trabajo_servidor.esperar_eventos(posicion, INTERVALO_LATIDO)
+                if not eventos and not terminado:
+                    self.wfile.write(b': latido\n\n')
+                for evento in eventos:
+                    self.wfile.write(f"id: {posicion}\nevent: {evento['evento']}\ndata: {json.dumps(evento, ensure_ascii=False)}\n\n".encode('utf-8'))
+                    posicion += 1
+                self.wfile.flush()
+                if terminado and posicion >= len(trabajo_servidor.eventos):
+                    return
+        except (BrokenPipeError, ConnectionResetError):
+            # El cliente ha cerrado la conexión: el trabajo sigue
+            return
+
+    # Función para enviar el .pptx de un trabajo terminado
+    def enviar_presentacion(self, trabajo_servidor):
+        ruta = trabajo_servidor.trabajo['filename']
+        if trabajo_servidor.estado != COMPLETADO or not os.path.exists(ruta):
+            return self.responder_json(409, {'error': 'La presentación no está lista', 'estado': trabajo_servidor.estado})
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/vnd.openxmlformats-officedocument.presentationml.presentation')
+        self.send_header('Content-Length', str(os.path.getsize(ruta)))
+        self.send_header('Content-Disposition', f'attachment; filename="{trabajo_servidor.id}.pptx"')
+        self.end_headers()
+        with open(ruta, 'rb') as f:
+            while True:
+                bloque = f.read(64 * 1024)
+                if not bloque:
+                    break
+                self.wfile.write(bloque)
+
+# Clase del servidor HTTP con el gestor de trabajos
+class ServidorGeneracion(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, direccion, gestor):
+        super().__init__(direccion, ManejadorPeticiones)
+        self.gestor = gestor
+
+# Función para crear el servicio local de generación (se arranca con serve_forever)
+def crear_servidor(carpeta_salida, host=HOST_POR_DEFECTO, puerto=PUERTO_POR_DEFECTO, simultaneos=TRABAJOS_SIMULTANEOS, max_cola=MAX_COLA):
+    os.makedirs(carpeta_salida, exist_ok=True)
+    return ServidorGeneracion((host, puerto), GestorTrabajos(carpeta_salida, simultaneos, max_cola))
@@ -4,6 +4,7 @@ from PySide6.QtCore import Qt, QTimer
 from PySide6.QtGui import QIcon, QPixmap, QGuiApplication, QPalette, QColor
 from Version_checker import hay_actualizacion_disponible, obtener_version_actual
 from Traducciones import obtener_traduccion
+from Configuracion import obtener_config_store
 
 # Función para obtener la ruta de un recurso
 def resource_path(relative_path):
@@ -39,12 +40,11 @@ def load_config():
     config_data = {'language': 'es', 'theme_preference': 'system'} # Valores por defecto
     config_file = get_config_file_path()
     
-    if config_file and os.path.exists(config_file):
+    if config_file:
         try:
-            with open(config_file, 'r', encoding='utf-8') as f:
-                loaded_config = json.load(f)
-                config_data['language'] = loaded_config.get('language', 'es')
-                config_data['theme_preference'] = loaded_config.get('theme_preference', 'system')
+            loaded_config = obtener_config_store(config_file).leer()
+            config_data['language'] = loaded_config.get('language', 'es')
+            config_data['theme_preference'] = loaded_config.get('theme_preference', 'system')
         except Exception as e:
             print(f"Error al cargar la configuración: {str(e)}")
     return config_data
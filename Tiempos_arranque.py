@@ -0,0 +1,87 @@
+import sys, os, time, builtins, threading
+
+# Variable de entorno y argumento para activar la medición del arranque
+VARIABLE_ENTORNO = 'POWERPOINEADOR_TIEMPOS_ARRANQUE'
+ARGUMENTO = '--tiempos-arranque'
+
+# Número de importaciones más lentas que se muestran en el informe
+MAX_IMPORTACIONES_INFORME = 30
+
+_inicio = time.perf_counter()
+_activo = False
+_informe_impreso = False
+# Etapas del arranque: (nombre, segundos desde el inicio)
+_etapas = []
+# Importaciones medidas: nombre -> [tiempo propio, tiempo acumulado] en segundos
+_importaciones = {}
+_local = threading.local()
+_bloqueo = threading.Lock()
+_import_original = builtins.__import__
+
+# Función para saber si se ha pedido medir el arranque
+def medicion_solicitada():
+    return os.environ.get(VARIABLE_ENTORNO, '') not in ('', '0') or ARGUMENTO in sys.argv
+
+# Función que sustituye a __import__ para medir cuánto tarda cada módulo nuevo (como python -X importtime)
+def _import_medido(name, globals=None, locals=None, fromlist=(), level=0):
+    if level or name in sys.modules:
+        return _import_original(name, globals, locals, fromlist, level)
+    pila = getattr(_local, 'pila', None)
+    if pila is None:
+        pila = _local.pila = []
+    pila.append(0.0)
+    inicio = time.perf_counter()
+    try:
+        return _import_original(name, globals, locals, fromlist, level)
+    finally:
+        acumulado = time.perf_counter() - inicio
+        hijos = pila.pop()
+        if pila:
+            pila[-1] += acumulado
+        with _bloqueo:
+            tiempos = _importaciones.setdefault(name, [0.0, 0.0])
+            tiempos[0] += acumulado - hijos
+            tiempos[1] += acumulado
+
+# Función para empezar a medir el arranque si se ha pedido
+def iniciar_medicion():
+    global _activo
+    if _activo or not medicion_solicitada():
+        return
+    _activo = True
+    builtins.__import__ = _import_medido
+    marcar_etapa('inicio')
+
+# Función para anotar el momento en que termina una etapa del arranque
+def marcar_etapa(nombre):
+    if _activo:
+        _etapas.append((nombre, time.perf_counter() - _inicio))
+
+# Función para dejar de medir las importaciones
+def detener_medicion():
+    global _activo
+    if _activo:
+        builtins.__import__ = _import_original
+        _activo = False
+
+# Función para imprimir el informe del arranque (solo la primera vez que se llama)
+def imprimir_informe(archivo=None):
+    global _informe_impreso
+    if not _activo or _informe_impreso:
+        return
+    _informe_impreso = True
+    detener_medicion()
+    archivo = archivo or sys.stderr
+
+    print("=== Tiempos de arranque ===", file=archivo)
+    anterior = 0.0
+    for nombre, segundos in _etapas:
+        print(f"{nombre:<24} {segundos * 1000:9.1f} ms  (+{(segundos - anterior) * 1000:.1f} ms)", file=archivo)
+        anterior = segundos
+
+    print(f"=== Importaciones más lentas (de {len(_importaciones)}) ===", file=archivo)
+    print(f"{'propio [ms]':>12} | {'acumulado [ms]':>14} | módulo", file=archivo)
+    with _bloqueo:
+        ordenadas = sorted(_importaciones.items(), key=lambda item: item[1][1], reverse=True)
+    for nombre, (propio, acumulado) in ordenadas[:MAX_IMPORTACIONES_INFORME]:
+        print(f"{propio * 1000:12.1f} | {acumulado * 1000:14.1f} | {nombre}", file=archivo)
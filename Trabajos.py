@@ -0,0 +1,223 @@
+import os, csv, json, time, uuid, threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from Configuracion import obtener_config_store
+from Cancelacion import TokenCancelacion, CancelacionError
+from Catalogo_modelos import obtener_modelo, requiere_imagen_personalizada, MODELO_TEXTO_POR_DEFECTO
+
+# Modelo de imagen que se usa si un trabajo no indica ninguno
+MODELO_IMAGEN_POR_DEFECTO = 'flux-schnell [$0.003]'
+
+# Presentaciones que se generan a la vez por defecto (las peticiones a cada proveedor siguen limitadas por Limites.py)
+TRABAJOS_SIMULTANEOS = 2
+
+# Campos de un trabajo y sus valores por defecto (los mismos nombres que los parámetros de generar_presentacion)
+CAMPOS_TRABAJO = {
+    'id': None,
+    'descripcion': None,
+    'modelo_texto': MODELO_TEXTO_POR_DEFECTO,
+    'modelo_imagen': MODELO_IMAGEN_POR_DEFECTO,
+    'num_diapositivas': 5,
+    'selected_layout_index': 1,
+    'imagen_personalizada': None,
+    'filename': None,
+    'idioma': 'es',
+    'title_font_name': 'Calibri',
+    'content_font_name': 'Calibri',
+    'title_font_size': 16,
+    'content_font_size': 10,
+    'title_bold': False,
+    'title_italic': False,
+    'title_underline': False,
+    'content_bold': False,
+    'content_italic': False,
+    'content_underline': False,
+    'usar_cache_imagenes': True,
+    'usar_cache_texto': True,
+}
+
+# Claves API guardadas en config.json y variable de entorno en la que las esperan los modelos
+CLAVES_API = {
+    'api_key': 'REPLICATE_API_TOKEN',
+    'grok_api_key': 'GROK_API_KEY',
+    'google_api_key': 'GOOGLE_API_KEY',
+}
+
+# Estados finales de un trabajo
+COMPLETADO, FALLIDO, CANCELADO = 'completado', 'fallido', 'cancelado'
+
+# Excepción para los trabajos mal definidos
+class TrabajoInvalidoError(ValueError):
+    pass
+
+# Función para cargar en el entorno las claves API guardadas por la aplicación (las del entorno tienen preferencia)
+def cargar_claves_api():
+    from Cifrado import GestorCifrado
+    config = obtener_config_store().leer()
+    pendientes = {campo: config.get(campo) for campo, variable in CLAVES_API.items() if not os.environ.get(variable) and config.get(campo)}
+    if not pendientes:
+        return
+    for campo, clave in GestorCifrado.decrypt_many(pendientes).items():
+        if clave:
+            os.environ[CLAVES_API[campo]] = clave
+
+# Función para convertir el texto de una columna CSV al tipo del valor por defecto del campo
+def _convertir(campo, valor):
+    defecto = CAMPOS_TRABAJO[campo]
+    if not isinstance(valor, str):
+        return valor
+    valor = valor.strip()
+    if valor == '':
+        return defecto
+    if isinstance(defecto, bool):
+        return valor.lower() in ('1', 'true', 'si', 'sí', 'yes', 'x')
+    if isinstance(defecto, int):
+        return int(valor)
+    return valor
+
+# Función para completar un trabajo con los valores por defecto y comprobar que se puede generar
+def normalizar_trabajo(datos, numero=1, carpeta_salida='.'):
+    desconocidos = set(datos) - set(CAMPOS_TRABAJO)
+    if desconocidos:
+        raise TrabajoInvalidoError(f"Trabajo {numero}: campos desconocidos: {', '.join(sorted(desconocidos))}")
+    try:
+        trabajo = {campo: _convertir(campo, datos.get(campo, defecto)) for campo, defecto in CAMPOS_TRABAJO.items()}
+    except ValueError as e:
+        raise TrabajoInvalidoError(f"Trabajo {numero}: {str(e)}") from e
+
+    trabajo['id'] = str(trabajo['id'] or numero)
+    if not trabajo['descripcion'] or not str(trabajo['descripcion']).strip():
+        raise TrabajoInvalidoError(f"Trabajo {trabajo['id']}: falta la descripción")
+    for campo, tipo in (('modelo_texto', 'texto'), ('modelo_imagen', 'imagen')):
+        modelo = obtener_modelo(trabajo[campo])
+        if modelo is None or modelo['tipo'] != tipo:
+            raise TrabajoInvalidoError(f"Trabajo {trabajo['id']}: modelo de {tipo} desconocido: {trabajo[campo]}")
+    if requiere_imagen_personalizada(trabajo['modelo_imagen']):
+        if not (trabajo['imagen_personalizada'] and os.path.exists(trabajo['imagen_personalizada'])):
+            raise TrabajoInvalidoError(f"Trabajo {trabajo['id']}: {trabajo['modelo_imagen']} necesita una imagen_personalizada")
+    if not trabajo['filename']:
+        trabajo['filename'] = os.path.join(carpeta_salida, f"{trabajo['id']}.pptx")
+    return trabajo
+
+# Función para leer los trabajos de un archivo JSONL (un objeto por línea) o CSV (una fila por trabajo)
+def leer_trabajos(ruta, carpeta_salida='.'):
+    with open(ruta, 'r', encoding='utf-8-sig', newline='') as f:
+        if ruta.lower().endswith('.csv'):
+            filas = [{campo: valor for campo, valor in fila.items() if campo} for fila in csv.DictReader(f)]
+        else:
+            filas = []
+            for numero_linea, linea in enumerate(f, 1):
+                if not linea.strip() or linea.lstrip().startswith('#'):
+                    continue
+                try:
+                    filas.append(json.loads(linea))
+                except json.JSONDecodeError as e:
+                    raise TrabajoInvalidoError(f"Línea {numero_linea}: JSON no válido: {str(e)}") from e
+    trabajos = [normalizar_trabajo(fila, numero, carpeta_salida) for numero, fila in enumerate(filas, 1)]
+    repetidos = {t['id'] for t in trabajos if sum(1 for otro in trabajos if otro['id'] == t['id']) > 1}
+    if repetidos:
+        raise TrabajoInvalidoError(f"Identificadores de trabajo repetidos: {', '.join(sorted(repetidos))}")
+    return trabajos
+
+# Clase con la misma interfaz que las señales de Qt (emit) para usar generar_presentacion sin interfaz gráfica
+class Senal:
+    def __init__(self, funcion):
+        self.funcion = funcion
+
+    def emit(self, *args):
+        self.funcion(*args)
+
+# Clase que sustituye a LogSignals y convierte cada señal en un evento del trabajo
+# - al_evento(evento): recibe un diccionario con 'evento', 'trabajo' y los datos de la señal
+class SenalesTrabajo:
+    def __init__(self, trabajo_id, al_evento, idioma='es'):
+        self.trabajo_id = trabajo_id
+        self.al_evento = al_evento
+        self.current_language = idioma
+        self.terminado = False
+        self.mensaje_error = None
+        self.update_log = Senal(lambda mensaje: self.emitir('log', mensaje=mensaje))
+        self.update_progress = Senal(lambda actual, total: self.emitir('progreso', actual=actual, total=total))
+        self.nueva_diapositiva = Senal(lambda imagen, titulo, contenido: self.emitir('diapositiva', imagen=imagen, titulo=titulo, contenido=contenido))
+        self.finished = Senal(self._terminar)
+        self.error = Senal(self._fallar)
+        self.closed = Senal(lambda: None)
+        self.etapa = Senal(lambda datos: self.emitir('etapa', **datos))
+        self.uso_modelos = Senal(lambda informe: self.emitir('uso', **informe))
+
+    # Función para enviar un evento del trabajo
+    def emitir(self, evento, **datos):
+        self.al_evento({'evento': evento, 'trabajo': self.trabajo_id, 'tiempo': round(time.time(), 3), **datos})
+
+    # Función que recibe la señal de fin de la generación
+    def _terminar(self):
+        self.terminado = True
+
+    # Función que recibe la señal de error de la generación
+    def _fallar(self, mensaje):
+        self.mensaje_error = mensaje
+
+# Función para generar la presentación de un trabajo; devuelve un diccionario con su resultado
+def ejecutar_trabajo(trabajo, al_evento, cancelacion=None):
+    from Logica_diapositivas import generar_presentacion, construir_descripcion
+    from Trazas import crear_traza
+    senales = SenalesTrabajo(trabajo['id'], al_evento, trabajo['idioma'])
+    inicio = time.monotonic()
+    senales.emitir('inicio', salida=trabajo['filename'])
+
+    argumentos = {campo: valor for campo, valor in trabajo.items() if campo not in ('id', 'idioma')}
+    traza = crear_traza(al_evento=senales.etapa.emit)
+    with traza.etapa('construir_prompt', 'texto'):
+        argumentos['descripcion'] = construir_descripcion(trabajo['descripcion'], trabajo['num_diapositivas'], trabajo['idioma'])
+    carpeta = os.path.dirname(os.path.abspath(trabajo['filename']))
+    os.makedirs(carpeta, exist_ok=True)
+    try:
+        generar_presentacion(auto_open=False, signals=senales, disenos_aleatorios=trabajo['selected_layout_index'] == 0,
+                             cancelacion=cancelacion, traza=traza, **argumentos)
+        estado = COMPLETADO if senales.terminado else FALLIDO
+    except CancelacionError:
+        estado = CANCELADO
+    except Exception as e:
+        senales.mensaje_error = str(e)
+        estado = FALLIDO
+
+    resultado = {'estado': estado, 'salida': trabajo['filename'] if estado == COMPLETADO else None,
+                 'error': senales.mensaje_error, 'segundos': round(time.monotonic() - inicio, 2)}
+    senales.emitir('fin', **resultado)
+    return {'id': trabajo['id'], **resultado}
+
+# Función para generar un lote de trabajos con varias presentaciones a la vez; devuelve sus resultados en orden
+def ejecutar_lote(trabajos, al_evento, simultaneos=TRABAJOS_SIMULTANEOS, cancelacion=None):
+    cancelacion = cancelacion or TokenCancelacion()
+    bloqueo = threading.Lock()
+
+    # Función para enviar los eventos de un trabajo de uno en uno aunque lleguen desde varios hilos
+    def emitir(evento):
+        with bloqueo:
+            al_evento(evento)
+
+    # Función que genera un trabajo si el lote no se ha cancelado antes de empezarlo
+    def ejecutar(trabajo):
+        if cancelacion.cancelado:
+            return {'id': trabajo['id'], 'estado': CANCELADO, 'salida': None, 'error': None, 'segundos': 0}
+        return ejecutar_trabajo(trabajo, emitir, cancelacion)
+
+    lote = uuid.uuid4().hex[:8]
+    emitir({'evento': 'lote', 'lote': lote, 'trabajos': len(trabajos), 'simultaneos': simultaneos, 'tiempo': round(time.time(), 3)})
+    ejecutor = ThreadPoolExecutor(max_workers=max(1, simultaneos), thread_name_prefix='trabajo')
+    try:
+        futuros = [ejecutor.submit(ejecutar, trabajo) for trabajo in trabajos]
+        # Esperar con un plazo corto para que Ctrl+C se atienda enseguida también en Windows
+        pendientes = set(futuros)
+        while pendientes:
+            _, pendientes = wait(pendientes, timeout=0.5)
+        resultados = [futuro.result() for futuro in futuros]
+    except BaseException:
+        # Cancelar las generaciones en curso y las pendientes (por ejemplo al pulsar Ctrl+C)
+        cancelacion.cancelar()
+        raise
+    finally:
+        ejecutor.shutdown(wait=True)
+
+    resumen = {estado: sum(1 for r in resultados if r['estado'] == estado) for estado in (COMPLETADO, FALLIDO, CANCELADO)}
+    emitir({'evento': 'resumen', 'lote': lote, **resumen, 'tiempo': round(time.time(), 3)})
+    return resultados
@@ -220,6 +220,36 @@ traducciones = {
         'error_cargar_imagen_mensaje': 'Error al cargar la imagen: {}',
         'seleccionar_imagen_personalizada': 'Seleccionar imagen',
         'imagen_filter': 'Imágenes',
+        'imagenes_en_paralelo': 'Generando {total} imágenes en paralelo (máximo {maximo} a la vez)',
+        'cache_imagenes_estadisticas': 'Caché de imágenes: {aciertos} aciertos, {fallos} fallos',
+        'respuesta_desde_cache': 'Respuesta de {modelo} recuperada de la caché (sin coste)',
+        'regenerar_texto': 'Regenerar texto',
+        'regenerar_texto_tooltip': 'Pedir de nuevo el texto al modelo aunque ya esté guardado en la caché',
+        'modelo_imagen_desconocido': 'El modelo de imagen {modelo} no está en el catálogo de modelos',
+        'reintentando_en': 'Reintentando (intento {intento}/{max_intentos}) en {segundos} s...',
+        'reintentos_agotados': 'No se pudo completar la petición tras {intentos} intentos: {error}',
+        'limite_ritmo_en_cola': '{proveedor} ha limitado el ritmo (429); la petición espera su turno en la cola',
+        'limite_ritmo_agotado': '{proveedor} sigue limitando el ritmo tras {segundos} s esperando en la cola: {error}',
+        'circuito_abierto': '{proveedor} ha fallado demasiadas veces seguidas; no se le harán más peticiones durante {segundos} s',
+        'imagen_duplicada': 'La imagen {numero} tarda más de {segundos} s; se lanza una petición de respaldo con {modelo}',
+        'cobertura_estadisticas': 'Peticiones de respaldo de imágenes: {duplicadas} (llegaron antes: {ganadas})',
+        'modelo_fallido_respaldo': '{modelo} ha fallado ({error}); se prueba con {respaldo}',
+        'texto_con_respaldo': 'El texto se ha generado con {modelo} en lugar de {original}',
+        'imagen_con_respaldo': 'La imagen {numero} se ha generado con {modelo} en lugar de {original}',
+        'imagen_sustituida': 'Ningún modelo ha podido generar la imagen {numero}; se usa una imagen de relleno para conservar la presentación',
+        'imagen_relleno': 'imagen de relleno',
+        'modelos_por_diapositiva': 'Modelo de imagen de cada diapositiva: {detalle}',
+        'plazo_superado': 'Error en intento {intento}: {modelo} superó el plazo de {segundos} s en la etapa \'{etapa}\'; se aborta la llamada',
+        'etapa_conexion': 'conexión',
+        'etapa_espera_modelo': 'espera del modelo',
+        'etapa_stream': 'recepción del texto',
+        'etapa_descarga': 'descarga de la imagen',
+        'reanudando_presentacion': 'Reanudando la última presentación: {hechas} de {total} imágenes ya generadas',
+        'texto_recuperado': 'Texto recuperado del intento anterior ({total} diapositivas)',
+        'imagen_recuperada': 'Imagen {numero} recuperada del intento anterior',
+        'reanudar_presentacion': 'Reanudar última presentación',
+        'reanudar_presentacion_tooltip': 'Recupera el texto y las {hechas} de {total} imágenes ya generadas y solo genera lo que falta',
+        'log_mensajes_omitidos': '({omitidos} mensajes omitidos en esta ventana; están en el archivo de registro)',
     },
     'en': {
         'auto_open': 'Automatically open presentation',
@@ -441,6 +471,36 @@ traducciones = {
         'error_cargar_imagen_mensaje': 'Error loading image: {}',
         'seleccionar_imagen_personalizada': 'Select image',
         'imagen_filter': 'Images',
+        'imagenes_en_paralelo': 'Generating {total} images in parallel (up to {maximo} at a time)',
+        'cache_imagenes_estadisticas': 'Image cache: {aciertos} hits, {fallos} misses',
+        'respuesta_desde_cache': '{modelo} response loaded from cache (no cost)',
+        'regenerar_texto': 'Regenerate text',
+        'regenerar_texto_tooltip': 'Ask the model for new text even if it is already cached',
+        'modelo_imagen_desconocido': 'Image model {modelo} is not in the model catalog',
+        'reintentando_en': 'Retrying (attempt {intento}/{max_intentos}) in {segundos} s...',
+        'reintentos_agotados': 'The request could not be completed after {intentos} attempts: {error}',
+        'limite_ritmo_en_cola': '{proveedor} is rate limiting (429); the request is waiting in the queue',
+        'limite_ritmo_agotado': '{proveedor} is still rate limiting after {segundos} s in the queue: {error}',
+        'circuito_abierto': '{proveedor} has failed too many times in a row; no more requests will be sent to it for {segundos} s',
+        'imagen_duplicada': 'Image {numero} is taking longer than {segundos} s; sending a backup request with {modelo}',
+        'cobertura_estadisticas': 'Backup image requests: {duplicadas} (arrived first: {ganadas})',
+        'modelo_fallido_respaldo': '{modelo} failed ({error}); trying {respaldo}',
+        'texto_con_respaldo': 'The text was generated with {modelo} instead of {original}',
+        'imagen_con_respaldo': 'Image {numero} was generated with {modelo} instead of {original}',
+        'imagen_sustituida': 'No model could generate image {numero}; using a placeholder image to keep the presentation',
+        'imagen_relleno': 'placeholder image',
+        'modelos_por_diapositiva': 'Image model used for each slide: {detalle}',
+        'plazo_superado': 'Error in attempt {intento}: {modelo} exceeded the {segundos} s deadline during \'{etapa}\'; aborting the call',
+        'etapa_conexion': 'connection',
+        'etapa_espera_modelo': 'waiting for the model',
+        'etapa_stream': 'receiving the text stream',
+        'etapa_descarga': 'image download',
+        'reanudando_presentacion': 'Resuming the last presentation: {hechas} of {total} images already generated',
+        'texto_recuperado': 'Text recovered from the previous attempt ({total} slides)',
+        'imagen_recuperada': 'Image {numero} recovered from the previous attempt',
+        'reanudar_presentacion': 'Resume last presentation',
+        'reanudar_presentacion_tooltip': 'Reuses the text and the {hechas} of {total} images already generated and only generates what is missing',
+        'log_mensajes_omitidos': '({omitidos} messages skipped in this window; they are in the log file)',
     },
     'fr': {
         'auto_open': 'Ouvrir automatiquement la présentation',
@@ -662,6 +722,36 @@ traducciones = {
         'error_cargar_imagen_mensaje': 'Erreur lors du chargement de l\'image : {}',
         'seleccionar_imagen_personalizada': 'Sélectionner une image',
         'imagen_filter': 'Images',
+        'imagenes_en_paralelo': 'Génération de {total} images en parallèle ({maximo} maximum à la fois)',
+        'cache_imagenes_estadisticas': 'Cache d\'images : {aciertos} succès, {fallos} échecs',
+        'respuesta_desde_cache': 'Réponse de {modelo} récupérée du cache (sans coût)',
+        'regenerar_texto': 'Régénérer le texte',
+        'regenerar_texto_tooltip': 'Redemander le texte au modèle même s\'il est déjà en cache',
+        'modelo_imagen_desconocido': 'Le modèle d\'image {modelo} n\'est pas dans le catalogue de modèles',
+        'reintentando_en': 'Nouvelle tentative ({intento}/{max_intentos}) dans {segundos} s...',
+        'reintentos_agotados': 'La requête n\'a pas pu aboutir après {intentos} tentatives : {error}',
+        'limite_ritmo_en_cola': '{proveedor} limite le débit (429) ; la requête attend son tour dans la file',
+        'limite_ritmo_agotado': '{proveedor} limite toujours le débit après {segundos} s dans la file : {error}',
+        'circuito_abierto': '{proveedor} a échoué trop de fois d\'affilée ; aucune requête ne lui sera envoyée pendant {segundos} s',
+        'imagen_duplicada': 'L\'image {numero} prend plus de {segundos} s ; envoi d\'une requête de secours avec {modelo}',
+        'cobertura_estadisticas': 'Requêtes d\'images de secours : {duplicadas} (arrivées en premier : {ganadas})',
+        'modelo_fallido_respaldo': '{modelo} a échoué ({error}) ; essai avec {respaldo}',
+        'texto_con_respaldo': 'Le texte a été généré avec {modelo} au lieu de {original}',
+        'imagen_con_respaldo': 'L\'image {numero} a été générée avec {modelo} au lieu de {original}',
+        'imagen_sustituida': 'Aucun modèle n\'a pu générer l\'image {numero} ; une image de remplacement est utilisée pour conserver la présentation',
+        'imagen_relleno': 'image de remplacement',
+        'modelos_por_diapositiva': 'Modèle d\'image de chaque diapositive : {detalle}',
+        'plazo_superado': 'Erreur à la tentative {intento} : {modelo} a dépassé le délai de {segundos} s pendant « {etapa} » ; l\'appel est abandonné',
+        'etapa_conexion': 'connexion',
+        'etapa_espera_modelo': 'attente du modèle',
+        'etapa_stream': 'réception du texte',
+        'etapa_descarga': 'téléchargement de l\'image',
+        'reanudando_presentacion': 'Reprise de la dernière présentation : {hechas} images sur {total} déjà générées',
+        'texto_recuperado': 'Texte récupéré de la tentative précédente ({total} diapositives)',
+        'imagen_recuperada': 'Image {numero} récupérée de la tentative précédente',
+        'reanudar_presentacion': 'Reprendre la dernière présentation',
+        'reanudar_presentacion_tooltip': 'Réutilise le texte et les {hechas} images sur {total} déjà générées et ne génère que ce qui manque',
+        'log_mensajes_omitidos': '({omitidos} messages omis dans cette fenêtre ; ils sont dans le fichier journal)',
     },
     'pt': {
         'auto_open': 'Abrir apresentação automaticamente',
@@ -883,6 +973,36 @@ traducciones = {
         'error_cargar_imagen_mensaje': 'Erreur lors du chargement de l\'image : {}',
         'seleccionar_imagen_personalizada': 'Selecionar imagem',
         'imagen_filter': 'Imagens',
+        'imagenes_en_paralelo': 'Gerando {total} imagens em paralelo (no máximo {maximo} por vez)',
+        'cache_imagenes_estadisticas': 'Cache de imagens: {aciertos} acertos, {fallos} falhas',
+        'respuesta_desde_cache': 'Resposta de {modelo} recuperada do cache (sem custo)',
+        'regenerar_texto': 'Regenerar texto',
+        'regenerar_texto_tooltip': 'Pedir novamente o texto ao modelo mesmo que já esteja em cache',
+        'modelo_imagen_desconocido': 'O modelo de imagem {modelo} não está no catálogo de modelos',
+        'reintentando_en': 'Tentando novamente (tentativa {intento}/{max_intentos}) em {segundos} s...',
+        'reintentos_agotados': 'Não foi possível concluir a solicitação após {intentos} tentativas: {error}',
+        'limite_ritmo_en_cola': '{proveedor} limitou o ritmo (429); a requisição aguarda a vez na fila',
+        'limite_ritmo_agotado': '{proveedor} continua limitando o ritmo após {segundos} s na fila: {error}',
+        'circuito_abierto': '{proveedor} falhou muitas vezes seguidas; não serão enviadas mais solicitações durante {segundos} s',
+        'imagen_duplicada': 'A imagem {numero} está demorando mais de {segundos} s; enviando uma solicitação de reserva com {modelo}',
+        'cobertura_estadisticas': 'Solicitações de imagens de reserva: {duplicadas} (chegaram primeiro: {ganadas})',
+        'modelo_fallido_respaldo': '{modelo} falhou ({error}); tentando com {respaldo}',
+        'texto_con_respaldo': 'O texto foi gerado com {modelo} em vez de {original}',
+        'imagen_con_respaldo': 'A imagem {numero} foi gerada com {modelo} em vez de {original}',
+        'imagen_sustituida': 'Nenhum modelo conseguiu gerar a imagem {numero}; usando uma imagem de preenchimento para manter a apresentação',
+        'imagen_relleno': 'imagem de preenchimento',
+        'modelos_por_diapositiva': 'Modelo de imagem de cada slide: {detalle}',
+        'plazo_superado': 'Erro na tentativa {intento}: {modelo} excedeu o prazo de {segundos} s na etapa \'{etapa}\'; a chamada é abortada',
+        'etapa_conexion': 'conexão',
+        'etapa_espera_modelo': 'espera do modelo',
+        'etapa_stream': 'recepção do texto',
+        'etapa_descarga': 'download da imagem',
+        'reanudando_presentacion': 'Retomando a última apresentação: {hechas} de {total} imagens já geradas',
+        'texto_recuperado': 'Texto recuperado da tentativa anterior ({total} slides)',
+        'imagen_recuperada': 'Imagem {numero} recuperada da tentativa anterior',
+        'reanudar_presentacion': 'Retomar última apresentação',
+        'reanudar_presentacion_tooltip': 'Reutiliza o texto e as {hechas} de {total} imagens já geradas e só gera o que falta',
+        'log_mensajes_omitidos': '({omitidos} mensagens omitidas nesta janela; estão no arquivo de registro)',
     },
     'it': {
         'auto_open': 'Apri presentazione automaticamente',
@@ -1104,6 +1224,36 @@ traducciones = {
         'error_cargar_imagen_mensaje': 'Errore lors del caricamento dell\'immagine : {}',
         'seleccionar_imagen_personalizada': 'Seleziona immagine',
         'imagen_filter': 'Immagini',
+        'imagenes_en_paralelo': 'Generazione di {total} immagini in parallelo (massimo {maximo} alla volta)',
+        'cache_imagenes_estadisticas': 'Cache immagini: {aciertos} successi, {fallos} mancati',
+        'respuesta_desde_cache': 'Risposta di {modelo} recuperata dalla cache (senza costi)',
+        'regenerar_texto': 'Rigenera testo',
+        'regenerar_texto_tooltip': 'Richiedi di nuovo il testo al modello anche se è già in cache',
+        'modelo_imagen_desconocido': 'Il modello di immagine {modelo} non è nel catalogo dei modelli',
+        'reintentando_en': 'Nuovo tentativo ({intento}/{max_intentos}) tra {segundos} s...',
+        'reintentos_agotados': 'Impossibile completare la richiesta dopo {intentos} tentativi: {error}',
+        'limite_ritmo_en_cola': '{proveedor} sta limitando la frequenza (429); la richiesta attende il suo turno in coda',
+        'limite_ritmo_agotado': '{proveedor} continua a limitare la frequenza dopo {segundos} s in coda: {error}',
+        'circuito_abierto': '{proveedor} ha fallito troppe volte di seguito; non verranno inviate altre richieste per {segundos} s',
+        'imagen_duplicada': 'L\'immagine {numero} impiega più di {segundos} s; invio di una richiesta di riserva con {modelo}',
+        'cobertura_estadisticas': 'Richieste di immagini di riserva: {duplicadas} (arrivate prima: {ganadas})',
+        'modelo_fallido_respaldo': '{modelo} non è riuscito ({error}); si prova con {respaldo}',
+        'texto_con_respaldo': 'Il testo è stato generato con {modelo} invece di {original}',
+        'imagen_con_respaldo': 'L\'immagine {numero} è stata generata con {modelo} invece di {original}',
+        'imagen_sustituida': 'Nessun modello è riuscito a generare l\'immagine {numero}; si usa un\'immagine segnaposto per conservare la presentazione',
+        'imagen_relleno': 'immagine segnaposto',
+        'modelos_por_diapositiva': 'Modello di immagine di ogni diapositiva: {detalle}',
+        'plazo_superado': 'Errore nel tentativo {intento}: {modelo} ha superato il limite di {segundos} s nella fase \'{etapa}\'; la chiamata viene interrotta',
+        'etapa_conexion': 'connessione',
+        'etapa_espera_modelo': 'attesa del modello',
+        'etapa_stream': 'ricezione del testo',
+        'etapa_descarga': 'download dell\'immagine',
+        'reanudando_presentacion': 'Ripresa dell\'ultima presentazione: {hechas} di {total} immagini già generate',
+        'texto_recuperado': 'Testo recuperato dal tentativo precedente ({total} diapositive)',
+        'imagen_recuperada': 'Immagine {numero} recuperata dal tentativo precedente',
+        'reanudar_presentacion': 'Riprendi l\'ultima presentazione',
+        'reanudar_presentacion_tooltip': 'Riutilizza il testo e le {hechas} di {total} immagini già generate e genera solo ciò che manca',
+        'log_mensajes_omitidos': '({omitidos} messaggi omessi in questa finestra; sono nel file di log)',
     },
     'de': {
         'auto_open': 'Präsentation automatisch öffnen',
@@ -1325,6 +1475,36 @@ traducciones = {
         'error_cargar_imagen_mensaje': 'Fehler beim Laden des Bildes: {}',
         'seleccionar_imagen_personalizada': 'Bild auswählen',
         'imagen_filter': 'Bilder',
+        'imagenes_en_paralelo': 'Generiere {total} Bilder parallel (höchstens {maximo} gleichzeitig)',
+        'cache_imagenes_estadisticas': 'Bild-Cache: {aciertos} Treffer, {fallos} Fehlschläge',
+        'respuesta_desde_cache': 'Antwort von {modelo} aus dem Cache geladen (kostenlos)',
+        'regenerar_texto': 'Text neu generieren',
+        'regenerar_texto_tooltip': 'Den Text erneut beim Modell anfordern, auch wenn er bereits im Cache ist',
+        'modelo_imagen_desconocido': 'Das Bildmodell {modelo} ist nicht im Modellkatalog',
+        'reintentando_en': 'Neuer Versuch ({intento}/{max_intentos}) in {segundos} s...',
+        'reintentos_agotados': 'Die Anfrage konnte nach {intentos} Versuchen nicht abgeschlossen werden: {error}',
+        'limite_ritmo_en_cola': '{proveedor} begrenzt die Rate (429); die Anfrage wartet in der Warteschlange',
+        'limite_ritmo_agotado': '{proveedor} begrenzt die Rate nach {segundos} s in der Warteschlange immer noch: {error}',
+        'circuito_abierto': '{proveedor} ist zu oft hintereinander fehlgeschlagen; für {segundos} s werden keine Anfragen mehr gesendet',
+        'imagen_duplicada': 'Bild {numero} dauert länger als {segundos} s; Ersatzanfrage mit {modelo} wird gesendet',
+        'cobertura_estadisticas': 'Ersatzanfragen für Bilder: {duplicadas} (zuerst angekommen: {ganadas})',
+        'modelo_fallido_respaldo': '{modelo} ist fehlgeschlagen ({error}); versuche {respaldo}',
+        'texto_con_respaldo': 'Der Text wurde mit {modelo} statt {original} erzeugt',
+        'imagen_con_respaldo': 'Bild {numero} wurde mit {modelo} statt {original} erzeugt',
+        'imagen_sustituida': 'Kein Modell konnte Bild {numero} erzeugen; ein Platzhalterbild wird verwendet, um die Präsentation zu erhalten',
+        'imagen_relleno': 'Platzhalterbild',
+        'modelos_por_diapositiva': 'Bildmodell pro Folie: {detalle}',
+        'plazo_superado': 'Fehler bei Versuch {intento}: {modelo} hat die Frist von {segundos} s in der Phase \'{etapa}\' überschritten; der Aufruf wird abgebrochen',
+        'etapa_conexion': 'Verbindung',
+        'etapa_espera_modelo': 'Warten auf das Modell',
+        'etapa_stream': 'Empfang des Textes',
+        'etapa_descarga': 'Bild-Download',
+        'reanudando_presentacion': 'Letzte Präsentation wird fortgesetzt: {hechas} von {total} Bildern bereits erzeugt',
+        'texto_recuperado': 'Text aus dem vorherigen Versuch wiederhergestellt ({total} Folien)',
+        'imagen_recuperada': 'Bild {numero} aus dem vorherigen Versuch wiederhergestellt',
+        'reanudar_presentacion': 'Letzte Präsentation fortsetzen',
+        'reanudar_presentacion_tooltip': 'Verwendet den Text und die {hechas} von {total} bereits erzeugten Bildern wieder und erzeugt nur, was fehlt',
+        'log_mensajes_omitidos': '({omitidos} Meldungen in diesem Fenster ausgelassen; sie stehen in der Protokolldatei)',
     },
     'ru': {
         'auto_open': 'Автоматически открывать презентацию',
@@ -1546,6 +1726,36 @@ traducciones = {
         'error_cargar_imagen_mensaje': 'Ошибка при загрузке изображения: {}',
         'seleccionar_imagen_personalizada': 'Выбрать изображение',
         'imagen_filter': 'Изображения',
+        'imagenes_en_paralelo': 'Параллельное создание {total} изображений (не более {maximo} одновременно)',
+        'cache_imagenes_estadisticas': 'Кэш изображений: {aciertos} попаданий, {fallos} промахов',
+        'respuesta_desde_cache': 'Ответ {modelo} загружен из кэша (бесплатно)',
+        'regenerar_texto': 'Заново создать текст',
+        'regenerar_texto_tooltip': 'Запросить текст у модели заново, даже если он уже есть в кэше',
+        'modelo_imagen_desconocido': 'Модель изображений {modelo} отсутствует в каталоге моделей',
+        'reintentando_en': 'Повторная попытка ({intento}/{max_intentos}) через {segundos} с...',
+        'reintentos_agotados': 'Не удалось выполнить запрос после {intentos} попыток: {error}',
+        'limite_ritmo_en_cola': '{proveedor} ограничивает частоту запросов (429); запрос ждёт своей очереди',
+        'limite_ritmo_agotado': '{proveedor} всё ещё ограничивает частоту после {segundos} с ожидания в очереди: {error}',
+        'circuito_abierto': '{proveedor} слишком много раз подряд вернул ошибку; запросы не будут отправляться {segundos} с',
+        'imagen_duplicada': 'Изображение {numero} генерируется дольше {segundos} с; отправляется резервный запрос к {modelo}',
+        'cobertura_estadisticas': 'Резервные запросы изображений: {duplicadas} (пришли первыми: {ganadas})',
+        'modelo_fallido_respaldo': '{modelo} завершился с ошибкой ({error}); пробуем {respaldo}',
+        'texto_con_respaldo': 'Текст сгенерирован с помощью {modelo} вместо {original}',
+        'imagen_con_respaldo': 'Изображение {numero} сгенерировано с помощью {modelo} вместо {original}',
+        'imagen_sustituida': 'Ни одна модель не смогла создать изображение {numero}; используется заглушка, чтобы сохранить презентацию',
+        'imagen_relleno': 'заглушка',
+        'modelos_por_diapositiva': 'Модель изображения для каждого слайда: {detalle}',
+        'plazo_superado': 'Ошибка в попытке {intento}: {modelo} превысил срок {segundos} с на этапе «{etapa}»; вызов прерван',
+        'etapa_conexion': 'подключение',
+        'etapa_espera_modelo': 'ожидание модели',
+        'etapa_stream': 'получение текста',
+        'etapa_descarga': 'загрузка изображения',
+        'reanudando_presentacion': 'Возобновление последней презентации: {hechas} из {total} изображений уже создано',
+        'texto_recuperado': 'Текст восстановлен из предыдущей попытки ({total} слайдов)',
+        'imagen_recuperada': 'Изображение {numero} восстановлено из предыдущей попытки',
+        'reanudar_presentacion': 'Продолжить последнюю презентацию',
+        'reanudar_presentacion_tooltip': 'Использует текст и {hechas} из {total} уже созданных изображений и создаёт только недостающее',
+        'log_mensajes_omitidos': '({omitidos} сообщений пропущено в этом окне; они есть в файле журнала)',
     },
     'cn': {
         'auto_open': '自动打开演示文稿',
@@ -1767,6 +1977,36 @@ traducciones = {
         'error_cargar_imagen_mensaje': '加载图片时出错: {}',
         'seleccionar_imagen_personalizada': '选择图片',
         'imagen_filter': '图片',
+        'imagenes_en_paralelo': '正在并行生成{total}张图像（每次最多{maximo}张）',
+        'cache_imagenes_estadisticas': '图像缓存：{aciertos} 次命中，{fallos} 次未命中',
+        'respuesta_desde_cache': '已从缓存加载 {modelo} 的响应（无费用）',
+        'regenerar_texto': '重新生成文本',
+        'regenerar_texto_tooltip': '即使文本已缓存，也重新向模型请求',
+        'modelo_imagen_desconocido': '图像模型 {modelo} 不在模型目录中',
+        'reintentando_en': '{segundos} 秒后重试（第 {intento}/{max_intentos} 次）...',
+        'reintentos_agotados': '尝试 {intentos} 次后仍无法完成请求：{error}',
+        'limite_ritmo_en_cola': '{proveedor} 正在限制请求频率 (429)；请求在队列中等待',
+        'limite_ritmo_agotado': '在队列中等待 {segundos} 秒后，{proveedor} 仍在限制请求频率：{error}',
+        'circuito_abierto': '{proveedor} 连续失败次数过多；{segundos} 秒内不再向其发送请求',
+        'imagen_duplicada': '图片 {numero} 耗时超过 {segundos} 秒；正在使用 {modelo} 发送备用请求',
+        'cobertura_estadisticas': '备用图片请求：{duplicadas}（先到达：{ganadas}）',
+        'modelo_fallido_respaldo': '{modelo} 失败（{error}）；正在尝试 {respaldo}',
+        'texto_con_respaldo': '文本已使用 {modelo} 而不是 {original} 生成',
+        'imagen_con_respaldo': '图片 {numero} 已使用 {modelo} 而不是 {original} 生成',
+        'imagen_sustituida': '没有模型能生成图片 {numero}；使用占位图片以保留演示文稿',
+        'imagen_relleno': '占位图片',
+        'modelos_por_diapositiva': '每张幻灯片使用的图片模型：{detalle}',
+        'plazo_superado': '第 {intento} 次尝试出错：{modelo} 在“{etapa}”阶段超过了 {segundos} 秒的时限；已中止调用',
+        'etapa_conexion': '连接',
+        'etapa_espera_modelo': '等待模型',
+        'etapa_stream': '接收文本',
+        'etapa_descarga': '下载图片',
+        'reanudando_presentacion': '正在继续上一个演示文稿：已生成 {hechas}/{total} 张图片',
+        'texto_recuperado': '已从上次尝试中恢复文本（{total} 张幻灯片）',
+        'imagen_recuperada': '已从上次尝试中恢复图片 {numero}',
+        'reanudar_presentacion': '继续上一个演示文稿',
+        'reanudar_presentacion_tooltip': '复用文本和已生成的 {hechas}/{total} 张图片，只生成缺少的部分',
+        'log_mensajes_omitidos': '（此窗口中省略了 {omitidos} 条消息；它们记录在日志文件中）',
     },
     'jp': {
         'auto_open': '自動的にプレゼンテーションを開く',
@@ -1988,6 +2228,36 @@ traducciones = {
         'error_cargar_imagen_mensaje': '画像の読み込み中にエラーが発生しました: {}',
         'seleccionar_imagen_personalizada': '画像を選択',
         'imagen_filter': '画像',
+        'imagenes_en_paralelo': '{total}枚の画像を並列生成中（同時に最大{maximo}枚）',
+        'cache_imagenes_estadisticas': '画像キャッシュ: ヒット {aciertos} 件、ミス {fallos} 件',
+        'respuesta_desde_cache': '{modelo} の応答をキャッシュから読み込みました（費用なし）',
+        'regenerar_texto': 'テキストを再生成',
+        'regenerar_texto_tooltip': 'キャッシュ済みでもモデルにテキストを再度リクエストします',
+        'modelo_imagen_desconocido': '画像モデル {modelo} はモデルカタログにありません',
+        'reintentando_en': '{segundos} 秒後に再試行します（{intento}/{max_intentos} 回目）...',
+        'reintentos_agotados': '{intentos} 回試行しましたがリクエストを完了できませんでした: {error}',
+        'limite_ritmo_en_cola': '{proveedor} がレート制限中です (429)。リクエストはキューで順番を待っています',
+        'limite_ritmo_agotado': 'キューで {segundos} 秒待っても {proveedor} のレート制限が続いています: {error}',
+        'circuito_abierto': '{proveedor} が連続して失敗しすぎました。{segundos} 秒間はリクエストを送信しません',
+        'imagen_duplicada': '画像 {numero} が {segundos} 秒以上かかっています。{modelo} で予備リクエストを送信します',
+        'cobertura_estadisticas': '画像の予備リクエスト: {duplicadas}（先に到着: {ganadas}）',
+        'modelo_fallido_respaldo': '{modelo} が失敗しました（{error}）。{respaldo} を試します',
+        'texto_con_respaldo': 'テキストは {original} の代わりに {modelo} で生成されました',
+        'imagen_con_respaldo': '画像 {numero} は {original} の代わりに {modelo} で生成されました',
+        'imagen_sustituida': '画像 {numero} を生成できるモデルがありませんでした。プレゼンテーションを残すためにプレースホルダー画像を使用します',
+        'imagen_relleno': 'プレースホルダー画像',
+        'modelos_por_diapositiva': '各スライドの画像モデル: {detalle}',
+        'plazo_superado': '試行 {intento} でエラー: {modelo} が「{etapa}」の段階で {segundos} 秒の期限を超えました。呼び出しを中止します',
+        'etapa_conexion': '接続',
+        'etapa_espera_modelo': 'モデル待ち',
+        'etapa_stream': 'テキスト受信',
+        'etapa_descarga': '画像のダウンロード',
+        'reanudando_presentacion': '前回のプレゼンテーションを再開しています: {total} 枚中 {hechas} 枚の画像は生成済み',
+        'texto_recuperado': '前回の試行からテキストを復元しました（{total} 枚のスライド）',
+        'imagen_recuperada': '画像 {numero} を前回の試行から復元しました',
+        'reanudar_presentacion': '前回のプレゼンテーションを再開',
+        'reanudar_presentacion_tooltip': 'テキストと生成済みの {total} 枚中 {hechas} 枚の画像を再利用し、足りない分だけを生成します',
+        'log_mensajes_omitidos': '（このウィンドウでは {omitidos} 件のメッセージを省略しました。ログファイルに記録されています）',
     },
     'kr': {
         'auto_open': '프레젠테이션 자동 열기',
@@ -2209,6 +2479,36 @@ traducciones = {
         'error_cargar_imagen_mensaje': '이미지 로드 중 오류 발생: {}',
         'seleccionar_imagen_personalizada': '이미지 선택',
         'imagen_filter': '이미지',
+        'imagenes_en_paralelo': '{total}개의 이미지를 병렬로 생성 중 (동시에 최대 {maximo}개)',
+        'cache_imagenes_estadisticas': '이미지 캐시: 적중 {aciertos}회, 실패 {fallos}회',
+        'respuesta_desde_cache': '{modelo} 응답을 캐시에서 불러왔습니다 (비용 없음)',
+        'regenerar_texto': '텍스트 다시 생성',
+        'regenerar_texto_tooltip': '이미 캐시되어 있어도 모델에 텍스트를 다시 요청합니다',
+        'modelo_imagen_desconocido': '이미지 모델 {modelo}이(가) 모델 카탈로그에 없습니다',
+        'reintentando_en': '{segundos}초 후 다시 시도합니다 ({intento}/{max_intentos}번째)...',
+        'reintentos_agotados': '{intentos}번 시도했지만 요청을 완료하지 못했습니다: {error}',
+        'limite_ritmo_en_cola': '{proveedor}이(가) 요청 속도를 제한하고 있습니다 (429). 요청이 대기열에서 기다리는 중입니다',
+        'limite_ritmo_agotado': '대기열에서 {segundos}초를 기다렸지만 {proveedor}이(가) 여전히 속도를 제한하고 있습니다: {error}',
+        'circuito_abierto': '{proveedor}이(가) 연속으로 너무 많이 실패했습니다. {segundos}초 동안 요청을 보내지 않습니다',
+        'imagen_duplicada': '이미지 {numero} 생성이 {segundos}초 이상 걸리고 있습니다. {modelo}(으)로 예비 요청을 보냅니다',
+        'cobertura_estadisticas': '예비 이미지 요청: {duplicadas} (먼저 도착: {ganadas})',
+        'modelo_fallido_respaldo': '{modelo} 실패 ({error}); {respaldo}(으)로 시도합니다',
+        'texto_con_respaldo': '텍스트가 {original} 대신 {modelo}(으)로 생성되었습니다',
+        'imagen_con_respaldo': '이미지 {numero}이(가) {original} 대신 {modelo}(으)로 생성되었습니다',
+        'imagen_sustituida': '이미지 {numero}을(를) 생성할 수 있는 모델이 없습니다. 프레젠테이션을 유지하기 위해 대체 이미지를 사용합니다',
+        'imagen_relleno': '대체 이미지',
+        'modelos_por_diapositiva': '슬라이드별 이미지 모델: {detalle}',
+        'plazo_superado': '시도 {intento} 오류: {modelo}이(가) \'{etapa}\' 단계에서 {segundos}초 제한을 초과했습니다. 호출을 중단합니다',
+        'etapa_conexion': '연결',
+        'etapa_espera_modelo': '모델 대기',
+        'etapa_stream': '텍스트 수신',
+        'etapa_descarga': '이미지 다운로드',
+        'reanudando_presentacion': '마지막 프레젠테이션을 이어서 생성합니다: {total}개 중 {hechas}개 이미지 생성됨',
+        'texto_recuperado': '이전 시도에서 텍스트를 복구했습니다 ({total}개 슬라이드)',
+        'imagen_recuperada': '이미지 {numero}을(를) 이전 시도에서 복구했습니다',
+        'reanudar_presentacion': '마지막 프레젠테이션 이어서 생성',
+        'reanudar_presentacion_tooltip': '텍스트와 이미 생성된 {total}개 중 {hechas}개 이미지를 재사용하고 부족한 부분만 생성합니다',
+        'log_mensajes_omitidos': '(이 창에서 {omitidos}개의 메시지를 생략했습니다. 로그 파일에 기록되어 있습니다)',
     },
     'ar': {
         'auto_open': 'فتح العرض التقديمي تلقائيًا',
@@ -2430,6 +2730,36 @@ traducciones = {
         'error_cargar_imagen_mensaje': 'خطأ في تحميل الصورة: {}',
         'seleccionar_imagen_personalizada': 'اختيار الصورة',
         'imagen_filter': 'صور',
+        'imagenes_en_paralelo': 'إنشاء {total} صور بالتوازي (بحد أقصى {maximo} في المرة الواحدة)',
+        'cache_imagenes_estadisticas': 'ذاكرة الصور المؤقتة: {aciertos} إصابات، {fallos} إخفاقات',
+        'respuesta_desde_cache': 'تم تحميل استجابة {modelo} من الذاكرة المؤقتة (بدون تكلفة)',
+        'regenerar_texto': 'إعادة توليد النص',
+        'regenerar_texto_tooltip': 'طلب النص من النموذج مجددًا حتى لو كان محفوظًا في الذاكرة المؤقتة',
+        'modelo_imagen_desconocido': 'نموذج الصور {modelo} غير موجود في كتالوج النماذج',
+        'reintentando_en': 'إعادة المحاولة ({intento}/{max_intentos}) خلال {segundos} ث...',
+        'reintentos_agotados': 'تعذّر إكمال الطلب بعد {intentos} محاولات: {error}',
+        'limite_ritmo_en_cola': 'يقوم {proveedor} بتقييد معدل الطلبات (429)؛ الطلب ينتظر دوره في قائمة الانتظار',
+        'limite_ritmo_agotado': 'لا يزال {proveedor} يقيد معدل الطلبات بعد {segundos} ثانية في قائمة الانتظار: {error}',
+        'circuito_abierto': 'فشل {proveedor} مرات كثيرة متتالية؛ لن تُرسل إليه طلبات أخرى لمدة {segundos} ث',
+        'imagen_duplicada': 'الصورة {numero} تستغرق أكثر من {segundos} ثانية؛ يتم إرسال طلب احتياطي باستخدام {modelo}',
+        'cobertura_estadisticas': 'طلبات الصور الاحتياطية: {duplicadas} (وصلت أولاً: {ganadas})',
+        'modelo_fallido_respaldo': 'فشل {modelo} ({error})؛ تتم المحاولة باستخدام {respaldo}',
+        'texto_con_respaldo': 'تم إنشاء النص باستخدام {modelo} بدلاً من {original}',
+        'imagen_con_respaldo': 'تم إنشاء الصورة {numero} باستخدام {modelo} بدلاً من {original}',
+        'imagen_sustituida': 'لم يتمكن أي نموذج من إنشاء الصورة {numero}؛ يتم استخدام صورة بديلة للحفاظ على العرض التقديمي',
+        'imagen_relleno': 'صورة بديلة',
+        'modelos_por_diapositiva': 'نموذج الصورة لكل شريحة: {detalle}',
+        'plazo_superado': 'خطأ في المحاولة {intento}: تجاوز {modelo} المهلة البالغة {segundos} ثانية في مرحلة \'{etapa}\'؛ تم إلغاء الاستدعاء',
+        'etapa_conexion': 'الاتصال',
+        'etapa_espera_modelo': 'انتظار النموذج',
+        'etapa_stream': 'استقبال النص',
+        'etapa_descarga': 'تنزيل الصورة',
+        'reanudando_presentacion': 'استئناف العرض الأخير: تم إنشاء {hechas} من {total} صور بالفعل',
+        'texto_recuperado': 'تم استرداد النص من المحاولة السابقة ({total} شرائح)',
+        'imagen_recuperada': 'تم استرداد الصورة {numero} من المحاولة السابقة',
+        'reanudar_presentacion': 'استئناف العرض الأخير',
+        'reanudar_presentacion_tooltip': 'يعيد استخدام النص و{hechas} من {total} صور تم إنشاؤها ويُنشئ الناقص فقط',
+        'log_mensajes_omitidos': '(تم تخطي {omitidos} رسالة في هذه النافذة؛ وهي موجودة في ملف السجل)',
     },
     'tl': {
         'auto_open': 'Awtomatikong buksan ang presentasyon',
@@ -2651,6 +2981,36 @@ traducciones = {
         'error_cargar_imagen_mensaje': 'Error sa pag-load ng larawan: {}',
         'seleccionar_imagen_personalizada': 'Pumili ng Larawan',
         'imagen_filter': 'Larawan',
+        'imagenes_en_paralelo': 'Gumagawa ng {total} larawan nang sabay-sabay (hanggang {maximo} bawat pagkakataon)',
+        'cache_imagenes_estadisticas': 'Image cache: {aciertos} tama, {fallos} mali',
+        'respuesta_desde_cache': 'Na-load mula sa cache ang sagot ng {modelo} (walang bayad)',
+        'regenerar_texto': 'I-regenerate ang teksto',
+        'regenerar_texto_tooltip': 'Humingi muli ng teksto sa model kahit naka-cache na ito',
+        'modelo_imagen_desconocido': 'Wala sa katalogo ng mga model ang image model na {modelo}',
+        'reintentando_en': 'Susubukang muli (pagsubok {intento}/{max_intentos}) sa loob ng {segundos} s...',
+        'reintentos_agotados': 'Hindi makumpleto ang kahilingan pagkatapos ng {intentos} pagsubok: {error}',
+        'limite_ritmo_en_cola': 'Nililimitahan ng {proveedor} ang bilis (429); naghihintay ang kahilingan sa pila',
+        'limite_ritmo_agotado': 'Nililimitahan pa rin ng {proveedor} ang bilis pagkatapos ng {segundos} s sa pila: {error}',
+        'circuito_abierto': 'Masyadong maraming sunod-sunod na pagkabigo ang {proveedor}; walang ipapadalang kahilingan sa loob ng {segundos} s',
+        'imagen_duplicada': 'Ang larawan {numero} ay tumatagal nang higit sa {segundos} s; nagpapadala ng backup na kahilingan gamit ang {modelo}',
+        'cobertura_estadisticas': 'Mga backup na kahilingan ng larawan: {duplicadas} (naunang dumating: {ganadas})',
+        'modelo_fallido_respaldo': 'Nabigo ang {modelo} ({error}); sinusubukan ang {respaldo}',
+        'texto_con_respaldo': 'Ang teksto ay ginawa gamit ang {modelo} sa halip na {original}',
+        'imagen_con_respaldo': 'Ang larawan {numero} ay ginawa gamit ang {modelo} sa halip na {original}',
+        'imagen_sustituida': 'Walang modelong nakagawa ng larawan {numero}; gumagamit ng pansamantalang larawan para mapanatili ang presentasyon',
+        'imagen_relleno': 'pansamantalang larawan',
+        'modelos_por_diapositiva': 'Modelo ng larawan sa bawat slide: {detalle}',
+        'plazo_superado': 'Error sa pagtatangka {intento}: lumampas ang {modelo} sa takdang {segundos} s sa yugtong \'{etapa}\'; itinigil ang tawag',
+        'etapa_conexion': 'koneksyon',
+        'etapa_espera_modelo': 'paghihintay sa modelo',
+        'etapa_stream': 'pagtanggap ng teksto',
+        'etapa_descarga': 'pag-download ng larawan',
+        'reanudando_presentacion': 'Ipinagpapatuloy ang huling presentasyon: {hechas} sa {total} na larawan ang nagawa na',
+        'texto_recuperado': 'Nabawi ang teksto mula sa nakaraang pagsubok ({total} na slide)',
+        'imagen_recuperada': 'Nabawi ang larawan {numero} mula sa nakaraang pagsubok',
+        'reanudar_presentacion': 'Ipagpatuloy ang huling presentasyon',
+        'reanudar_presentacion_tooltip': 'Ginagamit muli ang teksto at ang {hechas} sa {total} na larawang nagawa na at ginagawa lang ang kulang',
+        'log_mensajes_omitidos': '({omitidos} na mensahe ang nilaktawan sa window na ito; nasa log file ang mga ito)',
     }
 }
 
@@ -0,0 +1,235 @@
+import os, json, time, threading
+from contextlib import contextmanager, nullcontext
+from Configuracion import APP_DATA_DIR, obtener_config_store
+from Bitacora import obtener_registro
+
+# Registro del módulo
+registro = obtener_registro(__name__)
+
+# Carpeta con la traza de tiempos de cada presentación, en el formato de trazas de Chrome
+# (se abre en chrome://tracing o en https://ui.perfetto.dev para ver en qué se fue el tiempo)
+TRAZAS_DIR = os.path.join(APP_DATA_DIR, 'trazas')
+
+# Número máximo de trazas que se conservan (se borran las más antiguas)
+MAX_TRAZAS = 20
+
+# Clase que anota cuánto dura cada etapa de una generación
+# - al_evento(datos): recibe cada etapa terminada como un diccionario (nombre, categoria, inicio_ms, duracion_ms, hilo, args)
+# - en_disco: si al cerrarla se guarda en TRAZAS_DIR
+class Traza:
+    def __init__(self, nombre='presentacion', al_evento=None, en_disco=True):
+        self.nombre = nombre
+        self.al_evento = al_evento
+        self.en_disco = en_disco
+        self.eventos = []
+        self.hilos = {}
+        self._inicio = time.perf_counter()
+        self._creada = time.time()
+        self._bloqueo = threading.Lock()
+
+    # Función para convertir un instante de perf_counter en microsegundos desde el inicio de la traza
+    def _microsegundos(self, instante):
+        return round((instante - self._inicio) * 1_000_000, 1)
+
+    # Función para guardar un evento anotando el nombre del hilo la primera vez que aparece
+    def _agregar(self, evento):
+        hilo = threading.current_thread()
+        evento.update(pid=os.getpid(), tid=hilo.ident)
+        with self._bloqueo:
+            self.hilos.setdefault(hilo.ident, hilo.name)
+            self.eventos.append(evento)
+
+    # Función para anotar una etapa de la que ya se conocen el inicio y el fin (instantes de time.perf_counter)
+    def registrar(self, nombre, inicio, fin, categoria='generacion', **args):
+        self._agregar({'name': nombre, 'cat': categoria, 'ph': 'X', 'ts': self._microsegundos(inicio),
+                       'dur': round((fin - inicio) * 1_000_000, 1), 'args': args})
+        if self.al_evento:
+            self.al_evento({'nombre': nombre, 'categoria': categoria, 'inicio_ms': round((inicio - self._inicio) * 1000, 2),
+                            'duracion_ms': round((fin - inicio) * 1000, 2), 'hilo': threading.current_thread().name, 'args': args})
+
+    # Función para anotar un instante concreto (sin duración)
+    def marca(self, nombre, categoria='generacion', **args):
+        self._agregar({'name': nombre, 'cat': categoria, 'ph': 'i', 's': 't', 'ts': self._microsegundos(time.perf_counter()), 'args': args})
+
+    # Función para medir un bloque como una etapa; devuelve sus args para poder completarlos dentro del bloque
+    @contextmanager
+    def etapa(self, nombre, categoria='generacion', **args):
+        inicio = time.perf_counter()
+        try:
+            yield args
+        except BaseException as e:
+            args['error'] = type(e).__name__
+            raise
+        finally:
+            self.registrar(nombre, inicio, time.perf_counter(), categoria, **args)
+
+    # Función para medir cada llamada a los métodos designN de un objeto Diapositivas
+    def envolver_disenos(self, disenos):
+        return DisenosConTraza(disenos, self)
+
+    # Función para medir el primer fragmento y el análisis del texto que recibe un lector de secciones
+    def envolver_receptor(self, receptor):
+        return ReceptorConTraza(receptor, self)
+
+    # Función para obtener la traza en el formato de trazas de Chrome
+    def exportar(self, **metadatos):
+        with self._bloqueo:
+            eventos = list(self.eventos)
+            hilos = dict(self.hilos)
+        nombres_hilos = [{'name': 'thread_name', 'ph': 'M', 'pid': os.getpid(), 'tid': ident, 'args': {'name': nombre}}
+                         for ident, nombre in hilos.items()]
+        return {
+            'traceEvents': nombres_hilos + eventos,
+            'displayTimeUnit': 'ms',
+            'metadata': {'nombre': self.nombre, 'creada': self._creada, **metadatos},
+        }
+
+    # Función para guardar la traza en un archivo JSON (sin dejarlo a medias); devuelve su ruta
+    def guardar(self, ruta=None, **metadatos):
+        if ruta is None:
+            os.makedirs(TRAZAS_DIR, exist_ok=True)
+            ruta = os.path.join(TRAZAS_DIR, f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(self._creada))}_{self.nombre}.json")
+        temporal = ruta + '.tmp'
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump(self.exportar(**metadatos), f, ensure_ascii=False)
+        os.replace(temporal, ruta)
+        limpiar_trazas()
+        return ruta
+
+    # Función para terminar la traza, guardándola si corresponde; devuelve su ruta (None si no se guarda)
+    def cerrar(self, **metadatos):
+        if not self.en_disco:
+            return None
+        try:
+            return self.guardar(**metadatos)
+        except OSError as e:
+            registro.warning("Error al guardar la traza de la generación: %s", e)
+            return None
+
+# Clase con la misma interfaz que Traza que no anota nada (cuando las trazas están desactivadas y nadie escucha sus eventos)
+class TrazaNula:
+    nombre = None
+
+    def registrar(self, nombre, inicio, fin, categoria='generacion', **args):
+        pass
+
+    def marca(self, nombre, categoria='generacion', **args):
+        pass
+
+    def etapa(self, nombre, categoria='generacion', **args):
+        return nullcontext(args)
+
+    def envolver_disenos(self, disenos):
+        return disenos
+
+    def envolver_receptor(self, receptor):
+        return receptor
+
+    def guardar(self, ruta=None, **metadatos):
+        return None
+
+    def cerrar(self, **metadatos):
+        return None
+
+TRAZA_NULA = TrazaNula()
+
+# Clase que mide cada llamada a los métodos designN de un objeto Diapositivas (el resto de atributos pasan tal cual)
+class DisenosConTraza:
+    def __init__(self, disenos, traza):
+        self._disenos = disenos
+        self._traza = traza
+
+    def __getattr__(self, nombre):
+        atributo = getattr(self._disenos, nombre)
+        if not nombre.startswith('design') or not callable(atributo):
+            return atributo
+
+        # Función que aplica el diseño midiendo cuánto tarda
+        def disenar(*args, **kwargs):
+            with self._traza.etapa(nombre, 'diseno', titulo=args[1] if len(args) > 1 else None):
+                return atributo(*args, **kwargs)
+        return disenar
+
+# Clase que pasa los fragmentos del modelo de texto a un lector de secciones anotando
+# cuándo llega el primero (el TTFB del modelo) y cuánto tiempo se pasa analizándolos
+class ReceptorConTraza:
+    def __init__(self, receptor, traza):
+        self._receptor = receptor
+        self._traza = traza
+        self._inicio = time.perf_counter()
+        self.primer_fragmento = None
+        self.fragmentos = 0
+        self.segundos_analisis = 0.0
+
+    def reiniciar(self):
+        self._receptor.reiniciar()
+
+    def alimentar(self, fragmento):
+        inicio = time.perf_counter()
+        if self.primer_fragmento is None:
+            self.primer_fragmento = inicio
+            self._traza.registrar('primer_fragmento', self._inicio, inicio, 'texto')
+        try:
+            return self._receptor.alimentar(fragmento)
+        finally:
+            self.fragmentos += 1
+            self.segundos_analisis += time.perf_counter() - inicio
+
+    def __getattr__(self, nombre):
+        return getattr(self._receptor, nombre)
+
+    # Función para obtener los datos del stream que se añaden a la etapa del modelo de texto
+    def resumen(self):
+        return {
+            'ttfb_ms': round((self.primer_fragmento - self._inicio) * 1000, 2) if self.primer_fragmento else None,
+            'analisis_ms': round(self.segundos_analisis * 1000, 2),
+            'fragmentos': self.fragmentos,
+        }
+
+# Traza de la generación que se está haciendo en cada hilo
+_actual = threading.local()
+
+# Función para obtener la traza del hilo actual (TRAZA_NULA si no hay)
+def traza_actual():
+    return getattr(_actual, 'traza', None) or TRAZA_NULA
+
+# Función para usar una traza en el hilo actual mientras dura el bloque
+@contextmanager
+def usar_traza(traza):
+    anterior = getattr(_actual, 'traza', None)
+    _actual.traza = traza
+    try:
+        yield traza
+    finally:
+        _actual.traza = anterior
+
+# Función para medir un bloque con la traza del hilo actual (no hace nada si no hay traza)
+def medir(nombre, categoria='generacion', **args):
+    return traza_actual().etapa(nombre, categoria, **args)
+
+# Función para saber si se guardan las trazas (se puede desactivar con 'guardar_trazas' en config.json)
+def trazas_activadas():
+    try:
+        return bool(obtener_config_store().obtener('guardar_trazas', True))
+    except Exception as e:
+        registro.warning("Error al leer la configuración de las trazas: %s", e)
+        return True
+
+# Función para crear la traza de una generación (TRAZA_NULA si no se guarda ni nadie escucha sus eventos)
+def crear_traza(nombre='presentacion', al_evento=None):
+    en_disco = trazas_activadas()
+    if al_evento is None and not en_disco:
+        return TRAZA_NULA
+    return Traza(nombre, al_evento, en_disco)
+
+# Función para borrar las trazas más antiguas
+def limpiar_trazas(maximo=MAX_TRAZAS):
+    try:
+        nombres = sorted(nombre for nombre in os.listdir(TRAZAS_DIR) if nombre.endswith('.json'))
+    except FileNotFoundError:
+        return
+    for nombre in nombres[:-maximo or None]:
+        try:
+            os.remove(os.path.join(TRAZAS_DIR, nombre))
+        except OSError:
+            pass
@@ -0,0 +1,117 @@
+import time, hashlib, requests
+from concurrent.futures import ThreadPoolExecutor
+from Configuracion import obtener_config_store
+from Cliente_http import peticion, url_proveedor
+
+# Dirección usada para comprobar la conexión a Internet
+URL_CONEXION = "https://www.google.com"
+
+# Tiempos máximos de espera (en segundos) de cada comprobación
+TIMEOUT_CONEXION = 3
+TIMEOUT_VALIDACION = 10
+
+# Minutos durante los que se da por buena una clave ya validada (se puede cambiar con 'ttl_validacion_apis_minutos' en config.json)
+TTL_VALIDACION_MINUTOS = 10
+
+# Función para verificar la conexión a Internet
+def comprobar_conexion(timeout=TIMEOUT_CONEXION):
+    try:
+        peticion('GET', URL_CONEXION, timeout=timeout)
+        return True
+    except requests.RequestException:
+        return False
+
+# Función para validar la clave API de Replicate
+def validar_replicate(clave):
+    headers = {"Authorization": f"Token {clave}"}
+    response = peticion('GET', url_proveedor('replicate', '/v1/models'), 'replicate', headers=headers, timeout=TIMEOUT_VALIDACION)
+    return response.status_code == 200
+
+# Función para validar la clave API de xAI
+def validar_grok(clave):
+    headers = {
+        "Authorization": f"Bearer {clave}",
+        "Content-Type": "application/json"
+    }
+    response = peticion('GET', url_proveedor('xai', '/v1/models'), 'xai', headers=headers, timeout=TIMEOUT_VALIDACION)
+    return response.status_code in [200, 403]
+
+# Función para validar la clave API de Google
+def validar_google(clave):
+    headers = {"Content-Type": "application/json"}
+    url = url_proveedor('google', f"/v1beta/models?key={clave}")
+    response = peticion('GET', url, 'google', headers=headers, timeout=TIMEOUT_VALIDACION)
+    return response.status_code == 200
+
+# Validadores disponibles por proveedor
+VALIDADORES = {
+    'replicate': validar_replicate,
+    'grok': validar_grok,
+    'google': validar_google,
+}
+
+# Función para obtener la huella de una clave (en la configuración nunca se guarda la clave en claro)
+def huella_clave(clave):
+    return hashlib.sha256(clave.encode('utf-8')).hexdigest()
+
+# Función para saber si una clave se validó hace poco
+def validacion_cacheada(proveedor, clave):
+    config = obtener_config_store().leer()
+    try:
+        ttl = float(config.get('ttl_validacion_apis_minutos', TTL_VALIDACION_MINUTOS)) * 60
+    except (TypeError, ValueError):
+        ttl = TTL_VALIDACION_MINUTOS * 60
+    entrada = config.get('validacion_apis', {}).get(proveedor)
+    if not isinstance(entrada, dict):
+        return False
+    return entrada.get('huella') == huella_clave(clave) and time.time() - entrada.get('fecha', 0) < ttl
+
+# Función para guardar de una vez las claves que se acaban de validar
+def guardar_validaciones(claves_validas):
+    if not claves_validas:
+        return
+    config_store = obtener_config_store()
+    validaciones = config_store.obtener('validacion_apis', {})
+    if not isinstance(validaciones, dict):
+        validaciones = {}
+    ahora = time.time()
+    for proveedor, clave in claves_validas.items():
+        validaciones[proveedor] = {'huella': huella_clave(clave), 'fecha': ahora}
+    config_store.actualizar(validacion_apis=validaciones)
+
+# Función para validar una clave; cualquier error se considera una clave no válida
+def _validar(proveedor, clave):
+    try:
+        return VALIDADORES[proveedor](clave)
+    except Exception:
+        return False
+
+# Función para lanzar en paralelo la comprobación de conexión y la validación de las claves
+# Devuelve un futuro con {'conexion': bool, proveedor: True/False, o None si no hay clave}
+def validar_apis(claves, usar_cache=True):
+    resultados = {}
+    pendientes = {}
+    ejecutor = ThreadPoolExecutor(max_workers=len(claves) + 2, thread_name_prefix='validacion_apis')
+    futuro_conexion = ejecutor.submit(comprobar_conexion)
+
+    for proveedor, clave in claves.items():
+        if not clave:
+            resultados[proveedor] = None
+        elif usar_cache and validacion_cacheada(proveedor, clave):
+            resultados[proveedor] = True
+        else:
+            pendientes[proveedor] = ejecutor.submit(_validar, proveedor, clave)
+
+    # Función que espera a todas las comprobaciones y junta sus resultados
+    def combinar():
+        resultados['conexion'] = futuro_conexion.result()
+        for proveedor, futuro in pendientes.items():
+            resultados[proveedor] = futuro.result()
+        # Sin conexión los fallos no dicen nada de las claves, así que solo se cachean los aciertos con conexión
+        if resultados['conexion']:
+            guardar_validaciones({p: claves[p] for p in pendientes if resultados[p]})
+        return resultados
+
+    futuro = ejecutor.submit(combinar)
+    ejecutor.shutdown(wait=False)
+    return futuro
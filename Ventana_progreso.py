@@ -1,5 +1,10 @@
 import sys, os
 from PySide6.QtCore import Signal, QObject, QThread
+from Cancelacion import TokenCancelacion
+from Perfilado import perfilar
+
+# Milisegundos que se espera a que el worker se detenga solo tras cancelar antes de forzarlo
+TIEMPO_MAXIMO_CANCELACION_MS = 2000
 
 # Función para manejar rutas de recursos tanto en modo desarrollo como en modo ejecutable
 def resource_path(relative_path):
@@ -27,6 +32,8 @@ class LogSignals(QObject):
     update_progress = Signal(int, int)
     # Señal para agregar una nueva diapositiva
     nueva_diapositiva = Signal(str, str, str)
+    # Señal con el informe de los modelos usados en la presentación (para calcular los costes)
+    uso_modelos = Signal(dict)
     
     def __init__(self, parent=None):
         super().__init__()
@@ -45,7 +52,7 @@ class LogSignals(QObject):
 
 # Clase worker para ejecutar la generación en un hilo separado
 class GenerationWorker(QThread):
-    def __init__(self, modelo_texto, modelo_imagen, descripcion, auto_open, imagen_personalizada, filename, signals, title_font_name='Calibri', content_font_name='Calibri', title_font_size=16, content_font_size=10, title_bold=False, title_italic=False, title_underline=False, content_bold=False, content_italic=False, content_underline=False, disenos_aleatorios=True, selected_layout_index=1):
+    def __init__(self, modelo_texto, modelo_imagen, descripcion, auto_open, imagen_personalizada, filename, signals, title_font_name='Calibri', content_font_name='Calibri', title_font_size=16, content_font_size=10, title_bold=False, title_italic=False, title_underline=False, content_bold=False, content_italic=False, content_underline=False, disenos_aleatorios=True, selected_layout_index=1, num_diapositivas=None, usar_cache_imagenes=True, usar_cache_texto=True, punto_control=None):
         super().__init__()
         # Inicialización de variables necesarias para la generación
         self.modelo_texto = modelo_texto
@@ -64,6 +71,8 @@ class GenerationWorker(QThread):
         self.title_underline = title_underline
         # Bandera para saber si el proceso debe continuar
         self.running = True
+        # Token para cancelar la generación, cerrando las conexiones y streams en curso
+        self.cancelacion = TokenCancelacion()
         # Nuevas variables para formato de contenido
         self.content_bold = content_bold
         self.content_italic = content_italic
@@ -71,8 +80,31 @@ class GenerationWorker(QThread):
         # Variable para determinar si los diseños son aleatorios
         self.disenos_aleatorios = disenos_aleatorios
         self.selected_layout_index = selected_layout_index
+        # Número de diapositivas pedido, para numerar las imágenes mientras llega el texto
+        self.num_diapositivas = num_diapositivas
+        # Permitir desactivar la caché de imágenes en una generación concreta
+        self.usar_cache_imagenes = usar_cache_imagenes
+        # Permitir pedir de nuevo el texto aunque esté en la caché
+        self.usar_cache_texto = usar_cache_texto
+        # Punto de control de la presentación que se reanuda (None para empezar una nueva)
+        self.punto_control = punto_control
+
+    # Función para pedir que se detenga la generación: además de la petición de Qt, cancela las llamadas en curso
+    def requestInterruption(self):
+        self.running = False
+        self.cancelacion.cancelar()
+        super().requestInterruption()
+
+    # Función para cancelar la generación y esperar a que el hilo termine (se fuerza si no termina a tiempo)
+    def cancelar(self, tiempo_maximo_ms=TIEMPO_MAXIMO_CANCELACION_MS):
+        self.requestInterruption()
+        if not self.wait(tiempo_maximo_ms):
+            self.terminate()
+            return False
+        return True
 
     # Función para ejecutar la generación de la presentación
+    @perfilar('generacion')
     def run(self):
         try:
             # Importa e inicia la generación de la presentación
@@ -96,16 +128,17 @@ class GenerationWorker(QThread):
                 self.content_italic,
                 self.content_underline,
                 self.disenos_aleatorios,
-                self.selected_layout_index
+                self.selected_layout_index,
+                self.num_diapositivas,
+                self.usar_cache_imagenes,
+                self.usar_cache_texto,
+                self.cancelacion,
+                self.punto_control
             )
         except InterruptedError:
-            # Obtener idioma para mensaje de cancelación
-            current_language = 'es'
-            if self.signals and hasattr(self.signals, 'current_language'):
-                current_language = self.signals.current_language
             # No emitir error si fue cancelado intencionalmente
-            from Traducciones import obtener_traduccion
-            print(obtener_traduccion('generation_cancelled', current_language))
+            # (generar_presentacion ya ha registrado el mensaje de cancelación)
+            pass
         except Exception as e:
             # Emite señal de error si algo falla
             if not self.isInterruptionRequested():
@@ -3,6 +3,8 @@ from PySide6.QtCore import Qt, QSize, QThread, Signal, QObject, QTimer, QRect
 from PySide6.QtGui import QPixmap, QFont, QResizeEvent, QIcon, QFontDatabase, QFontMetrics
 import os, sys, subprocess
 from Traducciones import obtener_traduccion
+from Catalogo_modelos import requiere_imagen_personalizada
+from Perfilado import perfilar
 
 # Intentar importar python-pptx y manejar el error si no está instalado
 try:
@@ -679,6 +681,7 @@ class EditSlideDialog(QDialog):
                 self.signals = GenerateTitleSignals()
                 self._is_interrupted = False
 
+            @perfilar('titulo_ia')
             def run(self):
                 try:
                     descripcion_original = self.main_widget.descripcion_text.toPlainText()
@@ -715,7 +718,7 @@ class EditSlideDialog(QDialog):
                     if self.isInterruptionRequested(): return
 
                     from Logica_diapositivas import obtener_respuesta_ia # Importar aquí para evitar problemas de importación cíclica a nivel de módulo
-                    tupla_respuesta_dict = obtener_respuesta_ia(final_prompt_descripcion, modelo_texto, None)
+                    tupla_respuesta_dict = obtener_respuesta_ia(final_prompt_descripcion, modelo_texto, None, usar_cache=False)
 
                     if self.isInterruptionRequested(): return
 
@@ -893,7 +896,7 @@ class EditSlideDialog(QDialog):
             
         # Verificar si necesitamos imagen personalizada para el modelo
         imagen_personalizada = None
-        if modelo_imagen in ['flux-pulid [$0.029]', 'photomaker [$0.0069]']:
+        if requiere_imagen_personalizada(modelo_imagen):
             if hasattr(main_widget, 'imagen_personalizada') and main_widget.imagen_personalizada:
                 imagen_personalizada = main_widget.imagen_personalizada
             else:
@@ -920,10 +923,11 @@ class EditSlideDialog(QDialog):
                 # --- NUEVO: Flag para interrupción ---
                 self._is_interrupted = False
                 
+            @perfilar('imagen_ia')
             def run(self):
                 try:
                     # Importar funciones necesarias
-                    from Logica_diapositivas import generar_imagen_ia, generar_imagen_flux, generar_imagen_photomaker
+                    from Logica_diapositivas import generar_imagen_ia
                     import sys, os
                     
                     # --- NUEVO: Comprobar interrupción temprana ---
@@ -931,38 +935,20 @@ class EditSlideDialog(QDialog):
                         print("Generación de imagen cancelada antes de empezar.")
                         return
                         
-                    # Definir directorios para imágenes temporales
-                    if sys.platform == 'win32':
-                        APP_DATA_DIR = os.path.join(os.getenv('APPDATA'), 'Powerpoineador')
-                    elif sys.platform == 'darwin':
-                        APP_DATA_DIR = os.path.join(os.path.expanduser('~'), 'Library', 'Application Support', 'Powerpoineador')
-                    else:
-                        APP_DATA_DIR = os.path.join(os.path.expanduser('~'), '.Powerpoineador')
-                        
-                    IMAGES_DIR = os.path.join(APP_DATA_DIR, 'images')
-                    os.makedirs(IMAGES_DIR, exist_ok=True)
-                    
-                    # Generar una imagen temporal con nombre único basado en timestamp
-                    import time
-                    timestamp = int(time.time())
-                    self.temp_imagen_path = os.path.join(IMAGES_DIR, f'temp_edit_slide_{timestamp}.jpg')
+                    # Generar una imagen temporal con nombre único (se borra en segundo plano cuando se queda antigua)
+                    from Espacios_trabajo import ruta_temporal_edicion, guardar_atomico
+                    self.temp_imagen_path = ruta_temporal_edicion()
                     
                     # --- NUEVO: Comprobar interrupción antes de la llamada costosa ---
                     if self.isInterruptionRequested():
                         print("Generación de imagen cancelada antes de la llamada a la IA.")
                         return
                         
-                    # Generar la imagen según el modelo
-                    if self.modelo_imagen in ['flux-pulid [$0.029]', 'photomaker [$0.0069]']:
-                        if self.modelo_imagen == 'flux-pulid [$0.029]':
-                            img = generar_imagen_flux(self.titulo, self.contenido, "", self.imagen_personalizada, None, False)
-                        else:  # photomaker
-                            img = generar_imagen_photomaker(self.titulo, self.contenido, "", self.imagen_personalizada, None, False)
-                    else:
-                        img = generar_imagen_ia(self.titulo, self.contenido, "", self.modelo_imagen, None)
+                    # Generar la imagen con el modelo (sin caché: el usuario pide una imagen nueva)
+                    img = generar_imagen_ia(self.titulo, self.contenido, "", self.modelo_imagen, None, usar_cache=False, imagen_personalizada=self.imagen_personalizada)
                         
                     # Guardar la imagen generada
-                    img.save(self.temp_imagen_path)
+                    guardar_atomico(img.convert('RGB'), self.temp_imagen_path, 'JPEG')
                     
                     # --- NUEVO: Comprobar interrupción antes de emitir señal ---
                     if self.isInterruptionRequested():
@@ -2342,16 +2328,13 @@ class VentanaVistaPrevia(QWidget):
                             if is_design7: # Usar la variable is_design7 determinada por la nueva lógica
                                 print("Diseño 7 detectado (para oscurecer imagen): procesando imagen oscurecida...")
                                 # Mismo procesamiento que en design7
-                                APP_DATA_DIR_IMG = os.path.join(os.getenv('APPDATA'), 'Powerpoineador')
-                                IMAGES_DIR_IMG = os.path.join(APP_DATA_DIR_IMG, 'images')
-                                if not os.path.exists(IMAGES_DIR_IMG):
-                                    os.makedirs(IMAGES_DIR_IMG, exist_ok=True)
                                 from PIL import Image, ImageEnhance # Asegurar importación local si es necesario
+                                from Espacios_trabajo import ruta_temporal_edicion, guardar_atomico
                                 image_pil = Image.open(new_image_path)
                                 enhancer = ImageEnhance.Brightness(image_pil)
                                 image_darker = enhancer.enhance(0.5)
-                                darker_path = os.path.join(IMAGES_DIR_IMG, 'Slide_darker_edited.jpg') # Nombre diferente para evitar conflictos
-                                image_darker.save(darker_path)
+                                # Nombre único para no pisar la imagen de otra edición o generación
+                                darker_path = guardar_atomico(image_darker.convert('RGB'), ruta_temporal_edicion(), 'JPEG')
                                 # Usar la imagen oscurecida en su lugar
                                 new_image_path = darker_path
                         except Exception as e_img_proc:
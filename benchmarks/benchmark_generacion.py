@@ -0,0 +1,227 @@
+# Benchmark de extremo a extremo de generar_presentacion contra el servidor simulado (servidor_simulado.py):
+#   python benchmarks/benchmark_generacion.py --diapositivas 5 15 50 --repeticiones 3
+#   python benchmarks/benchmark_generacion.py --comparar benchmarks/resultados/base.json --umbral 0.15
+# Cada presentación se genera en un proceso aparte (con su propia carpeta de datos y sin cachés) y se mide:
+# - segundos: tiempo total de la generación
+# - primera_diapositiva: segundos hasta que la primera diapositiva está lista
+# - rss_pico_mb: memoria máxima del proceso (None en Windows)
+# - cpu_segundos: tiempo de CPU (usuario + sistema) de la generación
+# Los resultados se guardan como JSON en benchmarks/resultados para comparar una ejecución con otra.
+# Con --reproducir las respuestas salen de una grabación de tráfico real (ver Grabacion.py) en lugar del servidor simulado:
+#   python benchmarks/benchmark_generacion.py --reproducir grabaciones/energia_solar --diapositivas 15
+import os, sys, json, time, shutil, argparse, platform, tempfile, statistics, subprocess, contextlib
+
+CARPETA_BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+CARPETA_PROYECTO = os.path.dirname(CARPETA_BENCHMARKS)
+CARPETA_RESULTADOS = os.path.join(CARPETA_BENCHMARKS, 'resultados')
+sys.path.insert(0, CARPETA_PROYECTO)
+sys.path.insert(0, CARPETA_BENCHMARKS)
+
+from servidor_simulado import arrancar_en_segundo_plano, agregar_argumentos, configuracion_de_argumentos
+
+VERSION_RESULTADOS = 1
+DIAPOSITIVAS_POR_DEFECTO = [5, 15, 50]
+MODELO_TEXTO_POR_DEFECTO = 'gpt-4.1-nano [$0.00028]'
+MODELO_IMAGEN_POR_DEFECTO = 'flux-schnell [$0.003]'
+# Métricas que se comparan entre ejecuciones (en todas, un valor mayor es peor)
+METRICAS = ('segundos', 'primera_diapositiva', 'rss_pico_mb', 'cpu_segundos')
+# Cambio relativo de la mediana a partir del cual una métrica se considera una regresión
+UMBRAL_REGRESION = 0.10
+# Tiempo máximo de una generación, en segundos
+TIEMPO_MAXIMO_GENERACION = 1800
+
+# Función para obtener la memoria máxima del proceso en MB (None si el sistema no la da)
+def obtener_rss_pico_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # En macOS ru_maxrss está en bytes y en Linux en KB
+    return round(rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024, 1)
+
+# Función para obtener el tiempo de CPU consumido por el proceso (usuario + sistema), en segundos
+def obtener_cpu_segundos():
+    tiempos = os.times()
+    return tiempos.user + tiempos.system
+
+# Función que genera una presentación dentro del proceso hijo y devuelve sus métricas
+def medir_generacion(parametros):
+    inicio_importacion = time.monotonic()
+    from Trabajos import normalizar_trabajo, ejecutar_trabajo
+    import Logica_diapositivas
+    importacion = time.monotonic() - inicio_importacion
+
+    trabajo = normalizar_trabajo({
+        'id': 'benchmark',
+        'descripcion': 'Historia y futuro de la energía solar',
+        'modelo_texto': parametros['modelo_texto'],
+        'modelo_imagen': parametros['modelo_imagen'],
+        'num_diapositivas': parametros['diapositivas'],
+        'filename': os.path.join(parametros['carpeta'], 'benchmark.pptx'),
+        'usar_cache_imagenes': False,
+        'usar_cache_texto': False,
+    })
+    marcas = {}
+
+    # Función que anota cuándo llega la primera diapositiva
+    def al_evento(evento):
+        if evento['evento'] == 'diapositiva' and 'primera_diapositiva' not in marcas:
+            marcas['primera_diapositiva'] = time.monotonic()
+
+    cpu_inicial = obtener_cpu_segundos()
+    inicio = time.monotonic()
+    # Los mensajes de la generación no forman parte del resultado
+    with open(os.devnull, 'w') as nulo, contextlib.redirect_stdout(nulo):
+        resultado = ejecutar_trabajo(trabajo, al_evento)
+    fin = time.monotonic()
+
+    return {
+        'estado': resultado['estado'],
+        'error': resultado['error'],
+        'segundos': round(fin - inicio, 3),
+        'primera_diapositiva': round(marcas['primera_diapositiva'] - inicio, 3) if 'primera_diapositiva' in marcas else None,
+        'rss_pico_mb': obtener_rss_pico_mb(),
+        'cpu_segundos': round(obtener_cpu_segundos() - cpu_inicial, 3),
+        'importacion_segundos': round(importacion, 3),
+        'tamano_pptx_kb': round(os.path.getsize(trabajo['filename']) / 1024, 1) if os.path.exists(trabajo['filename']) else None,
+    }
+
+# Función para generar una presentación en un proceso aparte con una carpeta de datos vacía
+def ejecutar_en_proceso(servidor, diapositivas, modelo_texto, modelo_imagen, entorno_extra=None):
+    carpeta = tempfile.mkdtemp(prefix='powerpoineador_benchmark_')
+    entorno = dict(os.environ)
+    entorno.update(servidor.variables_entorno())
+    # La carpeta de datos de la aplicación sale de HOME (APPDATA en Windows): así no se usan las cachés ni la configuración del usuario
+    entorno.update({'HOME': carpeta, 'APPDATA': carpeta, 'USERPROFILE': carpeta})
+    for variable in ('REPLICATE_API_TOKEN', 'GROK_API_KEY', 'GOOGLE_API_KEY', 'GEMINI_API_KEY'):
+        entorno[variable] = 'simulado'
+    entorno.update(entorno_extra or {})
+    parametros = {'diapositivas': diapositivas, 'modelo_texto': modelo_texto, 'modelo_imagen': modelo_imagen, 'carpeta': carpeta}
+    try:
+        proceso = subprocess.run([sys.executable, os.path.abspath(__file__), '--hijo', json.dumps(parametros)],
+                                 env=entorno, cwd=CARPETA_PROYECTO, capture_output=True, text=True,
+                                 timeout=TIEMPO_MAXIMO_GENERACION)
+        if proceso.returncode != 0:
+            raise RuntimeError(f"El proceso de la generación ha terminado con código {proceso.returncode}:\n{proceso.stderr[-4000:]}")
+        return json.loads(proceso.stdout.strip().splitlines()[-1])
+    finally:
+        shutil.rmtree(carpeta, ignore_errors=True)
+
+# Función para calcular la mediana de una métrica en varias repeticiones (None si no hay valores)
+def mediana(medidas, metrica):
+    valores = [medida[metrica] for medida in medidas if medida.get(metrica) is not None]
+    return round(statistics.median(valores), 3) if valores else None
+
+# Función para ejecutar el benchmark completo; devuelve los resultados listos para guardar como JSON
+# (con reproduccion, las respuestas salen de esa carpeta de grabación y el servidor simulado no recibe peticiones)
+def ejecutar_benchmark(tamanos, repeticiones, modelo_texto, modelo_imagen, configuracion_servidor, al_medir=None,
+                       reproduccion=None, escala_reproduccion=0.0):
+    from Grabacion import VARIABLE_GRABACION, VARIABLE_ESCALA, REPRODUCIR
+    entorno_extra = {}
+    if reproduccion:
+        entorno_extra = {VARIABLE_GRABACION: f"{REPRODUCIR}:{os.path.abspath(reproduccion)}", VARIABLE_ESCALA: str(escala_reproduccion)}
+    servidor = arrancar_en_segundo_plano(configuracion_servidor)
+    try:
+        resultados = []
+        for diapositivas in tamanos:
+            medidas = []
+            for repeticion in range(1, repeticiones + 1):
+                antes = servidor.simulador.obtener_estadisticas()
+                medida = ejecutar_en_proceso(servidor, diapositivas, modelo_texto, modelo_imagen, entorno_extra)
+                despues = servidor.simulador.obtener_estadisticas()
+                medida['peticiones'] = {tipo: total - antes['peticiones'].get(tipo, 0) for tipo, total in despues['peticiones'].items()}
+                medida['errores_simulados'] = (despues['errores'] - antes['errores']) + (despues['limites'] - antes['limites'])
+                medidas.append(medida)
+                if al_medir:
+                    al_medir(diapositivas, repeticion, medida)
+            resultados.append({
+                'diapositivas': diapositivas,
+                'completadas': sum(1 for medida in medidas if medida['estado'] == 'completado'),
+                'mediana': {metrica: mediana(medidas, metrica) for metrica in METRICAS},
+                'repeticiones': medidas,
+            })
+    finally:
+        servidor.shutdown()
+        servidor.server_close()
+
+    return {
+        'version': VERSION_RESULTADOS,
+        'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'plataforma': platform.platform(),
+        'python': platform.python_version(),
+        'modelo_texto': modelo_texto,
+        'modelo_imagen': modelo_imagen,
+        'reproduccion': {'carpeta': os.path.abspath(reproduccion), 'escala_tiempo': escala_reproduccion} if reproduccion else None,
+        'servidor': {nombre: list(valor) if isinstance(valor, tuple) else valor for nombre, valor in configuracion_servidor.items()},
+        'resultados': resultados,
+    }
+
+# Función para comparar unos resultados con otros de referencia; devuelve las líneas del informe y las regresiones
+def comparar_resultados(base, actual, umbral=UMBRAL_REGRESION):
+    lineas, regresiones = [], []
+    medianas_base = {resultado['diapositivas']: resultado['mediana'] for resultado in base['resultados']}
+    for resultado in actual['resultados']:
+        referencia = medianas_base.get(resultado['diapositivas'])
+        if referencia is None:
+            continue
+        for metrica in METRICAS:
+            antes, ahora = referencia.get(metrica), resultado['mediana'].get(metrica)
+            if not antes or ahora is None:
+                continue
+            cambio = (ahora - antes) / antes
+            marca = ' REGRESIÓN' if cambio > umbral else ''
+            lineas.append(f"{resultado['diapositivas']:>4} diapositivas  {metrica:<20} {antes:>10.3f} -> {ahora:>10.3f}  ({cambio:+.1%}){marca}")
+            if marca:
+                regresiones.append((resultado['diapositivas'], metrica, cambio))
+    return lineas, regresiones
+
+# Función para crear el analizador de argumentos del benchmark
+def crear_parser():
+    parser = argparse.ArgumentParser(description='Benchmark de generación de presentaciones contra el servidor simulado.')
+    parser.add_argument('--diapositivas', type=int, nargs='+', default=DIAPOSITIVAS_POR_DEFECTO, help='Tamaños de presentación que se miden')
+    parser.add_argument('--repeticiones', type=int, default=1, help='Veces que se genera cada tamaño (se compara la mediana)')
+    parser.add_argument('--modelo-texto', default=MODELO_TEXTO_POR_DEFECTO)
+    parser.add_argument('--modelo-imagen', default=MODELO_IMAGEN_POR_DEFECTO)
+    parser.add_argument('--salida', default=None, help='Archivo JSON de resultados (por defecto uno nuevo en benchmarks/resultados)')
+    parser.add_argument('--comparar', default=None, help='Resultados de referencia con los que comparar')
+    parser.add_argument('--umbral', type=float, default=UMBRAL_REGRESION, help='Cambio relativo que se considera una regresión')
+    parser.add_argument('--reproducir', default=None, help='Carpeta de una grabación con la que responder en lugar del servidor simulado '
+                        '(el texto tiene las diapositivas que se grabaron)')
+    parser.add_argument('--escala-reproduccion', type=float, default=0.0, help='1 para esperar lo que tardó cada respuesta grabada, 0 para no esperar')
+    parser.add_argument('--hijo', default=None, help=argparse.SUPPRESS)
+    agregar_argumentos(parser)
+    return parser
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+    if args.hijo:
+        print(json.dumps(medir_generacion(json.loads(args.hijo))))
+        return 0
+
+    # Función para mostrar cada medida según se obtiene
+    def al_medir(diapositivas, repeticion, medida):
+        print(f"{diapositivas:>4} diapositivas  repetición {repeticion}: {medida['estado']}  {medida['segundos']:.2f} s  "
+              f"primera {medida['primera_diapositiva']} s  RSS {medida['rss_pico_mb']} MB  CPU {medida['cpu_segundos']:.2f} s", file=sys.stderr)
+
+    resultados = ejecutar_benchmark(args.diapositivas, args.repeticiones, args.modelo_texto, args.modelo_imagen,
+                                    configuracion_de_argumentos(args), al_medir, args.reproducir, args.escala_reproduccion)
+    salida = args.salida or os.path.join(CARPETA_RESULTADOS, f"benchmark_{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(salida)), exist_ok=True)
+    with open(salida, 'w', encoding='utf-8') as f:
+        json.dump(resultados, f, ensure_ascii=False, indent=2)
+    print(f"Resultados guardados en {salida}", file=sys.stderr)
+
+    fallidas = sum(resultado['completadas'] < len(resultado['repeticiones']) for resultado in resultados['resultados'])
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as f:
+            base = json.load(f)
+        lineas, regresiones = comparar_resultados(base, resultados, args.umbral)
+        print('\n'.join(lineas))
+        if regresiones:
+            print(f"{len(regresiones)} regresiones por encima del {args.umbral:.0%}", file=sys.stderr)
+            return 1
+    return 1 if fallidas else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,452 @@
+# Servidor HTTP que imita las partes de las APIs de Replicate, xAI y Google AI (Gemini) que usan los modelos de modelos/IA_*.py,
+# para medir generar_presentacion sin llamar a los proveedores reales (ni pagar por ello).
+# La aplicación lo usa si se apuntan a él las direcciones base de los proveedores (ver URLS_BASE en Cliente_http.py):
+#   POWERPOINEADOR_URL_REPLICATE=http://127.0.0.1:8766 POWERPOINEADOR_URL_XAI=http://127.0.0.1:8766 POWERPOINEADOR_URL_GOOGLE=http://127.0.0.1:8766
+# Se arranca solo con: python benchmarks/servidor_simulado.py --puerto 8766 --latencia-imagen 2 0.3 --tasa-errores 0.05
+import re, json, math, time, uuid, base64, random, argparse, threading
+from io import BytesIO
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from PIL import Image
+
+HOST_POR_DEFECTO = '127.0.0.1'
+PUERTO_POR_DEFECTO = 8766
+
+# Configuración por defecto del servidor simulado:
+# - latencia_*: (mediana, sigma) de una distribución lognormal, en segundos
+#   - latencia_imagen: lo que tarda un modelo de imagen en devolver su resultado
+#   - latencia_primer_token: lo que tarda un modelo de texto en empezar a responder
+#   - latencia_fragmento: lo que tarda cada fragmento siguiente del stream de texto
+#   - latencia_descarga: lo que tarda en empezar la descarga de una imagen generada
+# - tasa_errores: probabilidad de que una petición a un modelo falle con un 500
+# - tasa_limites: probabilidad de que una petición a un modelo se rechace con un 429 (con Retry-After)
+# - ancho_imagen, alto_imagen, calidad_jpeg, ruido_imagen: tamaño de las imágenes generadas (más ruido, archivo más grande)
+# - palabras_contenido: palabras del contenido de cada diapositiva
+# - caracteres_fragmento: caracteres de cada fragmento del stream de texto
+# - escala_tiempo: multiplica todas las latencias (0 para no esperar nada)
+# - semilla: semilla de los números aleatorios (None para que cada ejecución sea distinta)
+CONFIGURACION_POR_DEFECTO = {
+    'latencia_imagen': (2.0, 0.35),
+    'latencia_primer_token': (0.8, 0.3),
+    'latencia_fragmento': (0.02, 0.3),
+    'latencia_descarga': (0.1, 0.3),
+    'tasa_errores': 0.0,
+    'tasa_limites': 0.0,
+    'ancho_imagen': 1024,
+    'alto_imagen': 768,
+    'calidad_jpeg': 85,
+    'ruido_imagen': 40,
+    'palabras_contenido': 45,
+    'caracteres_fragmento': 12,
+    'escala_tiempo': 1.0,
+    'semilla': None,
+}
+
+# Diapositivas que se generan si el prompt no indica cuántas
+DIAPOSITIVAS_POR_DEFECTO = 5
+# Modelos de Replicate que devuelven una sola URL en vez de una lista (el resto devuelven una lista).
+# Los modelos con versión fija se piden a /v1/predictions solo con el id de la versión, así que se identifican por él
+MODELOS_SALIDA_UNICA = {
+    'google/imagen-3',
+    'google/imagen-3-fast',
+    'google/imagen-4',
+    'c6b5d2b7459910fec94432e9e1203c3cdce92d6db20f714f1355747990b52fa6',  # nvidia/sana
+    '6ed1ce77cdc8db65550e76d5ab82556d0cb31ac8ab3c4947b168a0bda7b962e4',  # nvidia/sana-sprint-1.6b
+}
+# Predicciones de Replicate que se recuerdan para GET /v1/predictions/{id} y el stream (se olvidan las más antiguas)
+MAX_PREDICCIONES = 1000
+
+PALABRAS = (
+    'datos sistema modelo proceso energía mercado cliente equipo proyecto estrategia calidad red diseño análisis '
+    'futuro historia ciencia salud ciudad agua tecnología industria servicio producto valor riesgo cambio impacto '
+    'resultado método objetivo recurso nivel desarrollo control gestión innovación sector crecimiento medida'
+).split()
+
+# Clase con la configuración, el estado y las estadísticas del servidor simulado
+class Simulador:
+    def __init__(self, configuracion=None):
+        self.configuracion = dict(CONFIGURACION_POR_DEFECTO)
+        self.configuracion.update(configuracion or {})
+        self.aleatorio = random.Random(self.configuracion['semilla'])
+        self.predicciones = {}
+        self.imagenes = {}
+        self.estadisticas = {'peticiones': {}, 'errores': 0, 'limites': 0, 'bytes_imagenes': 0}
+        self._bloqueo = threading.Lock()
+
+    # Función para obtener una latencia aleatoria de una de las distribuciones configuradas, en segundos
+    def latencia(self, nombre):
+        mediana, sigma = self.configuracion[f'latencia_{nombre}']
+        with self._bloqueo:
+            valor = mediana * math.exp(self.aleatorio.gauss(0, sigma)) if mediana > 0 else 0
+        return valor * self.configuracion['escala_tiempo']
+
+    # Función para esperar una latencia aleatoria
+    def esperar(self, nombre):
+        segundos = self.latencia(nombre)
+        if segundos > 0:
+            time.sleep(segundos)
+
+    # Función para decidir si una petición a un modelo falla; devuelve el código de error o None
+    def sortear_fallo(self):
+        with self._bloqueo:
+            sorteo = self.aleatorio.random()
+            if sorteo < self.configuracion['tasa_limites']:
+                self.estadisticas['limites'] += 1
+                return 429
+            if sorteo < self.configuracion['tasa_limites'] + self.configuracion['tasa_errores']:
+                self.estadisticas['errores'] += 1
+                return 500
+        return None
+
+    # Función para contar una petición por su tipo
+    def contar(self, tipo):
+        with self._bloqueo:
+            self.estadisticas['peticiones'][tipo] = self.estadisticas['peticiones'].get(tipo, 0) + 1
+
+    # Función para obtener una copia de las estadísticas
+    def obtener_estadisticas(self):
+        with self._bloqueo:
+            return json.loads(json.dumps(self.estadisticas))
+
+    # Función para generar el texto de una presentación con el formato que esperan los modelos ({"Título": "Contenido", ...})
+    def generar_texto(self, prompt):
+        coincidencia = re.search(r'en (\d+) claves-valores', prompt)
+        num_diapositivas = int(coincidencia.group(1)) if coincidencia else DIAPOSITIVAS_POR_DEFECTO
+        with self._bloqueo:
+            secciones = {}
+            for numero in range(1, num_diapositivas + 1):
+                titulo = f"{' '.join(self.aleatorio.choice(PALABRAS) for _ in range(2)).capitalize()} {numero}"
+                contenido = ' '.join(self.aleatorio.choice(PALABRAS) for _ in range(self.configuracion['palabras_contenido']))
+                secciones[titulo] = contenido.capitalize() + '.'
+        return json.dumps(secciones, ensure_ascii=False)
+
+    # Función para partir un texto en los fragmentos de un stream
+    def fragmentos(self, texto):
+        tamano = max(1, self.configuracion['caracteres_fragmento'])
+        return [texto[i:i + tamano] for i in range(0, len(texto), tamano)]
+
+    # Función para obtener los bytes de una imagen JPEG del tamaño configurado
+    # (se generan unas pocas variantes y se reutilizan para no medir el coste de crearlas)
+    def obtener_imagen(self):
+        with self._bloqueo:
+            variante = self.aleatorio.randrange(4)
+            if variante not in self.imagenes:
+                tamano = (self.configuracion['ancho_imagen'], self.configuracion['alto_imagen'])
+                canales = [Image.effect_noise(tamano, self.configuracion['ruido_imagen']) for _ in range(3)]
+                imagen = Image.merge('RGB', canales)
+                buffer = BytesIO()
+                imagen.save(buffer, format='JPEG', quality=self.configuracion['calidad_jpeg'])
+                self.imagenes[variante] = buffer.getvalue()
+            datos = self.imagenes[variante]
+            self.estadisticas['bytes_imagenes'] += len(datos)
+        return datos
+
+    # Función para guardar una predicción de Replicate
+    def guardar_prediccion(self, prediccion):
+        with self._bloqueo:
+            self.predicciones[prediccion['id']] = prediccion
+            while len(self.predicciones) > MAX_PREDICCIONES:
+                self.predicciones.pop(next(iter(self.predicciones)))
+
+    # Función para obtener una predicción de Replicate guardada (None si no existe)
+    def obtener_prediccion(self, identificador):
+        with self._bloqueo:
+            return self.predicciones.get(identificador)
+
+# Función para obtener la fecha actual en el formato de las APIs
+def ahora_iso():
+    return time.strftime('%Y-%m-%dT%H:%M:%S.000Z', time.gmtime())
+
+# Clase que atiende las peticiones imitando a cada proveedor
+class ManejadorSimulado(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    @property
+    def simulador(self):
+        return self.server.simulador
+
+    # Función para no llenar la consola con una línea por petición
+    def log_message(self, formato, *args):
+        pass
+
+    # Función para obtener la dirección base con la que el cliente ha llegado al servidor
+    def url_base(self):
+        return f"http://{self.headers.get('Host') or '%s:%s' % self.server.server_address[:2]}"
+
+    # Función para responder con un JSON
+    def responder_json(self, codigo, datos, cabeceras=None):
+        cuerpo = json.dumps(datos, ensure_ascii=False).encode('utf-8')
+        self.send_response(codigo)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(cuerpo)))
+        for nombre, valor in (cabeceras or {}).items():
+            self.send_header(nombre, valor)
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    # Función para responder con el error sorteado si la petición a un modelo debe fallar; devuelve si ha fallado
+    def responder_fallo(self):
+        codigo = self.simulador.sortear_fallo()
+        if codigo == 429:
+            self.responder_json(429, {'detail': 'Request was throttled (simulado)', 'status': 429}, {'Retry-After': '1'})
+        elif codigo == 500:
+            self.responder_json(500, {'detail': 'Internal server error (simulado)', 'status': 500})
+        return codigo is not None
+
+    # Función para leer el cuerpo JSON de la petición
+    def leer_json(self):
+        longitud = int(self.headers.get('Content-Length') or 0)
+        try:
+            return json.loads(self.rfile.read(longitud) or b'{}')
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return {}
+
+    # Función para abrir una respuesta de Server-Sent Events
+    def abrir_eventos(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-store')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+
+    def do_GET(self):
+        ruta = self.path.split('?', 1)[0]
+        try:
+            if ruta.startswith('/archivos/'):
+                return self.enviar_imagen()
+            if ruta == '/__estadisticas':
+                return self.responder_json(200, self.simulador.obtener_estadisticas())
+            if ruta in ('/v1/models', '/v1beta/models'):
+                self.simulador.contar('validacion')
+                return self.responder_json(200, {'results': [], 'data': [], 'models': []})
+            partes = [parte for parte in ruta.split('/') if parte]
+            if partes[:2] == ['v1', 'predictions'] and len(partes) == 4 and partes[3] == 'stream':
+                return self.enviar_stream_replicate(partes[2])
+            if partes[:2] == ['v1', 'predictions'] and len(partes) == 3:
+                prediccion = self.simulador.obtener_prediccion(partes[2])
+                if prediccion is None:
+                    return self.responder_json(404, {'detail': 'Not found.'})
+                return self.responder_json(200, prediccion)
+            if partes[:2] == ['v1', 'models'] and len(partes) == 6 and partes[4] == 'versions':
+                return self.responder_json(200, {'id': partes[5], 'created_at': ahora_iso(), 'cog_version': '0.9.0', 'openapi_schema': {}})
+            self.responder_json(404, {'detail': 'Not found.'})
+        except (BrokenPipeError, ConnectionResetError):
+            return
+
+    def do_POST(self):
+        ruta = self.path.split('?', 1)[0]
+        datos = self.leer_json()
+        try:
+            partes = [parte for parte in ruta.split('/') if parte]
+            if partes[:2] == ['v1', 'predictions'] and len(partes) == 4 and partes[3] == 'cancel':
+                return self.cancelar_prediccion(partes[2])
+            if partes == ['v1', 'predictions']:
+                return self.crear_prediccion(datos.get('version', ''), datos)
+            if partes[:2] == ['v1', 'models'] and len(partes) == 5 and partes[4] == 'predictions':
+                return self.crear_prediccion(f"{partes[2]}/{partes[3]}", datos)
+            if ruta == '/v1/chat/completions':
+                return self.completar_chat_xai(datos)
+            if ruta == '/v1/images/generations':
+                return self.generar_imagen_xai(datos)
+            if partes[:2] == ['v1beta', 'models'] and len(partes) == 3 and ':' in partes[2]:
+                modelo, metodo = partes[2].split(':', 1)
+                if metodo == 'streamGenerateContent':
+                    return self.stream_gemini(modelo, datos)
+                if metodo == 'generateContent':
+                    return self.generar_gemini(modelo, datos)
+            self.responder_json(404, {'detail': 'Not found.'})
+        except (BrokenPipeError, ConnectionResetError):
+            return
+
+    # Función para enviar una imagen generada (la descarga desde el "CDN" del proveedor)
+    def enviar_imagen(self):
+        self.simulador.contar('descarga')
+        self.simulador.esperar('descarga')
+        datos = self.simulador.obtener_imagen()
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/jpeg')
+        self.send_header('Content-Length', str(len(datos)))
+        self.end_headers()
+        self.wfile.write(datos)
+
+    # Función para obtener la URL de descarga de una imagen nueva
+    def url_imagen(self):
+        return f"{self.url_base()}/archivos/{uuid.uuid4().hex}.jpg"
+
+    # Función para crear una predicción de Replicate
+    # - con stream: se devuelve enseguida y el texto se envía por GET /v1/predictions/{id}/stream
+    # - sin stream: se espera a que termine (como con la cabecera Prefer: wait) y se devuelve su salida
+    def crear_prediccion(self, modelo, datos):
+        self.simulador.contar('replicate_stream' if datos.get('stream') else 'replicate_prediccion')
+        if self.responder_fallo():
+            return
+        identificador = uuid.uuid4().hex[:20]
+        url_prediccion = f"{self.url_base()}/v1/predictions/{identificador}"
+        prediccion = {
+            'id': identificador, 'model': modelo.split(':')[0], 'version': modelo.split(':')[-1],
+            'input': datos.get('input') or {}, 'logs': '', 'error': None, 'metrics': {},
+            'created_at': ahora_iso(), 'started_at': ahora_iso(), 'completed_at': None,
+            'urls': {'get': url_prediccion, 'cancel': f"{url_prediccion}/cancel"},
+        }
+        if datos.get('stream'):
+            prediccion['urls']['stream'] = f"{url_prediccion}/stream"
+            prediccion.update(status='starting', output=None)
+            prediccion['_texto'] = self.simulador.generar_texto(json.dumps(datos.get('input'), ensure_ascii=False))
+            self.simulador.guardar_prediccion(prediccion)
+            return self.responder_json(201, {clave: valor for clave, valor in prediccion.items() if not clave.startswith('_')})
+
+        self.simulador.esperar('imagen')
+        url = self.url_imagen()
+        salida = url if modelo in MODELOS_SALIDA_UNICA else [url]
+        prediccion.update(status='succeeded', output=salida, completed_at=ahora_iso())
+        self.simulador.guardar_prediccion(prediccion)
+        self.responder_json(201, prediccion)
+
+    # Función para cancelar una predicción de Replicate
+    def cancelar_prediccion(self, identificador):
+        self.simulador.contar('replicate_cancelacion')
+        prediccion = self.simulador.obtener_prediccion(identificador)
+        if prediccion is None:
+            return self.responder_json(404, {'detail': 'Not found.'})
+        if prediccion['status'] in ('starting', 'processing'):
+            prediccion['status'] = 'canceled'
+        self.responder_json(200, {clave: valor for clave, valor in prediccion.items() if not clave.startswith('_')})
+
+    # Función para enviar en streaming el texto de una predicción de Replicate
+    def enviar_stream_replicate(self, identificador):
+        prediccion = self.simulador.obtener_prediccion(identificador)
+        if prediccion is None or '_texto' not in prediccion:
+            return self.responder_json(404, {'detail': 'Not found.'})
+        self.abrir_eventos()
+        self.simulador.esperar('primer_token')
+        prediccion['status'] = 'processing'
+        for numero, fragmento in enumerate(self.simulador.fragmentos(prediccion['_texto'])):
+            if prediccion['status'] == 'canceled':
+                break
+            self.wfile.write(f"event: output\nid: {numero}\ndata: {fragmento}\n\n".encode('utf-8'))
+            self.wfile.flush()
+            self.simulador.esperar('fragmento')
+        if prediccion['status'] != 'canceled':
+            prediccion.update(status='succeeded', output=self.simulador.fragmentos(prediccion['_texto']), completed_at=ahora_iso())
+        self.wfile.write(b"event: done\nid: fin\ndata: {}\n\n")
+        self.wfile.flush()
+
+    # Función para responder a una petición de chat de xAI (sin streaming, como la usan los modelos Grok)
+    def completar_chat_xai(self, datos):
+        self.simulador.contar('xai_chat')
+        if self.responder_fallo():
+            return
+        prompt = ' '.join(str(mensaje.get('content', '')) for mensaje in datos.get('messages', []))
+        texto = self.simulador.generar_texto(prompt)
+        # Sin streaming el cliente espera a que el modelo termine de escribir toda la respuesta
+        self.simulador.esperar('primer_token')
+        for _ in self.simulador.fragmentos(texto):
+            self.simulador.esperar('fragmento')
+        self.responder_json(200, {
+            'id': uuid.uuid4().hex, 'object': 'chat.completion', 'created': int(time.time()), 'model': datos.get('model'),
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': texto}, 'finish_reason': 'stop'}],
+            'usage': {'prompt_tokens': len(prompt) // 4, 'completion_tokens': len(texto) // 4, 'total_tokens': (len(prompt) + len(texto)) // 4},
+        })
+
+    # Función para responder a una petición de imagen de xAI
+    def generar_imagen_xai(self, datos):
+        self.simulador.contar('xai_imagen')
+        if self.responder_fallo():
+            return
+        self.simulador.esperar('imagen')
+        self.responder_json(200, {'data': [{'url': self.url_imagen(), 'revised_prompt': datos.get('prompt', '')}]})
+
+    # Función para enviar en streaming el texto de Gemini (streamGenerateContent?alt=sse)
+    def stream_gemini(self, modelo, datos):
+        self.simulador.contar('google_stream')
+        if self.responder_fallo():
+            return
+        texto = self.simulador.generar_texto(json.dumps(datos.get('contents'), ensure_ascii=False))
+        self.abrir_eventos()
+        self.simulador.esperar('primer_token')
+        fragmentos = self.simulador.fragmentos(texto)
+        for numero, fragmento in enumerate(fragmentos):
+            respuesta = {'candidates': [{'content': {'role': 'model', 'parts': [{'text': fragmento}]}, 'index': 0}], 'modelVersion': modelo}
+            if numero == len(fragmentos) - 1:
+                respuesta['candidates'][0]['finishReason'] = 'STOP'
+            self.wfile.write(f"data: {json.dumps(respuesta, ensure_ascii=False)}\r\n\r\n".encode('utf-8'))
+            self.wfile.flush()
+            self.simulador.esperar('fragmento')
+
+    # Función para responder a una petición de imagen de Gemini (generateContent con la imagen en inlineData)
+    def generar_gemini(self, modelo, datos):
+        self.simulador.contar('google_imagen')
+        if self.responder_fallo():
+            return
+        self.simulador.esperar('imagen')
+        imagen = base64.b64encode(self.simulador.obtener_imagen()).decode('ascii')
+        self.responder_json(200, {
+            'candidates': [{'content': {'role': 'model', 'parts': [{'inlineData': {'mimeType': 'image/jpeg', 'data': imagen}}]},
+                            'finishReason': 'STOP', 'index': 0}],
+            'modelVersion': modelo,
+        })
+
+# Clase del servidor HTTP simulado
+class ServidorSimulado(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, direccion, simulador):
+        super().__init__(direccion, ManejadorSimulado)
+        self.simulador = simulador
+
+    # Función para obtener la dirección base del servidor
+    @property
+    def url(self):
+        host, puerto = self.server_address[:2]
+        return f"http://{host}:{puerto}"
+
+    # Función para obtener las variables de entorno que hacen que la aplicación use este servidor
+    def variables_entorno(self):
+        return {f'POWERPOINEADOR_URL_{proveedor}': self.url for proveedor in ('REPLICATE', 'XAI', 'GOOGLE')}
+
+# Función para crear el servidor simulado (puerto 0 para elegir uno libre); se arranca con serve_forever
+def crear_servidor_simulado(configuracion=None, host=HOST_POR_DEFECTO, puerto=PUERTO_POR_DEFECTO):
+    return ServidorSimulado((host, puerto), Simulador(configuracion))
+
+# Función para arrancar el servidor simulado en un hilo aparte; devuelve el servidor (se para con shutdown)
+def arrancar_en_segundo_plano(configuracion=None, host=HOST_POR_DEFECTO, puerto=0):
+    servidor = crear_servidor_simulado(configuracion, host, puerto)
+    threading.Thread(target=servidor.serve_forever, name='servidor_simulado', daemon=True).start()
+    return servidor
+
+# Función para añadir al analizador de argumentos las opciones de configuración del servidor simulado
+def agregar_argumentos(parser):
+    for nombre, defecto in CONFIGURACION_POR_DEFECTO.items():
+        opcion = '--' + nombre.replace('_', '-')
+        if isinstance(defecto, tuple):
+            parser.add_argument(opcion, type=float, nargs=2, metavar=('MEDIANA', 'SIGMA'), default=defecto)
+        elif nombre == 'semilla':
+            parser.add_argument(opcion, type=int, default=defecto)
+        else:
+            parser.add_argument(opcion, type=type(defecto), default=defecto)
+
+# Función para obtener la configuración del servidor simulado de los argumentos ya leídos
+def configuracion_de_argumentos(args):
+    return {nombre: tuple(getattr(args, nombre)) if isinstance(defecto, tuple) else getattr(args, nombre)
+            for nombre, defecto in CONFIGURACION_POR_DEFECTO.items()}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Servidor que imita las APIs de Replicate, xAI y Gemini para pruebas y benchmarks.')
+    parser.add_argument('--host', default=HOST_POR_DEFECTO)
+    parser.add_argument('--puerto', type=int, default=PUERTO_POR_DEFECTO)
+    agregar_argumentos(parser)
+    args = parser.parse_args(argv)
+    servidor = crear_servidor_simulado(configuracion_de_argumentos(args), args.host, args.puerto)
+    print(f"Servidor simulado escuchando en {servidor.url}")
+    for nombre, valor in servidor.variables_entorno().items():
+        print(f"  {nombre}={valor}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -1,9 +1,10 @@
-import replicate, requests
 from PIL import Image
 from io import BytesIO
+from Cache_imagenes import obtener_imagen_cacheada, guardar_imagen_cacheada
+from Cliente_http import descargar, ejecutar_replicate
 
 # Función para generar una imagen basada en la sección, contenido y descripción del usuario
-def generar_imagen(section, content, nuevo_string):
+def generar_imagen(section, content, nuevo_string, usar_cache=True):
 
     # Definir los parámetros de entrada para el modelo
     image_input = {
@@ -13,8 +14,13 @@ def generar_imagen(section, content, nuevo_string):
         "disable_safety_checker": True
     }
     
+    # Reutilizar la imagen si ya se generó antes con los mismos parámetros
+    img = obtener_imagen_cacheada("openai/dall-e-3", image_input, usar_cache)
+    if img is not None:
+        return img
+
     # Ejecutar el modelo para generar la imagen
-    output = replicate.run(
+    output = ejecutar_replicate(
         "openai/dall-e-3",
         input=image_input
     )
@@ -22,8 +28,11 @@ def generar_imagen(section, content, nuevo_string):
     # Obtener la URL de la imagen generada
     image_url = output[0]
     # Realizar una solicitud HTTP para obtener la imagen
-    response = requests.get(image_url)
+    response = descargar(image_url)
     # Abrir la imagen generada en formato PIL
     img = Image.open(BytesIO(response.content))
     
+    # Guardar la imagen en la caché para próximas generaciones
+    guardar_imagen_cacheada("openai/dall-e-3", image_input, img)
+
     return img
\ No newline at end of file
@@ -1,13 +1,17 @@
-import replicate, ast, time
+import ast
 from Traducciones import obtener_traduccion
+from Reintentos import reintentar
+from Cliente_http import stream_replicate
+from Bitacora import obtener_registro, registrar, MensajeTraducido, DEBUG, INFO, ERROR
+
+# Registro del módulo
+registro = obtener_registro(__name__)
 
 # Función para obtener respuesta del modelo con reintentos
-def obtener_respuesta_modelo(nuevo_string, signals=None):
+def obtener_respuesta_modelo(nuevo_string, signals=None, receptor_stream=None):
     # Función interna para manejar logs
-    def log_message(msg):
-        print(msg)
-        if signals:
-            signals.update_log.emit(str(msg))
+    def log_message(msg, nivel=INFO):
+        registrar(registro, signals, msg, nivel)
             
     # Obtener el idioma actual
     current_language = 'es'
@@ -36,8 +40,12 @@ def obtener_respuesta_modelo(nuevo_string, signals=None):
     respuesta_completa = ""
     
     try:
+        # Reiniciar el lector incremental de secciones en cada intento
+        if receptor_stream:
+            receptor_stream.reiniciar()
+
         # Ejecutar el modelo para obtener la respuesta
-        for event in replicate.stream(
+        for event in stream_replicate(
             "mikeei/dolphin-2.9-llama3-70b-gguf:7cd1882cb3ea90756d09decf4bc8a259353354703f8f385ce588b71f7946f0aa",
             input={
                 "prompt": prompt,
@@ -48,17 +56,18 @@ def obtener_respuesta_modelo(nuevo_string, signals=None):
                 "prompt_template": "<|im_start|>system\n{system_prompt}<|im_end|>\n<|im_start|>user\n{prompt}<|im_end|>\n<|im_start|>assistant"
             }
         ):
-            # Imprimir el evento actual
-            print(event, end="")
             # Agregar el evento actual a la respuesta completa
             respuesta_completa += str(event)
+            # Enviar el fragmento al lector incremental de secciones
+            if receptor_stream:
+                receptor_stream.alimentar(str(event))
 
         # Extraer el contenido entre llaves de la respuesta completa
         respuesta_procesada = extraer_entre_llaves(respuesta_completa)
         
-        # Imprimir la respuesta completa y procesada
-        log_message(obtener_traduccion('respuesta_completa_modelo', current_language).format(respuesta=respuesta_completa))
-        log_message(obtener_traduccion('respuesta_procesada', current_language).format(respuesta=respuesta_procesada))
+        # Registrar la respuesta completa y procesada (solo se formatean en el nivel DEBUG)
+        log_message(MensajeTraducido('respuesta_completa_modelo', current_language, respuesta=respuesta_completa), DEBUG)
+        log_message(MensajeTraducido('respuesta_procesada', current_language, respuesta=respuesta_procesada), DEBUG)
         
         # Intentar evaluar la respuesta procesada como un diccionario
         try:
@@ -69,8 +78,8 @@ def obtener_respuesta_modelo(nuevo_string, signals=None):
             
     except Exception as e:
         # Manejar cualquier error que ocurra durante la generación de respuesta
-        log_message(obtener_traduccion('error_generacion_respuesta', current_language).format(error=str(e)))
-        return None
+        log_message(obtener_traduccion('error_generacion_respuesta', current_language).format(error=str(e)), ERROR)
+        raise
     finally:
         # Limpiar las variables de respuesta
         respuesta_completa = None
@@ -85,13 +94,11 @@ def extraer_entre_llaves(texto):
     return None
 
 # Función para obtener respuesta del modelo con reintentos
-def intentar_obtener_respuesta(descripcion, signals=None):
+def intentar_obtener_respuesta(descripcion, signals=None, receptor_stream=None):
     # Función interna para manejar logs
-    def log_message(msg):
-        print(msg)
-        if signals:
-            signals.update_log.emit(str(msg))
-            
+    def log_message(msg, nivel=INFO):
+        registrar(registro, signals, msg, nivel)
+
     # Obtener el idioma actual
     current_language = 'es'
     if signals and hasattr(signals, 'current_language'):
@@ -101,22 +108,13 @@ def intentar_obtener_respuesta(descripcion, signals=None):
     elif signals and hasattr(signals, 'parent') and hasattr(signals.parent, 'parent') and hasattr(signals.parent.parent, 'current_language'):
         current_language = signals.parent.parent.current_language
 
-    while True:
-        try: 
-            # Imprimir un mensaje indicando que se está intentando generar una respuesta
-            log_message(obtener_traduccion('intentando_generar_respuesta', current_language).format(modelo="Dolphin"))
-            
-            # Obtener la respuesta del modelo
-            respuesta = obtener_respuesta_modelo(descripcion, signals)
-            # Verificar si la respuesta es un diccionario válido
-            if isinstance(respuesta, dict):
-                log_message(obtener_traduccion('respuesta_generada_exitosamente', current_language))
-                return respuesta
-            else:
-                # Imprimir un mensaje indicando que la respuesta no es un diccionario válido
-                log_message(obtener_traduccion('respuesta_no_valida', current_language))
-                time.sleep(3)
-        except Exception as e:
-            # Imprimir un mensaje indicando que ocurrió un error al obtener la respuesta
-            log_message(obtener_traduccion('error_intento', current_language).format(intento=1, error=str(e)))
-            time.sleep(3)
\ No newline at end of file
+    # Función para hacer un intento de obtener la respuesta
+    def intento():
+        # Imprimir un mensaje indicando que se está intentando generar una respuesta
+        log_message(obtener_traduccion('intentando_generar_respuesta', current_language).format(modelo="Dolphin"))
+        return obtener_respuesta_modelo(descripcion, signals, receptor_stream)
+
+    # Reintentar con espera exponencial hasta obtener un diccionario válido, sin superar el máximo de intentos
+    respuesta = reintentar(intento, 'replicate', log_message, current_language, es_valida=lambda r: isinstance(r, dict), modelo=__name__)
+    log_message(obtener_traduccion('respuesta_generada_exitosamente', current_language))
+    return respuesta
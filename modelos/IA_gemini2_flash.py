@@ -1,15 +1,19 @@
-import os, ast, time
-from google import genai
+import os, ast
 from google.genai import types
 from Traducciones import obtener_traduccion
+from Cliente_http import obtener_cliente_gemini
+from Plazos import vigilar_stream
+from Reintentos import reintentar
+from Bitacora import obtener_registro, registrar, MensajeTraducido, DEBUG, INFO, ERROR
+
+# Registro del módulo
+registro = obtener_registro(__name__)
 
 # Función para obtener respuesta del modelo con reintentos
-def obtener_respuesta_modelo(nuevo_string, signals=None):
+def obtener_respuesta_modelo(nuevo_string, signals=None, receptor_stream=None):
     # Función interna para manejar logs
-    def log_message(msg):
-        print(msg)
-        if signals:
-            signals.update_log.emit(str(msg))
+    def log_message(msg, nivel=INFO):
+        registrar(registro, signals, msg, nivel)
 
     # Obtener el idioma actual
     current_language = 'es'
@@ -38,10 +42,8 @@ def obtener_respuesta_modelo(nuevo_string, signals=None):
     respuesta_completa = ""
     
     try:
-        # Inicializar el cliente de Google AI
-        client = genai.Client(
-            api_key=os.environ.get("GEMINI_API_KEY"),
-        )
+        # Obtener el cliente de Google AI compartido
+        client = obtener_cliente_gemini(os.environ.get("GEMINI_API_KEY"))
         
         # Configurar el modelo y contenido
         model = "gemini-2.0-flash"
@@ -90,24 +92,29 @@ def obtener_respuesta_modelo(nuevo_string, signals=None):
                 ],
             tools=tools,
             )
+
+        # Reiniciar el lector incremental de secciones en cada intento
+        if receptor_stream:
+            receptor_stream.reiniciar()
         
         # Ejecutar el modelo para obtener la respuesta
-        for chunk in client.models.generate_content_stream(
+        for chunk in vigilar_stream(lambda: client.models.generate_content_stream(
             model=model,
             contents=contents,
             config=generate_content_config,
-        ):
-            # Imprimir el evento actual
-            print(chunk.text, end="")
+        ), 'stream', 'texto'):
             # Agregar el evento actual a la respuesta completa
             respuesta_completa += chunk.text
+            # Enviar el fragmento al lector incremental de secciones
+            if receptor_stream:
+                receptor_stream.alimentar(chunk.text)
 
         # Extraer el contenido entre llaves de la respuesta completa
         respuesta_procesada = extraer_entre_llaves(respuesta_completa)
         
-        # Imprimir la respuesta completa y procesada
-        log_message(obtener_traduccion('respuesta_completa_modelo', current_language).format(respuesta=respuesta_completa))
-        log_message(obtener_traduccion('respuesta_procesada', current_language).format(respuesta=respuesta_procesada))
+        # Registrar la respuesta completa y procesada (solo se formatean en el nivel DEBUG)
+        log_message(MensajeTraducido('respuesta_completa_modelo', current_language, respuesta=respuesta_completa), DEBUG)
+        log_message(MensajeTraducido('respuesta_procesada', current_language, respuesta=respuesta_procesada), DEBUG)
         
         # Intentar evaluar la respuesta procesada como un diccionario
         try:
@@ -118,8 +125,8 @@ def obtener_respuesta_modelo(nuevo_string, signals=None):
             
     except Exception as e:
         # Imprimir un mensaje indicando que ocurrió un error al obtener la respuesta
-        log_message(obtener_traduccion('error_generacion_respuesta', current_language).format(error=str(e)))
-        return None
+        log_message(obtener_traduccion('error_generacion_respuesta', current_language).format(error=str(e)), ERROR)
+        raise
     finally:
         # Limpiar la memoria
         import gc
@@ -134,7 +141,11 @@ def extraer_entre_llaves(texto):
     return texto
 
 # Función para obtener respuesta del modelo con reintentos
-def intentar_obtener_respuesta(descripcion, signals=None):
+def intentar_obtener_respuesta(descripcion, signals=None, receptor_stream=None):
+    # Función interna para manejar logs
+    def log_message(msg, nivel=INFO):
+        registrar(registro, signals, msg, nivel)
+
     # Obtener el idioma actual
     current_language = 'es'
     if signals and hasattr(signals, 'current_language'):
@@ -143,17 +154,11 @@ def intentar_obtener_respuesta(descripcion, signals=None):
         current_language = signals.parent.current_language
     elif signals and hasattr(signals, 'parent') and hasattr(signals.parent, 'parent') and hasattr(signals.parent.parent, 'current_language'):
         current_language = signals.parent.parent.current_language
-        
-    max_intentos = 3
-    for intento in range(max_intentos):
-        try:
-            # Obtener la respuesta del modelo
-            respuesta = obtener_respuesta_modelo(descripcion, signals)
-            if respuesta:
-                return respuesta
-        except Exception as e:
-            # Imprimir un mensaje indicando que ocurrió un error al obtener la respuesta
-            if signals:
-                signals.update_log.emit(obtener_traduccion('error_intento', current_language).format(intento=intento + 1, error=str(e)))
-            time.sleep(2)
-    return None
+
+    # Función para hacer un intento de obtener la respuesta
+    def intento():
+        return obtener_respuesta_modelo(descripcion, signals, receptor_stream)
+
+    # Reintentar con espera exponencial hasta obtener un diccionario válido, sin superar el máximo de intentos
+    respuesta = reintentar(intento, 'google', log_message, current_language, es_valida=lambda r: isinstance(r, dict), modelo=__name__)
+    return respuesta
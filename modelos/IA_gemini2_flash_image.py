@@ -1,16 +1,23 @@
 import os
-from google import genai
 from google.genai import types
 from PIL import Image
 from io import BytesIO
 from Traducciones import obtener_traduccion
+from Cache_imagenes import obtener_imagen_cacheada, guardar_imagen_cacheada
+from Cliente_http import obtener_cliente_gemini
+from Plazos import ejecutar_con_plazo
+from Bitacora import obtener_registro, registrar, MensajeTraducido, ERROR
+
+# Registro del módulo
+registro = obtener_registro(__name__)
 
 # Excepción personalizada para errores de compatibilidad regional
 class RegionCompatibilityError(Exception):
-    pass
+    # No tiene sentido reintentar: la región no cambia entre intentos
+    reintentable = False
 
 # Función para generar una imagen basada en la sección, contenido y descripción del usuario
-def generar_imagen(section, content, nuevo_string, signals=None):
+def generar_imagen(section, content, nuevo_string, signals=None, usar_cache=True):
     # Obtener el idioma actual
     current_language = 'es'
     if signals and hasattr(signals, 'current_language'):
@@ -21,16 +28,20 @@ def generar_imagen(section, content, nuevo_string, signals=None):
         current_language = signals.parent.parent.current_language
     
     try:
-        # Inicializar el cliente de Google AI
-        client = genai.Client(
-            api_key=os.environ.get("GEMINI_API_KEY"),
-        )
+        # Obtener el cliente de Google AI compartido
+        client = obtener_cliente_gemini(os.environ.get("GEMINI_API_KEY"))
         
         # Construir el prompt para la generación de imagen
         prompt = f"Generate an image about {content}."
         
+        # Reutilizar la imagen si ya se generó antes con el mismo prompt
+        entrada_cache = {"prompt": prompt, "temperature": 2, "max_output_tokens": 8192}
+        image = obtener_imagen_cacheada("gemini-2.0-flash-preview-image-generation", entrada_cache, usar_cache)
+        if image is not None:
+            return image
+        
         # Ejecutar el modelo para obtener la imagen
-        response = client.models.generate_content(
+        response = ejecutar_con_plazo(lambda: client.models.generate_content(
             model="gemini-2.0-flash-preview-image-generation",
             contents=prompt,
             config=types.GenerateContentConfig(
@@ -60,24 +71,22 @@ def generar_imagen(section, content, nuevo_string, signals=None):
                     ),
                 ]
             )
-        )
+        ), 'espera_modelo', 'imagen')
         
         # Procesar la respuesta para obtener la imagen
         for part in response.candidates[0].content.parts:
             if part.inline_data is not None:
                 # Convertir los datos binarios a una imagen PIL
                 image = Image.open(BytesIO(part.inline_data.data))
+                # Guardar la imagen en la caché para próximas generaciones
+                guardar_imagen_cacheada("gemini-2.0-flash-preview-image-generation", entrada_cache, image)
                 return image
             elif part.text is not None:
-                mensaje = f"Texto recibido del modelo: {part.text}"
-                print(mensaje)
-                if signals:
-                    signals.update_log.emit(obtener_traduccion('texto_recibido_modelo', current_language).format(texto=part.text))
+                registrar(registro, signals, MensajeTraducido('texto_recibido_modelo', current_language, texto=part.text))
         
         # Si no se encontró ninguna imagen en la respuesta
         error_mensaje = "No se generó ninguna imagen en la respuesta"
-        if signals:
-            signals.update_log.emit(obtener_traduccion('imagen_no_generada', current_language))
+        registrar(registro, signals, MensajeTraducido('imagen_no_generada', current_language))
         raise Exception(error_mensaje)
         
     except Exception as e:
@@ -86,14 +95,10 @@ def generar_imagen(section, content, nuevo_string, signals=None):
         if "models/gemini-2.0-flash-preview-image-generation is not found" in error_message and "NOT_FOUND" in error_message:
             custom_error_key = 'error_gemini_region_incompatible'
             custom_error_message = obtener_traduccion(custom_error_key, current_language)
-            print(custom_error_message)
-            if signals:
-                signals.update_log.emit(custom_error_message)
+            registrar(registro, signals, custom_error_message, ERROR)
             # Lanzar una excepción personalizada que será capturada específicamente
             raise RegionCompatibilityError(custom_error_message)
         else:
             # Manejo de otros errores como estaba antes
-            print(obtener_traduccion('error_generacion_imagen_gemini', current_language).format(error=error_message))
-            if signals:
-                signals.update_log.emit(obtener_traduccion('error_generacion_imagen_gemini', current_language).format(error=error_message))
+            registrar(registro, signals, MensajeTraducido('error_generacion_imagen_gemini', current_language, error=error_message), ERROR)
             raise
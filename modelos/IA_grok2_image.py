@@ -1,10 +1,18 @@
-import requests, os, time
+import requests, os
 from PIL import Image
 from io import BytesIO
 from Traducciones import obtener_traduccion
+from Cache_imagenes import obtener_imagen_cacheada, guardar_imagen_cacheada
+from Cliente_http import peticion_con_plazo, url_proveedor, descargar
+from Plazos import PlazoSuperadoError
+from Reintentos import ErrorReintentable
+from Bitacora import obtener_registro, registrar, MensajeTraducido, ERROR
+
+# Registro del módulo
+registro = obtener_registro(__name__)
 
 # Función para generar una imagen basada en la sección, contenido y descripción del usuario
-def generar_imagen(section, content, nuevo_string, signals=None):
+def generar_imagen(section, content, nuevo_string, signals=None, usar_cache=True):
     # Obtener el idioma actual
     current_language = 'es'
     if signals and hasattr(signals, 'current_language'):
@@ -28,118 +36,49 @@ def generar_imagen(section, content, nuevo_string, signals=None):
         "response_format": "url"
     }
     
-    max_retries = 10
-    retry_delay = 5
-    retries = 0
-
-    while retries < max_retries:
-        try:
-            # Realizar la solicitud HTTP
-            response = requests.post(
-                "https://api.x.ai/v1/images/generations",
-                headers=headers,
-                json=data,
-                timeout=30 # Add a timeout to the request itself
-            )
-            
-            # Verificar si la solicitud fue exitosa
-            if response.status_code == 200:
-                # Obtener la URL de la imagen generada
-                image_url = response.json()['data'][0]['url']
-                
-                # Realizar una solicitud HTTP para obtener la imagen
-                img_response = requests.get(image_url, timeout=30) # Add timeout here too
-                img_response.raise_for_status() # Check image download success
-                
-                # Abrir la imagen generada en formato PIL
-                img = Image.open(BytesIO(img_response.content))
-                
-                return img # Return the successful image
-
-            # Check for the specific timeout error
-            elif response.status_code == 400 and "Timeout expired" in response.text:
-                retries += 1
-                error_msg = f"Error 400 (Timeout): {response.text}"
-                print(error_msg)
-                if signals:
-                    retry_msg = obtener_traduccion('retry_image_generation', current_language).format(
-                        attempt=retries,
-                        max_attempts=max_retries,
-                        delay=retry_delay
-                    )
-                    signals.update_log.emit(retry_msg)
+    # Reutilizar la imagen si ya se generó antes con los mismos parámetros
+    img = obtener_imagen_cacheada("grok-2-image-1212", data, usar_cache)
+    if img is not None:
+        return img
 
-                if retries < max_retries:
-                    time.sleep(retry_delay)
-                    continue # Go to the next iteration
-                else:
-                    # Max retries reached for timeout
-                    final_error_msg = obtener_traduccion('max_retries_reached', current_language).format(error=error_msg)
-                    if signals:
-                        signals.update_log.emit(final_error_msg)
-                    raise Exception(final_error_msg)
-            else:
-                # Handle other non-200 status codes immediately
-                error_msg = f"Error: {response.status_code}\nResponse: {response.text}"
-                print(error_msg)
-                if signals:
-                    signals.update_log.emit(obtener_traduccion('error_generacion_imagen', current_language).format(error=error_msg))
-                raise Exception(error_msg)
+    try:
+        # Realizar la solicitud HTTP (los reintentos los gestiona la política común de Reintentos)
+        response = peticion_con_plazo(
+            'POST',
+            url_proveedor('xai', '/v1/images/generations'),
+            'xai',
+            'imagen',
+            headers=headers,
+            json=data,
+            timeout=30
+        )
 
-        except requests.exceptions.Timeout as timeout_err:
-            retries += 1
-            error_message = f"Request Timeout: {str(timeout_err)}"
-            print(error_message)
-            if signals:
-                retry_msg = obtener_traduccion('retry_image_generation', current_language).format(
-                    attempt=retries,
-                    max_attempts=max_retries,
-                    delay=retry_delay
-                ) + f" ({obtener_traduccion('request_timeout', current_language)})"
-                signals.update_log.emit(retry_msg)
+        # Verificar si la solicitud fue exitosa
+        if response.status_code == 200:
+            # Obtener la URL de la imagen generada
+            image_url = response.json()['data'][0]['url']
 
-            if retries < max_retries:
-                time.sleep(retry_delay)
-                continue # Go to the next iteration
-            else:
-                final_error_msg = obtener_traduccion('max_retries_reached', current_language).format(error=error_message)
-                if signals:
-                    signals.update_log.emit(final_error_msg)
-                raise Exception(final_error_msg) from timeout_err
+            # Realizar una solicitud HTTP para obtener la imagen
+            img_response = descargar(image_url, timeout=30)
 
-        except requests.exceptions.RequestException as req_err:
-            # Handle other potential request errors (connection, etc.)
-            retries += 1
-            error_message = f"Request Exception: {str(req_err)}"
-            print(error_message)
-            if signals:
-                 retry_msg = obtener_traduccion('retry_image_generation', current_language).format(
-                    attempt=retries,
-                    max_attempts=max_retries,
-                    delay=retry_delay
-                ) + f" ({obtener_traduccion('connection_error_details', current_language)}: {str(req_err)})"
-                 signals.update_log.emit(retry_msg)
+            # Abrir la imagen generada en formato PIL
+            img = Image.open(BytesIO(img_response.content))
+            # Guardar la imagen en la caché para próximas generaciones
+            guardar_imagen_cacheada("grok-2-image-1212", data, img)
 
-            if retries < max_retries:
-                time.sleep(retry_delay)
-                continue # Go to the next iteration
-            else:
-                final_error_msg = obtener_traduccion('max_retries_reached', current_language).format(error=error_message)
-                if signals:
-                    signals.update_log.emit(final_error_msg)
-                raise Exception(final_error_msg) from req_err
+            return img
 
-        except Exception as e:
-            # Catch any other unexpected errors during the process
-            error_message = str(e)
-            print(obtener_traduccion('error_generacion_imagen', current_language).format(error=error_message))
-            if signals:
-                signals.update_log.emit(obtener_traduccion('error_generacion_imagen', current_language).format(error=error_message))
-            raise # Re-raise the caught exception
+        error_msg = f"Error: {response.status_code}\nResponse: {response.text}"
+        # xAI responde con un 400 "Timeout expired" cuando la generación tarda demasiado: se puede reintentar
+        if response.status_code == 400 and "Timeout expired" in response.text:
+            raise ErrorReintentable(f"Error 400 (Timeout): {response.text}")
+        # Lanzar el error HTTP para que la política de reintentos lea su código y Retry-After
+        response.raise_for_status()
+        raise Exception(error_msg)
 
-    # This part should theoretically not be reached if exceptions are raised correctly
-    # but serves as a fallback.
-    final_fallback_error = obtener_traduccion('error_generacion_imagen_unknown', current_language)
-    if signals:
-        signals.update_log.emit(final_fallback_error)
-    raise Exception(final_fallback_error)
\ No newline at end of file
+    except Exception as e:
+        error_message = str(e)
+        if isinstance(e, (requests.exceptions.Timeout, PlazoSuperadoError)):
+            error_message = f"{obtener_traduccion('request_timeout', current_language)}: {error_message}"
+        registrar(registro, signals, MensajeTraducido('error_generacion_imagen', current_language, error=error_message), ERROR)
+        raise
@@ -1,13 +1,17 @@
-import requests, ast, time, os
+import ast, os
 from Traducciones import obtener_traduccion
+from Cliente_http import peticion_con_plazo, url_proveedor
+from Reintentos import reintentar
+from Bitacora import obtener_registro, registrar, MensajeTraducido, DEBUG, INFO, ERROR
+
+# Registro del módulo
+registro = obtener_registro(__name__)
 
 # Función para obtener respuesta del modelo con reintentos
-def obtener_respuesta_modelo(nuevo_string, signals=None):
+def obtener_respuesta_modelo(nuevo_string, signals=None, receptor_stream=None):
     # Función interna para manejar logs
-    def log_message(msg):
-        print(msg)
-        if signals:
-            signals.update_log.emit(str(msg))
+    def log_message(msg, nivel=INFO):
+        registrar(registro, signals, msg, nivel)
             
     # Obtener el idioma actual
     current_language = 'es'
@@ -61,8 +65,11 @@ def obtener_respuesta_modelo(nuevo_string, signals=None):
     
     try:
         # Realizar la solicitud HTTP
-        response = requests.post(
-            "https://api.x.ai/v1/chat/completions",
+        response = peticion_con_plazo(
+            'POST',
+            url_proveedor('xai', '/v1/chat/completions'),
+            'xai',
+            'razonamiento',
             headers=headers,
             json=data
         )
@@ -70,11 +77,15 @@ def obtener_respuesta_modelo(nuevo_string, signals=None):
         # Verificar si la solicitud fue exitosa
         if response.status_code == 200:
             respuesta_completa = response.json()['choices'][0]['message']['content']
-            log_message(obtener_traduccion('respuesta_completa_modelo', current_language).format(respuesta=respuesta_completa))
+            # Esta API no se consulta en streaming: pasar la respuesta entera al lector de secciones
+            if receptor_stream:
+                receptor_stream.reiniciar()
+                receptor_stream.alimentar(respuesta_completa)
+            log_message(MensajeTraducido('respuesta_completa_modelo', current_language, respuesta=respuesta_completa), DEBUG)
             
             # Extraer el contenido entre llaves de la respuesta completa
             respuesta_procesada = extraer_entre_llaves(respuesta_completa)
-            log_message(obtener_traduccion('respuesta_procesada', current_language).format(respuesta=respuesta_procesada))
+            log_message(MensajeTraducido('respuesta_procesada', current_language, respuesta=respuesta_procesada), DEBUG)
             
             # Intentar evaluar la respuesta procesada como un diccionario
             try:
@@ -85,12 +96,14 @@ def obtener_respuesta_modelo(nuevo_string, signals=None):
         else:
             error_msg = f"Error: {response.status_code}\nResponse: {response.text}"
             log_message(error_msg)
+            # Lanzar el error HTTP para que la política de reintentos lea su código y Retry-After
+            response.raise_for_status()
             return None
 
     except Exception as e:
         # Manejar cualquier error que ocurra durante la generación de respuesta
-        log_message(obtener_traduccion('error_generacion_respuesta', current_language).format(error=str(e)))
-        return None
+        log_message(obtener_traduccion('error_generacion_respuesta', current_language).format(error=str(e)), ERROR)
+        raise
     finally: 
         # Limpiar las variables de respuesta    
         respuesta_completa = None
@@ -105,13 +118,11 @@ def extraer_entre_llaves(texto):
     return None
 
 # Función para obtener respuesta del modelo con reintentos
-def intentar_obtener_respuesta(descripcion, signals=None):
+def intentar_obtener_respuesta(descripcion, signals=None, receptor_stream=None):
     # Función interna para manejar logs
-    def log_message(msg):
-        print(msg)
-        if signals:
-            signals.update_log.emit(str(msg))
-            
+    def log_message(msg, nivel=INFO):
+        registrar(registro, signals, msg, nivel)
+
     # Obtener el idioma actual
     current_language = 'es'
     if signals and hasattr(signals, 'current_language'):
@@ -121,23 +132,13 @@ def intentar_obtener_respuesta(descripcion, signals=None):
     elif signals and hasattr(signals, 'parent') and hasattr(signals.parent, 'parent') and hasattr(signals.parent.parent, 'current_language'):
         current_language = signals.parent.parent.current_language
 
-    while True:
-        try:
-            # Imprimir un mensaje indicando que se está intentando generar una respuesta
-            log_message(obtener_traduccion('intentando_generar_respuesta', current_language).format(modelo="Grok"))
-            
-            # Obtener la respuesta del modelo
-            respuesta = obtener_respuesta_modelo(descripcion, signals)
-            
-            # Verificar si la respuesta es un diccionario válido
-            if isinstance(respuesta, dict):
-                log_message(obtener_traduccion('respuesta_generada_exitosamente', current_language))
-                return respuesta
-            else:
-                # Imprimir un mensaje indicando que la respuesta no es un diccionario válido
-                log_message(obtener_traduccion('respuesta_no_valida', current_language))
-                time.sleep(3)
-        except Exception as e:
-            # Imprimir un mensaje indicando que ocurrió un error al obtener la respuesta
-            log_message(obtener_traduccion('error_intento', current_language).format(intento=1, error=str(e)))
-            time.sleep(3)
\ No newline at end of file
+    # Función para hacer un intento de obtener la respuesta
+    def intento():
+        # Imprimir un mensaje indicando que se está intentando generar una respuesta
+        log_message(obtener_traduccion('intentando_generar_respuesta', current_language).format(modelo="Grok"))
+        return obtener_respuesta_modelo(descripcion, signals, receptor_stream)
+
+    # Reintentar con espera exponencial hasta obtener un diccionario válido, sin superar el máximo de intentos
+    respuesta = reintentar(intento, 'xai', log_message, current_language, es_valida=lambda r: isinstance(r, dict), modelo=__name__)
+    log_message(obtener_traduccion('respuesta_generada_exitosamente', current_language))
+    return respuesta
@@ -1,9 +1,10 @@
-import replicate, requests
 from PIL import Image
 from io import BytesIO
+from Cache_imagenes import obtener_imagen_cacheada, guardar_imagen_cacheada
+from Cliente_http import descargar, ejecutar_replicate
 
 # Función para generar una imagen basada en la sección, contenido y descripción del usuario
-def generar_imagen(section, content, nuevo_string):
+def generar_imagen(section, content, nuevo_string, usar_cache=True):
     # Definir los parámetros de entrada para el modelo
     image_input = {
         "prompt": f"a photo in the context of the PowerPoint of {content} {section}, professional photographers style with soft lighting and exceptional clarity",
@@ -11,8 +12,13 @@ def generar_imagen(section, content, nuevo_string):
         "safety_filter_level": "block_only_high"
     }
     
+    # Reutilizar la imagen si ya se generó antes con los mismos parámetros
+    img = obtener_imagen_cacheada("google/imagen-3-fast", image_input, usar_cache)
+    if img is not None:
+        return img
+
     # Ejecutar el modelo para generar la imagen
-    output = replicate.run(
+    output = ejecutar_replicate(
         "google/imagen-3-fast",
         input=image_input
     )
@@ -20,8 +26,11 @@ def generar_imagen(section, content, nuevo_string):
     # Los modelos de Google devuelven directamente la URL de la imagen
     image_url = output
     # Realizar una solicitud HTTP para obtener la imagen
-    response = requests.get(image_url)
+    response = descargar(image_url)
     # Abrir la imagen generada en formato PIL
     img = Image.open(BytesIO(response.content))
     
+    # Guardar la imagen en la caché para próximas generaciones
+    guardar_imagen_cacheada("google/imagen-3-fast", image_input, img)
+
     return img 
\ No newline at end of file
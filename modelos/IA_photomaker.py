@@ -1,8 +1,10 @@
-import replicate, requests, base64
+import base64
 from PIL import Image
 from io import BytesIO
+from Cache_imagenes import obtener_imagen_cacheada, guardar_imagen_cacheada
+from Cliente_http import descargar, ejecutar_replicate
 # Función para generar una imagen basada en la sección, contenido, descripción e imagen personalizada del usuario
-def generar_imagen(section, content, nuevo_string, imagen_path):
+def generar_imagen(section, content, nuevo_string, imagen_path, usar_cache=True):
     # Leer la imagen personalizada del usuario y codificarla en base64
     with open(imagen_path, "rb") as image_file:
         Image1 = base64.b64encode(image_file.read()).decode('utf-8')
@@ -20,17 +22,25 @@ def generar_imagen(section, content, nuevo_string, imagen_path):
         "disable_safety_checker": True
     }
 
+    # Reutilizar la imagen si ya se generó antes con los mismos parámetros
+    img = obtener_imagen_cacheada("tencentarc/photomaker:ddfc2b08d209f9fa8c1eca692712918bd449f695dabb4a958da31802a9570fe4", input_params, usar_cache)
+    if img is not None:
+        return img
+
     # Ejecutar el modelo para generar la imagen
-    output = replicate.run(
+    output = ejecutar_replicate(
         "tencentarc/photomaker:ddfc2b08d209f9fa8c1eca692712918bd449f695dabb4a958da31802a9570fe4",
         input=input_params
     )
 
     # Realizar una solicitud HTTP para obtener la imagen generada
-    response = requests.get(output[0])
+    response = descargar(output[0])
     # Abrir la imagen generada en formato PIL
     img = Image.open(BytesIO(response.content))
     
+    # Guardar la imagen en la caché para próximas generaciones
+    guardar_imagen_cacheada("tencentarc/photomaker:ddfc2b08d209f9fa8c1eca692712918bd449f695dabb4a958da31802a9570fe4", input_params, img)
+
     return img
 
 # Función para codificar una imagen en base64
@@ -40,7 +50,7 @@ def encode_image(image_path):
 
 # Función para convertir una URL de imagen a base64
 def image_url_to_base64(url):
-    response = requests.get(url)
+    response = descargar(url)
     img = Image.open(BytesIO(response.content))
     buffered = BytesIO()
     img.save(buffered, format="PNG")
@@ -0,0 +1,89 @@
+# Punto de entrada sin interfaz gráfica para generar presentaciones por lotes:
+#   python -m powerpoineador generate trabajos.jsonl --simultaneos 4 --salida-dir presentaciones
+# Cada línea de stdout es un evento JSON (inicio, progreso, diapositiva, etapa, log, uso, fin, resumen);
+# los mensajes de depuración de la generación se escriben en stderr
+# También arranca el servicio HTTP local de generación (ver Servidor.py):
+#   python -m powerpoineador serve --puerto 8765 --simultaneos 2
+import sys, json, argparse, contextlib
+
+# Códigos de salida
+SALIDA_OK, SALIDA_FALLIDOS, SALIDA_TRABAJOS_INVALIDOS, SALIDA_INTERRUMPIDO = 0, 1, 2, 130
+
+# Función para crear el analizador de argumentos de la línea de comandos
+def crear_parser():
+    parser = argparse.ArgumentParser(prog='powerpoineador', description='Genera presentaciones de PowerPoint sin interfaz gráfica.')
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    generar = subparsers.add_parser('generate', help='Genera las presentaciones de un archivo de trabajos JSONL o CSV')
+    generar.add_argument('trabajos', help='Archivo .jsonl (un objeto por línea) o .csv (una fila por presentación)')
+    generar.add_argument('--simultaneos', type=int, default=None, help='Presentaciones que se generan a la vez')
+    generar.add_argument('--salida-dir', default='.', help='Carpeta para los trabajos que no indican filename')
+    generar.add_argument('--sin-log', action='store_true', help='No emitir los eventos de log, solo los de progreso')
+    generar.add_argument('--validar', action='store_true', help='Solo comprobar el archivo de trabajos, sin generar nada')
+
+    servir = subparsers.add_parser('serve', help='Arranca el servicio HTTP local de generación')
+    servir.add_argument('--host', default=None, help='Dirección en la que escuchar (por defecto solo el propio equipo)')
+    servir.add_argument('--puerto', type=int, default=None, help='Puerto en el que escuchar')
+    servir.add_argument('--simultaneos', type=int, default=None, help='Presentaciones que se generan a la vez')
+    servir.add_argument('--max-cola', type=int, default=None, help='Trabajos que pueden esperar en la cola')
+    servir.add_argument('--salida-dir', default='presentaciones', help='Carpeta donde se guardan las presentaciones generadas')
+    return parser
+
+# Función para ejecutar el comando generate
+def comando_generar(args):
+    from Trabajos import leer_trabajos, ejecutar_lote, cargar_claves_api, TrabajoInvalidoError, TRABAJOS_SIMULTANEOS, COMPLETADO
+    salida = sys.stdout
+
+    # Función para escribir un evento como una línea JSON
+    def al_evento(evento):
+        if args.sin_log and evento['evento'] == 'log':
+            return
+        salida.write(json.dumps(evento, ensure_ascii=False) + '\n')
+        salida.flush()
+
+    try:
+        trabajos = leer_trabajos(args.trabajos, args.salida_dir)
+    except (OSError, TrabajoInvalidoError) as e:
+        print(f"Error en el archivo de trabajos: {str(e)}", file=sys.stderr)
+        return SALIDA_TRABAJOS_INVALIDOS
+    if args.validar:
+        al_evento({'evento': 'validado', 'trabajos': len(trabajos)})
+        return SALIDA_OK
+
+    cargar_claves_api()
+    # Los print() de la generación van a stderr para que stdout solo tenga eventos JSON
+    with contextlib.redirect_stdout(sys.stderr):
+        try:
+            resultados = ejecutar_lote(trabajos, al_evento, args.simultaneos or TRABAJOS_SIMULTANEOS)
+        except KeyboardInterrupt:
+            return SALIDA_INTERRUMPIDO
+    return SALIDA_OK if all(r['estado'] == COMPLETADO for r in resultados) else SALIDA_FALLIDOS
+
+# Función para ejecutar el comando serve
+def comando_servir(args):
+    from Servidor import crear_servidor, HOST_POR_DEFECTO, PUERTO_POR_DEFECTO, MAX_COLA
+    from Trabajos import cargar_claves_api, TRABAJOS_SIMULTANEOS
+    cargar_claves_api()
+    servidor = crear_servidor(args.salida_dir, args.host or HOST_POR_DEFECTO, args.puerto or PUERTO_POR_DEFECTO,
+                              args.simultaneos or TRABAJOS_SIMULTANEOS, args.max_cola or MAX_COLA)
+    host, puerto = servidor.server_address[:2]
+    print(f"Servicio de generación escuchando en http://{host}:{puerto}", file=sys.stderr)
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        servidor.gestor.cerrar()
+    return SALIDA_OK
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+    if args.comando == 'generate':
+        return comando_generar(args)
+    if args.comando == 'serve':
+        return comando_servir(args)
+    return SALIDA_OK
+
+if __name__ == '__main__':
+    sys.exit(main())